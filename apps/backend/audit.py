@@ -23,6 +23,48 @@ from models import AuditLog
 from utils.security import redact_sensitive
 
 
+def audit_log_values(
+    action: str,
+    user_id: Optional[int] = None,
+    session_id: Optional[int] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    success: bool = True,
+    error_message: Optional[str] = None,
+    request: Optional[Request] = None,
+) -> Dict[str, Any]:
+    """Build the column values for an audit_log row without touching the DB."""
+    ip_address = None
+    user_agent = None
+
+    if request:
+        try:
+            ip_address = request.client.host if request.client else None
+            user_agent = request.headers.get("user-agent", "")[:500]  # Truncate
+        except Exception:
+            pass
+
+    # Redact sensitive info from details if present
+    safe_details = None
+    if details:
+        safe_details = json.dumps(redact_sensitive(details))
+
+    return {
+        "timestamp": datetime.utcnow(),
+        "user_id": user_id,
+        "session_id": session_id,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "details": safe_details,
+        "success": success,
+        "error_message": error_message,
+    }
+
+
 async def audit_log(
     session: AsyncSession,
     action: str,
@@ -41,33 +83,18 @@ async def audit_log(
     This should never raise - failures are logged but not propagated.
     """
     try:
-        ip_address = None
-        user_agent = None
-        
-        if request:
-            try:
-                ip_address = request.client.host if request.client else None
-                user_agent = request.headers.get("user-agent", "")[:500]  # Truncate
-            except Exception:
-                pass
-        
-        # Redact sensitive info from details if present
-        safe_details = None
-        if details:
-            safe_details = json.dumps(redact_sensitive(details))
-
         log_entry = AuditLog(
-            timestamp=datetime.utcnow(),
-            user_id=user_id,
-            session_id=session_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=safe_details,
-            success=success,
-            error_message=error_message,
+            **audit_log_values(
+                action,
+                user_id=user_id,
+                session_id=session_id,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                details=details,
+                success=success,
+                error_message=error_message,
+                request=request,
+            )
         )
         
         session.add(log_entry)
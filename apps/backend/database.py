@@ -102,28 +102,11 @@ if not hasattr(AsyncSession, "exec"):
     AsyncSession.exec = _exec  # type: ignore[attr-defined]
 
 # Query Performance Monitoring
-# Logs slow queries for performance analysis (development only)
-SLOW_QUERY_THRESHOLD = float(os.getenv("DB_SLOW_QUERY_THRESHOLD", "1.0"))  # seconds
-ENABLE_QUERY_LOGGING = os.getenv("DB_ENABLE_QUERY_LOGGING", "false").lower() == "true"
-
-if ENABLE_QUERY_LOGGING:
-    import logging
-    import time
-    from sqlalchemy import event
-    from sqlalchemy.engine import Engine
-
-    # Set up query logger
-    query_logger = logging.getLogger("sqlalchemy.query_performance")
-    query_logger.setLevel(logging.INFO)
-
-    if not query_logger.handlers:
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter(
-            "[%(asctime)s] SLOW QUERY (%(duration).3fs): %(statement)s"
-        ))
-        query_logger.addHandler(handler)
-
-    print(f"DEBUG: Query logging enabled (threshold={SLOW_QUERY_THRESHOLD}s)")
+# Per-statement latency by fingerprint, per-request query count / DB time, and
+# the slow query log (DB_SLOW_QUERY_THRESHOLD seconds). See services/db_timing.py.
+from services.db_timing import instrument_engine
+
+instrument_engine(engine)
 
 async def init_db():
     import models  # noqa: F401 — populate SQLModel.metadata with all table definitions
@@ -13,6 +13,7 @@ from datetime import datetime
 
 from database import get_session
 from models import AuthSession, User, hash_token
+from services.session_cache import session_cache
 
 
 async def get_current_session(
@@ -23,6 +24,8 @@ async def get_current_session(
     Extract and validate session from Authorization header.
 
     Returns None if authentication fails or if the session is expired.
+    Validated sessions are served from ``session_cache`` until they expire or
+    are revoked; a hit is a detached instance not bound to ``session``.
     """
     if not authorization or not authorization.startswith("Bearer "):
         return None
@@ -32,6 +35,11 @@ async def get_current_session(
     # Try legacy session token lookup
     token_hash = hash_token(token)
 
+    if session_cache is not None:
+        cached = session_cache.get(token_hash)
+        if cached is not None:
+            return cached
+
     result = await session.exec(
         select(AuthSession)
         .where(
@@ -40,7 +48,10 @@ async def get_current_session(
             (AuthSession.expires_at == None) | (AuthSession.expires_at > datetime.utcnow())
         )
     )
-    return result.first()
+    auth_session = result.first()
+    if auth_session is not None and session_cache is not None:
+        session_cache.put(auth_session)
+    return auth_session
 
 
 async def require_auth(
@@ -88,6 +99,10 @@ async def resolve_user_id_and_guest_flag(
     if auth_session:
         return auth_session.user_id, False
 
+    # The guest user never changes once created; look it up once per process.
+    if session_cache is not None and session_cache.guest_user_id is not None:
+        return session_cache.guest_user_id, True
+
     guest_result = await session.exec(select(User).where(User.email == GUEST_EMAIL))
     guest_user = guest_result.first()
     if not guest_user:
@@ -95,6 +110,8 @@ async def resolve_user_id_and_guest_flag(
         session.add(guest_user)
         await session.commit()
         await session.refresh(guest_user)
+    if session_cache is not None:
+        session_cache.guest_user_id = guest_user.id
     return guest_user.id, True
 
 
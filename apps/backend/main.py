@@ -6,6 +6,7 @@ from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from security.headers import SecurityHeadersMiddleware
 from security.csrf import CSRFProtectionMiddleware, set_csrf_secret
+from services.db_timing import RequestDBTimingMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
@@ -23,6 +24,7 @@ from sqlalchemy import text
 
 from database import init_db, get_session
 from sourcing import SourcingRepository, SearchResult
+from sourcing.circuit_breaker import provider_breakers
 from audit import audit_log
 
 # Import routers
@@ -57,6 +59,7 @@ from routes.outreach_tracking import router as outreach_tracking_router
 from routes.public_search import router as public_search_router
 from routes.public_vendors import router as public_vendors_router
 from routes.deals import router as deals_router
+import services.job_handlers  # noqa: F401  (registers background job handlers)
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env", override=False)
 
@@ -108,6 +111,9 @@ else:
 # Always register middleware; it skips validation when no secret is configured
 app.add_middleware(CSRFProtectionMiddleware)
 
+# Outermost: counts every DB statement a request runs and prints its DB time
+app.add_middleware(RequestDBTimingMiddleware)
+
 # Ensure uploads directory exists
 env_upload_dir = os.getenv("UPLOAD_DIR")
 candidate_paths = [
@@ -230,6 +236,8 @@ async def readiness_check(session: AsyncSession = Depends(get_session)):
         content={
             "status": "ready" if all_ok else "degraded",
             "checks": checks,
+            # Informational only: an open provider breaker does not fail readiness.
+            "provider_breakers": provider_breakers.snapshot(),
             "timestamp": datetime.utcnow().isoformat(),
         }
     )
@@ -284,6 +292,26 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Optional in-process vendor enrichment worker (VENDOR_ENRICHMENT_WORKER_ENABLED).
+_enrichment_worker_task: Optional[asyncio.Task] = None
+_enrichment_worker_stop = asyncio.Event()
+
+# Event-loop lag sampler (EVENT_LOOP_LAG_MONITOR_ENABLED, on by default).
+_loop_lag_task: Optional[asyncio.Task] = None
+_loop_lag_stop = asyncio.Event()
+
+# Concurrent index builds + data check after boot (STARTUP_INDEX_BUILD_ENABLED, on by default).
+_post_boot_task: Optional[asyncio.Task] = None
+
+# Cross-worker session revocation listener (SESSION_CACHE_BACKEND=postgres).
+_session_revocation_task: Optional[asyncio.Task] = None
+_session_revocation_stop = asyncio.Event()
+
+# In-process durable job worker (JOB_WORKER_ENABLED, on by default).
+_job_worker_task: Optional[asyncio.Task] = None
+_job_worker_stop = asyncio.Event()
+
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
@@ -296,7 +324,7 @@ async def startup_event():
         await init_db()
 
     from database import engine
-    from startup_migrations import run_startup_migrations, run_data_integrity_check
+    from startup_migrations import run_post_boot_maintenance, run_startup_migrations
 
     try:
         async with asyncio.timeout(15):
@@ -304,11 +332,36 @@ async def startup_event():
     except (TimeoutError, Exception) as e:
         print(f"Migration check skipped (DB timeout or error): {type(e).__name__}: {e}")
 
-    try:
-        async with asyncio.timeout(10):
-            await run_data_integrity_check(engine)
-    except (TimeoutError, Exception) as e:
-        print(f"⚠️  Data integrity check skipped ({type(e).__name__}): {e}")
+    if os.getenv("STARTUP_INDEX_BUILD_ENABLED", "true").lower() in ("1", "true", "yes"):
+        global _post_boot_task
+        _post_boot_task = asyncio.create_task(run_post_boot_maintenance(engine))
+
+    if os.getenv("VENDOR_ENRICHMENT_WORKER_ENABLED", "false").lower() in ("1", "true", "yes"):
+        from services.vendor_enrichment_worker import VendorEnrichmentWorker
+        global _enrichment_worker_task
+        _enrichment_worker_task = asyncio.create_task(
+            VendorEnrichmentWorker().run(_enrichment_worker_stop)
+        )
+
+    if os.getenv("JOB_WORKER_ENABLED", "true").lower() in ("1", "true", "yes"):
+        from services.jobs import JobWorker
+        global _job_worker_task
+        _job_worker_stop.clear()
+        _job_worker_task = asyncio.create_task(JobWorker().run(_job_worker_stop))
+
+    from services.session_cache import session_cache
+    if session_cache is not None and session_cache.broadcast:
+        global _session_revocation_task
+        _session_revocation_stop.clear()
+        _session_revocation_task = asyncio.create_task(
+            session_cache.listen_for_revocations(_session_revocation_stop)
+        )
+
+    if os.getenv("EVENT_LOOP_LAG_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes"):
+        from services.loop_lag import loop_lag_monitor
+        global _loop_lag_task
+        _loop_lag_stop.clear()
+        _loop_lag_task = asyncio.create_task(loop_lag_monitor.run(_loop_lag_stop))
 
     if is_production:
         return
@@ -318,3 +371,45 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     print("FastAPI application shutting down...")
+    from services.clickout_buffer import clickout_buffer
+    await clickout_buffer.close()
+    from services.share_access import share_access_counter
+    await share_access_counter.close()
+
+    if _enrichment_worker_task is not None:
+        _enrichment_worker_stop.set()
+        try:
+            await asyncio.wait_for(_enrichment_worker_task, timeout=10)
+        except (asyncio.TimeoutError, Exception) as e:
+            print(f"Enrichment worker did not stop cleanly: {type(e).__name__}: {e}")
+    if _job_worker_task is not None:
+        _job_worker_stop.set()
+        try:
+            await asyncio.wait_for(_job_worker_task, timeout=15)
+        except (asyncio.TimeoutError, Exception) as e:
+            print(f"Job worker did not stop cleanly: {type(e).__name__}: {e}")
+    if _session_revocation_task is not None:
+        _session_revocation_stop.set()
+        try:
+            await asyncio.wait_for(_session_revocation_task, timeout=5)
+        except (asyncio.TimeoutError, Exception) as e:
+            print(f"Session revocation listener did not stop cleanly: {type(e).__name__}: {e}")
+    if _loop_lag_task is not None:
+        _loop_lag_stop.set()
+        try:
+            await asyncio.wait_for(_loop_lag_task, timeout=5)
+        except (asyncio.TimeoutError, Exception) as e:
+            print(f"Loop lag monitor did not stop cleanly: {type(e).__name__}: {e}")
+    if _post_boot_task is not None and not _post_boot_task.done():
+        # An interrupted CONCURRENTLY build is dropped and retried on the next boot.
+        _post_boot_task.cancel()
+        try:
+            await asyncio.wait_for(_post_boot_task, timeout=5)
+        except (asyncio.CancelledError, asyncio.TimeoutError, Exception):
+            pass
+    from routes.bugs import close_storage
+    await close_storage()
+    from services.stripe_calls import shutdown_stripe_executor
+    shutdown_stripe_executor()
+    from utils.cpu_offload import shutdown_cpu_executor
+    shutdown_cpu_executor()
@@ -63,6 +63,7 @@ from models.marketplace import (
     VendorProfile,  # alias for Vendor
     Merchant,       # alias for Vendor
     SellerQuote,
+    SellerRowMatch,
     OutreachEvent,
     DealHandoff,
     Contract,
@@ -89,8 +90,12 @@ from models.admin import (
     UserPreference,
     VendorCoverageGap,
     LocationGeocodeCache,
+    ProviderResultCacheEntry,
+    LLMResponseCacheEntry,
     DiscoveredVendorCandidate,
     VendorEnrichmentQueueItem,
+    BackgroundJob,
+    MetricsDailyRollup,
 )
 
 __all__ = [
@@ -129,6 +134,7 @@ __all__ = [
     # Marketplace
     "VendorProfile",
     "SellerQuote",
+    "SellerRowMatch",
     "OutreachEvent",
     "DealHandoff",
     "Merchant",
@@ -147,6 +153,10 @@ __all__ = [
     "UserPreference",
     "VendorCoverageGap",
     "LocationGeocodeCache",
+    "ProviderResultCacheEntry",
+    "LLMResponseCacheEntry",
     "DiscoveredVendorCandidate",
     "VendorEnrichmentQueueItem",
+    "BackgroundJob",
+    "MetricsDailyRollup",
 ]
@@ -1,7 +1,7 @@
 """Admin and system models: bug reports, notifications, signals, and preferences."""
 
 from typing import Any, Optional
-from datetime import datetime
+from datetime import date, datetime
 import sqlalchemy as sa
 from sqlmodel import Field, SQLModel, Column
 
@@ -28,6 +28,8 @@ class BugReport(SQLModel, table=True):
     # Classification (Phase 2 - Triage)
     classification: Optional[str] = None  # "bug" | "feature_request"
     classification_confidence: Optional[float] = None  # 0.0-1.0
+    classification_reasoning: Optional[str] = None
+    triage_email_sent_at: Optional[datetime] = None  # set once the triage email went out
 
     # JSON fields
     attachments: Optional[str] = None  # JSON list of stored file paths/urls
@@ -161,6 +163,43 @@ class LocationGeocodeCache(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ProviderResultCacheEntry(SQLModel, table=True):
+    """Durable per-provider search result cache (shared across workers)."""
+    __tablename__ = "provider_result_cache"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cache_key: str = Field(index=True, unique=True)
+    provider_id: str = Field(index=True)
+    normalized_query: str
+
+    results: Optional[Any] = Field(default=None, sa_column=Column(sa.JSON, nullable=True))
+    result_count: int = 0
+    status_message: Optional[str] = None
+
+    hit_count: int = 0
+    fresh_until: datetime
+    expires_at: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LLMResponseCacheEntry(SQLModel, table=True):
+    """Durable LLM response cache keyed by prompt hash (shared across workers)."""
+    __tablename__ = "llm_response_cache"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cache_key: str = Field(index=True, unique=True)
+    response: str
+    model: str = ""
+    # Upstream latency of the call that filled the entry; hits report it as saved.
+    latency_ms: int = 0
+
+    hit_count: int = 0
+    expires_at: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class DiscoveredVendorCandidate(SQLModel, table=True):
     """Row-linked vendor candidates discovered live outside the canonical vendor DB."""
     __tablename__ = "discovered_vendor_candidate"
@@ -226,3 +265,44 @@ class VendorEnrichmentQueueItem(SQLModel, table=True):
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BackgroundJob(SQLModel, table=True):
+    """Durable background job, claimed by ``services.jobs.JobWorker`` with SKIP LOCKED."""
+    __tablename__ = "background_job"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(index=True)
+    queue: str = Field(default="default")
+    payload: Optional[Any] = Field(default=None, sa_column=Column(sa.JSON, nullable=True))
+
+    status: str = Field(default="queued", index=True)
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # Unique when set; used to make periodic and idempotent enqueues no-ops.
+    dedupe_key: Optional[str] = Field(
+        default=None, sa_column=Column(sa.String, unique=True, nullable=True)
+    )
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class MetricsDailyRollup(SQLModel, table=True):
+    """Per-day aggregate of an event metric, maintained by ``services.metrics_rollup``."""
+    __tablename__ = "metrics_daily_rollup"
+    __table_args__ = (
+        sa.UniqueConstraint("day", "metric", "dimension", name="metrics_daily_rollup_key"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date = Field(index=True)
+    metric: str
+    # Breakdown key (handler name, revenue type, ...); '' for the plain total.
+    dimension: str = ""
+    value: float = 0.0
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
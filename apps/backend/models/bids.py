@@ -84,6 +84,8 @@ class Bid(SQLModel, table=True):
 
     # Search Architecture v2
     canonical_url: Optional[str] = None
+    # normalize_bookmark_url(canonical_url or item_url); set on flush, matched by bookmark sync
+    normalized_url: Optional[str] = None
     source_payload: Optional[Any] = Field(default=None, sa_column=Column(sa.JSON, nullable=True))  # JSONB of raw provider data
     search_intent_version: Optional[str] = None
     normalized_at: Optional[datetime] = None
@@ -134,6 +136,14 @@ class Bid(SQLModel, table=True):
     seller: Optional[Vendor] = Relationship(back_populates="bids")
 
 
+@sa.event.listens_for(Bid, "before_insert")
+@sa.event.listens_for(Bid, "before_update")
+def _set_bid_normalized_url(mapper, connection, target: Bid) -> None:
+    from utils.urls import normalize_bookmark_url
+
+    target.normalized_url = normalize_bookmark_url(target.canonical_url or target.item_url)
+
+
 class BidWithProvenance(SQLModel):
     """
     Extended Bid model that includes parsed provenance data.
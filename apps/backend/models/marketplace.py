@@ -60,6 +60,30 @@ class SellerQuote(SQLModel, table=True):
     submitted_at: Optional[datetime] = None
 
 
+class SellerRowMatch(SQLModel, table=True):
+    """
+    Precomputed merchant -> open row matches for the seller inbox.
+    Only maintained with SELLER_INBOX_MATCH_TABLE=true (see services/seller_inbox.py).
+    """
+    __tablename__ = "seller_row_match"
+
+    merchant_id: int = Field(
+        sa_column=Column(
+            sa.Integer, sa.ForeignKey("vendor.id", ondelete="CASCADE"), primary_key=True
+        )
+    )
+    row_id: int = Field(
+        sa_column=Column(
+            sa.Integer,
+            sa.ForeignKey("row.id", ondelete="CASCADE"),
+            primary_key=True,
+            index=True,
+        )
+    )
+    # Copy of row.created_at so inbox pages are served from this table's index
+    row_created_at: datetime
+
+
 class OutreachEvent(SQLModel, table=True):
     """
     Tracks vendor outreach emails sent for a row.
@@ -4,6 +4,7 @@ from typing import Any, Optional, List, TYPE_CHECKING
 from datetime import datetime
 import uuid
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import Field, SQLModel, Relationship, Column
 
 if TYPE_CHECKING:
@@ -151,12 +152,27 @@ class Row(RowBase, table=True):
     # SDUI schema (Phase 0.2)
     ui_schema: Optional[Any] = Field(default=None, sa_column=Column(sa.JSON, nullable=True))
 
+    # Normalized category terms for the seller inbox (GIN-indexed), set on every write
+    match_terms: Optional[List[str]] = Field(
+        default=None, sa_column=Column(ARRAY(sa.Text), nullable=True)
+    )
+
     # Relationships
     bids: List["Bid"] = Relationship(back_populates="row")
     request_spec: Optional["RequestSpec"] = Relationship(back_populates="row")
     project: Optional[Project] = Relationship(back_populates="rows")
 
 
+@sa.event.listens_for(Row, "before_insert")
+@sa.event.listens_for(Row, "before_update")
+def _set_row_match_terms(mapper, connection, target: Row) -> None:
+    from utils.match_terms import row_match_terms
+
+    target.match_terms = row_match_terms(
+        target.title, target.service_category, target.search_intent
+    )
+
+
 class RequestSpec(RequestSpecBase, table=True):
     __tablename__ = "request_spec"
     id: Optional[int] = Field(default=None, primary_key=True)
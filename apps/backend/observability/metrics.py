@@ -47,6 +47,14 @@ db_query_duration_seconds = Histogram(
     registry=metrics_registry,
 )
 
+db_statement_duration_seconds = Histogram(
+    "db_statement_duration_seconds",
+    "Database statement duration in seconds, by normalized statement fingerprint",
+    ["operation", "fingerprint"],  # fingerprint text is on /admin/metrics (db_statements)
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+    registry=metrics_registry,
+)
+
 db_connection_pool_size = Gauge(
     "db_connection_pool_size",
     "Current database connection pool size",
@@ -74,6 +82,12 @@ llm_api_duration_seconds = Histogram(
     registry=metrics_registry,
 )
 
+llm_cache_saved_seconds_total = Counter(
+    "llm_cache_saved_seconds_total",
+    "Upstream LLM latency avoided by response cache hits",
+    registry=metrics_registry,
+)
+
 llm_api_errors_total = Counter(
     "llm_api_errors_total",
     "Total LLM API errors",
@@ -88,6 +102,14 @@ llm_tokens_used_total = Counter(
     registry=metrics_registry,
 )
 
+# Event loop health
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a scheduled wakeup, in seconds",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+    registry=metrics_registry,
+)
+
 # Search Provider Metrics
 search_provider_duration_seconds = Histogram(
     "search_provider_duration_seconds",
@@ -8,11 +8,14 @@ Provides:
 - Request/response logging
 """
 
+import re
 import time
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from typing import Optional
+
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.db_timing import track_request_db_time
 
 from .logging import get_logger, correlation_id_context, set_correlation_id
 from .metrics import (
@@ -24,7 +27,11 @@ from .metrics import (
 logger = get_logger(__name__)
 
 
-class ObservabilityMiddleware(BaseHTTPMiddleware):
+def _request_correlation_id(headers: Headers) -> Optional[str]:
+    return headers.get("X-Request-ID") or headers.get("X-Correlation-ID")
+
+
+class ObservabilityMiddleware:
     """
     Middleware for automatic observability instrumentation.
 
@@ -33,47 +40,46 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
     - Automatic metrics collection
     - Request/response logging
     - Performance tracking
+
+    Pure ASGI. Metrics and the completion log are recorded when the response
+    starts (for SSE, when the stream opens), and the response body is passed
+    through without buffering. The completion log carries the number of DB
+    statements run so far and their total time (db_queries / db_seconds).
     """
 
     def __init__(self, app: ASGIApp, enable_request_logging: bool = True):
-        super().__init__(app)
+        self.app = app
         self.enable_request_logging = enable_request_logging
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
         # Extract or generate correlation ID
-        correlation_id = request.headers.get("X-Request-ID") or request.headers.get("X-Correlation-ID")
+        correlation_id = _request_correlation_id(headers)
 
         # Use correlation_id_context to set it for the request lifecycle
-        with correlation_id_context(correlation_id) as req_id:
+        with correlation_id_context(correlation_id) as req_id, track_request_db_time() as db_stats:
             # Add to request state for downstream use
-            request.state.correlation_id = req_id
+            scope.setdefault("state", {})["correlation_id"] = req_id
 
             # Get path for metrics (sanitize to avoid cardinality explosion)
-            path = self._sanitize_path(request.url.path)
-            method = request.method
+            raw_path = URL(scope=scope).path
+            path = self._sanitize_path(raw_path)
+            method = scope["method"]
+            is_health_check = self._is_health_check(raw_path)
 
             # Track in-progress requests
             http_requests_in_progress.labels(method=method, endpoint=path).inc()
+            in_progress = True
 
             # Start timer
             start_time = time.time()
 
-            try:
-                # Log request (if enabled and not health check)
-                if self.enable_request_logging and not self._is_health_check(request):
-                    logger.info(
-                        "Request started",
-                        extra={
-                            "method": method,
-                            "path": path,
-                            "client_host": request.client.host if request.client else None,
-                            "user_agent": request.headers.get("user-agent", "")[:200],
-                        },
-                    )
-
-                # Process request
-                response = await call_next(request)
-
+            def finish(status_code: int) -> float:
+                nonlocal in_progress
                 # Calculate duration
                 duration = time.time() - start_time
 
@@ -81,7 +87,7 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                 http_requests_total.labels(
                     method=method,
                     endpoint=path,
-                    status=response.status_code,
+                    status=status_code,
                 ).inc()
 
                 http_request_duration_seconds.labels(
@@ -89,50 +95,71 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                     endpoint=path,
                 ).observe(duration)
 
-                # Add correlation ID to response headers
-                response.headers["X-Request-ID"] = req_id
+                # Decrement in-progress counter
+                http_requests_in_progress.labels(method=method, endpoint=path).dec()
+                in_progress = False
+                return duration
+
+            async def send_with_instrumentation(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    duration = finish(status_code)
+
+                    # Add correlation ID to response headers
+                    MutableHeaders(scope=message)["X-Request-ID"] = req_id
+
+                    # Log response (if enabled and not health check)
+                    if self.enable_request_logging and not is_health_check:
+                        logger.info(
+                            "Request completed",
+                            extra={
+                                "method": method,
+                                "path": path,
+                                "status_code": status_code,
+                                "duration_seconds": round(duration, 3),
+                                "db_queries": db_stats.queries,
+                                "db_seconds": round(db_stats.seconds, 3),
+                            },
+                        )
+
+                    # Warn on slow requests (>2s)
+                    if duration > 2.0 and not is_health_check:
+                        logger.warning(
+                            "Slow request detected",
+                            extra={
+                                "method": method,
+                                "path": path,
+                                "duration_seconds": round(duration, 3),
+                                "status_code": status_code,
+                                "db_queries": db_stats.queries,
+                                "db_seconds": round(db_stats.seconds, 3),
+                            },
+                        )
+                await send(message)
 
-                # Log response (if enabled and not health check)
-                if self.enable_request_logging and not self._is_health_check(request):
+            try:
+                # Log request (if enabled and not health check)
+                if self.enable_request_logging and not is_health_check:
+                    client = scope.get("client")
                     logger.info(
-                        "Request completed",
-                        extra={
-                            "method": method,
-                            "path": path,
-                            "status_code": response.status_code,
-                            "duration_seconds": round(duration, 3),
-                        },
-                    )
-
-                # Warn on slow requests (>2s)
-                if duration > 2.0 and not self._is_health_check(request):
-                    logger.warning(
-                        "Slow request detected",
+                        "Request started",
                         extra={
                             "method": method,
                             "path": path,
-                            "duration_seconds": round(duration, 3),
-                            "status_code": response.status_code,
+                            "client_host": client[0] if client else None,
+                            "user_agent": headers.get("user-agent", "")[:200],
                         },
                     )
 
-                return response
+                # Process request
+                await self.app(scope, receive, send_with_instrumentation)
 
             except Exception as exc:
-                # Calculate duration even on error
-                duration = time.time() - start_time
-
-                # Record error metrics (status 500 for unhandled exceptions)
-                http_requests_total.labels(
-                    method=method,
-                    endpoint=path,
-                    status=500,
-                ).inc()
-
-                http_request_duration_seconds.labels(
-                    method=method,
-                    endpoint=path,
-                ).observe(duration)
+                if in_progress:
+                    # Record error metrics (status 500 for unhandled exceptions)
+                    duration = finish(500)
+                else:
+                    duration = time.time() - start_time
 
                 # Log error
                 logger.error(
@@ -151,8 +178,9 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
                 raise
 
             finally:
-                # Decrement in-progress counter
-                http_requests_in_progress.labels(method=method, endpoint=path).dec()
+                if in_progress:
+                    # The app returned without starting a response (client went away).
+                    http_requests_in_progress.labels(method=method, endpoint=path).dec()
 
     def _sanitize_path(self, path: str) -> str:
         """
@@ -160,8 +188,6 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
 
         Replace UUIDs and numeric IDs with placeholders.
         """
-        import re
-
         # Replace UUIDs with placeholder
         path = re.sub(
             r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
@@ -175,23 +201,34 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
 
         return path
 
-    def _is_health_check(self, request: Request) -> bool:
+    def _is_health_check(self, path: str) -> bool:
         """Check if request is a health check endpoint."""
-        return request.url.path.startswith("/health") or request.url.path.startswith("/metrics")
+        return path.startswith("/health") or path.startswith("/metrics")
 
 
-class CorrelationIDMiddleware(BaseHTTPMiddleware):
+class CorrelationIDMiddleware:
     """
     Lightweight middleware that only adds correlation ID to requests.
 
     Use this if you don't want full observability instrumentation.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        correlation_id = request.headers.get("X-Request-ID") or request.headers.get("X-Correlation-ID")
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = _request_correlation_id(Headers(scope=scope))
 
         with correlation_id_context(correlation_id) as req_id:
-            request.state.correlation_id = req_id
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = req_id
-            return response
+            scope.setdefault("state", {})["correlation_id"] = req_id
+
+            async def send_with_correlation_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)["X-Request-ID"] = req_id
+                await send(message)
+
+            await self.app(scope, receive, send_with_correlation_id)
@@ -13,11 +13,12 @@ from sqlalchemy import func, text
 from database import get_session
 from models import (
     User, AuthSession, AuditLog, hash_token, generate_session_token,
-    Row, Bid, ClickoutEvent, PurchaseEvent, Merchant,
+    Row, Bid, Merchant,
     OutreachEvent, BugReport, SellerQuote, ShareLink,
 )
 from dependencies import require_admin
 from routes.rate_limit import check_rate_limit
+from services.metrics_rollup import gather_reads, load_rollup_totals
 
 router = APIRouter(tags=["admin"])
 
@@ -43,7 +44,7 @@ async def mint_session(request: MintSessionRequest, session: AsyncSession = Depe
 
     phone = validate_phone_number(request.phone)
 
-    if not check_rate_limit(f"mint:{phone}", "auth_start"):
+    if not await check_rate_limit(f"mint:{phone}", "auth_start"):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     result = await session.exec(select(User).where(User.phone_number == phone))
@@ -115,59 +116,47 @@ async def admin_stats(
     now = datetime.utcnow()
     week_ago = now - timedelta(days=7)
 
-    async def _count(model, extra_filter=None):
-        q = select(func.count(model.id))
-        if extra_filter is not None:
-            q = q.where(extra_filter)
-        r = await session.exec(q)
-        return r.one()
-
-    total_users = await _count(User)
-    users_7d = await _count(User, User.created_at >= week_ago)
-
-    total_rows = await _count(Row)
-    active_rows = await _count(Row, Row.status.notin_(["closed", "purchased", "archived"]))
-
-    total_bids = await _count(Bid)
-
-    total_clickouts = await _count(ClickoutEvent)
-    clickouts_7d = await _count(ClickoutEvent, ClickoutEvent.created_at >= week_ago)
-
-    total_purchases = await _count(PurchaseEvent)
-    gmv_result = await session.exec(
-        select(func.coalesce(func.sum(PurchaseEvent.amount), 0))
-    )
-    gmv = float(gmv_result.one())
-
-    total_merchants = await _count(Merchant)
-
-    total_outreach = await _count(OutreachEvent)
-    outreach_quoted = await _count(SellerQuote)
-
-    total_bugs = await _count(BugReport)
-    open_bugs = await _count(BugReport, BugReport.status.in_(["captured", "issue_created", "fix_in_progress"]))
-
-    # Revenue tracking (Phase 4)
-    revenue_result = await session.exec(
-        select(func.coalesce(func.sum(PurchaseEvent.platform_fee_amount), 0))
-    )
-    total_platform_revenue = float(revenue_result.one())
-
-    affiliate_clicks = await _count(
-        ClickoutEvent,
-        ClickoutEvent.affiliate_tag.isnot(None)
+    def _count(model, extra_filter=None):
+        async def _run(read_session: AsyncSession):
+            q = select(func.count(model.id))
+            if extra_filter is not None:
+                q = q.where(extra_filter)
+            r = await read_session.exec(q)
+            return r.one()
+        return _run
+
+    # Event totals and 7-day series come from daily rollups. Counts of what exists
+    # now (rows and users can be deleted) stay live; all reads run concurrently.
+    live = await gather_reads(
+        session,
+        all_time=lambda s: load_rollup_totals(s),
+        week=lambda s: load_rollup_totals(s, since=week_ago.date()),
+        total_users=_count(User),
+        total_rows=_count(Row),
+        total_bids=_count(Bid),
+        active_rows=_count(Row, Row.status.notin_(["closed", "purchased", "archived"])),
+        total_merchants=_count(Merchant),
+        total_outreach=_count(OutreachEvent),
+        outreach_quoted=_count(SellerQuote),
+        total_bugs=_count(BugReport),
+        open_bugs=_count(BugReport, BugReport.status.in_(["captured", "issue_created", "fix_in_progress"])),
     )
+    all_time, week = live["all_time"], live["week"]
 
     return {
-        "users": {"total": total_users, "last_7_days": users_7d},
-        "rows": {"total": total_rows, "active": active_rows},
-        "bids": {"total": total_bids},
-        "clickouts": {"total": total_clickouts, "last_7_days": clickouts_7d, "with_affiliate_tag": affiliate_clicks},
-        "purchases": {"total": total_purchases, "gmv": gmv},
-        "revenue": {"platform_total": total_platform_revenue},
-        "merchants": {"total": total_merchants},
-        "outreach": {"sent": total_outreach, "quoted": outreach_quoted},
-        "bugs": {"total": total_bugs, "open": open_bugs},
+        "users": {"total": live["total_users"], "last_7_days": week.count("users_created")},
+        "rows": {"total": live["total_rows"], "active": live["active_rows"]},
+        "bids": {"total": live["total_bids"]},
+        "clickouts": {
+            "total": all_time.count("clickouts"),
+            "last_7_days": week.count("clickouts"),
+            "with_affiliate_tag": all_time.count("clickouts_affiliate"),
+        },
+        "purchases": {"total": all_time.count("purchases"), "gmv": all_time.total("gmv")},
+        "revenue": {"platform_total": all_time.total("platform_revenue")},
+        "merchants": {"total": live["total_merchants"]},
+        "outreach": {"sent": live["total_outreach"], "quoted": live["outreach_quoted"]},
+        "bugs": {"total": live["total_bugs"], "open": live["open_bugs"]},
     }
 
 
@@ -181,56 +170,43 @@ async def admin_revenue(
     month_ago = now - timedelta(days=30)
     week_ago = now - timedelta(days=7)
 
-    # Revenue by type
-    revenue_by_type = await session.exec(
-        select(
-            PurchaseEvent.revenue_type,
-            func.count(PurchaseEvent.id),
-            func.coalesce(func.sum(PurchaseEvent.amount), 0),
-            func.coalesce(func.sum(PurchaseEvent.platform_fee_amount), 0),
-        ).group_by(PurchaseEvent.revenue_type)
-    )
-    streams = {}
-    for row in revenue_by_type.all():
-        rtype, count, total_amount, platform_fee = row
-        streams[rtype] = {
-            "count": count,
-            "total_amount": float(total_amount),
-            "platform_revenue": float(platform_fee),
-        }
+    async def _merchant_counts(read_session: AsyncSession):
+        result = await read_session.exec(
+            select(
+                func.count(Merchant.id).filter(Merchant.stripe_onboarding_complete == True),
+                func.count(Merchant.id),
+            )
+        )
+        return result.one()
 
-    # Clickout stats (affiliate performance)
-    total_clickouts_result = await session.exec(
-        select(func.count(ClickoutEvent.id))
+    live = await gather_reads(
+        session,
+        all_time=lambda s: load_rollup_totals(s),
+        week=lambda s: load_rollup_totals(s, since=week_ago.date()),
+        merchants=_merchant_counts,
     )
-    total_clickouts = total_clickouts_result.one()
+    all_time = live["all_time"]
 
-    affiliate_clickouts_result = await session.exec(
-        select(func.count(ClickoutEvent.id)).where(
-            ClickoutEvent.affiliate_tag.isnot(None)
-        )
-    )
-    affiliate_clickouts = affiliate_clickouts_result.one()
+    # Revenue by type
+    counts = all_time.by_dimension("purchases")
+    amounts = all_time.by_dimension("gmv")
+    fees = all_time.by_dimension("platform_revenue")
+    streams = {
+        rtype: {
+            "count": int(count),
+            "total_amount": amounts.get(rtype, 0.0),
+            "platform_revenue": fees.get(rtype, 0.0),
+        }
+        for rtype, count in counts.items()
+    }
 
-    clickouts_7d_result = await session.exec(
-        select(func.count(ClickoutEvent.id)).where(
-            ClickoutEvent.created_at >= week_ago
-        )
-    )
-    clickouts_7d = clickouts_7d_result.one()
+    # Clickout stats (affiliate performance)
+    total_clickouts = all_time.count("clickouts")
+    affiliate_clickouts = all_time.count("clickouts_affiliate")
+    clickouts_7d = live["week"].count("clickouts")
 
     # Merchant Stripe Connect status
-    connected_merchants_result = await session.exec(
-        select(func.count(Merchant.id)).where(
-            Merchant.stripe_onboarding_complete == True
-        )
-    )
-    connected_merchants = connected_merchants_result.one()
-
-    total_merchants_result = await session.exec(
-        select(func.count(Merchant.id))
-    )
-    total_merchants = total_merchants_result.one()
+    connected_merchants, total_merchants = live["merchants"]
 
     return {
         "period": {"from": month_ago.isoformat(), "to": now.isoformat()},
@@ -260,55 +236,91 @@ async def growth_metrics(
     now = datetime.utcnow()
     month_ago = now - timedelta(days=30)
 
-    # ── K-Factor Calculation ──
-    # K = avg(invitations_per_user) × avg(conversion_rate_per_invitation)
+    async def _share_stats(read_session: AsyncSession):
+        # Users who created at least one share link, share links, and total share link clicks
+        result = await read_session.exec(
+            select(
+                func.count(func.distinct(ShareLink.created_by)),
+                func.count(ShareLink.id),
+                func.coalesce(func.sum(ShareLink.click_count), 0),
+            )
+        )
+        return result.one()
+
+    async def _user_counts(read_session: AsyncSession):
+        # All users, and users who signed up through a share link
+        result = await read_session.exec(
+            select(
+                func.count(User.id),
+                func.count(User.id).filter(User.referral_share_token.isnot(None)),
+            )
+        )
+        return result.one()
+
+    async def _referral_rows(read_session: AsyncSession):
+        result = await read_session.exec(
+            select(
+                ShareLink.created_by,
+                func.count(ShareLink.id).label("shares_created"),
+                func.coalesce(func.sum(ShareLink.signup_conversion_count), 0).label("signups_driven"),
+                func.coalesce(func.sum(ShareLink.click_count), 0).label("total_clicks"),
+            )
+            .where(ShareLink.created_by.isnot(None))
+            .group_by(ShareLink.created_by)
+            .order_by(func.coalesce(func.sum(ShareLink.signup_conversion_count), 0).desc())
+            .limit(25)
+        )
+        return result.all()
 
-    # Total users who created at least one share link
-    sharers_result = await session.exec(
-        select(func.count(func.distinct(ShareLink.created_by)))
-        .where(ShareLink.created_by.isnot(None))
-    )
-    total_sharers = sharers_result.one() or 0
+    async def _sellers_who_buy(read_session: AsyncSession):
+        # Users who are both merchants AND have created rows (they buy + sell)
+        result = await read_session.exec(
+            select(func.count(func.distinct(Row.user_id)))
+            .where(Row.user_id.in_(select(Merchant.user_id).where(Merchant.user_id.isnot(None))))
+        )
+        return result.one() or 0
 
-    # Total share links created
-    total_shares_result = await session.exec(
-        select(func.count(ShareLink.id))
-    )
-    total_shares = total_shares_result.one() or 0
+    async def _total_merchants(read_session: AsyncSession):
+        result = await read_session.exec(select(func.count(Merchant.id)))
+        return result.one() or 0
 
-    # Total signups attributed to share links
-    total_referral_signups_result = await session.exec(
-        select(func.count(User.id))
-        .where(User.referral_share_token.isnot(None))
+    async def _referred_buyers(read_session: AsyncSession):
+        # Referred users who created their own row
+        result = await read_session.exec(
+            select(func.count(func.distinct(Row.user_id)))
+            .where(
+                Row.user_id.in_(
+                    select(User.id).where(User.referral_share_token.isnot(None))
+                )
+            )
+        )
+        return result.one() or 0
+
+    # These are counts of what exists now, so they all run live (concurrently).
+    live = await gather_reads(
+        session,
+        share_stats=_share_stats,
+        user_counts=_user_counts,
+        referral_rows=_referral_rows,
+        sellers_who_buy=_sellers_who_buy,
+        total_merchants=_total_merchants,
+        referred_buyers=_referred_buyers,
     )
-    total_referral_signups = total_referral_signups_result.one() or 0
 
-    # Total share link clicks
-    total_clicks_result = await session.exec(
-        select(func.coalesce(func.sum(ShareLink.click_count), 0))
-    )
-    total_clicks = total_clicks_result.one() or 0
+    # ── K-Factor Calculation ──
+    # K = avg(invitations_per_user) × avg(conversion_rate_per_invitation)
+    total_sharers, total_shares, total_clicks = live["share_stats"]
+    total_sharers = total_sharers or 0
+    total_shares = total_shares or 0
+    total_clicks = total_clicks or 0
+    total_users, total_referral_signups = live["user_counts"]
 
-    # K-factor
     avg_shares_per_user = total_shares / max(total_sharers, 1)
     conversion_rate = total_referral_signups / max(total_clicks, 1)
     k_factor = round(avg_shares_per_user * conversion_rate, 4)
 
     # ── Referral Graph (top referrers) ──
-    referral_graph_query = (
-        select(
-            ShareLink.created_by,
-            func.count(ShareLink.id).label("shares_created"),
-            func.coalesce(func.sum(ShareLink.signup_conversion_count), 0).label("signups_driven"),
-            func.coalesce(func.sum(ShareLink.click_count), 0).label("total_clicks"),
-        )
-        .where(ShareLink.created_by.isnot(None))
-        .group_by(ShareLink.created_by)
-        .order_by(func.coalesce(func.sum(ShareLink.signup_conversion_count), 0).desc())
-        .limit(25)
-    )
-    referral_graph_result = await session.exec(referral_graph_query)
-    referral_rows = referral_graph_result.all()
+    referral_rows = live["referral_rows"]
 
     # Fetch user details for referrers
     referrer_ids = [r[0] for r in referral_rows if r[0]]
@@ -333,42 +345,14 @@ async def growth_metrics(
     ]
 
     # ── Seller-to-Buyer Conversion ──
-    # Users who are both merchants AND have created rows (they buy + sell)
-    merchant_user_ids_result = await session.exec(
-        select(Merchant.user_id).where(Merchant.user_id.isnot(None))
-    )
-    merchant_user_ids = [uid for uid in merchant_user_ids_result]
-
-    sellers_who_buy = 0
-    if merchant_user_ids:
-        sellers_who_buy_result = await session.exec(
-            select(func.count(func.distinct(Row.user_id)))
-            .where(Row.user_id.in_(merchant_user_ids))
-        )
-        sellers_who_buy = sellers_who_buy_result.one() or 0
-
-    total_merchants_result = await session.exec(select(func.count(Merchant.id)))
-    total_merchants = total_merchants_result.one() or 0
-
+    sellers_who_buy = live["sellers_who_buy"]
+    total_merchants = live["total_merchants"]
     seller_to_buyer_rate = round(sellers_who_buy / max(total_merchants, 1), 4)
 
     # ── Collaborator-to-Buyer Funnel ──
-    # Stage 1: Share link clicks (total_clicks computed above)
-    # Stage 2: Referral signups (total_referral_signups computed above)
+    # Stage 1: Share link clicks, Stage 2: referral signups (both above)
     # Stage 3: Referred users who created their own row
-    referred_buyers_result = await session.exec(
-        select(func.count(func.distinct(Row.user_id)))
-        .where(
-            Row.user_id.in_(
-                select(User.id).where(User.referral_share_token.isnot(None))
-            )
-        )
-    )
-    referred_buyers = referred_buyers_result.one() or 0
-
-    # ── Total users (for context) ──
-    total_users_result = await session.exec(select(func.count(User.id)))
-    total_users = total_users_result.one() or 0
+    referred_buyers = live["referred_buyers"]
 
     return {
         "period": {"from": month_ago.isoformat(), "to": now.isoformat()},
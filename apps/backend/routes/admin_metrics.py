@@ -7,10 +7,21 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import func, text
 
 from database import get_session
-from models import (
-    User, Row, Bid, ClickoutEvent, PurchaseEvent, ShareLink,
-)
+from models import User, Row
 from dependencies import require_admin
+from services.clickout_buffer import clickout_buffer
+from services.db_timing import statement_timings
+from services.llm_cache import llm_response_cache
+from services.loop_lag import loop_lag_monitor
+from services.metrics_rollup import gather_reads, load_rollup_totals
+from services.rate_limiter import rate_limiter
+from services.sdui_builder import block_cache as sdui_block_cache
+from services.session_cache import session_cache
+from services.share_access import share_access_counter, share_resource_cache
+from sourcing.cache import result_cache_snapshot
+from sourcing.circuit_breaker import provider_breakers
+from sourcing.singleflight import provider_flights
+from sourcing.speculative import speculative_searches
 
 router = APIRouter(tags=["admin"])
 
@@ -29,126 +40,80 @@ async def admin_metrics(
     M4: Affiliate handler coverage
     M5: Revenue per active user
     Plus expanded metrics M6-M10.
+
+    Event counts come from daily rollups (services/metrics_rollup.py), so the
+    window is whole days; the remaining live queries run concurrently.
     """
     now = datetime.utcnow()
     period_start = now - timedelta(days=days)
+    prev_start = period_start - timedelta(days=days)
 
-    # M1: Avg time from row creation to first bid
-    m1_result = await session.execute(
-        text(
-            "SELECT AVG(EXTRACT(EPOCH FROM (first_bid.created_at - r.created_at))) "
-            "FROM row r "
-            "JOIN LATERAL ( "
-            "  SELECT created_at FROM bid WHERE bid.row_id = r.id ORDER BY created_at LIMIT 1 "
-            ") first_bid ON true "
-            "WHERE r.created_at >= :period_start"
+    async def _avg_time_to_first_result(read_session: AsyncSession):
+        # M1: Avg time from row creation to first bid (not additive per day, so live)
+        result = await read_session.execute(
+            text(
+                "SELECT AVG(EXTRACT(EPOCH FROM (first_bid.created_at - r.created_at))) "
+                "FROM row r "
+                "JOIN LATERAL ( "
+                "  SELECT created_at FROM bid WHERE bid.row_id = r.id ORDER BY created_at LIMIT 1 "
+                ") first_bid ON true "
+                "WHERE r.created_at >= :period_start"
+            ),
+            {"period_start": period_start},
+        )
+        return result.scalar() or 0
+
+    async def _active_users(read_session: AsyncSession):
+        result = await read_session.exec(
+            select(func.count(func.distinct(Row.user_id))).where(Row.created_at >= period_start)
+        )
+        return result.one() or 1
+
+    live = await gather_reads(
+        session,
+        current=lambda s: load_rollup_totals(s, since=period_start.date()),
+        previous=lambda s: load_rollup_totals(
+            s, since=prev_start.date(), until=period_start.date()
         ),
-        {"period_start": period_start},
+        avg_time_to_first_result_seconds=_avg_time_to_first_result,
+        active_users=_active_users,
     )
-    avg_time_to_first_result_seconds = m1_result.scalar() or 0
+    current = live["current"]
+    avg_time_to_first_result_seconds = live["avg_time_to_first_result_seconds"]
 
     # M2: Offer CTR (clickouts / bids shown)
-    total_bids_result = await session.exec(
-        select(func.count(Bid.id)).where(Bid.created_at >= period_start)
-    )
-    total_bids = total_bids_result.one() or 1
-
-    total_clickouts_result = await session.exec(
-        select(func.count(ClickoutEvent.id)).where(ClickoutEvent.created_at >= period_start)
-    )
-    total_clickouts = total_clickouts_result.one() or 0
+    total_bids = current.count("bids_created") or 1
+    total_clickouts = current.count("clickouts")
     ctr = round(total_clickouts / max(total_bids, 1), 4)
 
     # M3: Clickout success rate (non-suspicious clickouts)
-    suspicious_result = await session.exec(
-        select(func.count(ClickoutEvent.id)).where(
-            ClickoutEvent.created_at >= period_start,
-            ClickoutEvent.is_suspicious == True,
-        )
-    )
-    suspicious_count = suspicious_result.one() or 0
+    suspicious_count = current.count("clickouts_suspicious")
     clickout_success_rate = round((total_clickouts - suspicious_count) / max(total_clickouts, 1), 4)
 
     # M4: Affiliate handler coverage
-    affiliate_tagged_result = await session.exec(
-        select(func.count(ClickoutEvent.id)).where(
-            ClickoutEvent.created_at >= period_start,
-            ClickoutEvent.affiliate_tag.isnot(None),
-        )
-    )
-    affiliate_tagged = affiliate_tagged_result.one() or 0
+    affiliate_tagged = current.count("clickouts_affiliate")
     affiliate_coverage = round(affiliate_tagged / max(total_clickouts, 1), 4)
-
-    # Handler breakdown
-    handler_breakdown_result = await session.exec(
-        select(
-            ClickoutEvent.handler_name,
-            func.count(ClickoutEvent.id),
-        ).where(
-            ClickoutEvent.created_at >= period_start
-        ).group_by(ClickoutEvent.handler_name)
-    )
-    handler_breakdown = {name: count for name, count in handler_breakdown_result.all()}
+    handler_breakdown = {
+        (name or None): int(count) for name, count in current.by_dimension("clickouts").items()
+    }
 
     # M5: Revenue per active user
-    active_users_result = await session.exec(
-        select(func.count(func.distinct(Row.user_id))).where(
-            Row.created_at >= period_start
-        )
-    )
-    active_users = active_users_result.one() or 1
-
-    revenue_result = await session.exec(
-        select(func.coalesce(func.sum(PurchaseEvent.platform_fee_amount), 0)).where(
-            PurchaseEvent.created_at >= period_start
-        )
-    )
-    period_revenue = float(revenue_result.one())
+    active_users = live["active_users"]
+    period_revenue = current.total("platform_revenue")
     revenue_per_user = round(period_revenue / max(active_users, 1), 2)
 
     # M8: K-factor (simplified)
-    total_shares_result = await session.exec(
-        select(func.count(ShareLink.id)).where(ShareLink.created_at >= period_start)
-    )
-    total_shares = total_shares_result.one() or 0
-
-    referral_signups_result = await session.exec(
-        select(func.count(User.id)).where(
-            User.created_at >= period_start,
-            User.referral_share_token.isnot(None),
-        )
-    )
-    referral_signups = referral_signups_result.one() or 0
+    total_shares = current.count("shares_created")
+    referral_signups = current.count("referral_signups")
 
     # M9: GMV growth (current period vs previous)
-    prev_start = period_start - timedelta(days=days)
-    current_gmv_result = await session.exec(
-        select(func.coalesce(func.sum(PurchaseEvent.amount), 0)).where(
-            PurchaseEvent.created_at >= period_start
-        )
-    )
-    current_gmv = float(current_gmv_result.one())
-
-    prev_gmv_result = await session.exec(
-        select(func.coalesce(func.sum(PurchaseEvent.amount), 0)).where(
-            PurchaseEvent.created_at >= prev_start,
-            PurchaseEvent.created_at < period_start,
-        )
-    )
-    prev_gmv = float(prev_gmv_result.one())
+    current_gmv = current.total("gmv")
+    prev_gmv = live["previous"].total("gmv")
     gmv_growth_rate = round((current_gmv - prev_gmv) / max(prev_gmv, 1), 4)
 
     # Funnel tracking (R6)
-    visits = active_users  # Approximation: active users ≈ visits
-    rows_created_result = await session.exec(
-        select(func.count(Row.id)).where(Row.created_at >= period_start)
-    )
-    rows_created = rows_created_result.one() or 0
-
-    purchases_result = await session.exec(
-        select(func.count(PurchaseEvent.id)).where(PurchaseEvent.created_at >= period_start)
-    )
-    purchases = purchases_result.one() or 0
+    rows_created = current.count("rows_created")
+    purchases = current.count("purchases")
 
     return {
         "period": {"days": days, "from": period_start.isoformat(), "to": now.isoformat()},
@@ -175,4 +140,17 @@ async def admin_metrics(
             "platform_total": period_revenue,
             "active_users": active_users,
         },
+        "sourcing_provider_breakers": provider_breakers.snapshot(),
+        "sourcing_result_cache": result_cache_snapshot(),
+        "sourcing_single_flight": provider_flights.snapshot(),
+        "sourcing_speculative_search": speculative_searches.snapshot(),
+        "clickout_ingest": clickout_buffer.snapshot(),
+        "llm_cache": llm_response_cache.snapshot() if llm_response_cache is not None else None,
+        "event_loop_lag": loop_lag_monitor.snapshot(),
+        "sdui_block_cache": sdui_block_cache.snapshot(),
+        "session_cache": session_cache.snapshot() if session_cache is not None else None,
+        "share_access": share_access_counter.snapshot(),
+        "share_resource_cache": share_resource_cache.snapshot(),
+        "rate_limiter": rate_limiter.snapshot(),
+        "db_statements": statement_timings.snapshot(),
     }
@@ -13,6 +13,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from database import get_session
 from models import User
 from dependencies import get_current_session
+from services.session_cache import session_cache
 
 logger = logging.getLogger(__name__)
 
@@ -143,6 +144,8 @@ async def auth_logout(
     
     auth_session.revoked_at = datetime.utcnow()
     session.add(auth_session)
+    if session_cache is not None:
+        await session_cache.invalidate(auth_session.session_token_hash, session)
     await session.commit()
     
     return {"status": "ok"}
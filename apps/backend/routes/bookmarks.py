@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from typing import Optional, List
-from urllib.parse import parse_qsl, urlsplit, urlunsplit, urlencode
-from sqlalchemy import or_
+from sqlalchemy import update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from database import get_session
@@ -9,6 +8,7 @@ from dependencies import get_current_session
 from models import Vendor, Row, Bid
 from models.bookmarks import VendorBookmark, ItemBookmark
 from pydantic import BaseModel
+from utils.urls import normalize_bookmark_url as _normalize_bookmark_url
 
 router = APIRouter(prefix="/bookmarks", tags=["bookmarks"])
 
@@ -27,30 +27,14 @@ class ItemBookmarkResponse(BaseModel):
     created_at: str
 
 
-def _normalize_bookmark_url(url: Optional[str]) -> Optional[str]:
-    if not url:
-        return None
-    candidate = url.strip()
-    if not candidate:
-        return None
-    if not candidate.startswith(("http://", "https://")):
-        candidate = f"https://{candidate}"
-    try:
-        parsed = urlsplit(candidate)
-        host = parsed.netloc.lower()
-        if host.startswith("www."):
-            host = host[4:]
-        filtered_query = [
-            (key, value)
-            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
-            if not key.lower().startswith("utm_") and key.lower() not in {
-                "tag", "ref", "ref_", "fbclid", "gclid", "mc_cid", "mc_eid", "aff", "aff_id", "clickid"
-            }
-        ]
-        normalized_path = parsed.path.rstrip("/") or parsed.path or "/"
-        return urlunsplit(("https", host, normalized_path, urlencode(filtered_query, doseq=True), ""))
-    except Exception:
-        return candidate
+def _like_state_values(is_bookmarked: bool) -> dict:
+    if is_bookmarked:
+        return {"is_liked": True}
+    return {"is_liked": False, "liked_at": None}
+
+
+def _user_row_ids(user_id: int):
+    return select(Row.id).where(Row.user_id == user_id)
 
 
 async def _sync_vendor_bookmark_like_state(
@@ -59,16 +43,29 @@ async def _sync_vendor_bookmark_like_state(
     vendor_id: int,
     is_bookmarked: bool,
 ) -> None:
+    await session.execute(
+        update(Bid)
+        .where(Bid.vendor_id == vendor_id, Bid.row_id.in_(_user_row_ids(user_id)))
+        .values(**_like_state_values(is_bookmarked))
+    )
+
+
+async def _backfill_normalized_urls(session: AsyncSession, user_id: int) -> None:
+    """Populate ``normalized_url`` for this user's bids persisted before the column existed."""
     result = await session.exec(
-        select(Bid).where(
-            Bid.vendor_id == vendor_id,
-            Bid.row_id.in_(select(Row.id).where(Row.user_id == user_id)),
+        select(Bid.id, Bid.canonical_url, Bid.item_url).where(
+            Bid.row_id.in_(_user_row_ids(user_id)),
+            Bid.normalized_url.is_(None),
+            (Bid.canonical_url.isnot(None)) | (Bid.item_url.isnot(None)),
         )
     )
-    for bid in result.all():
-        bid.is_liked = is_bookmarked
-        if not is_bookmarked:
-            bid.liked_at = None
+    updates = [
+        {"id": bid_id, "normalized_url": normalized}
+        for bid_id, canonical_url, item_url in result.all()
+        if (normalized := _normalize_bookmark_url(canonical_url or item_url))
+    ]
+    if updates:
+        await session.execute(update(Bid), updates)
 
 
 async def _sync_item_bookmark_like_state(
@@ -77,18 +74,12 @@ async def _sync_item_bookmark_like_state(
     canonical_url: str,
     is_bookmarked: bool,
 ) -> None:
-    result = await session.exec(
-        select(Bid).where(
-            Bid.row_id.in_(select(Row.id).where(Row.user_id == user_id)),
-            or_(Bid.canonical_url.isnot(None), Bid.item_url.isnot(None)),
-        )
+    await _backfill_normalized_urls(session, user_id)
+    await session.execute(
+        update(Bid)
+        .where(Bid.row_id.in_(_user_row_ids(user_id)), Bid.normalized_url == canonical_url)
+        .values(**_like_state_values(is_bookmarked))
     )
-    for bid in result.all():
-        bid_url = _normalize_bookmark_url(bid.canonical_url or bid.item_url)
-        if bid_url == canonical_url:
-            bid.is_liked = is_bookmarked
-            if not is_bookmarked:
-                bid.liked_at = None
 
 @router.post("/vendors/{vendor_id}")
 async def bookmark_vendor(
@@ -1,8 +1,9 @@
 """Bug report routes - submit and track bug reports."""
-from fastapi import APIRouter, Depends, HTTPException, Header, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Header, UploadFile, File, Form
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import asyncio
 import json
 import traceback
 import os
@@ -18,7 +19,8 @@ from dependencies import get_current_session, require_admin
 from github_client import github_client
 from diagnostics_utils import generate_diagnostics_summary
 from services.email import send_triage_notification_email
-from storage import get_storage_provider
+from services.jobs import enqueue
+from storage import get_storage_provider, iter_upload_chunks
 
 router = APIRouter(tags=["bugs"])
 
@@ -37,6 +39,21 @@ def get_storage():
     return _storage_provider
 
 
+async def close_storage() -> None:
+    if _storage_provider is not None:
+        await _storage_provider.close()
+
+
+async def _save_attachment(file: UploadFile) -> Optional[str]:
+    try:
+        return await get_storage().save_stream(iter_upload_chunks(file), file.filename, "bugs")
+    except Exception as e:
+        print(f"[BUG] Failed to save attachment {file.filename}: {e}")
+        return None
+    finally:
+        await file.close()
+
+
 class BugReportRead(BaseModel):
     id: int
     status: str
@@ -104,7 +121,10 @@ async def classify_report(
 
 
 async def create_github_issue_task(bug_id: int):
-    """Background task to create GitHub issue for a bug report."""
+    """Background task to create GitHub issue for a bug report.
+
+    Raises when the issue could not be created, so the job queue retries it.
+    """
     print(f"[BUG] Background task started for report {bug_id}")
     print(f"[BUG] GitHub config: GITHUB_TOKEN={'set' if github_client.token else 'MISSING'}, GITHUB_REPO={github_client.repo or 'MISSING'}")
 
@@ -159,18 +179,22 @@ async def create_github_issue_task(bug_id: int):
                     diag_str = json.dumps(parsed_diag, indent=2)
                     body += f"\n<details>\n<summary>Full Diagnostics JSON</summary>\n\n```json\n{diag_str}\n```\n</details>\n"
 
-            classification = await classify_report(
-                notes=bug.notes,
-                expected=bug.expected,
-                actual=bug.actual,
-                diagnostics_summary=diagnostics_summary,
-            )
-            report_type = classification.get("type", "bug")
-            confidence = float(classification.get("confidence", 0.0))
-            reasoning = classification.get("reasoning", "")
-
-            bug.classification = report_type
-            bug.classification_confidence = confidence
+            # Retries reuse the triage of an earlier attempt instead of classifying again.
+            if bug.classification is None:
+                classification = await classify_report(
+                    notes=bug.notes,
+                    expected=bug.expected,
+                    actual=bug.actual,
+                    diagnostics_summary=diagnostics_summary,
+                )
+                bug.classification = classification.get("type", "bug")
+                bug.classification_confidence = float(classification.get("confidence", 0.0))
+                bug.classification_reasoning = classification.get("reasoning", "")
+                session.add(bug)
+                await session.commit()
+            report_type = bug.classification
+            confidence = bug.classification_confidence or 0.0
+            reasoning = bug.classification_reasoning or ""
 
             is_low_confidence = confidence < TRIAGE_CONFIDENCE_THRESHOLD
             is_feature_request = report_type == "feature_request" and not is_low_confidence
@@ -186,8 +210,8 @@ async def create_github_issue_task(bug_id: int):
                 except (json.JSONDecodeError, TypeError, KeyError):
                     pass
 
-            # Send email for feature requests OR low confidence reports
-            if is_feature_request or is_low_confidence:
+            # Send email for feature requests OR low confidence reports (once, not per attempt)
+            if (is_feature_request or is_low_confidence) and bug.triage_email_sent_at is None:
                 await send_triage_notification_email(
                     report_id=bug.id,
                     classification=report_type,
@@ -198,6 +222,9 @@ async def create_github_issue_task(bug_id: int):
                     reasoning=reasoning
                 )
                 print(f"[BUG] Sent triage email for report {bug_id} (type={report_type}, conf={confidence:.2f})")
+                bug.triage_email_sent_at = datetime.utcnow()
+                session.add(bug)
+                await session.commit()
 
             body += "\n### Triage\n"
             body += f"- **Classification**: {report_type}\n"
@@ -213,6 +240,14 @@ async def create_github_issue_task(bug_id: int):
                 bug.status = "feature_request"
                 print(f"[BUG] Report {bug_id} classified as feature request; creating GitHub issue without ai-fix label")
 
+            if not github_client.token or not github_client.repo:
+                # Retrying cannot help until GITHUB_TOKEN and GITHUB_REPO are set.
+                print(f"[BUG] GitHub is not configured; report {bug_id} stays without an issue")
+                bug.status = "github_unconfigured"
+                session.add(bug)
+                await session.commit()
+                return
+
             print(f"[BUG] Creating GitHub issue for report {bug_id}...")
             issue = await github_client.create_issue(
                 title=f"[Bug] {bug.notes[:50]}...",
@@ -231,15 +266,16 @@ async def create_github_issue_task(bug_id: int):
                 bug.status = "github_failed"
                 session.add(bug)
                 await session.commit()
+                raise RuntimeError(f"GitHub issue creation failed for report {bug_id}")
 
         except Exception as e:
             print(f"[BUG] Failed to create GitHub issue for report {bug_id}: {e}")
             traceback.print_exc()
+            raise
 
 
 @router.post("/api/bugs", response_model=BugReportRead, status_code=201)
 async def create_bug_report(
-    background_tasks: BackgroundTasks,
     notes: str = Form(...),
     severity: str = Form("low"),
     category: str = Form("ui"),
@@ -260,18 +296,10 @@ async def create_bug_report(
 
     saved_paths = []
     if attachments:
-        for file in attachments:
-            if not file.filename:
-                continue
-            
-            try:
-                content = await file.read()
-                public_url = await get_storage().save_file(content, file.filename, "bugs")
-                saved_paths.append(public_url)
-            except Exception as e:
-                print(f"[BUG] Failed to save attachment {file.filename}: {e}")
-            finally:
-                await file.close()
+        uploads = [file for file in attachments if file.filename]
+        # Stream each attachment into storage in chunks; attachments upload concurrently.
+        results = await asyncio.gather(*[_save_attachment(file) for file in uploads])
+        saved_paths = [url for url in results if url]
 
     bug = BugReport(
         user_id=user_id,
@@ -286,14 +314,15 @@ async def create_bug_report(
     )
     
     session.add(bug)
+    await session.flush()
+    # Durable job, committed with the report: survives restarts and is retried by the job worker.
+    await enqueue(
+        session, "bugs.create_github_issue", {"bug_id": bug.id}, dedupe_key=f"bug-issue:{bug.id}"
+    )
     await session.commit()
     await session.refresh(bug)
     
-    print(f"[BUG] Report {bug.id} saved. Queuing GitHub issue creation...")
-    background_tasks.add_task(create_github_issue_task, bug.id)
-    # Also run inline so issue creation does not depend solely on background task execution.
-    # Background task remains as a fallback/retry path.
-    await create_github_issue_task(bug.id)
+    print(f"[BUG] Report {bug.id} saved. Queued GitHub issue creation.")
     
     return BugReportRead(
         id=bug.id,
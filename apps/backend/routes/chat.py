@@ -24,8 +24,8 @@ from utils.json_utils import safe_json_loads
 from services.llm import (
     ChatContext,
     UnifiedDecision,
+    UnifiedDecisionStream,
     generate_choice_factors,
-    make_unified_decision,
 )
 
 # Helpers extracted to chat_helpers.py — re-exported for backward compatibility
@@ -39,7 +39,9 @@ from routes.chat_helpers import (  # noqa: F401
     _update_row,
     _save_choice_factors,
     _stream_search,
+    _start_speculative_search,
 )
+from sourcing.speculative import speculative_searches
 
 router = APIRouter(tags=["chat"])
 logger = logging.getLogger(__name__)
@@ -74,6 +76,8 @@ async def chat_endpoint(
     user_id = await resolve_user_id(authorization, session)
 
     async def generate_events() -> AsyncGenerator[str, None]:
+        decision_stream: Optional[UnifiedDecisionStream] = None
+        speculative_keys: List[str] = []
         try:
             messages = body.messages or []
             active_row_id = body.activeRowId
@@ -106,6 +110,7 @@ async def chat_endpoint(
             ]
 
             # Fetch active row if present
+            active_row = None
             active_row_data = None
             if active_row_id:
                 result = await session.exec(
@@ -131,6 +136,10 @@ async def chat_endpoint(
                 if proj:
                     active_project_data = {"id": project_id, "title": proj.title or ""}
 
+            # Warm provider fetches for the likely query while the LLM decides;
+            # the search stream claims them if the decision searches that query.
+            speculative_keys = await _start_speculative_search(user_message, active_row)
+
             # === SINGLE LLM DECISION ===
             ctx = ChatContext(
                 user_message=user_message,
@@ -141,7 +150,12 @@ async def chat_endpoint(
             )
 
             logger.info(f"Making unified decision: msg={user_message!r}, activeRow={active_row_id}, pending={bool(pending_clarification)}")
-            decision = await make_unified_decision(ctx)
+            # Stream the message text as the LLM writes it; act as soon as the
+            # action is known while trailing fields (ui_hint) keep streaming.
+            decision_stream = UnifiedDecisionStream(ctx)
+            async for text in decision_stream.message_deltas():
+                yield sse_event("assistant_message_delta", {"text": text})
+            decision = decision_stream.decision
 
             intent = decision.intent
             action = decision.action
@@ -149,7 +163,7 @@ async def chat_endpoint(
 
             logger.info(f"Decision: action={action_type}, intent.what={intent.what}, intent.category={intent.category}")
 
-            # Send assistant message
+            # Send the complete assistant message (replaces the streamed deltas)
             yield sse_event("assistant_message", {"text": decision.message})
 
             # === INTENT-DRIVEN HELPERS ===
@@ -241,7 +255,8 @@ async def chat_endpoint(
                             })
 
                     # Build and emit SDUI schema after search completes
-                    schema = await _build_and_persist_ui_schema(session, row, decision.ui_hint)
+                    ui_hint = (await decision_stream.final()).ui_hint
+                    schema = await _build_and_persist_ui_schema(session, row, ui_hint)
                     if schema:
                         yield sse_ui_schema_event(row.id, schema, row.ui_schema_version, "search_complete")
 
@@ -297,7 +312,8 @@ async def chat_endpoint(
                         })
 
                 # Build and emit SDUI schema after search completes
-                schema = await _build_and_persist_ui_schema(session, row, decision.ui_hint)
+                ui_hint = (await decision_stream.final()).ui_hint
+                schema = await _build_and_persist_ui_schema(session, row, ui_hint)
                 if schema:
                     yield sse_ui_schema_event(row.id, schema, row.ui_schema_version, "search_complete")
 
@@ -343,7 +359,8 @@ async def chat_endpoint(
                             yield sse_event("search_results", {"row_id": row.id, "results": batch.get("results", []), "provider_statuses": [batch.get("status")] if batch.get("status") else [], "more_incoming": batch.get("more_incoming", False), "provider": batch.get("provider")})
 
                     # Build and emit SDUI schema
-                    schema = await _build_and_persist_ui_schema(session, row, decision.ui_hint)
+                    ui_hint = (await decision_stream.final()).ui_hint
+                    schema = await _build_and_persist_ui_schema(session, row, ui_hint)
                     if schema:
                         yield sse_ui_schema_event(row.id, schema, row.ui_schema_version, "search_complete")
 
@@ -412,7 +429,8 @@ async def chat_endpoint(
                             })
 
                     # Build and emit SDUI schema
-                    schema = await _build_and_persist_ui_schema(session, row, decision.ui_hint)
+                    ui_hint = (await decision_stream.final()).ui_hint
+                    schema = await _build_and_persist_ui_schema(session, row, ui_hint)
                     if schema:
                         yield sse_ui_schema_event(row.id, schema, row.ui_schema_version, "search_complete")
 
@@ -487,6 +505,10 @@ async def chat_endpoint(
             logger.error(f"Chat error: {e}", exc_info=True)
             yield sse_event("error", {"message": str(e) or "Chat processing failed"})
             yield sse_event("done", {})
+        finally:
+            speculative_searches.discard(speculative_keys)
+            if decision_stream is not None:
+                await decision_stream.aclose()
 
     return StreamingResponse(
         generate_events(),
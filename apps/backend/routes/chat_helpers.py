@@ -16,8 +16,9 @@ from models.rows import Row, Project
 from models.bids import Bid
 from models import RequestSpec
 from sourcing.location import resolve_location_context
-from utils.json_utils import safe_json_loads
-from services.sdui_builder import build_ui_schema
+from sourcing.speculative import speculative_searches
+from utils.json_utils import json_dumps_fast, safe_json_loads
+from services.sdui_builder import apply_ui_schema, build_ui_schema
 
 logger = logging.getLogger(__name__)
 
@@ -50,23 +51,25 @@ _SELF_BASE_URL = _get_self_base_url()
 
 def sse_event(event: str, data: Any) -> str:
     """Format a single SSE event."""
-    return f"event: {event}\ndata: {json.dumps(data if data is not None else None)}\n\n"
+    return f"event: {event}\ndata: {json_dumps_fast(data)}\n\n"
 
 
 async def _build_and_persist_ui_schema(
     session: AsyncSession, row: Row, ui_hint_data=None
 ) -> Optional[dict]:
-    """Build SDUI schema from bids and persist on the Row. Returns schema dict or None."""
+    """Build SDUI schema from bids and persist on the Row. Returns schema dict or None.
+
+    An unchanged schema is not rewritten and keeps its ui_schema_version.
+    """
     try:
         result = await session.exec(
             select(Bid).where(Bid.row_id == row.id).order_by(Bid.combined_score.desc().nullslast()).limit(30)
         )
         bids = list(result.all())
         schema = build_ui_schema(ui_hint_data, row, bids)
-        row.ui_schema = schema
-        row.ui_schema_version = (getattr(row, "ui_schema_version", 0) or 0) + 1
-        session.add(row)
-        await session.commit()
+        if apply_ui_schema(row, schema):
+            session.add(row)
+            await session.commit()
         return schema
     except Exception as e:
         logger.warning(f"[Chat] Failed to build ui_schema for row {row.id}: {e}")
@@ -346,3 +349,38 @@ async def _stream_search(
                             yield data
                         except json.JSONDecodeError:
                             pass
+
+
+async def _start_speculative_search(user_message: str, active_row: Optional[Row]) -> List[str]:
+    """
+    Start provider fetches for the likely search query before the LLM decides.
+    Uses the active row's stored search intent, else the heuristic query from the
+    message. Returns the started keys so the caller can discard unclaimed ones.
+    """
+    if not speculative_searches.config.enabled:
+        return []
+    from routes.rows_search import get_sourcing_repo
+    from routes.rows_search_helpers import _extract_filters, _parse_intent_payload, _sanitize_query
+    from services.llm import _heuristic_provider_query
+
+    query = ""
+    min_price = max_price = None
+    if active_row is not None:
+        intent = _parse_intent_payload(active_row.search_intent)
+        query = intent.raw_input if intent else ""
+        min_price, max_price, _ = _extract_filters(active_row, None)
+    if not query:
+        query = _heuristic_provider_query(user_message)
+    if not query:
+        return []
+    try:
+        # Same normalization the search stream endpoint applies to the chat's query.
+        return await speculative_searches.start(
+            get_sourcing_repo(),
+            _sanitize_query(query, True),
+            min_price=min_price,
+            max_price=max_price,
+        )
+    except Exception as e:
+        logger.warning(f"[Chat] Speculative search failed to start: {e}")
+        return []
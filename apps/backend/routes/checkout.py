@@ -1,4 +1,5 @@
 """Checkout routes - Stripe Checkout Session creation and webhook handling."""
+import asyncio
 import json
 import logging
 import os
@@ -15,6 +16,7 @@ from models import Bid, Row, PurchaseEvent, Vendor
 from models.deals import Deal
 from audit import audit_log
 from services.deal_pipeline import transition_deal_status, record_message
+from services.stripe_calls import call_stripe
 
 logger = logging.getLogger(__name__)
 
@@ -89,35 +91,16 @@ class TipJarCreateRequest(BaseModel):
 # ── Create Checkout Session ──────────────────────────────────────────────
 
 
-@router.post("/api/checkout/create-session", response_model=CheckoutCreateResponse)
-async def create_checkout_session(
+async def _build_checkout_params(
     request: Request,
-    body: CheckoutCreateRequest,
-    authorization: Optional[str] = Header(None),
-    session: AsyncSession = Depends(get_session),
-):
-    """Create a Stripe Checkout Session for a bid."""
-    auth_session = await get_current_session(authorization, session)
-    if not auth_session:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    stripe = _get_stripe()
-
-    # Validate bid exists and belongs to user's row
-    bid = await session.get(Bid, body.bid_id)
-    if not bid:
-        raise HTTPException(status_code=404, detail="Bid not found")
-
-    row_result = await session.exec(
-        select(Row).where(Row.id == body.row_id, Row.user_id == auth_session.user_id)
-    )
-    row = row_result.first()
-    if not row:
-        raise HTTPException(status_code=404, detail="Row not found or access denied")
-
-    if bid.row_id != row.id:
-        raise HTTPException(status_code=400, detail="Bid does not belong to this row")
-
+    bid: Bid,
+    row: Row,
+    user_id: int,
+    success_url: str,
+    cancel_url: str,
+    session: AsyncSession,
+) -> dict:
+    """Build Stripe Checkout Session params for a validated bid."""
     # Don't allow checkout for service providers (no fixed price)
     if bid.price is None or bid.price <= 0:
         raise HTTPException(
@@ -145,19 +128,15 @@ async def create_checkout_session(
 
     # Default URLs — derive from request origin so multi-domain works
     app_base = _get_app_base(request)
-    success_url = body.success_url or f"{app_base}/?checkout=success&session_id={{CHECKOUT_SESSION_ID}}"
-    cancel_url = body.cancel_url or f"{app_base}/?checkout=cancel"
+    success_url = success_url or f"{app_base}/?checkout=success&session_id={{CHECKOUT_SESSION_ID}}"
+    cancel_url = cancel_url or f"{app_base}/?checkout=cancel"
 
     # Check for Stripe Connect: look up merchant via bid's seller
     connected_account_id = None
-    platform_fee_cents = 0
-    commission_rate = 0.00
     if bid.vendor_id:
         vendor = await session.get(Vendor, bid.vendor_id)
         if vendor and vendor.stripe_account_id and vendor.stripe_onboarding_complete:
             connected_account_id = vendor.stripe_account_id
-            commission_rate = 0.0
-            platform_fee_cents = 0
 
     session_params = {
         "mode": "payment",
@@ -167,7 +146,7 @@ async def create_checkout_session(
         "metadata": {
             "bid_id": str(bid.id),
             "row_id": str(row.id),
-            "user_id": str(auth_session.user_id),
+            "user_id": str(user_id),
         },
     }
 
@@ -176,26 +155,68 @@ async def create_checkout_session(
         session_params["stripe_account"] = connected_account_id
         session_params["metadata"]["connected_account"] = connected_account_id
 
-    try:
-        checkout_session = stripe.checkout.Session.create(**session_params)
-    except Exception as e:
-        logger.error(f"[CHECKOUT] Stripe session creation failed: {e}")
-        raise HTTPException(status_code=502, detail="Failed to create checkout session")
+    return session_params
+
 
+async def _audit_checkout_session(
+    session: AsyncSession, user_id: int, checkout_session, bid: Bid, row: Row
+) -> None:
     await audit_log(
         session=session,
         action="checkout.session_created",
-        user_id=auth_session.user_id,
+        user_id=user_id,
         resource_type="checkout",
         resource_id=checkout_session.id,
         details={
             "bid_id": bid.id,
             "row_id": row.id,
             "amount": bid.price,
-            "currency": currency,
+            "currency": (bid.currency or "USD").lower(),
         },
     )
 
+
+@router.post("/api/checkout/create-session", response_model=CheckoutCreateResponse)
+async def create_checkout_session(
+    request: Request,
+    body: CheckoutCreateRequest,
+    authorization: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_session),
+):
+    """Create a Stripe Checkout Session for a bid."""
+    auth_session = await get_current_session(authorization, session)
+    if not auth_session:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    stripe = _get_stripe()
+
+    # Validate bid exists and belongs to user's row
+    bid = await session.get(Bid, body.bid_id)
+    if not bid:
+        raise HTTPException(status_code=404, detail="Bid not found")
+
+    row_result = await session.exec(
+        select(Row).where(Row.id == body.row_id, Row.user_id == auth_session.user_id)
+    )
+    row = row_result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Row not found or access denied")
+
+    if bid.row_id != row.id:
+        raise HTTPException(status_code=400, detail="Bid does not belong to this row")
+
+    session_params = await _build_checkout_params(
+        request, bid, row, auth_session.user_id, body.success_url, body.cancel_url, session
+    )
+
+    try:
+        checkout_session = await call_stripe(stripe.checkout.Session.create, **session_params)
+    except Exception as e:
+        logger.error(f"[CHECKOUT] Stripe session creation failed: {e}")
+        raise HTTPException(status_code=502, detail="Failed to create checkout session")
+
+    await _audit_checkout_session(session, auth_session.user_id, checkout_session, bid, row)
+
     return CheckoutCreateResponse(
         checkout_url=checkout_session.url,
         session_id=checkout_session.id,
@@ -236,7 +257,7 @@ async def create_tip_jar_session(request: Request, body: TipJarCreateRequest = N
     }
 
     try:
-        checkout_session = stripe.checkout.Session.create(**session_params)
+        checkout_session = await call_stripe(stripe.checkout.Session.create, **session_params)
     except Exception as e:
         logger.error(f"[TIP JAR] Stripe session creation failed: {e}")
         raise HTTPException(status_code=502, detail="Failed to create tip jar session")
@@ -292,38 +313,47 @@ async def batch_checkout(
     if not row:
         raise HTTPException(status_code=404, detail="Row not found or access denied")
 
-    sessions_created = []
-    total = 0.0
-    currency = "USD"
+    stripe = _get_stripe()
 
+    # DB lookups stay sequential (one AsyncSession); the Stripe calls run concurrently.
+    prepared = []
     for bid_id in body.bid_ids:
         bid = await session.get(Bid, bid_id)
         if not bid or bid.row_id != body.row_id:
             continue
         if bid.price is None or bid.price <= 0:
             continue
-
-        # Create individual checkout for this bid
-        single_req = CheckoutCreateRequest(
-            bid_id=bid_id,
-            row_id=body.row_id,
-            success_url=body.success_url,
-            cancel_url=body.cancel_url,
+        session_params = await _build_checkout_params(
+            request, bid, row, auth_session.user_id, body.success_url, body.cancel_url, session
         )
-        try:
-            result = await create_checkout_session(request, single_req, authorization, session)
-            sessions_created.append({
-                "bid_id": bid_id,
-                "checkout_url": result.checkout_url,
-                "session_id": result.session_id,
-                "amount": bid.price,
-                "title": bid.item_title,
-            })
-            total += bid.price
-            currency = (bid.currency or "USD").upper()
-        except HTTPException as e:
-            logger.warning(f"[BATCH CHECKOUT] Skipped bid {bid_id}: {e.detail}")
+        prepared.append((bid, session_params))
+
+    created = await asyncio.gather(
+        *[call_stripe(stripe.checkout.Session.create, **params) for _, params in prepared],
+        return_exceptions=True,
+    )
+
+    sessions_created = []
+    total = 0.0
+    currency = "USD"
+
+    for (bid, _), checkout_session in zip(prepared, created):
+        if isinstance(checkout_session, Exception):
+            logger.warning(
+                f"[BATCH CHECKOUT] Skipped bid {bid.id}: "
+                f"Stripe session creation failed: {checkout_session}"
+            )
             continue
+        await _audit_checkout_session(session, auth_session.user_id, checkout_session, bid, row)
+        sessions_created.append({
+            "bid_id": bid.id,
+            "checkout_url": checkout_session.url,
+            "session_id": checkout_session.id,
+            "amount": bid.price,
+            "title": bid.item_title,
+        })
+        total += bid.price
+        currency = (bid.currency or "USD").upper()
 
     if not sessions_created:
         raise HTTPException(status_code=400, detail="No valid bids for checkout")
@@ -2,17 +2,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from fastapi.responses import RedirectResponse
 from typing import Optional
-import asyncio
+from datetime import datetime
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from database import get_session
-from models import ClickoutEvent
 from dependencies import get_current_session
 from sourcing import extract_merchant_domain
 from affiliate import link_resolver, ClickContext
-from audit import audit_log
+from audit import audit_log_values
 from routes.rate_limit import check_rate_limit
+from services.clickout_buffer import clickout_buffer
 
 router = APIRouter(tags=["clickout"])
 
@@ -50,7 +50,7 @@ async def clickout_redirect(
             session_id = auth_session.id
 
     rate_key = f"clickout:{user_id or request.client.host}"
-    if not check_rate_limit(rate_key, "clickout"):
+    if not await check_rate_limit(rate_key, "clickout"):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
     
     merchant_domain = extract_merchant_domain(url)
@@ -71,49 +71,36 @@ async def clickout_redirect(
     from services.fraud import assess_clickout
     is_suspicious = assess_clickout(client_ip, client_ua, user_id)
 
-    async def log_clickout():
-        try:
-            from database import engine
-            from sqlalchemy.orm import sessionmaker
-            from sqlmodel.ext.asyncio.session import AsyncSession as AS
-            async_session = sessionmaker(engine, class_=AS, expire_on_commit=False)
-            async with async_session() as log_session:
-                event = ClickoutEvent(
-                    user_id=user_id,
-                    session_id=session_id,
-                    row_id=row_id,
-                    bid_id=bid_id,
-                    offer_index=idx,
-                    canonical_url=url,
-                    final_url=resolved.final_url,
-                    merchant_domain=merchant_domain,
-                    handler_name=resolved.handler_name,
-                    affiliate_tag=resolved.affiliate_tag,
-                    source=source,
-                    is_suspicious=is_suspicious,
-                    ip_address=client_ip,
-                    user_agent=client_ua[:500] if client_ua else None,
-                )
-                log_session.add(event)
-                await log_session.commit()
-                await log_session.refresh(event)
-                
-                await audit_log(
-                    session=log_session,
-                    action="clickout.redirect",
-                    user_id=user_id,
-                    resource_type="clickout",
-                    resource_id=str(event.id),
-                    details={
-                        "canonical_url": url,
-                        "merchant_domain": merchant_domain,
-                        "handler_name": resolved.handler_name,
-                    },
-                    request=request,
-                )
-        except Exception as e:
-            print(f"[CLICKOUT] Failed to log: {e}")
-    
-    asyncio.create_task(log_clickout())
+    # Buffered: the redirect never waits on (or opens) a DB connection for logging.
+    clickout_buffer.submit(
+        {
+            "user_id": user_id,
+            "session_id": session_id,
+            "row_id": row_id,
+            "bid_id": bid_id,
+            "offer_index": idx,
+            "canonical_url": url,
+            "final_url": resolved.final_url,
+            "merchant_domain": merchant_domain,
+            "handler_name": resolved.handler_name,
+            "affiliate_tag": resolved.affiliate_tag,
+            "source": source,
+            "is_suspicious": is_suspicious,
+            "ip_address": client_ip,
+            "user_agent": client_ua[:500] if client_ua else None,
+            "created_at": datetime.utcnow(),
+        },
+        audit=audit_log_values(
+            "clickout.redirect",
+            user_id=user_id,
+            resource_type="clickout",
+            details={
+                "canonical_url": url,
+                "merchant_domain": merchant_domain,
+                "handler_name": resolved.handler_name,
+            },
+            request=request,
+        ),
+    )
     
     return RedirectResponse(url=resolved.final_url, status_code=302)
@@ -15,12 +15,10 @@ Results are ephemeral — not persisted to any Row or Bid.
 
 import hashlib
 import logging
-import time
-from collections import defaultdict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException
 from pydantic import BaseModel
 
 from sourcing.repository import SearchResult, SourcingRepository
@@ -28,30 +26,11 @@ from sourcing.scorer import score_results
 from sourcing.models import SearchIntent
 from services.llm import triage_provider_query, make_unified_decision, ChatContext
 from services.intent import extract_search_intent
+from routes.rate_limit import rate_limit
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["public"])
 
-# ---------------------------------------------------------------------------
-# Rate limiting (in-memory, per-IP)
-# ---------------------------------------------------------------------------
-_rate_store: Dict[str, List[float]] = defaultdict(list)
-RATE_LIMIT = 10  # requests per window
-RATE_WINDOW = 60  # seconds
-
-
-def _check_rate_limit(ip: str) -> bool:
-    now = time.time()
-    window_start = now - RATE_WINDOW
-    hits = _rate_store[ip]
-    # Prune old entries
-    _rate_store[ip] = [t for t in hits if t > window_start]
-    if len(_rate_store[ip]) >= RATE_LIMIT:
-        return False
-    _rate_store[ip].append(now)
-    return True
-
-
 def _hash_ip(ip: str) -> str:
     return hashlib.sha256(ip.encode()).hexdigest()[:12]
 
@@ -84,7 +63,13 @@ class PublicSearchResponse(BaseModel):
     result_count: int = 0
 
 
-@router.post("/api/public/search", response_model=PublicSearchResponse)
+@router.post(
+    "/api/public/search",
+    response_model=PublicSearchResponse,
+    dependencies=[
+        Depends(rate_limit("public_search", detail="Rate limit exceeded. Try again in a minute."))
+    ],
+)
 async def public_search(body: PublicSearchRequest, request: Request):
     """
     Public search endpoint — runs the full sourcing pipeline without auth.
@@ -93,9 +78,6 @@ async def public_search(body: PublicSearchRequest, request: Request):
     """
     client_ip = request.client.host if request.client else "unknown"
 
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again in a minute.")
-
     raw_query = body.query.strip()
     if not raw_query:
         raise HTTPException(status_code=400, detail="Query is required")
@@ -10,11 +10,9 @@ import json
 import logging
 import os
 import re
-import time
-from collections import defaultdict
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from sqlmodel import select, func, col
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -22,24 +20,10 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from database import get_session
 from fastapi import Depends
 from models.bids import Vendor
+from routes.rate_limit import rate_limit
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["public-vendors"])
-
-# Rate limiting
-_rate_store: Dict[str, List[float]] = defaultdict(list)
-RATE_LIMIT = 20
-RATE_WINDOW = 60
-
-
-def _check_rate_limit(ip: str) -> bool:
-    now = time.time()
-    hits = _rate_store[ip]
-    _rate_store[ip] = [t for t in hits if t > now - RATE_WINDOW]
-    if len(_rate_store[ip]) >= RATE_LIMIT:
-        return False
-    _rate_store[ip].append(now)
-    return True
+router = APIRouter(tags=["public-vendors"], dependencies=[Depends(rate_limit("public_vendors"))])
 
 
 def _vendor_to_public(v: Vendor) -> Dict[str, Any]:
@@ -87,16 +71,12 @@ class VendorListResponse(BaseModel):
 
 @router.get("/api/public/vendors/filter", response_model=VendorListResponse)
 async def filter_vendors(
-    request: Request,
     city: str = Query(..., min_length=1, max_length=100),
     category: str = Query(..., min_length=1, max_length=200),
     page: int = Query(1, ge=1),
     page_size: int = Query(24, ge=1, le=100),
     session: AsyncSession = Depends(get_session),
 ):
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     offset = (page - 1) * page_size
     city_like = f"%{city}%"
@@ -135,15 +115,11 @@ async def filter_vendors(
 
 @router.get("/api/public/vendors", response_model=VendorListResponse)
 async def list_vendors(
-    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(24, ge=1, le=100),
     session: AsyncSession = Depends(get_session),
 ):
     """Paginated vendor listing — only vendors with embeddings and websites."""
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     offset = (page - 1) * page_size
 
@@ -179,15 +155,11 @@ async def list_vendors(
 
 @router.get("/api/public/vendors/search")
 async def search_vendors(
-    request: Request,
     q: str = Query(..., min_length=1, max_length=200),
     limit: int = Query(20, ge=1, le=50),
     session: AsyncSession = Depends(get_session),
 ):
     """Vector search vendors by natural language query."""
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     logger.info(f"[PublicVendors] Search: {q!r}")
 
@@ -254,7 +226,6 @@ async def search_vendors(
 
 @router.get("/api/public/vendors/facets")
 async def list_vendor_facets(
-    request: Request,
     session: AsyncSession = Depends(get_session),
 ):
     """Return distinct (city, category) pairs for sitemap and internal linking.
@@ -263,9 +234,6 @@ async def list_vendor_facets(
     de-duped {cities: [...], categories: [...], combos: [{city, category}, ...]}.
     Capped at 500 combos to keep responses reasonable.
     """
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     stmt = (
         select(Vendor.store_geo_location, Vendor.category)
@@ -309,13 +277,9 @@ async def list_vendor_facets(
 @router.get("/api/public/vendors/{vendor_id}")
 async def get_vendor_detail(
     vendor_id: int,
-    request: Request,
     session: AsyncSession = Depends(get_session),
 ):
     """Single vendor detail — public info only, no email/phone."""
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     vendor = await session.get(Vendor, vendor_id)
     if not vendor:
@@ -336,12 +300,8 @@ def _compute_slug(name: str, vendor_id: int) -> str:
 @router.get("/api/public/vendors/slug/{vendor_slug}")
 async def get_vendor_detail_by_slug(
     vendor_slug: str,
-    request: Request,
     session: AsyncSession = Depends(get_session),
 ):
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     vendor: Optional[Vendor] = None
 
@@ -1,32 +1,54 @@
-"""Rate limiting utilities."""
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import List
-
-# Simple in-memory rate limiter (use Redis in production)
-rate_limit_store: dict[str, List[datetime]] = defaultdict(list)
-RATE_LIMIT_WINDOW = 60  # seconds
+"""Rate limiting utilities.
+
+Every limit is enforced by ``services.rate_limiter.rate_limiter`` (sliding-window
+counters, per process or shared through Postgres; see that module). Routes keyed
+by client IP declare the ``rate_limit`` dependency; routes keyed by user or phone
+call ``check_rate_limit`` once they know the key.
+"""
+from typing import Callable
+
+from fastapi import HTTPException, Request
+
+from services.rate_limiter import rate_limiter
+
 RATE_LIMIT_MAX = {
-    "search": 30,      # 30 searches per minute
-    "clickout": 60,    # 60 clicks per minute
-    "auth_start": 5,   # 5 login attempts per minute
-    "chat_anon": 10,   # 10 anonymous chat requests per minute
+    "search": 30,          # 30 searches per minute
+    "clickout": 60,        # 60 clicks per minute
+    "auth_start": 5,       # 5 login attempts per minute
+    "chat_anon": 10,       # 10 anonymous chat requests per minute
+    "public_search": 10,   # 10 public searches per minute per IP
+    "public_vendors": 20,  # 20 public vendor directory requests per minute per IP
 }
 
+# Older name for the limiter; ``rate_limit_store.clear()`` resets every limit.
+rate_limit_store = rate_limiter
+
 
-def check_rate_limit(key: str, limit_type: str) -> bool:
+async def check_rate_limit(key: str, limit_type: str) -> bool:
     """Returns True if request is allowed, False if rate limited."""
-    now = datetime.utcnow()
-    window_start = now - timedelta(seconds=RATE_LIMIT_WINDOW)
-    
-    # Clean old entries
-    rate_limit_store[key] = [
-        t for t in rate_limit_store[key] if t > window_start
-    ]
-    
-    max_requests = RATE_LIMIT_MAX.get(limit_type, 100)
-    if len(rate_limit_store[key]) >= max_requests:
-        return False
-    
-    rate_limit_store[key].append(now)
-    return True
+    return await rate_limiter.allow(key, RATE_LIMIT_MAX.get(limit_type, 100))
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(
+    limit_type: str,
+    key: Callable[[Request], str] = client_ip,
+    detail: str = "Rate limit exceeded",
+):
+    """FastAPI dependency enforcing ``RATE_LIMIT_MAX[limit_type]`` per ``key(request)``.
+
+    Usage: ``@router.get(..., dependencies=[Depends(rate_limit("public_vendors"))])``
+    """
+
+    async def dependency(request: Request) -> None:
+        if not await check_rate_limit(f"{limit_type}:{key(request)}", limit_type):
+            raise HTTPException(
+                status_code=429,
+                detail=detail,
+                headers={"Retry-After": str(rate_limiter.retry_after())},
+            )
+
+    return dependency
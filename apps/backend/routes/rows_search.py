@@ -7,7 +7,6 @@ from pydantic import BaseModel
 from typing import Optional, List, Any, AsyncGenerator
 from datetime import datetime
 import re
-import json
 import logging
 
 from sqlalchemy.orm import selectinload
@@ -43,6 +42,8 @@ from routes.rows_search_helpers import (
 from sourcing.adapters import build_provider_query_map
 from sourcing.normalizers import normalize_generic_results
 from sourcing.scorer import score_results
+from utils.cpu_offload import run_cpu_bound
+from utils.json_utils import sse_data
 from sourcing.service import SourcingService
 from sourcing.discovery.classifier import classify_search_path
 from sourcing.coverage import evaluate_internal_vendor_coverage
@@ -283,7 +284,7 @@ async def search_row_listings(
     requester = None if is_guest else await session.get(User, user_id)
 
     rate_key = f"search:{user_id}"
-    if not check_rate_limit(rate_key, "search"):
+    if not await check_rate_limit(rate_key, "search"):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     result = await session.exec(
@@ -474,6 +475,68 @@ async def search_row_listings(
     return SearchResponse(results=results, provider_statuses=provider_statuses, user_message=user_message)
 
 
+def _filter_stream_batch(
+    results: List[SearchResult],
+    choice_constraints: Optional[dict],
+    desire_tier: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+) -> List[SearchResult]:
+    """Apply choice and price/source filtering to one provider batch."""
+    from sourcing.filters import should_include_result
+
+    filtered_batch = []
+    for r in results:
+        title = getattr(r, "title", "")
+        source = (getattr(r, "source", "") or "").lower()
+        is_vector_searched = source == "vendor_directory"
+
+        # Check choice constraints (skip for vector-searched sources)
+        if not is_vector_searched and choice_constraints:
+            if should_exclude_by_choices(title, choice_constraints):
+                continue
+
+        # Unified price/source filtering
+        if not should_include_result(
+            price=getattr(r, "price", None),
+            source=getattr(r, "source", "") or "",
+            desire_tier=desire_tier,
+            min_price=min_price,
+            max_price=max_price,
+        ):
+            continue
+        filtered_batch.append(r)
+    return filtered_batch
+
+
+def _quantum_rerank_inputs(normalized_batch: list) -> tuple[list[dict], list[tuple[int, str]]]:
+    """Build reranker inputs, reusing existing embeddings; return them and the (idx, text) pairs to embed."""
+    results_for_quantum = []
+    texts_to_embed = []
+    for idx, res in enumerate(normalized_batch):
+        existing_emb = res.raw_data.get("embedding") if res.raw_data else None
+        results_for_quantum.append({"_idx": idx, "title": res.title, "embedding": existing_emb})
+        if not existing_emb:
+            # Rich text: title + merchant + description for better semantic matching
+            desc = ""
+            if res.raw_data:
+                desc = str(res.raw_data.get("snippet", "") or res.raw_data.get("description", "") or "")
+            parts = [res.title, res.merchant_name]
+            if desc:
+                parts.append(desc[:200])
+            texts_to_embed.append((idx, " | ".join(parts)))
+    return results_for_quantum, texts_to_embed
+
+
+async def _embed_missing(texts: List[str]) -> Optional[List[List[float]]]:
+    """Batch-embed ``texts`` in one API call; None when there is nothing to embed or it fails."""
+    if not texts:
+        return None
+    from sourcing.vendor_provider import _embed_texts
+
+    return await _embed_texts(texts)
+
+
 @router.post("/rows/{row_id}/search/stream")
 async def search_row_listings_stream(
     row_id: int,
@@ -492,7 +555,7 @@ async def search_row_listings_stream(
     requester = None if is_guest else await session.get(User, user_id)
 
     rate_key = f"search:{user_id}"
-    if not check_rate_limit(rate_key, "search"):
+    if not await check_rate_limit(rate_key, "search"):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
     result = await session.exec(
@@ -585,7 +648,7 @@ async def search_row_listings_stream(
             all_statuses.extend(internal_statuses)
 
             if internal_results:
-                yield f"data: {json.dumps({'provider': 'vendor_directory', 'results': [r.model_dump() for r in internal_results], 'status': internal_statuses[0].model_dump() if internal_statuses else None, 'providers_remaining': 1, 'more_incoming': True, 'phase': 'internal_results', 'coverage_status': 'pending', 'total_results_so_far': len(all_results)})}\n\n"
+                yield sse_data({'provider': 'vendor_directory', 'results': [r.model_dump() for r in internal_results], 'status': internal_statuses[0].model_dump() if internal_statuses else None, 'providers_remaining': 1, 'more_incoming': True, 'phase': 'internal_results', 'coverage_status': 'pending', 'total_results_so_far': len(all_results)})
 
             evaluation = evaluate_internal_vendor_coverage(
                 internal_results,
@@ -629,7 +692,7 @@ async def search_row_listings_stream(
                         ]
                         all_results.extend(search_results)
                         all_statuses.append(status)
-                        yield f"data: {json.dumps({'provider': status.provider_id, 'results': [r.model_dump() for r in search_results], 'status': status.model_dump(), 'providers_remaining': 0, 'more_incoming': True, 'phase': 'discovery_results', 'coverage_status': eval_result.status, 'discovery_session_id': discovery_session_id, 'total_results_so_far': len(all_results), 'user_message': 'I’m expanding the search beyond our current vendor database.'})}\n\n"
+                        yield sse_data({'provider': status.provider_id, 'results': [r.model_dump() for r in search_results], 'status': status.model_dump(), 'providers_remaining': 0, 'more_incoming': True, 'phase': 'discovery_results', 'coverage_status': eval_result.status, 'discovery_session_id': discovery_session_id, 'total_results_so_far': len(all_results), 'user_message': 'I’m expanding the search beyond our current vendor database.'})
 
             try:
                 existing_stmt = (
@@ -661,12 +724,11 @@ async def search_row_listings_stream(
                     all_persisted_bid_ids | protected_existing_ids,
                 )
 
-                from services.sdui_builder import build_zero_results_schema
+                from services.sdui_builder import apply_ui_schema, build_zero_results_schema
 
                 row.status = "bids_arriving" if all_results else "sourcing"
                 if not all_results:
-                    row.ui_schema = build_zero_results_schema(row)
-                    row.ui_schema_version = (row.ui_schema_version or 0) + 1
+                    apply_ui_schema(row, build_zero_results_schema(row))
                 row.updated_at = datetime.utcnow()
                 session.add(row)
                 await session.commit()
@@ -693,7 +755,7 @@ async def search_row_listings_stream(
                 "more_incoming": False,
                 "user_message": requester_message or (None if evaluation.status == "sufficient" else "I’m expanding the search beyond our current vendor database."),
             }
-            yield f"data: {json.dumps(final_event)}\n\n"
+            yield sse_data(final_event)
             return
 
         generator = sourcing_repo.search_streaming(
@@ -715,72 +777,47 @@ async def search_row_listings_stream(
                 return None
 
         async def process_batch(provider_name, results, status, providers_remaining):
-            # Convert and filter results
-            from sourcing.filters import should_include_result as _should_include
-            filtered_batch = []
-            for r in results:
-                title = getattr(r, "title", "")
-                source = (getattr(r, "source", "") or "").lower()
-                is_vector_searched = source == "vendor_directory"
-
-                # Check choice constraints (skip for vector-searched sources)
-                if not is_vector_searched and choice_constraints:
-                    if should_exclude_by_choices(title, choice_constraints):
-                        continue
-
-                # Unified price/source filtering
-                if not _should_include(
-                    price=getattr(r, "price", None),
-                    source=getattr(r, "source", "") or "",
-                    desire_tier=row.desire_tier,
-                    min_price=min_price_filter,
-                    max_price=max_price_filter,
-                ):
-                    continue
-                filtered_batch.append(r)
-            
+            # Filtering, scoring and reranking are CPU-bound and run on the bounded
+            # search CPU pool, so a large batch does not stall the other SSE streams.
+            filtered_batch = await run_cpu_bound(
+                _filter_stream_batch,
+                results,
+                choice_constraints,
+                row.desire_tier,
+                min_price_filter,
+                max_price_filter,
+                items=len(results),
+            )
+
             persisted_bid_ids = set()
             if filtered_batch:
                 try:
                     normalized_batch = normalize_generic_results(filtered_batch, provider_name)
                     if normalized_batch:
-                        normalized_batch = score_results(
-                            normalized_batch,
-                            intent=parsed_intent,
-                            min_price=min_price_filter,
-                            max_price=max_price_filter,
-                            desire_tier=row.desire_tier,
+                        # Quantum reranking: embed ALL results + score against user intent.
+                        # Embedding the titles that lack one (network) overlaps with scoring (CPU).
+                        rerank = bool(quantum_reranker and query_embedding)
+                        results_for_quantum, texts_to_embed = (
+                            _quantum_rerank_inputs(normalized_batch) if rerank else ([], [])
+                        )
+                        scored_batch, new_embeddings = await asyncio.gather(
+                            run_cpu_bound(
+                                score_results,
+                                normalized_batch,
+                                intent=parsed_intent,
+                                min_price=min_price_filter,
+                                max_price=max_price_filter,
+                                desire_tier=row.desire_tier,
+                                items=len(normalized_batch),
+                            ),
+                            _embed_missing([t for _, t in texts_to_embed]),
                         )
 
-                        # Quantum reranking: embed ALL results + score against user intent
-                        if quantum_reranker and query_embedding:
+                        if rerank:
                             try:
-                                from sourcing.vendor_provider import _embed_texts as _batch_embed
-
-                                # Build result dicts — reuse existing embeddings, collect texts to embed
-                                results_for_quantum = []
-                                texts_to_embed = []  # (idx_in_batch, text)
-                                for idx, res in enumerate(normalized_batch):
-                                    existing_emb = res.raw_data.get("embedding") if res.raw_data else None
-                                    rd = {"_idx": idx, "title": res.title, "embedding": existing_emb}
-                                    results_for_quantum.append(rd)
-                                    if not existing_emb:
-                                        # Rich text: title + merchant + description for better semantic matching
-                                        desc = ""
-                                        if res.raw_data:
-                                            desc = str(res.raw_data.get("snippet", "") or res.raw_data.get("description", "") or "")
-                                        parts = [res.title, res.merchant_name]
-                                        if desc:
-                                            parts.append(desc[:200])
-                                        texts_to_embed.append((idx, " | ".join(parts)))
-
-                                # Batch-embed titles that don't have embeddings (one API call)
-                                if texts_to_embed:
-                                    embed_texts = [t for _, t in texts_to_embed]
-                                    new_embeddings = await _batch_embed(embed_texts)
-                                    if new_embeddings and len(new_embeddings) == len(texts_to_embed):
-                                        for (idx, _), emb in zip(texts_to_embed, new_embeddings):
-                                            results_for_quantum[idx]["embedding"] = emb
+                                if new_embeddings and len(new_embeddings) == len(texts_to_embed):
+                                    for (idx, _), emb in zip(texts_to_embed, new_embeddings):
+                                        results_for_quantum[idx]["embedding"] = emb
 
                                 # Run quantum reranker on ALL results with embeddings
                                 if any(r.get("embedding") for r in results_for_quantum):
@@ -793,6 +830,7 @@ async def search_row_listings_stream(
                                     for r in reranked:
                                         if r.get("quantum_reranked") and "_idx" in r:
                                             score_map[r["_idx"]] = r
+                                    # _idx points into the pre-sort batch; the result objects are shared.
                                     for idx, res in enumerate(normalized_batch):
                                         if idx in score_map:
                                             qr = score_map[idx]
@@ -806,6 +844,7 @@ async def search_row_listings_stream(
                                     logger.info(f"[SEARCH STREAM] Quantum reranked {q_count}/{len(normalized_batch)} from {provider_name} (embedded {emb_new} new, reused {emb_reused})")
                             except Exception as qe:
                                 logger.warning(f"[SEARCH STREAM] Quantum reranking failed for {provider_name}: {qe}")
+                        normalized_batch = scored_batch
 
                         # Filter out low-quality vendor_directory results after scoring.
                         # Vendors with near-zero relevance for product queries are noise.
@@ -887,7 +926,7 @@ async def search_row_listings_stream(
                             "total_results_so_far": len(all_results),
                         }
                         
-                        yield f"data: {json.dumps(event_data)}\n\n"
+                        yield sse_data(event_data)
                     except Exception as e:
                         logger.error(f"[SEARCH STREAM] Processing error: {e}")
         
@@ -927,12 +966,11 @@ async def search_row_listings_stream(
 
         # Update row status to reflect search completion
         try:
-            from services.sdui_builder import build_ui_schema, build_zero_results_schema
+            from services.sdui_builder import apply_ui_schema, build_zero_results_schema
             await session.refresh(row)
             if len(all_results) == 0:
                 row.status = "sourcing"
-                row.ui_schema = build_zero_results_schema(row)
-                row.ui_schema_version = (row.ui_schema_version or 0) + 1
+                apply_ui_schema(row, build_zero_results_schema(row))
             else:
                 row.status = "bids_arriving"
             row.updated_at = datetime.utcnow()
@@ -972,7 +1010,7 @@ async def search_row_listings_stream(
             "more_incoming": False,
             "user_message": user_message,
         }
-        yield f"data: {json.dumps(final_event)}\n\n"
+        yield sse_data(final_event)
 
     return StreamingResponse(
         generate_sse(),
@@ -24,6 +24,7 @@ from dependencies import resolve_user_id
 from models import Row, RequestSpec, Project
 from services.intent import extract_search_intent
 from services.llm import triage_provider_query
+from utils.json_utils import FastJSONResponse
 
 router = APIRouter(tags=["search"])
 logger = logging.getLogger(__name__)
@@ -126,4 +127,5 @@ async def enriched_search(
         "search_intent": intent_result.to_dict(),
     }
 
-    return response_data
+    # Pre-encoded: skips FastAPI's jsonable_encoder pass over every result dict.
+    return FastJSONResponse(response_data)
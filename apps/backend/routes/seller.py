@@ -4,10 +4,9 @@ import logging
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from pydantic import BaseModel
-import sqlalchemy as sa
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -21,6 +20,7 @@ from models import (
     User,
     generate_magic_link_token,
 )
+from services.seller_inbox import decode_cursor, encode_cursor, inbox_query
 from utils.json_utils import safe_json_loads
 
 Merchant = Vendor
@@ -100,54 +100,42 @@ async def _get_merchant(session: AsyncSession, user_id: int) -> Merchant:
 
 @router.get("/inbox", response_model=List[RFPSummary])
 async def seller_inbox(
+    response: Response,
     page: int = 1,
     per_page: int = 20,
+    before: Optional[str] = None,
     authorization: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
 ):
-    """Get buyer RFPs matching the seller's registered categories."""
+    """Get buyer RFPs matching the seller's registered categories.
+
+    Pass the ``X-Next-Cursor`` header of a page as ``before`` to fetch the next one
+    (keyset pagination); ``page`` offsets are still accepted.
+    """
     auth_session = await get_current_session(authorization, session)
     if not auth_session:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     merchant = await _get_merchant(session, auth_session.user_id)
 
-    # Parse merchant categories
-    categories: List[str] = []
-    if merchant.category:
-        categories = [merchant.category.strip().lower()]
-
-    # Build query for matching rows (both service and product rows)
-    active_statuses = ["sourcing", "inviting", "bids_arriving", "open", "active"]
-    query = select(Row).where(
-        Row.status.in_(active_statuses),
-    )
-
-    # Filter by category if merchant has categories
-    if categories:
-        category_filters = []
-        for cat in categories:
-            category_filters.append(Row.service_category.ilike(f"%{cat}%"))
-            category_filters.append(Row.title.ilike(f"%{cat}%"))
-            # Also match search intent category (cast JSONB to text for ILIKE)
-            category_filters.append(Row.search_intent.cast(sa.Text).ilike(f"%{cat}%"))
-        query = query.where(or_(*category_filters))
-    else:
-        # If no categories set, only show service rows (legacy behavior)
-        query = query.where(Row.is_service == True)
+    cursor = None
+    if before:
+        try:
+            cursor = decode_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    query = (
-        query.order_by(Row.created_at.desc())
-        .offset((page - 1) * per_page)
-        .limit(per_page)
+    result = await session.exec(
+        inbox_query(merchant, per_page, before=cursor, offset=max(page - 1, 0) * per_page)
     )
-
-    result = await session.exec(query)
     rows = result.all()
 
     if not rows:
         return []
 
+    if len(rows) == per_page:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+
     # Batch fetch quote counts in a single query
     row_ids = [r.id for r in rows]
     quote_counts_result = await session.exec(
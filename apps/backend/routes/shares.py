@@ -10,6 +10,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from database import get_session
 from models import ShareLink, User, Row, Project, Bid
 from dependencies import get_current_session
+from services.share_access import share_access_counter, share_resource_cache
 
 router = APIRouter(tags=["shares"])
 
@@ -63,6 +64,9 @@ async def get_resource_data(
     """
     Fetch resource data based on type and ID.
 
+    Payloads are served from ``share_resource_cache`` for a short TTL, so a
+    popular link does not re-read its resource on every hit.
+
     Args:
         resource_type: Type of resource ("project", "row", "tile")
         resource_id: ID of the resource
@@ -71,6 +75,21 @@ async def get_resource_data(
     Returns:
         Dictionary with resource data or None if not found
     """
+    cached = share_resource_cache.get(resource_type, resource_id)
+    if cached is not None:
+        return cached
+
+    data = await _load_resource_data(resource_type, resource_id, session)
+    if data is not None:
+        share_resource_cache.put(resource_type, resource_id, data)
+    return data
+
+
+async def _load_resource_data(
+    resource_type: str,
+    resource_id: int,
+    session: AsyncSession
+) -> Optional[Dict[str, Any]]:
     if resource_type == "project":
         result = await session.exec(select(Project).where(Project.id == resource_id))
         project = result.first()
@@ -227,7 +246,8 @@ async def resolve_share_link(
     Resolve a share link and return the shared content.
 
     Public endpoint - no authentication required.
-    Increments access counters and tracks unique visitors.
+    Records the hit in ``share_access_counter``; the count is written to the
+    database in batches, so this path performs no writes.
 
     Args:
         token: Share link token
@@ -259,17 +279,14 @@ async def resolve_share_link(
             detail="Shared content no longer available"
         )
 
-    # Increment access count
-    share_link.access_count += 1
-    session.add(share_link)
-    await session.commit()
+    share_access_counter.record(share_link.id)
 
     return ShareContentResponse(
         resource_type=share_link.resource_type,
         resource_id=share_link.resource_id,
         resource_data=resource_data,
         created_by=share_link.created_by,
-        access_count=share_link.access_count
+        access_count=share_link.access_count + share_access_counter.pending(share_link.id)
     )
 
 
@@ -360,7 +377,7 @@ async def get_share_metrics(
 
     return ShareMetricsResponse(
         token=share_link.token,
-        access_count=share_link.access_count,
+        access_count=share_link.access_count + share_access_counter.pending(share_link.id),
         unique_visitors=share_link.unique_visitors,
         search_initiated_count=share_link.search_initiated_count,
         search_success_count=share_link.search_success_count,
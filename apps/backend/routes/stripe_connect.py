@@ -16,6 +16,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from database import get_session
 from dependencies import get_current_session
 from models import Vendor
+from services.stripe_calls import call_stripe
 
 Merchant = Vendor  # Unified model — Merchant is an alias for Vendor
 
@@ -84,7 +85,8 @@ async def start_onboarding(
     # Create or reuse Stripe Connected Account
     if not merchant.stripe_account_id:
         try:
-            account = stripe.Account.create(
+            account = await call_stripe(
+                stripe.Account.create,
                 type="express",
                 email=merchant.email,
                 business_profile={"name": merchant.name},
@@ -99,7 +101,8 @@ async def start_onboarding(
 
     # Generate onboarding link
     try:
-        account_link = stripe.AccountLink.create(
+        account_link = await call_stripe(
+            stripe.AccountLink.create,
             account=merchant.stripe_account_id,
             refresh_url=f"{app_base}/seller/stripe-connect?refresh=1",
             return_url=f"{app_base}/seller/stripe-connect?success=1",
@@ -142,7 +145,7 @@ async def onboarding_status(
     # Check account status with Stripe
     stripe = _get_stripe()
     try:
-        account = stripe.Account.retrieve(merchant.stripe_account_id)
+        account = await call_stripe(stripe.Account.retrieve, merchant.stripe_account_id)
         charges_enabled = account.charges_enabled
         details_submitted = account.details_submitted
 
@@ -205,7 +208,8 @@ async def onboard_vendor_direct(
                 detail="Vendor has no email on file — cannot create Stripe account",
             )
         try:
-            account = stripe.Account.create(
+            account = await call_stripe(
+                stripe.Account.create,
                 type="express",
                 email=vendor.email,
                 business_profile={"name": vendor.name},
@@ -220,7 +224,8 @@ async def onboard_vendor_direct(
             raise HTTPException(status_code=502, detail="Failed to create Stripe account")
 
     try:
-        account_link = stripe.AccountLink.create(
+        account_link = await call_stripe(
+            stripe.AccountLink.create,
             account=vendor.stripe_account_id,
             refresh_url=f"{app_base}/seller?tab=profile&stripe=refresh",
             return_url=f"{app_base}/seller?tab=profile&stripe=complete",
@@ -206,7 +206,7 @@ async def resend_inbound_webhook(
         raise HTTPException(status_code=401, detail="Invalid Resend signature")
 
     from services.deal_pipeline import (
-        resolve_deal_from_alias,
+        resolve_deal_contacts,
         identify_sender,
         record_message,
         relay_email,
@@ -300,14 +300,15 @@ async def resend_inbound_webhook(
         logger.warning(f"[ResendWebhook] No alias found in To: {to_list}")
         return {"status": "ignored", "reason": "no_alias"}
 
-    # Resolve the deal
-    deal = await resolve_deal_from_alias(session, alias)
-    if not deal:
+    # Resolve the deal with both parties' contact fields; reused for the relay below
+    contacts = await resolve_deal_contacts(session, alias)
+    if not contacts:
         logger.warning(f"[ResendWebhook] No deal found for alias: {alias}")
         return {"status": "ignored", "reason": "unknown_alias"}
+    deal = contacts.deal
 
     # Identify sender
-    sender_type = await identify_sender(deal, sender_email, session)
+    sender_type = await identify_sender(deal, sender_email, session, contacts=contacts)
     if not sender_type:
         logger.warning(
             f"[ResendWebhook] Unrecognized sender {sender_email} for deal {deal.id}"
@@ -385,6 +386,7 @@ async def resend_inbound_webhook(
         original_html=html_body,
         subject=subject,
         session=session,
+        contacts=contacts,
     )
 
     logger.info(
@@ -0,0 +1,109 @@
+"""Benchmark: JSON encoding of SSE search frames and large bid payloads.
+
+Compares the stdlib encoder used before (``json.dumps`` on ``model_dump()`` dicts,
+FastAPI's ``jsonable_encoder`` + JSONResponse for plain-dict routes) with
+``utils.json_utils.json_dumps_bytes`` / ``FastJSONResponse``. Also checks that
+both sides decode to the same value.
+
+Usage:
+    python scripts/bench_json.py [--bids 40] [--frames 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from sourcing.repository import ProviderStatusSnapshot, SearchResult  # noqa: E402
+from utils.json_utils import FastJSONResponse, json_dumps_bytes, orjson  # noqa: E402
+
+
+def _result(i: int) -> SearchResult:
+    return SearchResult(
+        title=f"Trail running shoe – model {i} “Pro” (size 10)",
+        price=79.99 + i,
+        merchant="Acme Outdoor",
+        url=f"https://www.example.com/p/trail-shoe-{i}?ref=search&tag=abc",
+        canonical_url=f"https://www.example.com/p/trail-shoe-{i}",
+        merchant_domain="example.com",
+        click_url=f"/api/out?url=https%3A%2F%2Fwww.example.com%2Fp%2F{i}",
+        match_score=0.8123,
+        image_url=f"https://images.example.com/{i}.jpg",
+        rating=4.6,
+        reviews_count=1200 + i,
+        shipping_info="Free 2-day shipping",
+        description="Lightweight trail shoe with a rock plate and 4mm drop. " * 3,
+        source="rainforest",
+        bid_id=10_000 + i,
+        liked_at=datetime.now(timezone.utc).isoformat(),
+        metadata={
+            "score": {"combined": 0.71, "relevance": 0.64, "price": 0.9},
+            "asin": f"B0{i:08d}",
+        },
+    )
+
+
+def _frame(bids: int) -> dict:
+    status = ProviderStatusSnapshot(
+        provider_id="rainforest", status="ok", result_count=bids, latency_ms=812
+    )
+    return {
+        "provider": "rainforest",
+        "results": [r.model_dump() for r in (_result(i) for i in range(bids))],
+        "status": status.model_dump(),
+        "providers_remaining": 3,
+        "more_incoming": True,
+        "total_results_so_far": bids,
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bids", type=int, default=40, help="results per SSE frame")
+    parser.add_argument("--frames", type=int, default=200, help="repetitions per measurement")
+    args = parser.parse_args()
+
+    frame = _frame(args.bids)
+    page = {"rows": [frame for _ in range(10)]}
+
+    before_frame = f"data: {json.dumps(frame)}\n\n"
+    after_frame = f"data: {json_dumps_bytes(frame).decode()}\n\n"
+    assert json.loads(before_frame[6:]) == json.loads(after_frame[6:]), "SSE payloads differ"
+    stdlib_body = JSONResponse(jsonable_encoder(page)).body
+    assert json.loads(stdlib_body) == json.loads(FastJSONResponse(page).body)
+
+    rows = [
+        ("SSE frame", lambda: json.dumps(frame), lambda: json_dumps_bytes(frame)),
+        (
+            "10-frame response",
+            lambda: JSONResponse(jsonable_encoder(page)),
+            lambda: FastJSONResponse(page),
+        ),
+    ]
+    backend = f"orjson {orjson.__version__}" if orjson is not None else "stdlib fallback"
+    print(
+        f"encoder: {backend}; {args.bids} bids per frame, "
+        f"{len(before_frame)} -> {len(after_frame)} chars"
+    )
+    print(f"{'payload':<20} {'stdlib':>12} {'fast':>12} {'speedup':>9}")
+    for name, before, after in rows:
+        b, a = _time(before, args.frames), _time(after, args.frames)
+        print(f"{name:<20} {b:>9.3f} ms {a:>9.3f} ms {b / a:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Microbenchmark: per-request middleware overhead and SSE time-to-first-byte.
+
+Compares the pure ASGI security middleware (security/headers.py, security/csrf.py)
+against the same header logic wrapped in Starlette's BaseHTTPMiddleware, which is
+how both were implemented before. Requests are driven straight through the ASGI
+callable, so the numbers contain no server or client overhead.
+
+Usage:
+    python scripts/bench_middleware.py [--requests 5000] [--streams 500]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+import security.csrf as csrf  # noqa: E402
+from security.csrf import CSRFProtectionMiddleware  # noqa: E402
+from security.headers import SecurityHeadersMiddleware, generate_csp_nonce  # noqa: E402
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    is_production = False
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        SecurityHeadersMiddleware._add_headers(self, response.headers, generate_csp_nonce())
+        return response
+
+
+class LegacyCSRF(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        if request.method in CSRFProtectionMiddleware.SAFE_METHODS:
+            CSRFProtectionMiddleware._set_csrf_cookie(self, response.headers)
+        return response
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield "data: first\n\n"
+            await asyncio.sleep(0)
+            yield "data: done\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    if legacy:
+        app.add_middleware(LegacySecurityHeaders)
+        app.add_middleware(LegacyCSRF)
+    else:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(CSRFProtectionMiddleware)
+    return app
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+
+async def _request(app, path: str) -> float:
+    """Run one request; return seconds until the first non-empty body chunk."""
+    started = time.perf_counter()
+    first_byte = None
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal first_byte
+        if first_byte is None and message["type"] == "http.response.body" and message.get("body"):
+            first_byte = time.perf_counter() - started
+
+    await app(_scope(path), receive, send)
+    return first_byte
+
+
+async def bench(app, requests: int, streams: int) -> dict:
+    for _ in range(200):  # warm up routing and imports
+        await _request(app, "/ping")
+    started = time.perf_counter()
+    for _ in range(requests):
+        await _request(app, "/ping")
+    per_request = (time.perf_counter() - started) / requests
+    ttfb = [await _request(app, "/stream") for _ in range(streams)]
+    return {
+        "per_request_us": per_request * 1e6,
+        "sse_ttfb_median_us": statistics.median(ttfb) * 1e6,
+        "sse_ttfb_p99_us": sorted(ttfb)[int(len(ttfb) * 0.99) - 1] * 1e6,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--streams", type=int, default=500)
+    args = parser.parse_args()
+    csrf.set_csrf_secret("bench-secret")
+
+    results = {
+        "BaseHTTPMiddleware": await bench(build_app(legacy=True), args.requests, args.streams),
+        "pure ASGI": await bench(build_app(legacy=False), args.requests, args.streams),
+    }
+    print(f"{'stack':<20} {'per request':>14} {'SSE TTFB p50':>14} {'SSE TTFB p99':>14}")
+    for name, r in results.items():
+        print(
+            f"{name:<20} {r['per_request_us']:>11.1f} us {r['sse_ttfb_median_us']:>11.1f} us "
+            f"{r['sse_ttfb_p99_us']:>11.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,184 @@
+"""Benchmark: seller inbox matching on a synthetic 100k-row table, with EXPLAIN.
+
+Builds a scratch schema (``bench_seller_inbox``) holding a copy of the row
+columns the inbox reads, fills it with synthetic open and closed rows, and
+backfills ``match_terms`` with the same SQL the startup migration uses. It then
+creates the indexes from ``startup_migrations.INDEX_STEPS`` and EXPLAIN ANALYZEs:
+
+- the legacy ILIKE query (service_category / title / search_intent::text)
+- the indexed ``match_terms @>`` query, first page and a keyset page
+- the precomputed ``seller_row_match`` range read
+
+Each plan is printed along with the index it used. The scratch schema is
+dropped at the end.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_seller_inbox.py \
+        [--rows 100000] [--keep]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Building the synthetic table takes longer than the API's default 30s statement timeout.
+os.environ.setdefault("DB_COMMAND_TIMEOUT", "600")
+
+from sqlalchemy import text  # noqa: E402
+
+from database import engine  # noqa: E402
+from services.seller_inbox import _VENDOR_TERMS_SQL, ACTIVE_ROW_STATUSES  # noqa: E402
+from startup_migrations import INDEX_STEPS  # noqa: E402
+from utils.match_terms import ROW_TERMS_SQL, match_terms  # noqa: E402
+
+SCHEMA = "bench_seller_inbox"
+CATEGORIES = [
+    "catering", "private_aviation", "photography", "florist", "landscaping", "plumbing",
+    "event_planning", "interior_design", "moving_services", "house_cleaning", "wedding_venue",
+    "dj_services", "yacht_charter", "limousine", "personal_chef", "tutoring", "pet_grooming",
+    "roofing", "solar_installation", "home_staging",
+]
+MERCHANT_CATEGORY = "Private Aviation"
+INDEXES = {"row_match_terms_gin_idx", "row_open_created_idx", "seller_row_match_inbox_idx"}
+_ACTIVE_SQL = ", ".join(f"'{status}'" for status in ACTIVE_ROW_STATUSES)
+_CATEGORIES_SQL = "ARRAY[" + ", ".join(f"'{c}'" for c in CATEGORIES) + "]"
+_INDEX_USE_RE = r"Index(?: Only)? Scan(?: Backward)? using (\w+)|Bitmap Index Scan on (\w+)"
+
+
+async def _setup(conn, rows: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+    await conn.execute(text("""
+        CREATE TABLE row (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            service_category VARCHAR,
+            search_intent JSONB,
+            is_service BOOLEAN NOT NULL DEFAULT false,
+            created_at TIMESTAMP NOT NULL,
+            match_terms TEXT[]
+        )
+    """))
+    await conn.execute(text(f"""
+        INSERT INTO row (title, status, service_category, search_intent, is_service, created_at)
+        SELECT
+            initcap(replace(cat, '_', ' ')) || ' request #' || i,
+            (ARRAY['sourcing', 'open', 'bids_arriving', 'closed', 'archived'])[1 + (i / 20) % 5],
+            CASE WHEN i % 3 = 0 THEN cat END,
+            jsonb_build_object('product_category', cat,
+                               'keywords', jsonb_build_array('quote', 'request'),
+                               'raw_input', 'need help with ' || cat || ' soon'),
+            i % 3 = 0,
+            now() - (i || ' minutes')::interval
+        FROM (
+            SELECT i, ({_CATEGORIES_SQL})[1 + (i * 7) % {len(CATEGORIES)}] AS cat
+            FROM generate_series(1, {rows}) AS i
+        ) s
+    """))
+    await conn.execute(text(f"UPDATE row SET match_terms = {ROW_TERMS_SQL}"))
+
+    await conn.execute(text("""
+        CREATE TABLE vendor (id SERIAL PRIMARY KEY, user_id INTEGER, category VARCHAR)
+    """))
+    await conn.execute(text(f"""
+        INSERT INTO vendor (user_id, category)
+        SELECT i, replace(({_CATEGORIES_SQL})[1 + i % {len(CATEGORIES)}], '_', ' ')
+        FROM generate_series(1, 200) AS i
+    """))
+    await conn.execute(text("""
+        CREATE TABLE seller_row_match (
+            merchant_id INTEGER NOT NULL,
+            row_id INTEGER NOT NULL,
+            row_created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (merchant_id, row_id)
+        )
+    """))
+    # Index first: without the GIN index the fill below compares every vendor with every row.
+    for step in INDEX_STEPS:
+        if step.name in INDEXES:
+            await conn.execute(text(f"CREATE INDEX {step.name} {step.definition}"))
+    await conn.execute(text("ANALYZE row"))
+    await conn.execute(text(f"""
+        INSERT INTO seller_row_match (merchant_id, row_id, row_created_at)
+        SELECT v.id, r.id, r.created_at
+        FROM vendor v JOIN row r ON r.match_terms @> {_VENDOR_TERMS_SQL}
+        WHERE r.status IN ({_ACTIVE_SQL})
+    """))
+    await conn.execute(text("ANALYZE seller_row_match"))
+
+
+async def _explain(conn, label: str, sql: str, params: dict) -> None:
+    started = time.perf_counter()
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+    plan = [line for (line,) in result]
+    elapsed = (time.perf_counter() - started) * 1000
+    used = sorted(set(re.findall(_INDEX_USE_RE, "\n".join(plan))))
+    used = [a or b for a, b in used]
+    seq = any("Seq Scan on row" in line for line in plan)
+    print(f"\n=== {label} ({elapsed:.1f} ms round trip)")
+    print("\n".join(plan))
+    print(f"--> indexes: {', '.join(used) or 'none'}; seq scan on row: {'yes' if seq else 'no'}")
+
+
+async def main(rows: int, keep: bool) -> None:
+    terms = match_terms(MERCHANT_CATEGORY)
+    async with engine.begin() as conn:
+        started = time.perf_counter()
+        await _setup(conn, rows)
+        elapsed = time.perf_counter() - started
+        print(f"Built {rows} synthetic rows in {elapsed:.1f}s; merchant terms {terms}")
+
+        cat = MERCHANT_CATEGORY.lower()
+        await _explain(conn, "legacy ILIKE + OFFSET (page 3)", f"""
+            SELECT * FROM row
+            WHERE status IN ({_ACTIVE_SQL})
+              AND (service_category ILIKE :pat OR title ILIKE :pat
+                   OR CAST(search_intent AS TEXT) ILIKE :pat)
+            ORDER BY created_at DESC OFFSET 40 LIMIT 20
+        """, {"pat": f"%{cat}%"})
+
+        base = (
+            f"SELECT * FROM row WHERE status IN ({_ACTIVE_SQL}) "
+            "AND match_terms @> CAST(:terms AS text[])"
+        )
+        await _explain(conn, "match_terms @> (first page)",
+                       f"{base} ORDER BY created_at DESC, id DESC LIMIT 20", {"terms": terms})
+        cursor = (await conn.execute(
+            text(f"{base} ORDER BY created_at DESC, id DESC OFFSET 39 LIMIT 1"), {"terms": terms}
+        )).first()
+        if cursor is not None:
+            await _explain(conn, "match_terms @> (keyset page 3)",
+                           f"{base} AND (created_at, id) < (:created_at, :id) "
+                           "ORDER BY created_at DESC, id DESC LIMIT 20",
+                           {"terms": terms, "created_at": cursor.created_at, "id": cursor.id})
+
+        merchant_id = (await conn.execute(
+            text(
+                "SELECT v.id FROM vendor v "
+                f"WHERE CAST(:terms AS text[]) = {_VENDOR_TERMS_SQL} LIMIT 1"
+            ),
+            {"terms": terms},
+        )).scalar()
+        await _explain(conn, "seller_row_match range (first page)", f"""
+            SELECT r.* FROM row r JOIN seller_row_match m ON m.row_id = r.id
+            WHERE m.merchant_id = :merchant_id AND r.status IN ({_ACTIVE_SQL})
+            ORDER BY m.row_created_at DESC, m.row_id DESC LIMIT 20
+        """, {"merchant_id": merchant_id})
+
+        if not keep:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--keep", action="store_true", help=f"leave the {SCHEMA} schema in place")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.keep))
@@ -30,6 +30,7 @@ EXPECTED_COLS = [
     ("bid", "is_superseded", "BOOLEAN", "false"),
     ("bid", "superseded_at", "TIMESTAMP", None),
     ("bid", "vendor_id", "INTEGER", None),
+    ("bid", "normalized_url", "TEXT", None),
     ("bid", "canonical_url", "VARCHAR", None),
     ("bid", "source_payload", "TEXT", None),
     ("bid", "search_intent_version", "VARCHAR", None),
@@ -81,6 +82,10 @@ EXPECTED_COLS = [
     ("clickout_event", "ip_address", "VARCHAR", None),
     ("clickout_event", "user_agent", "VARCHAR", None),
 
+    # BugReport — triage kept across job retries
+    ("bug_report", "classification_reasoning", "TEXT", None),
+    ("bug_report", "triage_email_sent_at", "TIMESTAMP", None),
+
     # Bid — Phase 4 scoring dimensions
     ("bid", "combined_score", "FLOAT", None),
     ("bid", "relevance_score", "FLOAT", None),
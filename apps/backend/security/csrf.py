@@ -10,8 +10,9 @@ import hashlib
 from typing import Optional
 from datetime import datetime, timedelta
 from fastapi import Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import JSONResponse
 from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 # CSRF token configuration
@@ -117,7 +118,7 @@ def decode_csrf_cookie(cookie_value: str) -> Optional[tuple[str, int, str]]:
         return None
 
 
-class CSRFProtectionMiddleware(BaseHTTPMiddleware):
+class CSRFProtectionMiddleware:
     """
     CSRF protection middleware using double-submit cookie pattern.
 
@@ -129,6 +130,10 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
     - /auth/* endpoints (need CSRF token to login)
     - /health endpoints
     - /webhooks endpoints (use signature verification instead)
+
+    Pure ASGI: the check reads only headers, and the cookie is added to the
+    ``http.response.start`` message, so request and response bodies stream
+    through untouched.
     """
 
     SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
@@ -146,45 +151,54 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
         "/api/public/",  # Public search endpoints
     ]
 
-    async def dispatch(self, request: Request, call_next):
-        """Process request with CSRF protection."""
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process request with CSRF protection."""
         # Skip all CSRF logic when no secret is configured
-        if not CSRF_SECRET_KEY:
-            return await call_next(request)
+        if scope["type"] != "http" or not CSRF_SECRET_KEY:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
 
         # Skip CSRF check for safe methods
         if request.method in self.SAFE_METHODS:
-            response = await call_next(request)
             # Always set CSRF cookie on safe requests
-            self._set_csrf_cookie(response)
-            return response
+            async def send_with_cookie(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    self._set_csrf_cookie(MutableHeaders(scope=message))
+                await send(message)
+
+            await self.app(scope, receive, send_with_cookie)
+            return
 
         # Skip CSRF check for requests using Bearer token auth (not cookie-based)
         auth_header = request.headers.get("authorization", "")
         if auth_header.lower().startswith("bearer "):
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
+            return
 
         # Skip CSRF check for exempt paths
         path = request.url.path
         if any(path.startswith(exempt) for exempt in self.EXEMPT_PATHS):
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
+            return
 
         # Verify CSRF token for state-changing operations
         try:
             self._verify_csrf(request)
         except HTTPException as e:
             # Return error response without calling next handler
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail}
             )
+            await response(scope, receive, send)
+            return
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
     def _verify_csrf(self, request: Request):
         """
@@ -231,16 +245,18 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
                 detail="CSRF token mismatch"
             )
 
-    def _set_csrf_cookie(self, response: Response):
-        """Set CSRF cookie on response."""
+    def _set_csrf_cookie(self, headers: MutableHeaders):
+        """Set CSRF cookie on the response headers."""
         # Only set if not already present
-        if CSRF_COOKIE_NAME in response.headers.getlist("set-cookie"):
+        if CSRF_COOKIE_NAME in headers.getlist("set-cookie"):
             return
 
         token, timestamp, signature = create_signed_csrf_token()
         cookie_value = encode_csrf_cookie(token, timestamp, signature)
 
-        response.set_cookie(
+        # Build the header with Response.set_cookie so the format matches other cookies.
+        cookie = Response()
+        cookie.set_cookie(
             key=CSRF_COOKIE_NAME,
             value=cookie_value,
             httponly=False,  # Must be accessible to JavaScript
@@ -248,3 +264,4 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
             samesite="strict",  # Strict same-site policy
             max_age=int(CSRF_TOKEN_EXPIRY.total_seconds())
         )
+        headers.append("set-cookie", cookie.headers["set-cookie"])
@@ -12,8 +12,8 @@ Adds security headers to all responses:
 
 import secrets
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 def generate_csp_nonce() -> str:
@@ -21,7 +21,7 @@ def generate_csp_nonce() -> str:
     return secrets.token_urlsafe(16)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Add security headers to all responses.
 
@@ -33,60 +33,74 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - Content-Security-Policy: Restrict resource loading
     - Referrer-Policy: Control referrer information
     - Permissions-Policy: Disable unnecessary browser features
+
+    Pure ASGI: headers are set on the ``http.response.start`` message, so
+    streaming (SSE) bodies pass through untouched.
     """
 
-    def __init__(self, app, *, is_production: bool = False):
+    def __init__(self, app: ASGIApp, *, is_production: bool = False):
         """
         Initialize security headers middleware.
 
         Args:
-            app: FastAPI application
+            app: ASGI application
             is_production: Whether running in production (enables stricter policies)
         """
-        super().__init__(app)
+        self.app = app
         self.is_production = is_production
 
-    async def dispatch(self, request: Request, call_next):
-        """Add security headers to response."""
-        response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Content Security Policy with nonce-based script protection
+        nonce = generate_csp_nonce()
+        scope.setdefault("state", {})["csp_nonce"] = nonce
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._add_headers(MutableHeaders(scope=message), nonce)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
+    def _add_headers(self, headers: MutableHeaders, nonce: str) -> None:
+        """Add security headers to response."""
         # HSTS - Force HTTPS for 1 year (only in production)
         if self.is_production:
-            response.headers["Strict-Transport-Security"] = (
+            headers["Strict-Transport-Security"] = (
                 "max-age=31536000; includeSubDomains; preload"
             )
 
         # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
+        headers["X-Content-Type-Options"] = "nosniff"
 
         # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
+        headers["X-Frame-Options"] = "DENY"
 
         # XSS Protection (legacy browsers)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Content Security Policy with nonce-based script protection
-        nonce = generate_csp_nonce()
-        request.state.csp_nonce = nonce
-
-        csp_directives = [
-            "default-src 'self'",
-            f"script-src 'self' 'unsafe-inline' 'unsafe-eval' 'nonce-{nonce}' https://s.skimresources.com",
-            "style-src 'self' 'unsafe-inline'",
-            "img-src 'self' data: https:",
-            "font-src 'self' data:",
-            "connect-src 'self' https: wss:",
-            "frame-ancestors 'none'",
-            "base-uri 'self'",
-            "form-action 'self'",
-        ]
-        response.headers["Content-Security-Policy"] = "; ".join(csp_directives)
+        headers["X-XSS-Protection"] = "1; mode=block"
+
+        headers["Content-Security-Policy"] = "; ".join(
+            [
+                "default-src 'self'",
+                f"script-src 'self' 'unsafe-inline' 'unsafe-eval' 'nonce-{nonce}' https://s.skimresources.com",
+                "style-src 'self' 'unsafe-inline'",
+                "img-src 'self' data: https:",
+                "font-src 'self' data:",
+                "connect-src 'self' https: wss:",
+                "frame-ancestors 'none'",
+                "base-uri 'self'",
+                "form-action 'self'",
+            ]
+        )
 
         # Expose nonce to frontend via custom header
-        response.headers["X-CSP-Nonce"] = nonce
+        headers["X-CSP-Nonce"] = nonce
 
         # Referrer Policy - Don't leak referrer to external sites
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
 
         # Permissions Policy - Disable unnecessary features
         permissions = [
@@ -96,6 +110,4 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "interest-cohort=()",  # Disable FLoC
             "payment=()",
         ]
-        response.headers["Permissions-Policy"] = ", ".join(permissions)
-
-        return response
+        headers["Permissions-Policy"] = ", ".join(permissions)
@@ -0,0 +1,268 @@
+"""Buffered, batched clickout ingestion.
+
+``/api/out`` used to spawn an untracked task per click that opened its own
+session, inserted a ``ClickoutEvent``, committed, then wrote an audit row.
+Click bursts multiplied connections and tasks, and pending writes were lost on
+shutdown.
+
+The redirect path now only calls ``clickout_buffer.submit()``, which appends to
+an in-process bounded ring buffer. A single background task drains it into
+multi-row inserts (clickout_event + audit_log in one transaction) every
+``flush_interval_ms`` or as soon as ``batch_size`` events are waiting, and the
+buffer is flushed on shutdown. When the buffer is full the oldest event is
+dropped and counted, so a DB outage never slows the redirect down.
+
+A failed batch is retried one row at a time, so a single bad row (say, an FK
+violation) only costs its own attempts and the rest of the batch is written.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingClickout:
+    event: Dict[str, Any]
+    audit: Optional[Dict[str, Any]] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+BatchWriter = Callable[[List[PendingClickout]], Awaitable[None]]
+
+
+async def write_clickout_batch(batch: List[PendingClickout]) -> None:
+    """Insert a batch of clickouts and their audit rows in one transaction."""
+    from sqlalchemy import insert
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from database import engine
+    from models import AuditLog, ClickoutEvent
+
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with _session_factory() as session:
+        result = await session.execute(
+            insert(ClickoutEvent).returning(ClickoutEvent.id, sort_by_parameter_order=True),
+            [item.event for item in batch],
+        )
+        event_ids = [row[0] for row in result.all()]
+        audit_rows = []
+        for item, event_id in zip(batch, event_ids):
+            if item.audit is not None:
+                audit_rows.append({**item.audit, "resource_id": str(event_id)})
+        if audit_rows:
+            await session.execute(insert(AuditLog), audit_rows)
+        await session.commit()
+
+
+_session_factory = None
+
+
+class ClickoutBuffer:
+    """Bounded ring buffer of clickout events with a background batch flusher."""
+
+    def __init__(
+        self,
+        max_events: int = 10_000,
+        batch_size: int = 200,
+        flush_interval_ms: float = 250,
+        max_attempts: int = 3,
+        writer: Optional[BatchWriter] = None,
+    ):
+        self.max_events = max(1, max_events)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = max(flush_interval_ms, 1) / 1000
+        self.max_attempts = max(1, max_attempts)
+        self._writer = writer or write_clickout_batch
+        self._queue: Deque[PendingClickout] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self.stats: Dict[str, float] = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "high_water": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ClickoutBuffer":
+        def _num(name: str, default: float) -> float:
+            try:
+                return float(os.getenv(name, str(default)))
+            except ValueError:
+                return default
+
+        return cls(
+            max_events=int(_num("CLICKOUT_BUFFER_MAX_EVENTS", 10_000)),
+            batch_size=int(_num("CLICKOUT_BUFFER_BATCH_SIZE", 200)),
+            flush_interval_ms=_num("CLICKOUT_BUFFER_FLUSH_MS", 250),
+        )
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def snapshot(self) -> Dict[str, Any]:
+        oldest_age = time.monotonic() - self._queue[0].enqueued_at if self._queue else 0.0
+        return {
+            **self.stats,
+            "depth": self.depth(),
+            "capacity": self.max_events,
+            "oldest_pending_seconds": round(oldest_age, 3),
+        }
+
+    def submit(self, event: Dict[str, Any], audit: Optional[Dict[str, Any]] = None) -> None:
+        """Queue a clickout for the next batch. Never blocks and never raises."""
+        if len(self._queue) >= self.max_events:
+            self._queue.popleft()
+            self.stats["dropped"] += 1
+        self._queue.append(PendingClickout(event=event, audit=audit))
+        self.stats["submitted"] += 1
+        self.stats["high_water"] = max(self.stats["high_water"], len(self._queue))
+        self._ensure_running()
+        if len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._closing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; the next submit from a request will start it
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue:
+                if not await self.flush():
+                    break  # back off until the next tick after a failed write
+                if len(self._queue) < self.batch_size:
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to one batch. Returns False if the write failed."""
+        if not self._queue:
+            return True
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch: List[PendingClickout] = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            if not batch:
+                return True
+            started = time.monotonic()
+            try:
+                await self._writer(batch)
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                logger.error(
+                    f"[ClickoutBuffer] Failed to write {len(batch)} clickouts: "
+                    f"{type(e).__name__}: {e}"
+                )
+                if len(batch) == 1:
+                    self._requeue(batch, failed=batch)
+                    return False
+                return await self._write_rows(batch)
+            self.stats["batches"] += 1
+            self.stats["written"] += len(batch)
+            self.stats["last_flush_ms"] = round((time.monotonic() - started) * 1000, 1)
+            return True
+
+    async def _write_rows(self, batch: List[PendingClickout]) -> bool:
+        """Retry a failed batch row by row so only the rows that fail alone count an attempt.
+
+        Two rows failing back to back look like the DB being down rather than bad
+        rows, so the rest of the batch is requeued untried instead of N more writes.
+        """
+        failed: List[PendingClickout] = []
+        pending: List[PendingClickout] = []
+        written = 0
+        streak = 0
+        for index, item in enumerate(batch):
+            try:
+                await self._writer([item])
+            except Exception as e:
+                failed.append(item)
+                streak += 1
+                logger.warning(
+                    f"[ClickoutBuffer] Clickout rejected on its own: {type(e).__name__}: {e}"
+                )
+                if streak >= 2:
+                    pending = batch[index + 1:]
+                    break
+                continue
+            written += 1
+            streak = 0
+        self.stats["written"] += written
+        if failed:
+            self._requeue(failed + pending, failed=failed)
+            return False
+        return True
+
+    def _requeue(self, batch: List[PendingClickout], failed: List[PendingClickout]) -> None:
+        """Put ``batch`` back at the front in order; only ``failed`` rows spend an attempt."""
+        failed_ids = {id(item) for item in failed}
+        for item in reversed(batch):
+            if id(item) in failed_ids:
+                item.attempts += 1
+            if item.attempts >= self.max_attempts or len(self._queue) >= self.max_events:
+                self.stats["dropped"] += 1
+                continue
+            self._queue.appendleft(item)
+
+    async def close(self, timeout_seconds: float = 5.0) -> None:
+        """Stop the flusher and write whatever is still buffered."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout_seconds)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+        deadline = time.monotonic() + timeout_seconds
+        stalled = 0  # failed flushes in a row that wrote nothing; a bad row needs max_attempts
+        while self._queue and time.monotonic() < deadline:
+            written = self.stats["written"]
+            if await self.flush() or self.stats["written"] > written:
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled > self.max_attempts:
+                    break
+        if self._queue:
+            logger.error(f"[ClickoutBuffer] Dropping {len(self._queue)} clickouts at shutdown")
+            self.stats["dropped"] += len(self._queue)
+            self._queue.clear()
+        # Allow a later submit (e.g. a restarted app in the same process) to start a new flusher.
+        self._task = None
+        self._closing = False
+
+
+clickout_buffer = ClickoutBuffer.from_env()
+
+__all__ = ["ClickoutBuffer", "PendingClickout", "clickout_buffer", "write_clickout_batch"]
@@ -0,0 +1,296 @@
+"""Per-statement database timing.
+
+``instrument_engine`` (called on ``database.engine`` at import) installs
+``before_cursor_execute`` / ``after_cursor_execute`` hooks. Each statement is:
+
+- observed in ``db_statement_duration_seconds{operation, fingerprint}`` and
+  ``db_query_duration_seconds{query_type}``, when prometheus_client is installed;
+- aggregated per fingerprint in ``statement_timings`` (calls, total and max time).
+  The statements with the most total time are on ``/admin/metrics``;
+- added to the current request's ``RequestDBStats``. ``RequestDBTimingMiddleware``
+  (mounted in main.py) opens one per request, or joins the one the observability
+  middleware opened, and prints the request's query count and DB time once it
+  finishes, unless ``DB_REQUEST_LOG_ENABLED=false``;
+- logged with the correlation ID when it takes ``DB_SLOW_QUERY_THRESHOLD`` seconds
+  or longer (default: 1.0), unless ``DB_ENABLE_QUERY_LOGGING=false``.
+
+The fingerprint is the statement text with literals and bind parameters replaced
+by ``?`` and repeated parameter lists collapsed. The same query with different
+arguments therefore lands in one series, and the slow query log never contains
+parameter values. Prometheus labels use a short hash of the fingerprint. At most
+``DB_STATEMENT_FINGERPRINT_LIMIT`` fingerprints are tracked; later ones are
+grouped under ``other``.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:  # prometheus_client is optional
+    from observability.metrics import db_query_duration_seconds, db_statement_duration_seconds
+except Exception:  # pragma: no cover - depends on installed extras
+    db_query_duration_seconds = db_statement_duration_seconds = None
+
+try:  # observability.logging needs python-json-logger
+    from observability.logging import get_correlation_id
+except Exception:  # pragma: no cover - depends on installed extras
+    def get_correlation_id() -> Optional[str]:
+        return None
+
+
+OTHER_FINGERPRINT = "other"
+_OPERATIONS = {"select", "insert", "update", "delete", "with"}
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+")
+_NUMBER_RE = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_CAST_RE = re.compile(r"\?::[\w ]+?(?:\[\])?(?=[\s,)]|$)")
+_SPACE_RE = re.compile(r"\s+")
+_PARAM_LIST_RE = re.compile(r"\(\?(?:, \?)+\)")
+_REPEATED_GROUP_RE = re.compile(r"(\([^()]*\))(?:, \1)+")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+@lru_cache(maxsize=2048)
+def statement_fingerprint(statement: str) -> str:
+    """Normalize ``statement`` so executions differing only in arguments compare equal."""
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _SPACE_RE.sub(" ", sql).strip()
+    sql = _CAST_RE.sub("?", sql)
+    sql = _PARAM_LIST_RE.sub("(?, ...)", sql)
+    return _REPEATED_GROUP_RE.sub(r"\1, ...", sql)
+
+
+def _operation(fingerprint: str) -> str:
+    word = fingerprint.split(" ", 1)[0].lower()
+    return word if word in _OPERATIONS else "other"
+
+
+@dataclass
+class RequestDBStats:
+    """Statements run while handling one request."""
+
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+@contextmanager
+def track_request_db_time() -> Iterator[RequestDBStats]:
+    """Count statements run in this context (and tasks it starts) into a RequestDBStats.
+
+    Nested contexts share the outermost one, so the access log and the ``[DB]``
+    line of the same request report the same numbers.
+    """
+    active = _request_db_stats.get()
+    if active is not None:
+        yield active
+        return
+    stats = RequestDBStats()
+    token = _request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_db_stats.reset(token)
+
+
+class RequestDBTimingMiddleware:
+    """Pure ASGI: print one line per request that ran statements, e.g.
+
+    ``[DB] GET /rows/{row_id} 200 45.1ms db_queries=3 db_ms=12.4``
+
+    Written when the request finishes, so streamed responses include the
+    statements run while streaming. It is printed like the rest of the API's
+    operational output: under uvicorn's default logging config, INFO records
+    from application loggers are dropped.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: Optional[bool] = None):
+        self.app = app
+        if enabled is None:
+            setting = (os.getenv("DB_REQUEST_LOG_ENABLED", "true") or "").strip().lower()
+            enabled = setting not in ("0", "false", "no", "off")
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with track_request_db_time() as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if stats.queries:
+                    route = scope.get("route")
+                    path = getattr(route, "path", None) or scope.get("path", "")
+                    print(
+                        f"[DB] {scope['method']} {path} {status_code} "
+                        f"{(time.perf_counter() - started) * 1000:.1f}ms "
+                        f"db_queries={stats.queries} db_ms={stats.seconds * 1000:.1f}"
+                    )
+
+
+class StatementTimings:
+    """Latency per statement fingerprint, plus the slow query log."""
+
+    def __init__(self, slow_threshold_seconds: Optional[float] = 1.0, max_fingerprints: int = 500):
+        self.slow_threshold_seconds = slow_threshold_seconds
+        self.max_fingerprints = max(1, max_fingerprints)
+        # label -> [fingerprint, calls, total seconds, max seconds]
+        self._entries: Dict[str, List[Any]] = {}
+        self.stats: Dict[str, int] = {"statements": 0, "slow": 0, "untracked": 0}
+
+    @classmethod
+    def from_env(cls) -> "StatementTimings":
+        logging_enabled = (os.getenv("DB_ENABLE_QUERY_LOGGING", "true") or "").strip().lower()
+        return cls(
+            slow_threshold_seconds=(
+                None if logging_enabled in ("0", "false", "no", "off")
+                else _env_float("DB_SLOW_QUERY_THRESHOLD", 1.0)
+            ),
+            max_fingerprints=int(_env_float("DB_STATEMENT_FINGERPRINT_LIMIT", 500)),
+        )
+
+    def _label(self, fingerprint: str) -> str:
+        label = hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+        if label not in self._entries:
+            if len(self._entries) >= self.max_fingerprints:
+                self.stats["untracked"] += 1
+                return OTHER_FINGERPRINT
+            self._entries[label] = [fingerprint, 0, 0.0, 0.0]
+        return label
+
+    def record(self, statement: str, seconds: float) -> None:
+        fingerprint = statement_fingerprint(statement)
+        operation = _operation(fingerprint)
+        label = self._label(fingerprint)
+        self.stats["statements"] += 1
+        entry = self._entries.get(label)
+        if entry is not None:
+            entry[1] += 1
+            entry[2] += seconds
+            entry[3] = max(entry[3], seconds)
+
+        if db_statement_duration_seconds is not None:
+            db_statement_duration_seconds.labels(
+                operation=operation, fingerprint=label
+            ).observe(seconds)
+            db_query_duration_seconds.labels(query_type=operation).observe(seconds)
+
+        request_stats = _request_db_stats.get()
+        if request_stats is not None:
+            request_stats.queries += 1
+            request_stats.seconds += seconds
+
+        if self.slow_threshold_seconds is not None and seconds >= self.slow_threshold_seconds:
+            self.stats["slow"] += 1
+            correlation_id = get_correlation_id() or "none"
+            logger.warning(
+                f"[DB] Slow query ({seconds:.3f}s) correlation_id={correlation_id} "
+                f"fingerprint={label}: {fingerprint[:1000]}",
+                extra={
+                    "duration_seconds": round(seconds, 3),
+                    "fingerprint": label,
+                    "operation": operation,
+                },
+            )
+
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Fingerprints with the most total time, most expensive first."""
+        ranked = sorted(self._entries.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": label,
+                "statement": fingerprint[:300],
+                "calls": calls,
+                "total_ms": round(total * 1000, 1),
+                "mean_ms": round(total * 1000 / calls, 2) if calls else None,
+                "max_ms": round(slowest * 1000, 1),
+            }
+            for label, (fingerprint, calls, total, slowest) in ranked
+        ]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for name in self.stats:
+            self.stats[name] = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "fingerprints": len(self._entries),
+            "slow_threshold_seconds": self.slow_threshold_seconds,
+            "top": self.top(),
+        }
+
+
+statement_timings = StatementTimings.from_env()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._db_timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_db_timing_started", None)
+    if started is not None:
+        statement_timings.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement run on ``engine`` (sync or async). Idempotent."""
+    target = getattr(engine, "sync_engine", engine)
+    for name, fn in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(target, name, fn):
+            event.listen(target, name, fn)
+
+
+__all__ = [
+    "RequestDBStats",
+    "RequestDBTimingMiddleware",
+    "StatementTimings",
+    "instrument_engine",
+    "statement_fingerprint",
+    "statement_timings",
+    "track_request_db_time",
+]
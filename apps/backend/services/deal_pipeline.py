@@ -12,6 +12,7 @@ import logging
 import os
 import re
 import secrets
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
@@ -20,12 +21,9 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from models.deals import Deal, DealMessage
 from models import Row, Bid, Vendor, User
-from services.email import EmailResult, RESEND_API_KEY, FROM_NAME, DEV_EMAIL_OVERRIDE
-
-try:
-    import resend
-except ModuleNotFoundError:  # pragma: no cover
-    resend = None  # type: ignore
+from services.email import (
+    EmailResult, RESEND_API_KEY, FROM_NAME, DEV_EMAIL_OVERRIDE, send_resend_email
+)
 
 try:
     from email_reply_parser import EmailReplyParser
@@ -194,12 +192,17 @@ async def relay_email(
     original_html: Optional[str],
     subject: str,
     session: AsyncSession,
+    contacts: Optional["DealContacts"] = None,
 ) -> EmailResult:
     """
     Relay an email through the proxy.
     - If sender is vendor -> relay to buyer
     - If sender is buyer -> relay to vendor
+
+    Pass the ``contacts`` loaded by ``resolve_deal_contacts`` to skip the lookup.
     """
+    if contacts is None:
+        contacts = await load_deal_contacts(session, deal)
     proxy_address = f"{deal.proxy_email_alias}@{MESSAGES_DOMAIN}"
     trust_footer_h = TRUST_FOOTER_HTML.format(app_url=APP_BASE_URL)
     trust_footer_t = TRUST_FOOTER_TEXT.format(app_url=APP_BASE_URL)
@@ -207,29 +210,22 @@ async def relay_email(
     # Determine recipient
     if sender_type == "vendor":
         # Relay to buyer
-        buyer = await session.get(User, deal.buyer_user_id)
-        if not buyer or not buyer.email:
+        if not contacts.buyer_email:
             return EmailResult(success=False, error="Buyer email not found")
-        to_email = buyer.email
+        to_email = contacts.buyer_email
 
-        vendor_name = "Vendor"
-        if deal.vendor_id:
-            vendor = await session.get(Vendor, deal.vendor_id)
-            if vendor:
-                vendor_name = vendor.name
+        vendor_name = contacts.vendor_name or "Vendor"
         from_display = f"{vendor_name} (via BuyAnything)"
 
     elif sender_type == "buyer":
         # Relay to vendor
         if not deal.vendor_id:
             return EmailResult(success=False, error="No vendor linked to deal")
-        vendor = await session.get(Vendor, deal.vendor_id)
-        if not vendor or not vendor.email:
+        if not contacts.vendor_email:
             return EmailResult(success=False, error="Vendor email not found")
-        to_email = vendor.email
+        to_email = contacts.vendor_email
 
-        buyer = await session.get(User, deal.buyer_user_id)
-        buyer_name = buyer.name if buyer and buyer.name else "Buyer"
+        buyer_name = contacts.buyer_name or "Buyer"
         from_display = f"{buyer_name} (via BuyAnything)"
 
     else:
@@ -257,9 +253,9 @@ async def relay_email(
     text_body += trust_footer_t
 
     # Send via Resend
-    if RESEND_API_KEY and resend is not None:
+    if RESEND_API_KEY:
         try:
-            params: resend.Emails.SendParams = {
+            params = {
                 "from": f"{from_display} <{proxy_address}>",
                 "to": [to_email],
                 "reply_to": proxy_address,
@@ -267,7 +263,7 @@ async def relay_email(
                 "html": html_body,
                 "text": text_body,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             logger.info(f"[DealPipeline] Relayed {sender_type} -> {to_email} for deal {deal.id}")
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
@@ -291,12 +287,12 @@ async def send_initial_outreach(
     if not deal.vendor_id:
         return EmailResult(success=False, error="No vendor on deal")
 
-    vendor = await session.get(Vendor, deal.vendor_id)
-    if not vendor or not vendor.email:
+    contacts = await load_deal_contacts(session, deal)
+    if not contacts.vendor_email:
         return EmailResult(success=False, error="Vendor email missing")
 
-    buyer = await session.get(User, deal.buyer_user_id)
-    buyer_name = buyer.name if buyer and buyer.name else "A buyer on BuyAnything"
+    buyer_name = contacts.buyer_name or "A buyer on BuyAnything"
+    vendor_greeting = contacts.vendor_contact_name or contacts.vendor_name
 
     proxy_address = f"{deal.proxy_email_alias}@{MESSAGES_DOMAIN}"
     trust_footer_h = TRUST_FOOTER_HTML.format(app_url=APP_BASE_URL)
@@ -306,7 +302,7 @@ async def send_initial_outreach(
     html_content = f"""
     <div style="font-family: -apple-system, BlinkMacSystemFont, sans-serif; max-width: 600px; margin: 0 auto;">
         <h2>New Quote Request</h2>
-        <p>Hi {vendor.contact_name or vendor.name},</p>
+        <p>Hi {vendor_greeting},</p>
         <p><strong>{buyer_name}</strong> is looking for a quote:</p>
         <div style="background: #f5f5f5; padding: 15px; border-radius: 8px; margin: 20px 0;">
             <p style="margin: 0;"><strong>{request_summary}</strong></p>
@@ -318,20 +314,20 @@ async def send_initial_outreach(
 
     text_content = (
         f"New Quote Request\n\n"
-        f"Hi {vendor.contact_name or vendor.name},\n\n"
+        f"Hi {vendor_greeting},\n\n"
         f"{buyer_name} is looking for a quote:\n\n"
         f"{request_summary}\n\n"
         f"Simply reply to this email to start the conversation.\n"
     )
 
-    to_email = vendor.email
+    to_email = contacts.vendor_email
     if DEV_EMAIL_OVERRIDE:
         subject = f"[DEV → {to_email}] {subject}"
         to_email = DEV_EMAIL_OVERRIDE
 
-    if RESEND_API_KEY and resend is not None:
+    if RESEND_API_KEY:
         try:
-            params: resend.Emails.SendParams = {
+            params = {
                 "from": f"{FROM_NAME} <{proxy_address}>",
                 "to": [to_email],
                 "reply_to": proxy_address,
@@ -339,7 +335,7 @@ async def send_initial_outreach(
                 "html": html_content,
                 "text": text_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             logger.info(f"[DealPipeline] Initial outreach sent to {to_email} for deal {deal.id}")
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
@@ -468,6 +464,49 @@ Return JSON ONLY, no extra text:
         }
 
 
+@dataclass
+class DealContacts:
+    """A deal plus the buyer and vendor contact fields a relay needs."""
+
+    deal: Deal
+    buyer_email: Optional[str] = None
+    buyer_name: Optional[str] = None
+    vendor_email: Optional[str] = None
+    vendor_name: Optional[str] = None
+    vendor_contact_name: Optional[str] = None
+
+
+def _deal_contacts_query():
+    return (
+        select(Deal, User.email, User.name, Vendor.email, Vendor.name, Vendor.contact_name)
+        .outerjoin(User, User.id == Deal.buyer_user_id)
+        .outerjoin(Vendor, Vendor.id == Deal.vendor_id)
+    )
+
+
+async def resolve_deal_contacts(
+    session: AsyncSession,
+    alias: str,
+) -> Optional[DealContacts]:
+    """Load a deal and both parties' contact fields by proxy alias in one query."""
+    result = await session.execute(_deal_contacts_query().where(Deal.proxy_email_alias == alias))
+    row = result.first()
+    return DealContacts(*row) if row is not None else None
+
+
+async def load_deal_contacts(session: AsyncSession, deal: Deal) -> DealContacts:
+    """Contact fields for an already-loaded deal, in one query."""
+    result = await session.execute(
+        select(User.email, User.name, Vendor.email, Vendor.name, Vendor.contact_name)
+        .select_from(Deal)
+        .outerjoin(User, User.id == Deal.buyer_user_id)
+        .outerjoin(Vendor, Vendor.id == Deal.vendor_id)
+        .where(Deal.id == deal.id)
+    )
+    row = result.first()
+    return DealContacts(deal, *row) if row is not None else DealContacts(deal)
+
+
 async def resolve_deal_from_alias(
     session: AsyncSession,
     alias: str,
@@ -483,20 +522,22 @@ async def identify_sender(
     deal: Deal,
     from_email: str,
     session: AsyncSession,
+    contacts: Optional[DealContacts] = None,
 ) -> Optional[str]:
     """
     Determine if the sender is 'buyer' or 'vendor' based on their email.
     Returns None if unrecognized.
     """
+    if contacts is None:
+        contacts = await load_deal_contacts(session, deal)
+    sender = from_email.lower()
+
     # Check buyer
-    buyer = await session.get(User, deal.buyer_user_id)
-    if buyer and buyer.email and buyer.email.lower() == from_email.lower():
+    if contacts.buyer_email and contacts.buyer_email.lower() == sender:
         return "buyer"
 
     # Check vendor
-    if deal.vendor_id:
-        vendor = await session.get(Vendor, deal.vendor_id)
-        if vendor and vendor.email and vendor.email.lower() == from_email.lower():
-            return "vendor"
+    if deal.vendor_id and contacts.vendor_email and contacts.vendor_email.lower() == sender:
+        return "vendor"
 
     return None
@@ -2,8 +2,9 @@
 Email service for outreach and handoff emails.
 Uses Resend for transactional email delivery.
 """
+import asyncio
 import os
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 from dataclasses import dataclass
 
 try:
@@ -21,8 +22,23 @@ class EmailResult:
 
 # Check if Resend is available
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
+RESEND_TIMEOUT_SECONDS = float(os.getenv("RESEND_TIMEOUT_SECONDS", "10"))
 if RESEND_API_KEY and resend is not None:
     resend.api_key = RESEND_API_KEY
+    resend.default_http_client = resend.RequestsClient(timeout=RESEND_TIMEOUT_SECONDS)
+
+
+async def send_resend_email(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one email with ``resend.Emails.send`` without blocking the event loop.
+
+    The SDK does a blocking HTTPS round trip, so it runs on a worker thread
+    (as Stripe calls do, see services/stripe_calls.py). Returns the SDK's
+    response (``{"id": ...}``) and raises whatever the SDK raises.
+    """
+    if resend is None:
+        raise RuntimeError("resend is not installed")
+    return await asyncio.to_thread(resend.Emails.send, params)
+
 
 FROM_EMAIL = os.getenv("FROM_EMAIL", "outreach@shopper.buy-anything.com")
 FROM_NAME = os.getenv("FROM_NAME", "BuyAnything")
@@ -185,7 +201,7 @@ This link expires in 7 days.
                 "text": text_content,
             }
             
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             
             return EmailResult(
                 success=True,
@@ -266,7 +282,7 @@ Submit your quote: {quote_url}
                 "text": plain_text,
             }
 
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
 
             return EmailResult(
                 success=True,
@@ -369,7 +385,7 @@ async def send_vendor_coverage_report_email(
                 "html": html_content,
                 "text": text_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -437,7 +453,7 @@ Simply reply to this email with your quote and availability.
                 "text": plain_text,
             }
 
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
 
             return EmailResult(
                 success=True,
@@ -516,7 +532,7 @@ async def send_reminder_email(
                 "subject": subject,
                 "html": html_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
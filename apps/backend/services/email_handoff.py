@@ -9,7 +9,7 @@ from typing import Optional
 
 from services.email import (
     EmailResult, RESEND_API_KEY, FROM_EMAIL, FROM_NAME, ADMIN_EMAIL,
-    APP_BASE_URL, DEV_EMAIL_OVERRIDE, _maybe_intercept,
+    APP_BASE_URL, DEV_EMAIL_OVERRIDE, _maybe_intercept, send_resend_email,
 )
 
 try:
@@ -74,7 +74,7 @@ async def send_handoff_buyer_email(
                 "subject": subject,
                 "html": html_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -134,7 +134,7 @@ async def send_handoff_seller_email(
                 "subject": subject,
                 "html": html_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -199,7 +199,7 @@ async def send_vendor_selected_email(
                 "subject": subject,
                 "html": html_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -259,7 +259,7 @@ async def send_triage_notification_email(
                 "html": html_content,
                 "text": text_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -306,7 +306,7 @@ async def send_merchant_verification_email(
                 "html": html_content,
                 "text": text_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -362,7 +362,7 @@ async def send_merchant_status_email(
                 "subject": subject,
                 "html": html_content,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
             print(f"[RESEND ERROR] {e}")
@@ -430,7 +430,7 @@ async def send_admin_vendor_alert(
                 "subject": subject,
                 "html": html,
             }
-            response = resend.Emails.send(params)
+            response = await send_resend_email(params)
             print(f"[ADMIN ALERT] Sent {event_type} alert for {vendor_display}")
             return EmailResult(success=True, message_id=response.get("id"))
         except Exception as e:
@@ -242,7 +242,7 @@ Rules:
 - confidence should be 0-1.
 """
 
-    text = await call_gemini(prompt, timeout=15.0)
+    text = await call_gemini(prompt, timeout=15.0, cache=True)
     return _extract_json(text)
 
 
@@ -0,0 +1,76 @@
+"""Job handlers and periodic schedules for the durable job queue (services/jobs.py).
+
+Importing this module registers every handler, so both the in-process worker
+and ``python -m services.jobs`` see the same set.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlmodel import delete
+
+from database import get_session
+from models import BackgroundJob, LLMResponseCacheEntry, ProviderResultCacheEntry
+from services.jobs import STATUS_DONE, job, periodic
+
+JOB_RETENTION_DAYS = 7
+
+
+@job("bugs.create_github_issue", max_attempts=3, timeout_seconds=120)
+async def create_github_issue(payload: Dict[str, Any]) -> None:
+    from routes.bugs import create_github_issue_task
+
+    await create_github_issue_task(int(payload["bug_id"]))
+
+
+@job("security.cleanup", queue="maintenance", max_attempts=2)
+async def security_cleanup(payload: Dict[str, Any]) -> None:
+    from security.session_cleanup import run_security_cleanup
+
+    await run_security_cleanup()
+
+
+@job("retention.cleanup", queue="maintenance", max_attempts=2, timeout_seconds=1800)
+async def retention_cleanup(payload: Dict[str, Any]) -> None:
+    from retention import cleanup_old_audit_logs, cleanup_old_bug_reports, cleanup_old_clickouts
+
+    async for session in get_session():
+        await cleanup_old_audit_logs(session)
+        await cleanup_old_clickouts(session)
+        await cleanup_old_bug_reports(session)
+        now = datetime.utcnow()
+        await session.execute(
+            delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.expires_at < now)
+        )
+        await session.execute(
+            delete(ProviderResultCacheEntry).where(ProviderResultCacheEntry.expires_at < now)
+        )
+        await session.commit()
+
+
+@job("jobs.prune", queue="maintenance", max_attempts=2)
+async def prune_finished_jobs(payload: Dict[str, Any]) -> None:
+    cutoff = datetime.utcnow() - timedelta(days=JOB_RETENTION_DAYS)
+    async for session in get_session():
+        await session.execute(
+            delete(BackgroundJob).where(
+                BackgroundJob.status == STATUS_DONE, BackgroundJob.finished_at < cutoff
+            )
+        )
+        await session.commit()
+
+
+@job("metrics.rollup", queue="maintenance", max_attempts=2, timeout_seconds=1800)
+async def refresh_metric_rollups(payload: Dict[str, Any]) -> None:
+    from services.metrics_rollup import EPOCH, refresh_rollups, rollups_exist
+
+    async for session in get_session():
+        # First run backfills the whole history; later runs refresh the trailing days.
+        since = None if await rollups_exist(session) else EPOCH
+        await refresh_rollups(session, since=since)
+
+
+periodic("security.cleanup", interval_seconds=3600)
+periodic("retention.cleanup", interval_seconds=24 * 3600)
+periodic("jobs.prune", interval_seconds=24 * 3600)
+periodic("metrics.rollup", interval_seconds=300)
@@ -0,0 +1,413 @@
+"""Durable Postgres-backed job queue.
+
+Background work is persisted as ``background_job`` rows so it survives
+restarts and is retried on failure:
+
+- handlers are registered by name with :func:`job` and receive the JSON payload;
+- :func:`enqueue` inserts a job on the caller's session, so it commits (or rolls
+  back) together with the request's own writes;
+- :class:`JobWorker` claims due jobs per queue with ``FOR UPDATE SKIP LOCKED``,
+  bounded by a per-queue concurrency limit, and any number of workers can run;
+- periodic jobs registered with :func:`periodic` are enqueued once per interval
+  slot (deduplicated by ``dedupe_key``), whichever worker gets there first.
+
+Claimed jobs carry a lease in ``locked_until`` that outlasts the handler's
+timeout, so a job held by a crashed worker is claimed again once the lease
+expires but a live run never is. A worker only records the outcome of the
+attempt it claimed. Failed jobs are retried with exponential backoff and end
+as ``failed`` after ``max_attempts``.
+
+Run standalone with ``python -m services.jobs`` or inside the API process
+(``JOB_WORKER_ENABLED``, on by default).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+DEFAULT_QUEUE = "default"
+# Time a claim outlives its handler's timeout, for cancellation and the final write.
+LEASE_MARGIN_SECONDS = 60.0
+
+JobFn = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class JobHandler:
+    name: str
+    fn: JobFn
+    queue: str = DEFAULT_QUEUE
+    max_attempts: int = 5
+    timeout_seconds: float = 300.0
+
+
+@dataclass
+class PeriodicJob:
+    name: str
+    interval_seconds: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+_handlers: Dict[str, JobHandler] = {}
+_periodic: Dict[str, PeriodicJob] = {}
+
+
+def job(
+    name: str,
+    queue: str = DEFAULT_QUEUE,
+    max_attempts: int = 5,
+    timeout_seconds: float = 300.0,
+) -> Callable[[JobFn], JobFn]:
+    """Register ``fn(payload)`` as the handler for jobs called ``name``."""
+
+    def decorator(fn: JobFn) -> JobFn:
+        _handlers[name] = JobHandler(
+            name=name,
+            fn=fn,
+            queue=queue,
+            max_attempts=max_attempts,
+            timeout_seconds=timeout_seconds,
+        )
+        return fn
+
+    return decorator
+
+
+def periodic(name: str, interval_seconds: float, payload: Optional[Dict[str, Any]] = None) -> None:
+    """Schedule the registered job ``name`` to run every ``interval_seconds``."""
+    _periodic[name] = PeriodicJob(
+        name=name, interval_seconds=interval_seconds, payload=payload or {}
+    )
+
+
+def get_handler(name: str) -> Optional[JobHandler]:
+    return _handlers.get(name)
+
+
+async def enqueue(
+    session: AsyncSession,
+    name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    run_at: Optional[datetime] = None,
+    delay_seconds: float = 0.0,
+    dedupe_key: Optional[str] = None,
+) -> Optional[int]:
+    """Add a job on ``session`` (not committed). Returns its id, or None if deduplicated.
+
+    Raises ValueError if the job's queue is not in ``JOB_QUEUES``: no worker
+    would ever claim it.
+    """
+    handler = _handlers.get(name)
+    queue = handler.queue if handler else DEFAULT_QUEUE
+    if queue not in configured_queues():
+        raise ValueError(f"job '{name}' uses queue '{queue}', which is not in JOB_QUEUES")
+    now = datetime.utcnow()
+    values = {
+        "name": name,
+        "queue": queue,
+        "payload": payload or {},
+        "status": STATUS_QUEUED,
+        "attempts": 0,
+        "max_attempts": handler.max_attempts if handler else 5,
+        "run_at": run_at or now + timedelta(seconds=delay_seconds),
+        "dedupe_key": dedupe_key,
+        "created_at": now,
+        "updated_at": now,
+    }
+    stmt = pg_insert(BackgroundJob).values(**values).returning(BackgroundJob.id)
+    if dedupe_key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["dedupe_key"])
+    result = await session.execute(stmt)
+    row = result.first()
+    return row[0] if row else None
+
+
+def configured_queues() -> Dict[str, int]:
+    """Queues named in ``JOB_QUEUES`` (``name:concurrency`` pairs) with their limits."""
+    queues: Dict[str, int] = {}
+    for part in os.getenv("JOB_QUEUES", "default:4,maintenance:1").split(","):
+        queue, _, limit = part.strip().partition(":")
+        if queue:
+            try:
+                queues[queue] = max(1, int(limit or 1))
+            except ValueError:
+                queues[queue] = 1
+    return queues or {DEFAULT_QUEUE: 4}
+
+
+def lease_seconds_for(name: str, minimum: float) -> float:
+    """Lease for a claim of job ``name``: its handler's timeout plus a margin, or ``minimum``."""
+    handler = _handlers.get(name)
+    if handler is None:
+        return minimum
+    return max(minimum, handler.timeout_seconds + LEASE_MARGIN_SECONDS)
+
+
+def backoff_seconds(
+    attempt: int, base: float = 30.0, cap: float = 3600.0, jitter: float = 0.1
+) -> float:
+    delay = min(cap, base * (2 ** max(0, attempt - 1)))
+    return delay * (1 + random.uniform(-jitter, jitter)) if jitter else delay
+
+
+_CLAIM_SQL = sa.text("""
+    UPDATE background_job
+    SET status = :running,
+        attempts = attempts + 1,
+        locked_until = NOW() + make_interval(
+            secs => COALESCE((CAST(:leases AS jsonb) ->> name)::float, :lease_seconds)
+        ),
+        updated_at = NOW()
+    WHERE id IN (
+        SELECT id FROM background_job
+        WHERE queue = :queue
+          AND ((status = :queued AND run_at <= NOW())
+               OR (status = :running AND locked_until <= NOW()))
+        ORDER BY run_at, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, name, payload, attempts, max_attempts
+""")
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    name: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+@dataclass
+class JobWorkerConfig:
+    # queue name -> max jobs of that queue running at once in this worker
+    queues: Dict[str, int] = field(default_factory=lambda: {DEFAULT_QUEUE: 4})
+    poll_interval_seconds: float = 1.0
+    lease_seconds: float = 600.0
+    schedule_interval_seconds: float = 30.0
+    base_backoff_seconds: float = 30.0
+    shutdown_grace_seconds: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "JobWorkerConfig":
+        """``JOB_QUEUES`` is ``name:concurrency`` pairs, e.g. ``default:4,email:2``."""
+        def _num(name: str, default: float) -> float:
+            try:
+                return float(os.getenv(name, str(default)))
+            except ValueError:
+                return default
+
+        return cls(
+            queues=configured_queues(),
+            poll_interval_seconds=_num("JOB_POLL_INTERVAL_SECONDS", 1.0),
+            lease_seconds=_num("JOB_LEASE_SECONDS", 600.0),
+        )
+
+
+class JobWorker:
+    """Polls ``background_job`` and runs due jobs with per-queue concurrency limits."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        config: Optional[JobWorkerConfig] = None,
+    ):
+        if session_factory is None:
+            from sqlalchemy.orm import sessionmaker
+
+            from database import engine
+
+            session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self._session_factory = session_factory
+        self.config = config or JobWorkerConfig.from_env()
+        self._running: Dict[str, set] = {queue: set() for queue in self.config.queues}
+        self._last_schedule = float("-inf")
+        self.stats: Dict[str, int] = {
+            "claimed": 0,
+            "succeeded": 0,
+            "retried": 0,
+            "failed": 0,
+            "scheduled": 0,
+            "lost_lease": 0,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": {queue: len(tasks) for queue, tasks in self._running.items()},
+        }
+
+    async def claim(self, queue: str, limit: int) -> List[ClaimedJob]:
+        leases = {
+            name: lease_seconds_for(name, self.config.lease_seconds)
+            for name, handler in _handlers.items()
+            if handler.queue == queue
+        }
+        async with self._session_factory() as session:
+            result = await session.execute(
+                _CLAIM_SQL,
+                {
+                    "running": STATUS_RUNNING,
+                    "queued": STATUS_QUEUED,
+                    "queue": queue,
+                    "lease_seconds": self.config.lease_seconds,
+                    "leases": json.dumps(leases),
+                    "limit": limit,
+                },
+            )
+            jobs = [ClaimedJob(*row) for row in result.all()]
+            await session.commit()
+        self.stats["claimed"] += len(jobs)
+        return jobs
+
+    async def execute(self, claimed: ClaimedJob) -> None:
+        handler = _handlers.get(claimed.name)
+        try:
+            if handler is None:
+                raise LookupError(f"no handler registered for job '{claimed.name}'")
+            await asyncio.wait_for(
+                handler.fn(claimed.payload or {}), timeout=handler.timeout_seconds
+            )
+        except Exception as e:
+            await self._finish(claimed, error=f"{type(e).__name__}: {e}")
+            return
+        await self._finish(claimed)
+
+    async def _finish(self, claimed: ClaimedJob, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        async with self._session_factory() as session:
+            row = await session.get(BackgroundJob, claimed.id, with_for_update=True)
+            if row is None:
+                return
+            if row.status != STATUS_RUNNING or row.attempts != claimed.attempts:
+                # The lease expired and another worker claimed the job again.
+                self.stats["lost_lease"] += 1
+                logger.warning(
+                    f"[JobWorker] Job {claimed.id} ({claimed.name}) attempt {claimed.attempts} "
+                    f"lost its lease; not recording its result"
+                )
+                return
+            row.locked_until = None
+            row.updated_at = now
+            if error is None:
+                row.status = STATUS_DONE
+                row.finished_at = now
+                row.last_error = None
+                self.stats["succeeded"] += 1
+            elif claimed.attempts >= claimed.max_attempts:
+                row.status = STATUS_FAILED
+                row.finished_at = now
+                row.last_error = error[:2000]
+                self.stats["failed"] += 1
+                logger.error(
+                    f"[JobWorker] Job {claimed.id} ({claimed.name}) failed after "
+                    f"{claimed.attempts} attempts: {error}"
+                )
+            else:
+                row.status = STATUS_QUEUED
+                row.run_at = now + timedelta(
+                    seconds=backoff_seconds(claimed.attempts, base=self.config.base_backoff_seconds)
+                )
+                row.last_error = error[:2000]
+                self.stats["retried"] += 1
+                logger.warning(
+                    f"[JobWorker] Job {claimed.id} ({claimed.name}) "
+                    f"attempt {claimed.attempts} failed: {error}"
+                )
+            session.add(row)
+            await session.commit()
+
+    async def schedule_periodic(self) -> int:
+        """Enqueue each periodic job of this worker's queues once for the current interval slot."""
+        if not _periodic:
+            return 0
+        created = 0
+        now = time.time()
+        async with self._session_factory() as session:
+            for spec in _periodic.values():
+                handler = _handlers.get(spec.name)
+                if (handler.queue if handler else DEFAULT_QUEUE) not in self.config.queues:
+                    continue
+                slot = int(now // spec.interval_seconds)
+                dedupe_key = f"periodic:{spec.name}:{slot}"
+                if await enqueue(session, spec.name, spec.payload, dedupe_key=dedupe_key):
+                    created += 1
+            await session.commit()
+        self.stats["scheduled"] += created
+        return created
+
+    async def poll_once(self) -> int:
+        """Fill free slots in every queue. Returns the number of jobs started."""
+        if time.monotonic() - self._last_schedule >= self.config.schedule_interval_seconds:
+            self._last_schedule = time.monotonic()
+            await self.schedule_periodic()
+
+        started = 0
+        for queue, limit in self.config.queues.items():
+            running = self._running[queue]
+            free = limit - len(running)
+            if free <= 0:
+                continue
+            for claimed in await self.claim(queue, free):
+                task = asyncio.create_task(self.execute(claimed))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                started += 1
+        return started
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Poll until ``stop`` is set, then wait for running jobs to finish."""
+        stop = stop or asyncio.Event()
+        logger.info(
+            f"[JobWorker] Started (queues={self.config.queues}, handlers={sorted(_handlers)})"
+        )
+        while not stop.is_set():
+            try:
+                started = await self.poll_once()
+            except Exception as e:
+                logger.error(f"[JobWorker] Poll failed: {type(e).__name__}: {e}")
+                started = 0
+            if started:
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.config.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+        pending = [task for tasks in self._running.values() for task in tasks]
+        if pending:
+            _, unfinished = await asyncio.wait(pending, timeout=self.config.shutdown_grace_seconds)
+            # Cancelled jobs keep their lease and are claimed again once it expires.
+            for task in unfinished:
+                task.cancel()
+        logger.info("[JobWorker] Stopped")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-7s %(message)s")
+    import services.job_handlers  # noqa: F401  (registers handlers)
+
+    asyncio.run(JobWorker().run())
@@ -7,10 +7,12 @@ This file keeps make_unified_decision,
 choice factors, provider triage, outreach email, and re-exports everything.
 """
 
+import asyncio
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +25,9 @@ from services.llm_core import (  # noqa: E402, F401
     _get_openrouter_api_key,
     GEMINI_MODEL,
     OPENROUTER_MODEL,
+    stream_gemini,
 )
+from utils.json_stream import StreamingJSONObjectParser  # noqa: E402
 
 # Re-export data models for backward compatibility
 from services.llm_models import (  # noqa: E402, F401
@@ -43,11 +47,7 @@ from services.llm_models import (  # noqa: E402, F401
 # UNIFIED LLM DECISION
 # =============================================================================
 
-async def make_unified_decision(ctx: ChatContext) -> UnifiedDecision:
-    """
-    Single LLM call to decide what action to take based on user message and context.
-    Ported from BFF's makeUnifiedDecision() in llm.ts.
-    """
+def _build_decision_prompt(ctx: ChatContext) -> str:
     active_row_json = json.dumps({
         "id": ctx.active_row["id"],
         "title": ctx.active_row.get("title", ""),
@@ -66,7 +66,7 @@ async def make_unified_decision(ctx: ChatContext) -> UnifiedDecision:
     recent = ctx.conversation_history[-6:] if ctx.conversation_history else []
     recent_text = "\n".join(f"  {m['role']}: {m['content']}" for m in recent)
 
-    prompt = f"""You are the decision engine for a shopping/procurement assistant.
+    return f"""You are the decision engine for a shopping/procurement assistant.
 
 INPUTS:
 - User message: "{ctx.user_message}"
@@ -248,42 +248,140 @@ Return ONLY valid JSON:
   "ui_hint": {{ "layout": "ROW_COMPACT|ROW_MEDIA_LEFT|ROW_TIMELINE", "blocks": ["..."], "value_vector": "unit_price|safety|speed|reliability|durability" }}
 }}"""
 
-    try:
-        text = await call_gemini(prompt, timeout=30.0)
-        parsed = _extract_json(text)
 
-        # Handle multi-item responses
-        items_list = parsed.pop("items", None)
-        if items_list and isinstance(items_list, list) and len(items_list) > 0:
-            first = items_list[0]
-            if "intent" not in parsed:
-                parsed["intent"] = {
-                    "what": first.get("what", ""),
-                    "category": "product",
-                    "search_query": first.get("search_query", f"{first.get('what', '')} deals"),
-                    "constraints": {},
-                    "desire_tier": "commodity",
-                    "desire_confidence": 0.95,
-                }
-            decision = UnifiedDecision(**parsed)
-            decision.items = items_list
-            return decision
-
-        return UnifiedDecision(**parsed)
+def _decision_from_json(parsed: Dict[str, Any]) -> UnifiedDecision:
+    # Handle multi-item responses
+    items_list = parsed.pop("items", None)
+    if items_list and isinstance(items_list, list) and len(items_list) > 0:
+        first = items_list[0]
+        if "intent" not in parsed:
+            parsed["intent"] = {
+                "what": first.get("what", ""),
+                "category": "product",
+                "search_query": first.get("search_query", f"{first.get('what', '')} deals"),
+                "constraints": {},
+                "desire_tier": "commodity",
+                "desire_confidence": 0.95,
+            }
+        decision = UnifiedDecision(**parsed)
+        decision.items = items_list
+        return decision
+
+    return UnifiedDecision(**parsed)
+
+
+def _fallback_decision(ctx: ChatContext) -> UnifiedDecision:
+    """Create a basic row from the user message when the LLM response is unusable."""
+    return UnifiedDecision(
+        message="I'll help you find that. Let me set up a search for you.",
+        intent=UserIntent(
+            what=ctx.user_message,
+            category="product",
+            search_query=ctx.user_message,
+            constraints={},
+        ),
+        action={"type": "create_row"},
+    )
+
+
+async def make_unified_decision(ctx: ChatContext) -> UnifiedDecision:
+    """
+    Single LLM call to decide what action to take based on user message and context.
+    Ported from BFF's makeUnifiedDecision() in llm.ts.
+    """
+    try:
+        text = await call_gemini(_build_decision_prompt(ctx), timeout=30.0)
+        return _decision_from_json(_extract_json(text))
     except Exception as e:
         logger.error(f"Failed to parse LLM decision: {e}")
-        # Fallback: create a basic row from the user message
-        return UnifiedDecision(
-            message="I'll help you find that. Let me set up a search for you.",
-            intent=UserIntent(
-                what=ctx.user_message,
-                category="product",
-                search_query=ctx.user_message,
-                constraints={},
-            ),
-            action={"type": "create_row"},
-        )
+        return _fallback_decision(ctx)
+
 
+@dataclass
+class DecisionStreamEvent:
+    kind: str  # "message_delta" | "ready" | "final"
+    text: str = ""
+    decision: Optional[UnifiedDecision] = None
+    fallback: bool = False  # final decision is _fallback_decision, not the model's
+
+
+async def stream_unified_decision(ctx: ChatContext) -> AsyncIterator[DecisionStreamEvent]:
+    """
+    Streaming make_unified_decision.
+
+    Yields "message_delta" events while the message field streams, one "ready"
+    event with a provisional decision once message, intent and action are
+    complete (ui_hint and other trailing fields may still be streaming), and a
+    "final" event with the fully parsed decision (or the usual fallback).
+    """
+    parser = StreamingJSONObjectParser(stream_fields=("message",))
+    chunks: List[str] = []
+    ready = False
+    fallback = False
+    try:
+        async for chunk in stream_gemini(_build_decision_prompt(ctx), timeout=30.0):
+            chunks.append(chunk)
+            for event in parser.feed(chunk):
+                if event.kind == "delta":
+                    yield DecisionStreamEvent("message_delta", text=event.value)
+            if not ready and {"message", "intent", "action"} <= parser.fields.keys():
+                try:
+                    provisional = _decision_from_json(dict(parser.fields))
+                except Exception:
+                    continue  # malformed so far; the final parse decides
+                ready = True
+                yield DecisionStreamEvent("ready", decision=provisional)
+        decision = _decision_from_json(_extract_json("".join(chunks)))
+    except Exception as e:
+        logger.error(f"Failed to parse streamed LLM decision: {e}")
+        decision = _fallback_decision(ctx)
+        fallback = True
+    yield DecisionStreamEvent("final", decision=decision, fallback=fallback)
+
+
+class UnifiedDecisionStream:
+    """
+    Act on a unified decision while the LLM is still writing it.
+
+    ``message_deltas()`` yields the message text as it arrives and stops as soon
+    as the decision is actionable (``self.decision`` is then set). The rest of
+    the response keeps streaming in the background; ``final()`` waits for it.
+    """
+
+    def __init__(self, ctx: ChatContext):
+        self._events = stream_unified_decision(ctx)
+        self._rest: Optional[asyncio.Task] = None
+        self.decision: Optional[UnifiedDecision] = None
+
+    async def message_deltas(self) -> AsyncIterator[str]:
+        async for event in self._events:
+            if event.kind == "message_delta":
+                yield event.text
+                continue
+            self.decision = event.decision
+            if event.kind == "ready":
+                self._rest = asyncio.create_task(self._drain())
+            return
+
+    async def _drain(self) -> UnifiedDecision:
+        async for event in self._events:
+            # The action was dispatched from the provisional decision; a late
+            # failure only loses the trailing fields, it does not replace it.
+            if event.kind == "final" and not event.fallback:
+                self.decision = event.decision
+        return self.decision
+
+    async def final(self) -> Optional[UnifiedDecision]:
+        """The complete decision; the provisional one if the stream ended early."""
+        if self._rest is not None:
+            await self._rest
+        return self.decision
+
+    async def aclose(self) -> None:
+        if self._rest is not None and not self._rest.done():
+            self._rest.cancel()
+            await asyncio.gather(self._rest, return_exceptions=True)
+        await self._events.aclose()
 
 
 # =============================================================================
@@ -336,7 +434,7 @@ IMPORTANT: If "Existing constraints" are provided, you MUST include a spec defin
 Return ONLY the JSON array, no explanation."""
 
     try:
-        text = await call_gemini(prompt, timeout=20.0)
+        text = await call_gemini(prompt, timeout=20.0, cache=True)
         factors = _extract_json_array(text)
 
         if not isinstance(factors, list):
@@ -582,7 +680,7 @@ Return JSON ONLY:
 }}"""
 
     try:
-        text = await call_gemini(prompt, timeout=20.0)
+        text = await call_gemini(prompt, timeout=20.0, cache=True)
         parsed = _extract_json(text)
         if isinstance(parsed.get("suggested_vendor_search_queries"), list):
             parsed["suggested_vendor_search_queries"] = [
@@ -627,7 +725,7 @@ Return JSON ONLY:
 {{"provider_query":"..."}}"""
 
     try:
-        text = await call_gemini(prompt, timeout=15.0)
+        text = await call_gemini(prompt, timeout=15.0, cache=True)
         parsed = _extract_json(text)
         q = parsed.get("provider_query", "").strip()
         return q or _heuristic_provider_query(display_query or row_title or "")
@@ -0,0 +1,312 @@
+"""Response cache and request coalescing for deterministic LLM prompts.
+
+Triage, intent extraction, choice factors and vendor coverage assessment call
+``call_gemini`` at low temperature with inputs that repeat constantly (the same
+row title, the same choice answers, the same public query). Their responses are
+cached by a hash of (models, prompt, image URLs):
+
+- An in-process LRU tier (always on) and an optional Postgres table shared
+  across workers (``LLM_CACHE_BACKEND=postgres``), both bounded by a TTL.
+- Concurrent misses for the same prompt share one upstream call.
+- Errors are never cached; neither are empty responses.
+
+Callers opt in with ``call_gemini(..., cache=True)``. Upstream latency, cache
+hits and the latency they saved are reported through
+``llm_api_duration_seconds`` (``provider="cache"`` for hits) when Prometheus is
+available.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sourcing.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+try:  # prometheus_client is optional
+    from observability.metrics import (
+        cache_hits_total,
+        cache_misses_total,
+        llm_api_duration_seconds,
+        llm_cache_saved_seconds_total,
+    )
+except Exception:  # pragma: no cover - depends on installed extras
+    cache_hits_total = cache_misses_total = None
+    llm_api_duration_seconds = llm_cache_saved_seconds_total = None
+
+CACHE_TYPE = "llm"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def observe_llm_call(provider: str, model: str, seconds: float) -> None:
+    """Record one LLM call (or cache hit) in ``llm_api_duration_seconds``."""
+    if llm_api_duration_seconds is not None:
+        llm_api_duration_seconds.labels(provider=provider, model=model).observe(seconds)
+
+
+def build_llm_cache_key(
+    prompt: str, models: List[str], image_urls: Optional[List[str]] = None
+) -> str:
+    payload = json.dumps(
+        {"models": models, "prompt": prompt, "images": list(image_urls or [])},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedLLMResponse:
+    """A cached completion. ``expires_at`` is epoch seconds."""
+
+    response: str
+    model: str
+    latency_seconds: float
+    expires_at: float
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= self.expires_at
+
+
+@dataclass
+class LLMCacheConfig:
+    ttl_seconds: float = 3600.0
+    max_entries: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "LLMCacheConfig":
+        return cls(
+            ttl_seconds=_env_float("LLM_CACHE_TTL_SECONDS", 3600.0),
+            max_entries=int(_env_float("LLM_CACHE_MAX_ENTRIES", 1024)),
+        )
+
+
+class MemoryLLMCache:
+    """Bounded in-process LRU tier."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, CachedLLMResponse]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedLLMResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedLLMResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PostgresLLMCache:
+    """Shared tier backed by the llm_response_cache table."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from sqlalchemy.orm import sessionmaker
+            from sqlmodel.ext.asyncio.session import AsyncSession
+
+            from database import engine
+
+            self._session_factory = sessionmaker(
+                engine, class_=AsyncSession, expire_on_commit=False
+            )
+        return self._session_factory()
+
+    async def get(self, key: str) -> Optional[CachedLLMResponse]:
+        from sqlmodel import select
+
+        from models import LLMResponseCacheEntry
+
+        async with self._session() as session:
+            result = await session.exec(
+                select(LLMResponseCacheEntry).where(LLMResponseCacheEntry.cache_key == key)
+            )
+            row = result.first()
+            if not row or row.expires_at < datetime.utcnow():
+                return None
+            row.hit_count = (row.hit_count or 0) + 1
+            row.updated_at = datetime.utcnow()
+            session.add(row)
+            await session.commit()
+
+        return CachedLLMResponse(
+            response=row.response,
+            model=row.model,
+            latency_seconds=(row.latency_ms or 0) / 1000.0,
+            expires_at=time.time() + (row.expires_at - datetime.utcnow()).total_seconds(),
+        )
+
+    async def set(self, key: str, entry: CachedLLMResponse) -> None:
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        from models import LLMResponseCacheEntry
+
+        now_utc = datetime.utcnow()
+        values = {
+            "cache_key": key,
+            "response": entry.response,
+            "model": entry.model,
+            "latency_ms": int(entry.latency_seconds * 1000),
+            "expires_at": now_utc + timedelta(seconds=max(0.0, entry.expires_at - time.time())),
+            "updated_at": now_utc,
+        }
+        stmt = pg_insert(LLMResponseCacheEntry.__table__).values(
+            created_at=now_utc, hit_count=0, **values
+        )
+        stmt = stmt.on_conflict_do_update(index_elements=["cache_key"], set_=values)
+        async with self._session() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+
+class LLMResponseCache:
+    """Tiered prompt cache with single-flight coalescing of concurrent misses."""
+
+    def __init__(self, config: Optional[LLMCacheConfig] = None, tiers: Optional[List[Any]] = None):
+        self.config = config or LLMCacheConfig()
+        self.tiers = tiers if tiers is not None else [MemoryLLMCache(self.config.max_entries)]
+        self.flights = SingleFlight()
+        self.stats: Dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "errors": 0,
+            "saved_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        """Build the cache from LLM_CACHE_* settings; None when disabled."""
+        enabled = (os.getenv("LLM_CACHE_ENABLED", "true") or "").strip().lower()
+        if enabled in ("0", "false", "no", "off"):
+            return None
+        config = LLMCacheConfig.from_env()
+        tiers: List[Any] = [MemoryLLMCache(config.max_entries)]
+        backend = (os.getenv("LLM_CACHE_BACKEND", "memory") or "").strip().lower()
+        if backend == "postgres":
+            tiers.append(PostgresLLMCache())
+        return cls(config, tiers)
+
+    async def lookup(self, key: str) -> Optional[CachedLLMResponse]:
+        """Return an unexpired entry from the first tier that has one."""
+        for index, tier in enumerate(self.tiers):
+            try:
+                entry = await tier.get(key)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"[LLMCache] {type(tier).__name__} lookup failed: {e}")
+                continue
+            if entry is None:
+                continue
+            # Promote shared-tier hits into the faster tiers above it.
+            for upper in self.tiers[:index]:
+                try:
+                    await upper.set(key, entry)
+                except Exception:
+                    pass
+            return entry
+        return None
+
+    async def store(self, key: str, entry: CachedLLMResponse) -> None:
+        for tier in self.tiers:
+            try:
+                await tier.set(key, entry)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"[LLMCache] {type(tier).__name__} store failed: {e}")
+        self.stats["stores"] += 1
+
+    def _record_hit(self, entry: CachedLLMResponse, lookup_seconds: float) -> None:
+        saved = max(0.0, entry.latency_seconds - lookup_seconds)
+        self.stats["hits"] += 1
+        self.stats["saved_seconds"] += saved
+        observe_llm_call("cache", entry.model, lookup_seconds)
+        if cache_hits_total is not None:
+            cache_hits_total.labels(cache_type=CACHE_TYPE).inc()
+            llm_cache_saved_seconds_total.inc(saved)
+
+    async def get_or_call(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[str]],
+        model: str = "",
+    ) -> str:
+        """Serve ``key`` from cache, else run ``call`` once for concurrent callers and cache it."""
+        t0 = time.monotonic()
+        entry = await self.lookup(key)
+        if entry is not None:
+            self._record_hit(entry, time.monotonic() - t0)
+            return entry.response
+
+        async def _fill() -> str:
+            self.stats["misses"] += 1
+            if cache_misses_total is not None:
+                cache_misses_total.labels(cache_type=CACHE_TYPE).inc()
+            started = time.monotonic()
+            response = await call()
+            if response and response.strip():
+                await self.store(
+                    key,
+                    CachedLLMResponse(
+                        response=response,
+                        model=model,
+                        latency_seconds=time.monotonic() - started,
+                        expires_at=time.time() + self.config.ttl_seconds,
+                    ),
+                )
+            return response
+
+        return await self.flights.do(key, _fill)
+
+    def snapshot(self) -> Dict[str, Any]:
+        memory = next((t for t in self.tiers if isinstance(t, MemoryLLMCache)), None)
+        return {
+            **self.stats,
+            "saved_seconds": round(self.stats["saved_seconds"], 3),
+            "coalesced": self.flights.stats["coalesced"],
+            "entries": len(memory) if memory is not None else 0,
+            "inflight": self.flights.inflight_count(),
+        }
+
+
+llm_response_cache: Optional[LLMResponseCache] = LLMResponseCache.from_env()
+
+
+__all__ = [
+    "CachedLLMResponse",
+    "LLMCacheConfig",
+    "LLMResponseCache",
+    "MemoryLLMCache",
+    "PostgresLLMCache",
+    "build_llm_cache_key",
+    "llm_response_cache",
+    "observe_llm_call",
+]
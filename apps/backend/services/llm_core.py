@@ -8,7 +8,7 @@ import logging
 import os
 import re
 import time
-from typing import Optional, List, Any
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 import httpx
 
@@ -30,20 +30,13 @@ def _get_openrouter_api_key() -> str:
     return os.getenv("OPENROUTER_API_KEY") or ""
 
 
-async def _call_gemini_direct(prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None) -> str:
-    """Call Gemini REST API directly."""
-    api_key = _get_gemini_api_key()
-    if not api_key:
-        raise ValueError("No Gemini API key")
+async def _gemini_parts(prompt: str, image_urls: Optional[List[str]] = None) -> List[dict]:
+    parts: List[dict] = [{"text": prompt}]
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
-
-    parts = [{"text": prompt}]
-    
     if image_urls:
         import base64
         import mimetypes
-        
+
         async with httpx.AsyncClient() as dl_client:
             for img_url in image_urls:
                 try:
@@ -51,7 +44,7 @@ async def _call_gemini_direct(prompt: str, timeout: float = 30.0, image_urls: Op
                     resp.raise_for_status()
                     b64_data = base64.b64encode(resp.content).decode("utf-8")
                     mime_type = mimetypes.guess_type(img_url)[0] or "image/jpeg"
-                    
+
                     parts.append({
                         "inlineData": {
                             "mimeType": mime_type,
@@ -60,8 +53,11 @@ async def _call_gemini_direct(prompt: str, timeout: float = 30.0, image_urls: Op
                     })
                 except Exception as e:
                     logger.warning(f"[LLM] Failed to download image {img_url} for Gemini fallback: {e}")
+    return parts
 
-    payload = {
+
+def _gemini_payload(parts: List[dict]) -> dict:
+    return {
         "contents": [{"parts": parts}],
         "generationConfig": {
             "temperature": 0.2,
@@ -69,6 +65,26 @@ async def _call_gemini_direct(prompt: str, timeout: float = 30.0, image_urls: Op
         },
     }
 
+
+def _gemini_text(data: dict) -> str:
+    candidates = data.get("candidates", [])
+    if not candidates:
+        raise ValueError("Gemini returned no candidates")
+    parts = candidates[0].get("content", {}).get("parts", [])
+    if not parts:
+        raise ValueError("Gemini returned no content parts")
+    return parts[0].get("text", "")
+
+
+async def _call_gemini_direct(prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None) -> str:
+    """Call Gemini REST API directly."""
+    api_key = _get_gemini_api_key()
+    if not api_key:
+        raise ValueError("No Gemini API key")
+
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+    payload = _gemini_payload(await _gemini_parts(prompt, image_urls))
+
     async with httpx.AsyncClient() as client:
         resp = await client.post(
             url,
@@ -79,17 +95,13 @@ async def _call_gemini_direct(prompt: str, timeout: float = 30.0, image_urls: Op
         resp.raise_for_status()
         data = resp.json()
 
-    candidates = data.get("candidates", [])
-    if not candidates:
-        raise ValueError("Gemini returned no candidates")
-    parts = candidates[0].get("content", {}).get("parts", [])
-    if not parts:
-        raise ValueError("Gemini returned no content parts")
-    return parts[0].get("text", "")
+    return _gemini_text(data)
 
 
-async def _call_openrouter(prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None) -> str:
-    """Call OpenRouter API (OpenAI-compatible)."""
+def _openrouter_request(
+    prompt: str, image_urls: Optional[List[str]] = None
+) -> Tuple[str, dict, dict]:
+    """(url, headers, payload) for an OpenRouter chat completion."""
     api_key = _get_openrouter_api_key()
     if not api_key:
         raise ValueError("No OpenRouter API key (OPENROUTER_API_KEY)")
@@ -119,6 +131,12 @@ async def _call_openrouter(prompt: str, timeout: float = 30.0, image_urls: Optio
         "temperature": 0.2,
         "max_tokens": 4096,
     }
+    return url, headers, payload
+
+
+async def _call_openrouter(prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None) -> str:
+    """Call OpenRouter API (OpenAI-compatible)."""
+    url, headers, payload = _openrouter_request(prompt, image_urls)
 
     async with httpx.AsyncClient() as client:
         resp = await client.post(url, headers=headers, json=payload, timeout=timeout)
@@ -131,29 +149,131 @@ async def _call_openrouter(prompt: str, timeout: float = 30.0, image_urls: Optio
     return choices[0].get("message", {}).get("content", "")
 
 
-async def call_gemini(prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None) -> str:
-    """Call LLM: try OpenRouter first, fall back to Gemini direct. Circuit-breaker on 402."""
+async def _sse_data(resp: httpx.Response) -> AsyncIterator[str]:
+    """Yield the ``data:`` payloads of a server-sent event stream."""
+    async for line in resp.aiter_lines():
+        if line.startswith("data:"):
+            yield line[len("data:"):].strip()
+
+
+async def _stream_openrouter(
+    prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None
+) -> AsyncIterator[str]:
+    """Stream an OpenRouter completion as text deltas."""
+    url, headers, payload = _openrouter_request(prompt, image_urls)
+    payload["stream"] = True
+
+    async with httpx.AsyncClient() as client:
+        async with client.stream(
+            "POST", url, headers=headers, json=payload, timeout=timeout
+        ) as resp:
+            resp.raise_for_status()
+            async for data in _sse_data(resp):
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("error"):
+                    raise ValueError(f"OpenRouter stream error: {chunk['error']}")
+                choices = chunk.get("choices") or []
+                text = (choices[0].get("delta") or {}).get("content") if choices else None
+                if text:
+                    yield text
+
+
+async def _stream_gemini_direct(
+    prompt: str, timeout: float = 30.0, image_urls: Optional[List[str]] = None
+) -> AsyncIterator[str]:
+    """Stream a Gemini completion (streamGenerateContent over SSE) as text deltas."""
+    api_key = _get_gemini_api_key()
+    if not api_key:
+        raise ValueError("No Gemini API key")
+
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:streamGenerateContent"
+    payload = _gemini_payload(await _gemini_parts(prompt, image_urls))
+
+    async with httpx.AsyncClient() as client:
+        async with client.stream(
+            "POST", url, params={"key": api_key, "alt": "sse"}, json=payload, timeout=timeout
+        ) as resp:
+            resp.raise_for_status()
+            async for data in _sse_data(resp):
+                candidates = json.loads(data).get("candidates") or []
+                content = (candidates[0].get("content") or {}) if candidates else {}
+                parts = content.get("parts") or []
+                text = "".join(part.get("text", "") for part in parts)
+                if text:
+                    yield text
+
+
+def _note_openrouter_failure(e: Exception) -> None:
+    """Log an OpenRouter failure and open the 402 circuit breaker when out of credits."""
     global _openrouter_backoff_until
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == 402:
+            _openrouter_backoff_until = time.monotonic() + _OPENROUTER_BACKOFF_SECS
+            logger.error(f"[LLM] OpenRouter 402 — OUT OF CREDITS. Skipping for {_OPENROUTER_BACKOFF_SECS}s.")
+        else:
+            logger.warning(f"[LLM] OpenRouter HTTP {e.response.status_code}, falling back to Gemini direct")
+    else:
+        logger.warning(f"[LLM] OpenRouter failed ({e}), falling back to Gemini direct")
+
+
+def _openrouter_available() -> bool:
+    if not _get_openrouter_api_key():
+        return False
+    if time.monotonic() >= _openrouter_backoff_until:
+        return True
+    remaining = int(_openrouter_backoff_until - time.monotonic())
+    logger.info(f"[LLM] OpenRouter circuit breaker active ({remaining}s remaining), using Gemini direct")
+    return False
+
+
+_NO_KEY_MESSAGE = (
+    "No LLM API key configured "
+    "(OPENROUTER_API_KEY, GEMINI_API_KEY, or GOOGLE_GENERATIVE_AI_API_KEY)"
+)
+
+
+async def call_gemini(
+    prompt: str,
+    timeout: float = 30.0,
+    image_urls: Optional[List[str]] = None,
+    cache: bool = False,
+) -> str:
+    """Call LLM: try OpenRouter first, fall back to Gemini direct. Circuit-breaker on 402.
+
+    With ``cache=True`` the response is served from / stored in the prompt cache
+    (services/llm_cache.py) and concurrent identical prompts share one call. Only
+    use it for prompts whose answer depends on nothing but the prompt text.
+    """
+    if cache:
+        from services.llm_cache import build_llm_cache_key, llm_response_cache
+
+        if llm_response_cache is not None:
+            key = build_llm_cache_key(prompt, [OPENROUTER_MODEL, GEMINI_MODEL], image_urls)
+            return await llm_response_cache.get_or_call(
+                key,
+                lambda: _call_llm(prompt, timeout, image_urls),
+                model=OPENROUTER_MODEL if _get_openrouter_api_key() else GEMINI_MODEL,
+            )
+    return await _call_llm(prompt, timeout, image_urls)
+
+
+async def _call_llm(prompt: str, timeout: float, image_urls: Optional[List[str]]) -> str:
+    from services.llm_cache import observe_llm_call
+
     t0 = time.monotonic()
 
     # Primary: OpenRouter (skip if circuit breaker is active)
-    if _get_openrouter_api_key() and time.monotonic() >= _openrouter_backoff_until:
+    if _openrouter_available():
         try:
             result = await _call_openrouter(prompt, timeout, image_urls=image_urls)
             elapsed = time.monotonic() - t0
             logger.info(f"[LLM] OpenRouter responded in {elapsed:.1f}s")
+            observe_llm_call("openrouter", OPENROUTER_MODEL, elapsed)
             return result
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 402:
-                _openrouter_backoff_until = time.monotonic() + _OPENROUTER_BACKOFF_SECS
-                logger.error(f"[LLM] OpenRouter 402 — OUT OF CREDITS. Skipping for {_OPENROUTER_BACKOFF_SECS}s.")
-            else:
-                logger.warning(f"[LLM] OpenRouter HTTP {e.response.status_code}, falling back to Gemini direct")
         except Exception as e:
-            logger.warning(f"[LLM] OpenRouter failed ({e}), falling back to Gemini direct")
-    elif _get_openrouter_api_key():
-        remaining = int(_openrouter_backoff_until - time.monotonic())
-        logger.info(f"[LLM] OpenRouter circuit breaker active ({remaining}s remaining), using Gemini direct")
+            _note_openrouter_failure(e)
 
     # Fallback: Gemini direct API
     if _get_gemini_api_key():
@@ -161,12 +281,58 @@ async def call_gemini(prompt: str, timeout: float = 30.0, image_urls: Optional[L
             result = await _call_gemini_direct(prompt, timeout, image_urls=image_urls)
             elapsed = time.monotonic() - t0
             logger.info(f"[LLM] Gemini direct responded in {elapsed:.1f}s")
+            observe_llm_call("gemini", GEMINI_MODEL, elapsed)
             return result
         except Exception as e:
             logger.error(f"[LLM] Gemini direct also failed: {e}")
             raise
 
-    raise ValueError("No LLM API key configured (OPENROUTER_API_KEY, GEMINI_API_KEY, or GOOGLE_GENERATIVE_AI_API_KEY)")
+    raise ValueError(_NO_KEY_MESSAGE)
+
+
+async def stream_gemini(
+    prompt: str,
+    timeout: float = 30.0,
+    image_urls: Optional[List[str]] = None,
+) -> AsyncIterator[str]:
+    """Streaming call_gemini: yield text chunks as the model produces them.
+
+    Same provider order and 402 circuit breaker as call_gemini. A provider that
+    fails before its first chunk falls back to the next one; a failure after
+    text has been yielded is raised to the caller.
+    """
+    from services.llm_cache import observe_llm_call
+
+    t0 = time.monotonic()
+
+    if _openrouter_available():
+        started = False
+        try:
+            async for chunk in _stream_openrouter(prompt, timeout, image_urls=image_urls):
+                started = True
+                yield chunk
+            elapsed = time.monotonic() - t0
+            logger.info(f"[LLM] OpenRouter stream finished in {elapsed:.1f}s")
+            observe_llm_call("openrouter", OPENROUTER_MODEL, elapsed)
+            return
+        except Exception as e:
+            if started:
+                raise
+            _note_openrouter_failure(e)
+
+    if _get_gemini_api_key():
+        try:
+            async for chunk in _stream_gemini_direct(prompt, timeout, image_urls=image_urls):
+                yield chunk
+        except Exception as e:
+            logger.error(f"[LLM] Gemini direct stream failed: {e}")
+            raise
+        elapsed = time.monotonic() - t0
+        logger.info(f"[LLM] Gemini direct stream finished in {elapsed:.1f}s")
+        observe_llm_call("gemini", GEMINI_MODEL, elapsed)
+        return
+
+    raise ValueError(_NO_KEY_MESSAGE)
 
 
 def _extract_json(text: str) -> dict:
@@ -0,0 +1,89 @@
+"""Event-loop lag monitor.
+
+A coroutine sleeps for a fixed interval and measures how late it wakes up. The
+overshoot is the time the loop spent running something else without yielding
+(inline CPU work, a blocking call), which every other request on the worker
+waited through. Lag is exported as the ``event_loop_lag_seconds`` histogram and
+summarized on /admin/metrics; wakeups later than ``EVENT_LOOP_LAG_WARN_SECONDS``
+are logged.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:  # prometheus_client is optional
+    from observability.metrics import event_loop_lag_seconds
+except Exception:  # pragma: no cover - depends on installed extras
+    event_loop_lag_seconds = None
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class EventLoopLagMonitor:
+    """Samples scheduling delay of the running loop; see ``run``."""
+
+    def __init__(self, interval: float = 0.5, warn_threshold: float = 0.1, window: int = 120):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._recent: Deque[float] = deque(maxlen=window)
+        self.samples = 0
+        self.slow_samples = 0
+        self.max_lag = 0.0
+
+    @classmethod
+    def from_env(cls) -> "EventLoopLagMonitor":
+        return cls(
+            interval=_env_float("EVENT_LOOP_LAG_INTERVAL_SECONDS", 0.5),
+            warn_threshold=_env_float("EVENT_LOOP_LAG_WARN_SECONDS", 0.1),
+        )
+
+    def record(self, lag: float) -> None:
+        lag = max(0.0, lag)
+        self.samples += 1
+        self._recent.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        if event_loop_lag_seconds is not None:
+            event_loop_lag_seconds.observe(lag)
+        if lag >= self.warn_threshold:
+            self.slow_samples += 1
+            logger.warning(f"[LoopLag] Event loop blocked for {lag * 1000:.0f}ms")
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Sample until ``stop`` is set."""
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            started = loop.time()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            self.record(loop.time() - started - self.interval)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        p99: Optional[float] = None
+        if recent:
+            p99 = recent[min(len(recent) - 1, int(len(recent) * 0.99))]
+        return {
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "slow_samples": self.slow_samples,
+            "last_ms": round(self._recent[-1] * 1000, 1) if self._recent else None,
+            "recent_p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "max_ms": round(self.max_lag * 1000, 1),
+        }
+
+
+# Process-wide: started by main.py, read by /admin/metrics.
+loop_lag_monitor = EventLoopLagMonitor.from_env()
@@ -0,0 +1,159 @@
+"""Daily rollups of event metrics for the admin dashboards.
+
+``/admin/metrics``, ``/admin/stats``, ``/admin/revenue`` and ``/admin/growth``
+used to run a dozen sequential ``COUNT``/``SUM`` scans over bid, clickout_event,
+purchase_event, row, share_link and user per request. Those additive, per-event
+numbers are now kept in ``metrics_daily_rollup`` (one row per day, metric and
+optional dimension) and read back with a single grouped query.
+
+``refresh_rollups`` recomputes a trailing window of days in one
+``DELETE`` + ``INSERT ... SELECT`` transaction, so it is idempotent and cheap
+(each source query is a range scan on a ``created_at`` index). It runs as the
+periodic ``metrics.rollup`` job; the first run backfills the full history.
+Numbers that are not additive per day (distinct users, current row status,
+mutable share counters) stay live in the routes.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# metric -> SELECT producing (day, dimension, value) for rows created since :since
+ROLLUP_SOURCES: Dict[str, str] = {
+    "bids_created": (
+        "SELECT created_at::date, '', COUNT(*) FROM bid WHERE created_at >= :since GROUP BY 1"
+    ),
+    "rows_created": (
+        'SELECT created_at::date, \'\', COUNT(*) FROM "row" WHERE created_at >= :since GROUP BY 1'
+    ),
+    "users_created": (
+        'SELECT created_at::date, \'\', COUNT(*) FROM "user" WHERE created_at >= :since GROUP BY 1'
+    ),
+    "referral_signups": (
+        'SELECT created_at::date, \'\', COUNT(*) FROM "user" '
+        "WHERE created_at >= :since AND referral_share_token IS NOT NULL GROUP BY 1"
+    ),
+    "shares_created": (
+        "SELECT created_at::date, '', COUNT(*) FROM share_link "
+        "WHERE created_at >= :since GROUP BY 1"
+    ),
+    # dimension = handler name; the unbroken total is the sum over dimensions
+    "clickouts": (
+        "SELECT created_at::date, COALESCE(handler_name, ''), COUNT(*) FROM clickout_event "
+        "WHERE created_at >= :since GROUP BY 1, 2"
+    ),
+    "clickouts_suspicious": (
+        "SELECT created_at::date, '', COUNT(*) FROM clickout_event "
+        "WHERE created_at >= :since AND is_suspicious GROUP BY 1"
+    ),
+    "clickouts_affiliate": (
+        "SELECT created_at::date, '', COUNT(*) FROM clickout_event "
+        "WHERE created_at >= :since AND affiliate_tag IS NOT NULL GROUP BY 1"
+    ),
+    # dimension = revenue type
+    "purchases": (
+        "SELECT created_at::date, COALESCE(revenue_type, ''), COUNT(*) FROM purchase_event "
+        "WHERE created_at >= :since GROUP BY 1, 2"
+    ),
+    "gmv": (
+        "SELECT created_at::date, COALESCE(revenue_type, ''), COALESCE(SUM(amount), 0) "
+        "FROM purchase_event WHERE created_at >= :since GROUP BY 1, 2"
+    ),
+    "platform_revenue": (
+        "SELECT created_at::date, COALESCE(revenue_type, ''), "
+        "COALESCE(SUM(platform_fee_amount), 0) "
+        "FROM purchase_event WHERE created_at >= :since GROUP BY 1, 2"
+    ),
+}
+
+# Refresh today and yesterday on every run so late writes are picked up.
+DEFAULT_REFRESH_DAYS = 2
+EPOCH = date(2000, 1, 1)
+
+
+def _refresh_sql(metrics: Iterable[str]) -> sa.TextClause:
+    selects = [
+        f"SELECT '{metric}' AS metric, src.* "
+        f"FROM ({ROLLUP_SOURCES[metric]}) AS src(day, dimension, value)"
+        for metric in metrics
+    ]
+    return sa.text(
+        "INSERT INTO metrics_daily_rollup (day, metric, dimension, value, refreshed_at) "
+        "SELECT day, metric, dimension, value, NOW() FROM ("
+        + " UNION ALL ".join(selects)
+        + ") AS rolled"
+    )
+
+
+async def rollups_exist(session: AsyncSession) -> bool:
+    result = await session.execute(sa.text("SELECT EXISTS (SELECT 1 FROM metrics_daily_rollup)"))
+    return bool(result.scalar())
+
+
+async def refresh_rollups(session: AsyncSession, since: Optional[date] = None) -> date:
+    """Recompute every rollup for days >= ``since`` (default: yesterday) and commit."""
+    if since is None:
+        since = datetime.utcnow().date() - timedelta(days=DEFAULT_REFRESH_DAYS - 1)
+    since_ts = datetime.combine(since, datetime.min.time())
+    await session.execute(
+        sa.text("DELETE FROM metrics_daily_rollup WHERE day >= :since"), {"since": since}
+    )
+    await session.execute(_refresh_sql(ROLLUP_SOURCES), {"since": since_ts})
+    await session.commit()
+    return since
+
+
+class RollupTotals:
+    """Totals over a day range, from one grouped query on ``metrics_daily_rollup``."""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, Any]]):
+        self._values: Dict[Tuple[str, str], float] = {}
+        for metric, dimension, value in rows:
+            self._values[(metric, dimension or "")] = float(value or 0)
+
+    def total(self, metric: str) -> float:
+        return sum(v for (m, _), v in self._values.items() if m == metric)
+
+    def count(self, metric: str) -> int:
+        return int(self.total(metric))
+
+    def by_dimension(self, metric: str) -> Dict[str, float]:
+        return {d: v for (m, d), v in self._values.items() if m == metric}
+
+
+async def load_rollup_totals(
+    session: AsyncSession,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> RollupTotals:
+    result = await session.execute(
+        sa.text(
+            "SELECT metric, dimension, SUM(value) FROM metrics_daily_rollup "
+            "WHERE day >= :since AND day < :until GROUP BY metric, dimension"
+        ),
+        {"since": since or EPOCH, "until": until or date.max},
+    )
+    return RollupTotals(result.all())
+
+
+async def gather_reads(
+    session: AsyncSession, **queries: Callable[[AsyncSession], Awaitable[Any]]
+) -> Dict[str, Any]:
+    """Run independent read queries concurrently, each on its own session on ``session``'s engine.
+
+    An AsyncSession cannot run statements concurrently, so each query gets a
+    short-lived sibling session; without a bind they run sequentially on ``session``.
+    """
+    bind = getattr(session, "bind", None)
+    if bind is None:
+        return {name: await fn(session) for name, fn in queries.items()}
+
+    async def _run(fn: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with AsyncSession(bind, expire_on_commit=False) as read_session:
+            return await fn(read_session)
+
+    values = await asyncio.gather(*[_run(fn) for fn in queries.values()])
+    return dict(zip(queries, values))
@@ -0,0 +1,278 @@
+"""Sliding-window rate limiting shared by every rate-limited route.
+
+Each key keeps two counters: hits in the current fixed window and hits in the
+previous one. A request is allowed while
+
+    previous * (fraction of the current window still to run) + current < limit
+
+which approximates a true sliding window with O(1) work and constant memory per
+key. Denied requests are not counted.
+
+The backend is chosen by ``RATE_LIMIT_BACKEND``:
+
+- ``memory`` (default): per-process counters in an LRU bounded by
+  ``RATE_LIMIT_MAX_KEYS``. Keys with no hits in the current or previous window
+  no longer affect any decision and are dropped first.
+- ``postgres``: counters live in the ``rate_limit_counter`` table, so every
+  worker draws from one budget per key instead of N workers allowing N times the
+  limit. Each check costs one round trip.
+
+``SharedStoreBackend`` works with any ``CounterStore``. ``LocalCounterStore`` is
+an in-process stand-in used by the tests.
+
+If the store fails, the check fails open and is counted in ``errors``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Protocol, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class InProcessBackend:
+    """Counters for this process only, in an LRU of at most ``max_keys`` keys."""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max(1, max_keys)
+        # key -> [window, previous window hits, current window hits]
+        self._entries: "OrderedDict[str, List[int]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"evicted_idle": 0, "evicted_lru": 0}
+
+    async def acquire(self, key: str, window: int, weight: float, limit: int) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [window, 0, 0]
+        else:
+            self._entries.move_to_end(key)
+            if entry[0] != window:
+                entry[1] = entry[2] if entry[0] == window - 1 else 0
+                entry[0], entry[2] = window, 0
+        allowed = entry[1] * weight + entry[2] < limit
+        if allowed:
+            entry[2] += 1
+        self._evict(window)
+        return allowed
+
+    def _evict(self, window: int) -> None:
+        entries = self._entries
+        # LRU order is last-touch order, so idle keys are always at the front.
+        while entries and next(iter(entries.values()))[0] < window - 1:
+            entries.popitem(last=False)
+            self.stats["evicted_idle"] += 1
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+            self.stats["evicted_lru"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "keys": len(self._entries), "max_keys": self.max_keys}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CounterStore(Protocol):
+    """Expiring integer counters shared between workers."""
+
+    async def incr(self, key: str, ttl_seconds: float, read_key: str) -> Tuple[int, int]:
+        """Add one hit to ``key`` and return ``(its new count, the count of read_key)``."""
+
+    async def decr(self, key: str) -> None:
+        ...
+
+
+class SharedStoreBackend:
+    """Counters kept in a ``CounterStore``, one key per (limit key, window)."""
+
+    name = "shared"
+
+    def __init__(self, store: CounterStore, ttl_seconds: float = 120.0):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+
+    async def acquire(self, key: str, window: int, weight: float, limit: int) -> bool:
+        current_key = f"{key}:{window}"
+        current, previous = await self.store.incr(
+            current_key, self.ttl_seconds, f"{key}:{window - 1}"
+        )
+        # ``current`` includes this hit; the check is against the count before it.
+        if previous * weight + current - 1 < limit:
+            return True
+        await self.store.decr(current_key)
+        return False
+
+    def clear(self) -> None:
+        clear = getattr(self.store, "clear", None)
+        if clear is not None:
+            clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"store": type(self.store).__name__}
+
+
+class LocalCounterStore:
+    """In-process ``CounterStore``.
+
+    Limiters sharing one instance behave like workers sharing a store.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._counters: Dict[str, List[float]] = {}  # key -> [hits, expires_at]
+
+    async def incr(self, key: str, ttl_seconds: float, read_key: str) -> Tuple[int, int]:
+        now = self.clock()
+        counter = self._counters.get(key)
+        if counter is None or counter[1] <= now:
+            counter = self._counters[key] = [0, now + ttl_seconds]
+        counter[0] += 1
+        other = self._counters.get(read_key)
+        return int(counter[0]), int(other[0]) if other is not None and other[1] > now else 0
+
+    async def decr(self, key: str) -> None:
+        counter = self._counters.get(key)
+        if counter is not None:
+            counter[0] -= 1
+
+    def clear(self) -> None:
+        self._counters.clear()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class PostgresCounterStore:
+    """``CounterStore`` over the UNLOGGED ``rate_limit_counter`` table.
+
+    Expired counters are deleted at most once per ``purge_interval_seconds``, in
+    the same transaction as a check.
+    """
+
+    _INCR = text("""
+        WITH hit AS (
+            INSERT INTO rate_limit_counter (key, hits, expires_at)
+            VALUES (:key, 1, now() + make_interval(secs => :ttl))
+            ON CONFLICT (key) DO UPDATE SET hits = rate_limit_counter.hits + 1
+            RETURNING hits
+        )
+        SELECT (SELECT hits FROM hit),
+               COALESCE((SELECT hits FROM rate_limit_counter WHERE key = :read_key), 0)
+    """)
+    _DECR = text("UPDATE rate_limit_counter SET hits = hits - 1 WHERE key = :key")
+    _PURGE = text("DELETE FROM rate_limit_counter WHERE expires_at < now()")
+
+    def __init__(self, engine=None, purge_interval_seconds: float = 60.0):
+        self._engine = engine
+        self.purge_interval_seconds = purge_interval_seconds
+        self._next_purge = 0.0
+
+    def _get_engine(self):
+        if self._engine is None:
+            from database import engine
+
+            self._engine = engine
+        return self._engine
+
+    async def incr(self, key: str, ttl_seconds: float, read_key: str) -> Tuple[int, int]:
+        async with self._get_engine().begin() as conn:
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self.purge_interval_seconds
+                await conn.execute(self._PURGE)
+            current, previous = (
+                await conn.execute(
+                    self._INCR, {"key": key, "ttl": float(ttl_seconds), "read_key": read_key}
+                )
+            ).one()
+        return current, previous
+
+    async def decr(self, key: str) -> None:
+        async with self._get_engine().begin() as conn:
+            await conn.execute(self._DECR, {"key": key})
+
+
+class RateLimiter:
+    """Approximate sliding-window limiter over a pluggable backend."""
+
+    def __init__(
+        self,
+        backend=None,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend if backend is not None else InProcessBackend()
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.stats: Dict[str, int] = {"allowed": 0, "denied": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls, window_seconds: float = 60.0) -> "RateLimiter":
+        """Build the limiter from RATE_LIMIT_* settings."""
+        backend_name = (os.getenv("RATE_LIMIT_BACKEND", "memory") or "").strip().lower()
+        if backend_name == "postgres":
+            backend = SharedStoreBackend(PostgresCounterStore(), ttl_seconds=2 * window_seconds)
+        else:
+            backend = InProcessBackend(max_keys=int(_env_float("RATE_LIMIT_MAX_KEYS", 100_000)))
+        return cls(backend=backend, window_seconds=window_seconds)
+
+    async def allow(self, key: str, limit: int) -> bool:
+        """Count one hit for ``key`` and return True if it is within ``limit`` per window."""
+        window, offset = divmod(self.clock(), self.window_seconds)
+        weight = 1 - offset / self.window_seconds
+        try:
+            allowed = await self.backend.acquire(key, int(window), weight, limit)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"[RateLimit] {self.backend.name} backend failed, allowing {key}: {e}")
+            return True
+        self.stats["allowed" if allowed else "denied"] += 1
+        return allowed
+
+    def retry_after(self) -> int:
+        """Seconds until the current window ends, for a Retry-After header."""
+        return max(1, math.ceil(self.window_seconds - self.clock() % self.window_seconds))
+
+    def clear(self) -> None:
+        self.backend.clear()
+        for name in self.stats:
+            self.stats[name] = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "backend": self.backend.name,
+            "window_seconds": self.window_seconds,
+            **self.backend.snapshot(),
+        }
+
+
+rate_limiter: RateLimiter = RateLimiter.from_env()
+
+
+__all__ = [
+    "CounterStore",
+    "InProcessBackend",
+    "LocalCounterStore",
+    "PostgresCounterStore",
+    "RateLimiter",
+    "SharedStoreBackend",
+    "rate_limiter",
+]
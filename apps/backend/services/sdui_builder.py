@@ -10,8 +10,11 @@ See PRD-SDUI-Schema-Spec.md §8.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
 
 from services.sdui_schema import (
     BLOCK_TYPES,
@@ -519,6 +522,100 @@ BLOCK_HYDRATORS = {
 }
 
 
+class BlockInputs(NamedTuple):
+    """Row/bid fields a hydrator reads, and how many of the capped bids it looks at."""
+    row_fields: Tuple[str, ...] = ()
+    bid_fields: Tuple[str, ...] = ()
+    bid_limit: Optional[int] = None  # None = every capped bid
+
+
+# Keep in sync with the hydrators above: a field missing here means a change to it
+# would not invalidate the cached block.
+BLOCK_INPUTS: Dict[str, BlockInputs] = {
+    "ProductImage": BlockInputs(bid_fields=("image_url", "item_title")),
+    "PriceBlock": BlockInputs(bid_fields=("price", "currency")),
+    "DataGrid": BlockInputs(row_fields=("choice_answers",)),
+    "FeatureList": BlockInputs(bid_fields=("provenance",), bid_limit=3),
+    "BadgeList": BlockInputs(row_fields=("status",), bid_fields=("source",), bid_limit=5),
+    "MarkdownText": BlockInputs(row_fields=("title",)),
+    "Timeline": BlockInputs(row_fields=("status",)),
+    "MessageList": BlockInputs(row_fields=("chat_history",)),
+    "ChoiceFactorForm": BlockInputs(row_fields=("choice_factors",)),
+    # The "View All" action also depends on the bid cap and total count (see block_fingerprint).
+    "ActionRow": BlockInputs(bid_fields=("item_url", "id", "source"), bid_limit=1),
+}
+
+
+def _digest(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def block_fingerprint(block_type: str, row: "Row", bids: List["Bid"], **context: Any) -> str:
+    """Content hash of exactly the inputs BLOCK_HYDRATORS[block_type] reads."""
+    inputs = BLOCK_INPUTS.get(block_type, BlockInputs())
+    scanned = bids if inputs.bid_limit is None else bids[:inputs.bid_limit]
+    bid_values = (
+        [[getattr(b, f, None) for f in inputs.bid_fields] for b in scanned]
+        if inputs.bid_fields else []
+    )
+    return _digest({
+        "block": block_type,
+        "row": [getattr(row, f, None) for f in inputs.row_fields],
+        "bids": bid_values,
+        **context,
+    })
+
+
+def schema_digest(schema: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Stable hash of a persisted schema dict (key order and JSON round-trips don't matter)."""
+    return _digest(schema) if schema is not None else None
+
+
+_MISSING = object()
+
+
+class HydratedBlockCache:
+    """Bounded LRU of hydrated blocks keyed by block_fingerprint()."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Optional[UIBlock]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        block = self._entries.get(key, _MISSING)
+        if block is _MISSING:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return block
+
+    def put(self, key: str, block: Optional[UIBlock]) -> None:
+        self._entries[key] = block
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+block_cache = HydratedBlockCache()
+
+
 # ---------------------------------------------------------------------------
 # Main Builder
 # ---------------------------------------------------------------------------
@@ -532,7 +629,8 @@ def hydrate_ui_schema(
     Hydrate a UISchema from an LLM-selected UIHint + real data.
 
     The LLM picks the layout and block types; this function fills in
-    all field values from structured Row/Bid data.
+    all field values from structured Row/Bid data. Blocks whose inputs
+    are unchanged since they were last hydrated come from block_cache.
     """
     schema = UISchema(
         version=1,
@@ -553,9 +651,17 @@ def hydrate_ui_schema(
 
         # ActionRow needs the total count (before capping) for "View All"
         if block_type == "ActionRow":
-            block = hydrator(row, capped_bids, total_bid_count=total_bid_count)
+            context = {"cap": get_bid_cap(row, capped_bids), "total": total_bid_count}
         else:
-            block = hydrator(row, capped_bids)
+            context = {}
+        key = block_fingerprint(block_type, row, capped_bids, **context)
+        block = block_cache.get(key)
+        if block is _MISSING:
+            if block_type == "ActionRow":
+                block = hydrator(row, capped_bids, total_bid_count=total_bid_count)
+            else:
+                block = hydrator(row, capped_bids)
+            block_cache.put(key, block)
 
         if block:
             schema.blocks.append(block)
@@ -594,6 +700,20 @@ def build_ui_schema(
         return get_minimum_viable_row(title=title, status=status)
 
 
+def apply_ui_schema(entity: Any, schema: Dict[str, Any]) -> bool:
+    """Store schema on a Row/Bid and bump ui_schema_version — unless it is unchanged.
+
+    Returns False (and leaves the entity untouched) when the stored schema already
+    matches, so callers can skip the write.
+    """
+    current = getattr(entity, "ui_schema", None)
+    if current is not None and schema_digest(current) == schema_digest(schema):
+        return False
+    entity.ui_schema = schema
+    entity.ui_schema_version = (getattr(entity, "ui_schema_version", 0) or 0) + 1
+    return True
+
+
 def build_project_ui_schema(project: "Project") -> Dict[str, Any]:
     """Build a Project-level ui_schema (list header)."""
     blocks: List[Dict[str, Any]] = []
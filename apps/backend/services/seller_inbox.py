@@ -0,0 +1,224 @@
+"""Seller inbox matching: which open buyer rows a merchant sees.
+
+Every write to a row stores ``row.match_terms`` (see ``utils.match_terms``), the
+normalized tokens of its title, service category and the search intent's category
+fields. The inbox filters on ``row.match_terms @> merchant_terms``, which a GIN
+index serves. The old filter was a leading-wildcard ILIKE over ``search_intent``
+cast to text, which forced a sequential scan. Pages are keyset-paginated on
+``(created_at, id)``.
+
+With ``SELLER_INBOX_MATCH_TABLE=true``, ``seller_row_match`` also holds the
+precomputed (merchant, open row) pairs, and the inbox reads one index range of it.
+Mapper events keep the table current:
+
+- when a row is inserted, or its status or terms change
+- when a merchant's category changes
+
+Run ``python -m services.seller_inbox rebuild`` once after turning it on.
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select
+
+from models import Row, SellerRowMatch, Vendor
+from utils.match_terms import SQL_TERMS_TEMPLATE, match_terms
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_ROW_STATUSES = ("sourcing", "inviting", "bids_arriving", "open", "active")
+
+_ACTIVE_SQL = ", ".join(f"'{status}'" for status in ACTIVE_ROW_STATUSES)
+_VENDOR_TERMS_SQL = SQL_TERMS_TEMPLATE.format(expr="v.category")
+_MERCHANT_SQL = (
+    f"v.user_id IS NOT NULL AND v.category IS NOT NULL AND cardinality({_VENDOR_TERMS_SQL}) > 0"
+)
+
+_INSERT_ROW_MATCHES = sa.text(f"""
+    INSERT INTO seller_row_match (merchant_id, row_id, row_created_at)
+    SELECT v.id, :row_id, :row_created_at FROM vendor v
+    WHERE {_MERCHANT_SQL} AND CAST(:terms AS text[]) @> {_VENDOR_TERMS_SQL}
+    ON CONFLICT DO NOTHING
+""").bindparams(sa.bindparam("terms", type_=ARRAY(sa.Text)))
+
+_INSERT_MERCHANT_MATCHES = sa.text(f"""
+    INSERT INTO seller_row_match (merchant_id, row_id, row_created_at)
+    SELECT :merchant_id, r.id, r.created_at FROM row r
+    WHERE r.status IN ({_ACTIVE_SQL}) AND r.match_terms @> CAST(:terms AS text[])
+    ON CONFLICT DO NOTHING
+""").bindparams(sa.bindparam("terms", type_=ARRAY(sa.Text)))
+
+_REBUILD_MATCHES = (
+    sa.text("DELETE FROM seller_row_match"),
+    sa.text(f"""
+        INSERT INTO seller_row_match (merchant_id, row_id, row_created_at)
+        SELECT v.id, r.id, r.created_at
+        FROM vendor v JOIN row r ON r.match_terms @> {_VENDOR_TERMS_SQL}
+        WHERE {_MERCHANT_SQL} AND r.status IN ({_ACTIVE_SQL})
+    """),
+)
+
+
+def match_table_enabled() -> bool:
+    setting = (os.getenv("SELLER_INBOX_MATCH_TABLE", "false") or "").strip().lower()
+    return setting in ("1", "true", "yes", "on")
+
+
+def merchant_terms(merchant: Vendor) -> List[str]:
+    return match_terms(merchant.category)
+
+
+# ── Keyset cursor ────────────────────────────────────────────────────────
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+
+
+# ── Query ────────────────────────────────────────────────────────────────
+
+
+def inbox_query(
+    merchant: Vendor,
+    per_page: int,
+    before: Optional[Tuple[datetime, int]] = None,
+    offset: int = 0,
+):
+    """Select one inbox page of open rows for ``merchant``, newest first.
+
+    ``before`` is the decoded cursor of the last row on the previous page; when it
+    is given, ``offset`` is ignored.
+    """
+    terms = merchant_terms(merchant)
+    query = select(Row).where(Row.status.in_(ACTIVE_ROW_STATUSES))
+    if terms and match_table_enabled():
+        query = query.join(SellerRowMatch, SellerRowMatch.row_id == Row.id).where(
+            SellerRowMatch.merchant_id == merchant.id
+        )
+        created_col, id_col = SellerRowMatch.row_created_at, SellerRowMatch.row_id
+    else:
+        if terms:
+            query = query.where(Row.match_terms.contains(terms))
+        else:
+            # If no categories set, only show service rows (legacy behavior)
+            query = query.where(Row.is_service == True)  # noqa: E712
+        created_col, id_col = Row.created_at, Row.id
+
+    if before is not None:
+        query = query.where(sa.tuple_(created_col, id_col) < sa.tuple_(*before))
+    elif offset:
+        query = query.offset(offset)
+    return query.order_by(created_col.desc(), id_col.desc()).limit(per_page)
+
+
+# ── Match table maintenance ──────────────────────────────────────────────
+
+
+def _changed(target, *attrs: str) -> bool:
+    state = sa.inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in attrs)
+
+
+def _sync_row_matches(mapper, connection, target: Row) -> None:
+    if not _changed(target, "status", "match_terms"):
+        return
+    match_table = SellerRowMatch.__table__
+    connection.execute(match_table.delete().where(match_table.c.row_id == target.id))
+    if target.status in ACTIVE_ROW_STATUSES and target.match_terms:
+        connection.execute(
+            _INSERT_ROW_MATCHES,
+            {
+                "row_id": target.id,
+                "row_created_at": target.created_at,
+                "terms": list(target.match_terms),
+            },
+        )
+
+
+def _sync_merchant_matches(mapper, connection, target: Vendor) -> None:
+    if not _changed(target, "category", "user_id"):
+        return
+    match_table = SellerRowMatch.__table__
+    connection.execute(match_table.delete().where(match_table.c.merchant_id == target.id))
+    terms = merchant_terms(target)
+    if target.user_id is not None and terms:
+        connection.execute(_INSERT_MERCHANT_MATCHES, {"merchant_id": target.id, "terms": terms})
+
+
+_LISTENERS = (
+    (Row, "after_insert", _sync_row_matches),
+    (Row, "after_update", _sync_row_matches),
+    (Vendor, "after_insert", _sync_merchant_matches),
+    (Vendor, "after_update", _sync_merchant_matches),
+)
+
+
+def install_match_table_listeners() -> None:
+    """Keep seller_row_match current from ORM writes. Idempotent."""
+    for model, event_name, fn in _LISTENERS:
+        if not sa.event.contains(model, event_name, fn):
+            sa.event.listen(model, event_name, fn)
+
+
+def remove_match_table_listeners() -> None:
+    for model, event_name, fn in _LISTENERS:
+        if sa.event.contains(model, event_name, fn):
+            sa.event.remove(model, event_name, fn)
+
+
+async def rebuild_match_table(engine=None) -> int:
+    """Recompute every (merchant, open row) pair. Returns the number of pairs."""
+    if engine is None:
+        from database import engine
+    async with engine.begin() as conn:
+        for statement in _REBUILD_MATCHES:
+            result = await conn.execute(statement)
+    return result.rowcount
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Seller inbox match table maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    pairs = asyncio.run(rebuild_match_table())
+    print(f"seller_row_match rebuilt: {pairs} pairs")
+
+
+if match_table_enabled():
+    install_match_table_listeners()
+
+
+__all__ = [
+    "ACTIVE_ROW_STATUSES",
+    "decode_cursor",
+    "encode_cursor",
+    "inbox_query",
+    "install_match_table_listeners",
+    "match_table_enabled",
+    "merchant_terms",
+    "rebuild_match_table",
+    "remove_match_table_listeners",
+]
+
+
+if __name__ == "__main__":
+    _main()
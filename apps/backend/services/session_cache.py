@@ -0,0 +1,194 @@
+"""In-process cache of validated auth sessions.
+
+``dependencies.get_current_session`` runs on every authenticated request (and
+``resolve_user_id_and_guest_flag`` on every anonymous one). Validated sessions
+are cached by token hash so repeat polls skip the ``auth_session`` lookup:
+
+- Entries live for ``SESSION_CACHE_TTL_SECONDS`` but never past the session's
+  own ``expires_at``; the LRU is bounded by ``SESSION_CACHE_MAX_ENTRIES``.
+- Unknown, revoked and expired tokens are never cached, so they always hit the DB.
+- Logout evicts the entry locally. With ``SESSION_CACHE_BACKEND=postgres`` the
+  revocation is also broadcast with ``NOTIFY`` (delivered on commit) and every
+  worker listening on the channel evicts it, instead of serving it until the TTL.
+- The guest user's id is resolved once per process.
+
+Hits return a fresh detached ``AuthSession`` each time, so no instance is shared
+between request sessions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import make_transient_to_detached
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "auth_session_revoked"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class CachedAuthSession:
+    """Column values of a validated AuthSession. ``valid_until`` is naive UTC, like the model."""
+
+    values: Dict[str, Any]
+    valid_until: datetime
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.utcnow()) >= self.valid_until
+
+
+class AuthSessionCache:
+    """Bounded TTL cache of validated sessions keyed by token hash."""
+
+    def __init__(
+        self, ttl_seconds: float = 60.0, max_entries: int = 10000, broadcast: bool = False
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.broadcast = broadcast
+        self._entries: "OrderedDict[str, CachedAuthSession]" = OrderedDict()
+        self.guest_user_id: Optional[int] = None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["AuthSessionCache"]:
+        """Build the cache from SESSION_CACHE_* settings; None when disabled."""
+        enabled = (os.getenv("SESSION_CACHE_ENABLED", "true") or "").strip().lower()
+        if enabled in ("0", "false", "no", "off"):
+            return None
+        backend = (os.getenv("SESSION_CACHE_BACKEND", "memory") or "").strip().lower()
+        return cls(
+            ttl_seconds=_env_float("SESSION_CACHE_TTL_SECONDS", 60.0),
+            max_entries=int(_env_float("SESSION_CACHE_MAX_ENTRIES", 10000)),
+            broadcast=backend == "postgres",
+        )
+
+    def get(self, token_hash: str):
+        """Return a detached AuthSession for a cached, unexpired token hash, else None."""
+        from models import AuthSession
+
+        entry = self._entries.get(token_hash)
+        if entry is not None and entry.is_expired():
+            self._entries.pop(token_hash, None)
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(token_hash)
+        self.stats["hits"] += 1
+        auth_session = AuthSession(**entry.values)
+        make_transient_to_detached(auth_session)
+        return auth_session
+
+    def put(self, auth_session) -> None:
+        """Cache a session that was just validated against the DB."""
+        if auth_session.revoked_at is not None:
+            return
+        valid_until = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        if auth_session.expires_at is not None:
+            valid_until = min(valid_until, auth_session.expires_at)
+        values = {name: getattr(auth_session, name) for name in type(auth_session).model_fields}
+        self._entries[auth_session.session_token_hash] = CachedAuthSession(values, valid_until)
+        self._entries.move_to_end(auth_session.session_token_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def evict(self, token_hash: str) -> None:
+        if self._entries.pop(token_hash, None) is not None:
+            self.stats["invalidations"] += 1
+
+    async def invalidate(self, token_hash: str, db_session=None) -> None:
+        """Evict a revoked session here and, with the postgres backend, on every other worker.
+
+        Pass the request's DB session to make the broadcast part of the revoking
+        transaction: NOTIFY is only delivered once it commits.
+        """
+        self.evict(token_hash)
+        if self.broadcast and db_session is not None:
+            await db_session.execute(
+                text("SELECT pg_notify(:channel, :token_hash)"),
+                {"channel": REVOCATION_CHANNEL, "token_hash": token_hash},
+            )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.guest_user_id = None
+
+    async def listen_for_revocations(self, stop: asyncio.Event, engine=None) -> None:
+        """Evict sessions revoked by other workers until ``stop`` is set (postgres backend).
+
+        Holds one pooled connection per worker for LISTEN. While it is down the
+        local cache is emptied, since revocations could be missed.
+        """
+        if engine is None:
+            from database import engine
+
+        def _on_revoked(_connection, _pid, _channel, payload):
+            self.evict(payload)
+
+        while not stop.is_set():
+            lost = asyncio.Event()
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    driver.add_termination_listener(lambda _connection: lost.set())
+                    await driver.add_listener(REVOCATION_CHANNEL, _on_revoked)
+                    try:
+                        waiters = [
+                            asyncio.ensure_future(stop.wait()),
+                            asyncio.ensure_future(lost.wait()),
+                        ]
+                        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                        for waiter in waiters:
+                            waiter.cancel()
+                    finally:
+                        if not lost.is_set():
+                            await driver.remove_listener(REVOCATION_CHANNEL, _on_revoked)
+            except Exception as e:
+                logger.warning(f"[SessionCache] Revocation listener failed: {e}")
+            if stop.is_set():
+                break
+            self._entries.clear()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "entries": len(self._entries),
+            "backend": "postgres" if self.broadcast else "memory",
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+session_cache: Optional[AuthSessionCache] = AuthSessionCache.from_env()
+
+
+__all__ = [
+    "AuthSessionCache",
+    "CachedAuthSession",
+    "REVOCATION_CHANNEL",
+    "session_cache",
+]
@@ -0,0 +1,223 @@
+"""Write-behind share link access counting and cached share payloads.
+
+``GET /api/shares/{token}`` used to do ``share_link.access_count += 1`` and a
+commit on every hit: a viral link serialized its readers on one row and lost
+increments when two requests read the same count. Hits are now only recorded in
+``share_access_counter``, which aggregates them per link in memory. A
+background task writes the totals every ``SHARE_ACCESS_FLUSH_MS`` as one batch
+of atomic ``UPDATE share_link SET access_count = access_count + n``
+statements. The counter is also flushed on shutdown. A failed write keeps its
+counts for the next flush.
+
+``share_resource_cache`` holds the public payloads built by
+``routes.shares.get_resource_data`` for ``SHARE_RESOURCE_CACHE_TTL_SECONDS``.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+CountWriter = Callable[[Dict[int, int]], Awaitable[None]]
+
+_session_factory = None
+
+
+async def write_share_access_counts(counts: Dict[int, int]) -> None:
+    """Apply pending increments in one transaction, in id order so workers never deadlock."""
+    from sqlalchemy import text
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from database import engine
+
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with _session_factory() as session:
+        await session.execute(
+            text("UPDATE share_link SET access_count = access_count + :n WHERE id = :id"),
+            [{"id": link_id, "n": n} for link_id, n in sorted(counts.items())],
+        )
+        await session.commit()
+
+
+class ShareAccessCounter:
+    """Aggregates share link hits in memory and flushes them on an interval."""
+
+    def __init__(self, flush_interval_ms: float = 1000, writer: Optional[CountWriter] = None):
+        self.flush_interval_seconds = max(flush_interval_ms, 1) / 1000
+        self._writer = writer or write_share_access_counts
+        self._pending: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+        self.stats: Dict[str, float] = {
+            "recorded": 0,
+            "written": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ShareAccessCounter":
+        return cls(flush_interval_ms=_env_float("SHARE_ACCESS_FLUSH_MS", 1000))
+
+    def record(self, share_link_id: int) -> None:
+        """Count one hit. Never blocks and never raises."""
+        self._pending[share_link_id] = self._pending.get(share_link_id, 0) + 1
+        self.stats["recorded"] += 1
+        self._ensure_running()
+
+    def pending(self, share_link_id: int) -> int:
+        """Hits recorded for a link but not yet written."""
+        return self._pending.get(share_link_id, 0)
+
+    def _ensure_running(self) -> None:
+        if self._closing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """Write everything pending. Returns False if the write failed."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            if not self._pending:
+                return True
+            counts, self._pending = self._pending, {}
+            started = time.monotonic()
+            try:
+                await self._writer(counts)
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                logger.error(
+                    f"[ShareAccess] Failed to write counts for {len(counts)} links: "
+                    f"{type(e).__name__}: {e}"
+                )
+                for link_id, n in counts.items():
+                    self._pending[link_id] = self._pending.get(link_id, 0) + n
+                return False
+            self.stats["flushes"] += 1
+            self.stats["written"] += sum(counts.values())
+            self.stats["last_flush_ms"] = round((time.monotonic() - started) * 1000, 1)
+            return True
+
+    async def close(self, timeout_seconds: float = 5.0) -> None:
+        """Stop the flusher and write whatever is still pending."""
+        self._closing = True
+        if self._task is not None:
+            # Let an in-flight write finish rather than cancelling it and losing its counts.
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout_seconds)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            pass
+        if self._pending:
+            dropped = sum(self._pending.values())
+            logger.error(f"[ShareAccess] Dropping {dropped} share hits at shutdown")
+            self._pending.clear()
+        self._task = None
+        self._closing = False
+
+    def clear(self) -> None:
+        """Drop pending hits without writing them (tests reset the schema between runs)."""
+        self._pending.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending_links": len(self._pending),
+            "pending_hits": sum(self._pending.values()),
+        }
+
+
+class ShareResourceCache:
+    """Bounded TTL cache of shared resource payloads keyed by (resource_type, resource_id)."""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ShareResourceCache":
+        return cls(
+            ttl_seconds=_env_float("SHARE_RESOURCE_CACHE_TTL_SECONDS", 30.0),
+            max_entries=int(_env_float("SHARE_RESOURCE_CACHE_MAX_ENTRIES", 1024)),
+        )
+
+    def get(self, resource_type: str, resource_id: int) -> Optional[Dict[str, Any]]:
+        key = (resource_type, resource_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def put(self, resource_type: str, resource_id: int, payload: Dict[str, Any]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        key = (resource_type, resource_id)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+share_access_counter = ShareAccessCounter.from_env()
+share_resource_cache = ShareResourceCache.from_env()
+
+__all__ = [
+    "ShareAccessCounter",
+    "ShareResourceCache",
+    "share_access_counter",
+    "share_resource_cache",
+    "write_share_access_counts",
+]
@@ -0,0 +1,48 @@
+"""Run blocking Stripe SDK calls off the event loop.
+
+The stripe SDK is synchronous: every ``stripe.X.create`` does a blocking HTTPS
+round trip. Calling it directly from an async route stalls every other request
+on the worker, including in-flight SSE searches. ``call_stripe`` runs the call
+on a small dedicated thread pool so the loop keeps serving, and the pool size
+bounds how many Stripe requests a worker has open at once.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _max_workers() -> int:
+    try:
+        return max(1, int(os.getenv("STRIPE_MAX_CONCURRENCY", "8")))
+    except ValueError:
+        return 8
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix="stripe")
+    return _executor
+
+
+async def call_stripe(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await ``fn(*args, **kwargs)`` on the Stripe thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_stripe_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
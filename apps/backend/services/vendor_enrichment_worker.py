@@ -0,0 +1,472 @@
+"""Vendor enrichment queue worker.
+
+Drains ``vendor_enrichment_queue_item`` rows enqueued by
+``DiscoveryOrchestrator._persist_candidates``. Each pass:
+
+1. claims a batch with ``FOR UPDATE SKIP LOCKED`` so several replicas can drain
+   the queue in parallel without double-processing;
+2. crawls, extracts and summarizes each candidate's website concurrently;
+3. embeds all resulting profiles in one batched call;
+4. upserts into ``vendor`` (matched by domain) and links the candidate.
+
+Failed items are retried with exponential backoff and moved to ``dead_letter``
+after ``max_attempts``. Claimed rows carry a lease in ``next_attempt_at`` so
+items held by a crashed worker are picked up again once the lease expires.
+
+Run standalone with ``python -m services.vendor_enrichment_worker`` or inside
+the API process with ``VENDOR_ENRICHMENT_WORKER_ENABLED=true``.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import sqlalchemy as sa
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import DiscoveredVendorCandidate, Vendor, VendorEnrichmentQueueItem
+from sourcing.discovery.extractors import extract_contact_hints
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_PROCESSING = "processing"
+STATUS_RETRY = "retry"
+STATUS_DONE = "done"
+STATUS_DEAD_LETTER = "dead_letter"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+MIN_SITE_TEXT_CHARS = 200
+MAX_SITE_TEXT_CHARS = 6000
+
+_CLAIM_SQL = sa.text("""
+    UPDATE vendor_enrichment_queue_item
+    SET status = :processing,
+        next_attempt_at = NOW() + make_interval(secs => :lease_seconds),
+        updated_at = NOW()
+    WHERE id IN (
+        SELECT id FROM vendor_enrichment_queue_item
+        WHERE status = :queued
+           OR (status IN (:retry, :processing) AND next_attempt_at <= NOW())
+        ORDER BY confidence DESC, id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+""")
+
+
+class EnrichmentError(Exception):
+    """A candidate could not be enriched (retryable)."""
+
+
+@dataclass
+class EnrichmentWorkerConfig:
+    batch_size: int = 10
+    concurrency: int = 5
+    max_attempts: int = 5
+    base_backoff_seconds: float = 60.0
+    max_backoff_seconds: float = 6 * 3600.0
+    lease_seconds: float = 600.0
+    poll_interval_seconds: float = 15.0
+
+    @classmethod
+    def from_env(cls) -> "EnrichmentWorkerConfig":
+        def _num(name: str, default: float) -> float:
+            try:
+                return float(os.getenv(name, str(default)))
+            except ValueError:
+                return default
+
+        return cls(
+            batch_size=int(_num("VENDOR_ENRICHMENT_BATCH_SIZE", 10)),
+            concurrency=int(_num("VENDOR_ENRICHMENT_CONCURRENCY", 5)),
+            max_attempts=int(_num("VENDOR_ENRICHMENT_MAX_ATTEMPTS", 5)),
+            base_backoff_seconds=_num("VENDOR_ENRICHMENT_BACKOFF_SECONDS", 60.0),
+            max_backoff_seconds=_num("VENDOR_ENRICHMENT_MAX_BACKOFF_SECONDS", 6 * 3600.0),
+            lease_seconds=_num("VENDOR_ENRICHMENT_LEASE_SECONDS", 600.0),
+            poll_interval_seconds=_num("VENDOR_ENRICHMENT_POLL_SECONDS", 15.0),
+        )
+
+
+def backoff_seconds(attempt: int, config: EnrichmentWorkerConfig, jitter: float = 0.1) -> float:
+    """Exponential backoff for the given (1-based) attempt, with +/- jitter."""
+    delay = min(
+        config.base_backoff_seconds * (2 ** max(attempt - 1, 0)), config.max_backoff_seconds
+    )
+    if jitter:
+        delay *= 1 + random.uniform(-jitter, jitter)
+    return delay
+
+
+def apply_failure(
+    item: VendorEnrichmentQueueItem,
+    error: str,
+    config: EnrichmentWorkerConfig,
+    now: Optional[datetime] = None,
+) -> None:
+    """Schedule a retry for ``item``, or dead-letter it once attempts run out."""
+    now = now or datetime.utcnow()
+    item.retry_count = (item.retry_count or 0) + 1
+    payload = dict(item.payload or {})
+    payload["last_error"] = error[:500]
+    item.payload = payload
+    item.updated_at = now
+    if item.retry_count >= config.max_attempts:
+        item.status = STATUS_DEAD_LETTER
+        item.next_attempt_at = None
+    else:
+        item.status = STATUS_RETRY
+        item.next_attempt_at = now + timedelta(seconds=backoff_seconds(item.retry_count, config))
+
+
+# ── Crawl / extract / embed ──────────────────────────────────────────────
+
+
+async def fetch_site_text(url: str, timeout_seconds: float = 15.0) -> str:
+    """Fetch a homepage and return its visible text (title + meta + body)."""
+    from bs4 import BeautifulSoup
+
+    async with httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=timeout_seconds,
+        headers={"User-Agent": USER_AGENT},
+    ) as client:
+        resp = await client.get(url)
+        resp.raise_for_status()
+        html = resp.text
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript", "nav", "footer", "svg"]):
+        tag.decompose()
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+    meta = soup.find("meta", attrs={"name": "description"})
+    description = (meta.get("content") or "").strip() if meta else ""
+    body = re.sub(r"\s+", " ", soup.get_text(" ", strip=True))
+    return "\n".join(part for part in (title, description, body) if part)[:MAX_SITE_TEXT_CHARS]
+
+
+async def extract_vendor_profile(vendor_name: str, site_text: str) -> Dict[str, Any]:
+    """Ask the LLM for structured vendor fields; returns {} when unavailable."""
+    from services.llm import _extract_json, call_gemini
+
+    prompt = (
+        f"Given this website text for the business \"{vendor_name}\", extract structured info.\n"
+        "Return JSON with keys: description (2-3 sentences), tagline, specialties "
+        "(comma-separated), email, phone, contact_name. Use null for anything not "
+        "stated in the text.\n\n"
+        f"WEBSITE TEXT:\n{site_text}"
+    )
+    try:
+        return _extract_json(await call_gemini(prompt, timeout=30.0))
+    except Exception as e:
+        logger.warning(f"[EnrichmentWorker] LLM extraction failed for {vendor_name}: {e}")
+        return {}
+
+
+def build_profile_text(vendor_name: str, domain: Optional[str], fields: Dict[str, Any]) -> str:
+    parts = [vendor_name]
+    for key in ("tagline", "description", "specialties"):
+        value = fields.get(key)
+        if value:
+            parts.append(str(value))
+    if domain:
+        parts.append(f"Website: {domain}")
+    return "\n".join(parts)
+
+
+async def enrich_candidate(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Crawl and extract one candidate. Raises EnrichmentError when the site is unusable."""
+    url = candidate.get("website_url")
+    if not url:
+        raise EnrichmentError("candidate has no website")
+    try:
+        site_text = await fetch_site_text(url)
+    except httpx.HTTPError as e:
+        raise EnrichmentError(f"crawl failed: {type(e).__name__}: {e}") from e
+    if len(site_text) < MIN_SITE_TEXT_CHARS:
+        raise EnrichmentError(f"insufficient site text ({len(site_text)} chars)")
+
+    fields = await extract_vendor_profile(candidate["vendor_name"], site_text)
+    email, phone = extract_contact_hints(site_text)
+    fields = {k: v for k, v in fields.items() if v not in (None, "", [])}
+    fields.setdefault("email", candidate.get("email") or email)
+    fields.setdefault("phone", candidate.get("phone") or phone)
+    if isinstance(fields.get("specialties"), list):
+        fields["specialties"] = ", ".join(str(s) for s in fields["specialties"])
+    fields["profile_text"] = build_profile_text(
+        candidate["vendor_name"], candidate.get("canonical_domain"), fields
+    )
+    return fields
+
+
+async def embed_profiles(texts: List[str]) -> Optional[List[List[float]]]:
+    if not texts:
+        return []
+    from sourcing.vendor_provider import _embed_texts
+
+    return await _embed_texts(texts)
+
+
+# ── Worker ───────────────────────────────────────────────────────────────
+
+
+class VendorEnrichmentWorker:
+    """Claims queue items in batches and enriches them into ``vendor`` rows."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        config: Optional[EnrichmentWorkerConfig] = None,
+        enrich: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]] = enrich_candidate,
+        embed: Callable[[List[str]], Awaitable[Optional[List[List[float]]]]] = embed_profiles,
+    ):
+        if session_factory is None:
+            from sqlalchemy.orm import sessionmaker
+
+            from database import engine
+
+            session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self._session_factory = session_factory
+        self.config = config or EnrichmentWorkerConfig.from_env()
+        self._enrich = enrich
+        self._embed = embed
+        self.stats: Dict[str, float] = {
+            "batches": 0,
+            "claimed": 0,
+            "enriched": 0,
+            "vendors_created": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+            "busy_seconds": 0.0,
+        }
+
+    def throughput_per_minute(self) -> float:
+        busy = self.stats["busy_seconds"]
+        return round(self.stats["enriched"] * 60 / busy, 2) if busy else 0.0
+
+    async def claim_batch(self) -> List[int]:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                _CLAIM_SQL,
+                {
+                    "processing": STATUS_PROCESSING,
+                    "queued": STATUS_QUEUED,
+                    "retry": STATUS_RETRY,
+                    "lease_seconds": self.config.lease_seconds,
+                    "batch_size": self.config.batch_size,
+                },
+            )
+            ids = [row[0] for row in result.all()]
+            await session.commit()
+        return ids
+
+    async def _load_candidates(self, item_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        async with self._session_factory() as session:
+            result = await session.exec(
+                select(VendorEnrichmentQueueItem, DiscoveredVendorCandidate)
+                .join(
+                    DiscoveredVendorCandidate,
+                    DiscoveredVendorCandidate.id == VendorEnrichmentQueueItem.candidate_id,
+                )
+                .where(VendorEnrichmentQueueItem.id.in_(item_ids))
+            )
+            return {
+                item.id: {
+                    "candidate_id": candidate.id,
+                    "vendor_name": candidate.vendor_name,
+                    "website_url": candidate.website_url,
+                    "canonical_domain": item.canonical_domain or candidate.canonical_domain,
+                    "email": candidate.email,
+                    "phone": candidate.phone,
+                    "image_url": candidate.image_url,
+                }
+                for item, candidate in result.all()
+            }
+
+    async def enrich_all(self, candidates: Dict[int, Dict[str, Any]]) -> Dict[int, Any]:
+        """Enrich candidates concurrently; values are field dicts or exceptions."""
+        semaphore = asyncio.Semaphore(max(1, self.config.concurrency))
+
+        async def _one(candidate: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._enrich(candidate)
+
+        item_ids = list(candidates)
+        outcomes = await asyncio.gather(
+            *[_one(candidates[item_id]) for item_id in item_ids], return_exceptions=True
+        )
+        return dict(zip(item_ids, outcomes))
+
+    async def _upsert_vendor(
+        self,
+        session: AsyncSession,
+        candidate: Dict[str, Any],
+        fields: Dict[str, Any],
+    ) -> Vendor:
+        domain = (candidate.get("canonical_domain") or "").lower() or None
+        vendor = None
+        if domain:
+            # Serialize concurrent upserts of the same domain across replicas.
+            await session.execute(
+                sa.text("SELECT pg_advisory_xact_lock(hashtext(:d))"), {"d": domain}
+            )
+            result = await session.exec(
+                select(Vendor).where(sa.func.lower(Vendor.domain) == domain)
+            )
+            vendor = result.first()
+        now = datetime.utcnow()
+        if vendor is None:
+            vendor = Vendor(
+                name=candidate["vendor_name"],
+                domain=domain,
+                website=candidate.get("website_url"),
+                image_url=candidate.get("image_url"),
+                created_at=now,
+            )
+            self.stats["vendors_created"] += 1
+        for key in ("email", "phone", "contact_name", "description", "tagline", "specialties"):
+            if fields.get(key) and not getattr(vendor, key):
+                setattr(vendor, key, str(fields[key]))
+        vendor.profile_text = fields["profile_text"]
+        vendor.updated_at = now
+        session.add(vendor)
+        await session.flush()
+        return vendor
+
+    async def _complete(
+        self,
+        item_id: int,
+        candidate: Dict[str, Any],
+        fields: Dict[str, Any],
+        embedding: Optional[List[float]],
+    ) -> None:
+        from sourcing.vendor_provider import _get_embedding_model
+
+        async with self._session_factory() as session:
+            vendor = await self._upsert_vendor(session, candidate, fields)
+            if embedding:
+                await session.execute(
+                    sa.text(
+                        "UPDATE vendor SET embedding = CAST(:vec AS vector), "
+                        "embedding_model = :model, embedded_at = NOW() WHERE id = :vid"
+                    ),
+                    {
+                        "vec": "[" + ",".join(str(f) for f in embedding) + "]",
+                        "model": _get_embedding_model(),
+                        "vid": vendor.id,
+                    },
+                )
+            now = datetime.utcnow()
+            item = await session.get(VendorEnrichmentQueueItem, item_id)
+            item.status = STATUS_DONE
+            item.vendor_id = vendor.id
+            item.next_attempt_at = None
+            item.updated_at = now
+            session.add(item)
+            db_candidate = await session.get(DiscoveredVendorCandidate, candidate["candidate_id"])
+            if db_candidate is not None:
+                db_candidate.vendor_id = vendor.id
+                db_candidate.status = "promoted"
+                db_candidate.updated_at = now
+                session.add(db_candidate)
+            await session.commit()
+        self.stats["enriched"] += 1
+
+    async def _fail(self, item_id: int, error: str) -> None:
+        async with self._session_factory() as session:
+            item = await session.get(VendorEnrichmentQueueItem, item_id)
+            if item is None:
+                return
+            apply_failure(item, error, self.config)
+            session.add(item)
+            await session.commit()
+            if item.status == STATUS_DEAD_LETTER:
+                self.stats["dead_lettered"] += 1
+                logger.error(
+                    f"[EnrichmentWorker] Item {item_id} dead-lettered after "
+                    f"{item.retry_count} attempts: {error}"
+                )
+            else:
+                self.stats["retried"] += 1
+                logger.warning(
+                    f"[EnrichmentWorker] Item {item_id} attempt {item.retry_count} failed: {error}"
+                )
+
+    async def run_once(self) -> int:
+        """Claim and process one batch. Returns the number of items claimed."""
+        item_ids = await self.claim_batch()
+        if not item_ids:
+            return 0
+        started = time.monotonic()
+        self.stats["batches"] += 1
+        self.stats["claimed"] += len(item_ids)
+
+        candidates = await self._load_candidates(item_ids)
+        outcomes = await self.enrich_all(candidates)
+        enriched = {i: o for i, o in outcomes.items() if not isinstance(o, BaseException)}
+
+        embeddings: Dict[int, List[float]] = {}
+        try:
+            vectors = await self._embed([enriched[i]["profile_text"] for i in enriched]) or []
+            embeddings = dict(zip(enriched, vectors))
+        except Exception as e:
+            logger.warning(f"[EnrichmentWorker] Embedding batch failed: {e}")
+
+        for item_id in item_ids:
+            outcome = outcomes.get(item_id, EnrichmentError("candidate not found"))
+            try:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                await self._complete(item_id, candidates[item_id], outcome, embeddings.get(item_id))
+            except Exception as e:
+                await self._fail(item_id, f"{type(e).__name__}: {e}")
+
+        elapsed = time.monotonic() - started
+        self.stats["busy_seconds"] += elapsed
+        logger.info(
+            f"[EnrichmentWorker] batch={len(item_ids)} ok={len(enriched)} in {elapsed:.1f}s "
+            f"(total enriched={self.stats['enriched']}, retried={self.stats['retried']}, "
+            f"dead={self.stats['dead_lettered']}, {self.throughput_per_minute()}/min)"
+        )
+        return len(item_ids)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Drain the queue until ``stop`` is set, sleeping when it is empty."""
+        stop = stop or asyncio.Event()
+        logger.info(
+            f"[EnrichmentWorker] Started (batch_size={self.config.batch_size}, "
+            f"concurrency={self.config.concurrency})"
+        )
+        while not stop.is_set():
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"[EnrichmentWorker] Batch failed: {type(e).__name__}: {e}")
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.config.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("[EnrichmentWorker] Stopped")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-7s %(message)s")
+    asyncio.run(VendorEnrichmentWorker().run())
@@ -0,0 +1,399 @@
+"""Per-provider search result cache.
+
+Shopping results are stable for minutes, while most providers are paid per call
+and rate limited. Results are cached per provider, keyed by
+(provider, normalized query, zip, price bounds):
+
+- Fresh entries are served directly for a per-provider TTL.
+- Stale entries are served for a further window while a background refresh
+  revalidates them (stale-while-revalidate).
+- Successful-but-empty responses are negatively cached with a shorter TTL.
+- Errors, timeouts and quota failures are never cached.
+
+Two tiers are available: an in-process LRU (always on) and an optional Postgres
+table shared across workers (``SOURCING_CACHE_BACKEND=postgres``). Lookups in
+the Postgres tier are read-only; the daily retention job deletes expired rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from sourcing.models import ProviderStatusSnapshot
+
+if TYPE_CHECKING:
+    from sourcing.repository import SearchResult
+
+logger = logging.getLogger(__name__)
+
+# vendor_directory is our own DB and its results depend on the query embedding
+# and location context, which are not part of the cache key.
+UNCACHEABLE_PROVIDERS = {"vendor_directory"}
+
+CACHED_STATUS_MESSAGE = "Served from cache"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_cache_query(query: str) -> str:
+    return " ".join((query or "").strip().lower().split())
+
+
+def _format_bound(value: Any) -> str:
+    if value is None or value == "":
+        return ""
+    try:
+        return f"{float(value):.2f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def build_result_cache_key(
+    provider_id: str,
+    query: str,
+    *,
+    zip_code: Optional[str] = None,
+    min_price: Any = None,
+    max_price: Any = None,
+) -> str:
+    scoped = "|".join(
+        [
+            provider_id,
+            normalize_cache_query(query),
+            (zip_code or "").strip(),
+            _format_bound(min_price),
+            _format_bound(max_price),
+        ]
+    )
+    return hashlib.sha256(scoped.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedProviderResult:
+    """A cached provider response. Timestamps are epoch seconds."""
+
+    provider_id: str
+    results: List["SearchResult"]
+    fresh_until: float
+    expires_at: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.fresh_until
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= self.expires_at
+
+    @property
+    def is_negative(self) -> bool:
+        return not self.results
+
+    def copy_results(self) -> List["SearchResult"]:
+        # Callers mutate match_score/click_url on the returned objects.
+        return [r.model_copy(deep=True) for r in self.results]
+
+    def status_snapshot(self) -> ProviderStatusSnapshot:
+        return ProviderStatusSnapshot(
+            provider_id=self.provider_id,
+            status="ok",
+            result_count=len(self.results),
+            latency_ms=0,
+            message=CACHED_STATUS_MESSAGE,
+        )
+
+
+@dataclass
+class ResultCacheConfig:
+    ttl_seconds: float = 300.0
+    stale_seconds: float = 600.0
+    negative_ttl_seconds: float = 60.0
+    max_entries: int = 2048
+    provider_ttls: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls, provider_ids: Optional[List[str]] = None) -> "ResultCacheConfig":
+        config = cls(
+            ttl_seconds=_env_float("SOURCING_CACHE_TTL_SECONDS", 300.0),
+            stale_seconds=_env_float("SOURCING_CACHE_STALE_SECONDS", 600.0),
+            negative_ttl_seconds=_env_float("SOURCING_CACHE_NEGATIVE_TTL_SECONDS", 60.0),
+            max_entries=int(_env_float("SOURCING_CACHE_MAX_ENTRIES", 2048)),
+        )
+        # Per-provider overrides, e.g. SOURCING_CACHE_TTL_AMAZON=900
+        for provider_id in provider_ids or []:
+            env_name = f"SOURCING_CACHE_TTL_{provider_id.upper()}"
+            if os.getenv(env_name):
+                config.provider_ttls[provider_id] = _env_float(env_name, config.ttl_seconds)
+        return config
+
+    def ttl_for(self, provider_id: str, *, negative: bool = False) -> float:
+        if negative:
+            return self.negative_ttl_seconds
+        return self.provider_ttls.get(provider_id, self.ttl_seconds)
+
+
+class MemoryResultCache:
+    """Bounded in-process LRU tier."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, CachedProviderResult]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedProviderResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedProviderResult, normalized_query: str = "") -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PostgresResultCache:
+    """Shared tier backed by the provider_result_cache table."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from sqlalchemy.orm import sessionmaker
+            from sqlmodel.ext.asyncio.session import AsyncSession
+
+            from database import engine
+
+            self._session_factory = sessionmaker(
+                engine, class_=AsyncSession, expire_on_commit=False
+            )
+        return self._session_factory()
+
+    async def get(self, key: str) -> Optional[CachedProviderResult]:
+        from sqlmodel import select
+
+        from models import ProviderResultCacheEntry
+        from sourcing.repository import SearchResult
+
+        async with self._session() as session:
+            result = await session.exec(
+                select(ProviderResultCacheEntry).where(ProviderResultCacheEntry.cache_key == key)
+            )
+            row = result.first()
+        if not row or row.expires_at < datetime.utcnow():
+            return None
+
+        now_utc = datetime.utcnow()
+        now = time.time()
+        return CachedProviderResult(
+            provider_id=row.provider_id,
+            results=[SearchResult(**item) for item in (row.results or [])],
+            fresh_until=now + (row.fresh_until - now_utc).total_seconds(),
+            expires_at=now + (row.expires_at - now_utc).total_seconds(),
+        )
+
+    async def set(self, key: str, entry: CachedProviderResult, normalized_query: str = "") -> None:
+        from sqlmodel import select
+
+        from models import ProviderResultCacheEntry
+
+        now = time.time()
+        now_utc = datetime.utcnow()
+        async with self._session() as session:
+            result = await session.exec(
+                select(ProviderResultCacheEntry).where(ProviderResultCacheEntry.cache_key == key)
+            )
+            row = result.first() or ProviderResultCacheEntry(
+                cache_key=key,
+                provider_id=entry.provider_id,
+                normalized_query=normalized_query,
+                fresh_until=now_utc,
+                expires_at=now_utc,
+            )
+            row.results = [r.model_dump(mode="json") for r in entry.results]
+            row.result_count = len(entry.results)
+            row.fresh_until = now_utc + timedelta(seconds=max(0.0, entry.fresh_until - now))
+            row.expires_at = now_utc + timedelta(seconds=max(0.0, entry.expires_at - now))
+            row.updated_at = now_utc
+            session.add(row)
+            await session.commit()
+
+
+class ProviderResultCache:
+    """Tiered provider result cache with stale-while-revalidate."""
+
+    def __init__(
+        self, config: Optional[ResultCacheConfig] = None, tiers: Optional[List[Any]] = None
+    ):
+        self.config = config or ResultCacheConfig()
+        self.tiers = tiers if tiers is not None else [MemoryResultCache(self.config.max_entries)]
+        self._revalidations: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "revalidations": 0,
+            "errors": 0,
+        }
+
+    @classmethod
+    def from_env(cls, provider_ids: Optional[List[str]] = None) -> Optional["ProviderResultCache"]:
+        """Build the cache from SOURCING_CACHE_* settings; None when disabled."""
+        enabled = (os.getenv("SOURCING_CACHE_ENABLED", "true") or "").strip().lower()
+        if enabled in ("0", "false", "no", "off"):
+            return None
+        config = ResultCacheConfig.from_env(provider_ids)
+        tiers: List[Any] = [MemoryResultCache(config.max_entries)]
+        backend = (os.getenv("SOURCING_CACHE_BACKEND", "memory") or "").strip().lower()
+        if backend == "postgres":
+            tiers.append(PostgresResultCache())
+        cache = cls(config, tiers)
+        _live_caches.add(cache)
+        return cache
+
+    def is_cacheable(self, provider_id: str) -> bool:
+        return provider_id not in UNCACHEABLE_PROVIDERS
+
+    def key_for(self, provider_id: str, query: str, params: Dict[str, Any]) -> str:
+        return build_result_cache_key(
+            provider_id,
+            query,
+            zip_code=params.get("zip_code"),
+            min_price=params.get("min_price"),
+            max_price=params.get("max_price"),
+        )
+
+    async def lookup(self, key: str) -> Optional[CachedProviderResult]:
+        """Return a fresh or stale entry from the first tier that has one."""
+        for index, tier in enumerate(self.tiers):
+            try:
+                entry = await tier.get(key)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"[ResultCache] {type(tier).__name__} lookup failed: {e}")
+                continue
+            if entry is None:
+                continue
+            # Promote shared-tier hits into the faster tiers above it.
+            for upper in self.tiers[:index]:
+                try:
+                    await upper.set(key, entry)
+                except Exception:
+                    pass
+            if entry.is_fresh():
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+            if entry.is_negative:
+                self.stats["negative_hits"] += 1
+            return entry
+        self.stats["misses"] += 1
+        return None
+
+    async def store(
+        self,
+        key: str,
+        query: str,
+        results: List["SearchResult"],
+        status: ProviderStatusSnapshot,
+    ) -> None:
+        """Cache a provider response. Only successful responses are cached."""
+        if status.status != "ok":
+            return
+        now = time.time()
+        ttl = self.config.ttl_for(status.provider_id, negative=not results)
+        entry = CachedProviderResult(
+            provider_id=status.provider_id,
+            results=[r.model_copy(deep=True) for r in results],
+            fresh_until=now + ttl,
+            expires_at=now + ttl + (self.config.stale_seconds if results else 0.0),
+        )
+        normalized_query = normalize_cache_query(query)
+        for tier in self.tiers:
+            try:
+                await tier.set(key, entry, normalized_query)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"[ResultCache] {type(tier).__name__} store failed: {e}")
+        self.stats["stores"] += 1
+
+    def revalidate(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh a stale entry in the background; at most one refresh per key."""
+        existing = self._revalidations.get(key)
+        if existing is not None and not existing.done():
+            return
+        self.stats["revalidations"] += 1
+        task = asyncio.create_task(refresh())
+        self._revalidations[key] = task
+
+        def _forget(done: asyncio.Task, k: str = key) -> None:
+            if self._revalidations.get(k) is done:
+                self._revalidations.pop(k, None)
+
+        task.add_done_callback(_forget)
+
+    def snapshot(self) -> Dict[str, Any]:
+        memory = next((tier for tier in self.tiers if isinstance(tier, MemoryResultCache)), None)
+        return {
+            **self.stats,
+            "entries": len(memory) if memory is not None else None,
+            "tiers": [type(tier).__name__ for tier in self.tiers],
+        }
+
+
+# Caches built by from_env; each SourcingRepository owns one.
+_live_caches: "weakref.WeakSet[ProviderResultCache]" = weakref.WeakSet()
+
+
+def result_cache_snapshot() -> Optional[Dict[str, Any]]:
+    """Stats summed over this process's provider result caches; None when caching is off."""
+    caches = list(_live_caches)
+    if not caches:
+        return None
+    totals: Dict[str, Any] = {"caches": len(caches)}
+    for cache in caches:
+        for name, value in cache.snapshot().items():
+            if isinstance(value, int):
+                totals[name] = totals.get(name, 0) + value
+            else:
+                totals.setdefault(name, value)
+    lookups = totals["hits"] + totals["stale_hits"] + totals["misses"]
+    served = totals["hits"] + totals["stale_hits"]
+    totals["hit_rate"] = round(served / lookups, 3) if lookups else None
+    return totals
+
+
+__all__ = [
+    "CACHED_STATUS_MESSAGE",
+    "CachedProviderResult",
+    "MemoryResultCache",
+    "PostgresResultCache",
+    "ProviderResultCache",
+    "ResultCacheConfig",
+    "UNCACHEABLE_PROVIDERS",
+    "build_result_cache_key",
+    "normalize_cache_query",
+    "result_cache_snapshot",
+]
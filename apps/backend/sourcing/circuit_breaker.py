@@ -0,0 +1,230 @@
+"""Per-provider circuit breakers for sourcing.
+
+A provider that keeps failing, has run out of quota (402) or is rate limited
+(429) is skipped instantly instead of being called and awaited on every search.
+
+States:
+- closed: calls go through; outcomes are tracked in a rolling window and the
+  breaker opens once the error rate crosses the threshold.
+- open: calls are skipped until the cooldown expires. Quota and rate-limit
+  signals open the breaker immediately, honouring ``Retry-After`` when given.
+- half_open: after the cooldown a single probe call is let through; success
+  closes the breaker, failure re-opens it.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from sourcing.models import ProviderStatusSnapshot
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Statuses that count as a failed call for the error-rate window.
+_FAILURE_STATUSES = {"error", "timeout", "exhausted", "rate_limited"}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class CircuitBreakerConfig:
+    window: int = 20
+    min_calls: int = 5
+    error_rate_threshold: float = 0.5
+    cooldown_seconds: float = 30.0
+    rate_limit_cooldown_seconds: float = 60.0
+    quota_cooldown_seconds: float = 900.0
+    max_cooldown_seconds: float = 3600.0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakerConfig":
+        return cls(
+            window=int(_env_float("SOURCING_BREAKER_WINDOW", 20)),
+            min_calls=int(_env_float("SOURCING_BREAKER_MIN_CALLS", 5)),
+            error_rate_threshold=_env_float("SOURCING_BREAKER_ERROR_RATE", 0.5),
+            cooldown_seconds=_env_float("SOURCING_BREAKER_COOLDOWN_SECONDS", 30.0),
+            rate_limit_cooldown_seconds=_env_float(
+                "SOURCING_BREAKER_RATE_LIMIT_COOLDOWN_SECONDS", 60.0
+            ),
+            quota_cooldown_seconds=_env_float("SOURCING_BREAKER_QUOTA_COOLDOWN_SECONDS", 900.0),
+            max_cooldown_seconds=_env_float("SOURCING_BREAKER_MAX_COOLDOWN_SECONDS", 3600.0),
+        )
+
+
+@dataclass
+class ProviderCircuitBreaker:
+    provider_id: str
+    config: CircuitBreakerConfig
+    clock: Callable[[], float] = time.monotonic
+    state: str = CLOSED
+    # Provider status reported for skipped calls ("exhausted", "rate_limited" or "error").
+    reason: str = "error"
+    opened_at: Optional[float] = None
+    open_until: float = 0.0
+    probe_in_flight: bool = False
+    trips: int = 0
+    skipped: int = 0
+    outcomes: Deque[bool] = field(default_factory=deque)
+
+    def __post_init__(self):
+        self.outcomes = deque(self.outcomes, maxlen=max(1, self.config.window))
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+    def current_state(self) -> str:
+        if self.state == OPEN and self.clock() >= self.open_until:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        return self.state
+
+    def retry_in_seconds(self) -> float:
+        if self.current_state() != OPEN:
+            return 0.0
+        return max(0.0, self.open_until - self.clock())
+
+    def allow(self) -> bool:
+        state = self.current_state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        self.skipped += 1
+        return False
+
+    def release(self) -> None:
+        """Give the half-open probe slot back when a call ends without an outcome."""
+        self.probe_in_flight = False
+
+    def record(self, status: ProviderStatusSnapshot) -> None:
+        if status.status == "exhausted":
+            cooldown = status.retry_after_seconds or self.config.quota_cooldown_seconds
+            self._trip("exhausted", cooldown)
+            return
+        if status.status == "rate_limited":
+            cooldown = status.retry_after_seconds or self.config.rate_limit_cooldown_seconds
+            self._trip("rate_limited", cooldown)
+            return
+
+        ok = status.status not in _FAILURE_STATUSES
+        state = self.current_state()
+        if state == HALF_OPEN:
+            if ok:
+                self._close()
+            else:
+                self._trip("error", self.config.cooldown_seconds)
+            return
+
+        self.outcomes.append(ok)
+        if (
+            state == CLOSED
+            and len(self.outcomes) >= self.config.min_calls
+            and self.error_rate() >= self.config.error_rate_threshold
+        ):
+            self._trip("error", self.config.cooldown_seconds)
+
+    def _trip(self, reason: str, cooldown_seconds: float) -> None:
+        cooldown = min(max(cooldown_seconds, 0.0), self.config.max_cooldown_seconds)
+        now = self.clock()
+        self.state = OPEN
+        self.reason = reason
+        self.opened_at = now
+        self.open_until = now + cooldown
+        self.probe_in_flight = False
+        self.trips += 1
+        logger.warning(
+            f"[CircuitBreaker] {self.provider_id} opened ({reason}) for {cooldown:.0f}s"
+        )
+
+    def _close(self) -> None:
+        logger.info(f"[CircuitBreaker] {self.provider_id} closed after successful probe")
+        self.state = CLOSED
+        self.reason = "error"
+        self.opened_at = None
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.outcomes.clear()
+
+    def skipped_status(self) -> ProviderStatusSnapshot:
+        return ProviderStatusSnapshot(
+            provider_id=self.provider_id,
+            status=self.reason,
+            result_count=0,
+            latency_ms=0,
+            message=f"Skipped: circuit open, retry in {int(self.retry_in_seconds())}s",
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.current_state()
+        return {
+            "state": state,
+            "reason": self.reason if state != CLOSED else None,
+            "error_rate": round(self.error_rate(), 3),
+            "calls_in_window": len(self.outcomes),
+            "retry_in_seconds": round(self.retry_in_seconds(), 1),
+            "trips": self.trips,
+            "skipped": self.skipped,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one breaker per provider id."""
+
+    def __init__(
+        self,
+        config: Optional[CircuitBreakerConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config or CircuitBreakerConfig()
+        self._clock = clock
+        self._breakers: Dict[str, ProviderCircuitBreaker] = {}
+
+    def get(self, provider_id: str) -> ProviderCircuitBreaker:
+        breaker = self._breakers.get(provider_id)
+        if breaker is None:
+            breaker = ProviderCircuitBreaker(provider_id, self.config, clock=self._clock)
+            self._breakers[provider_id] = breaker
+        return breaker
+
+    def allow(self, provider_id: str) -> bool:
+        return self.get(provider_id).allow()
+
+    def record(self, provider_id: str, status: ProviderStatusSnapshot) -> None:
+        self.get(provider_id).record(status)
+
+    def reset(self) -> None:
+        self._breakers.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {pid: breaker.snapshot() for pid, breaker in sorted(self._breakers.items())}
+
+
+# Process-wide registry: quota and rate limits are per API key, not per repository.
+provider_breakers = CircuitBreakerRegistry(CircuitBreakerConfig.from_env())
+
+__all__ = [
+    "CLOSED",
+    "OPEN",
+    "HALF_OPEN",
+    "CircuitBreakerConfig",
+    "CircuitBreakerRegistry",
+    "ProviderCircuitBreaker",
+    "provider_breakers",
+]
@@ -1,12 +1,15 @@
 """Provider executors for Search Architecture v2."""
 
 from sourcing.executors.base import run_provider_with_status
+from sourcing.executors.latency import ProviderLatencyTracker, provider_latency
 from sourcing.executors.google_cse import execute_google_cse
 from sourcing.executors.rainforest import execute_rainforest
 from sourcing.executors.ebay import execute_ebay
 
 __all__ = [
     "run_provider_with_status",
+    "ProviderLatencyTracker",
+    "provider_latency",
     "execute_google_cse",
     "execute_rainforest",
     "execute_ebay",
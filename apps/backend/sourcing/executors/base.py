@@ -4,42 +4,141 @@ from __future__ import annotations
 
 import asyncio
 import time
-from typing import List, Tuple, TYPE_CHECKING
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
+from sourcing.executors.latency import ProviderLatencyTracker, provider_latency
 from sourcing.models import ProviderStatusSnapshot
 
 if TYPE_CHECKING:
     from sourcing.repository import SourcingProvider, SearchResult
 
 
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read a Retry-After header (seconds or HTTP date) off an HTTP error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+async def _search_hedged(
+    provider: "SourcingProvider",
+    query: str,
+    hedge: Tuple[str, "SourcingProvider"],
+    hedge_delay_seconds: float,
+    **kwargs,
+) -> Tuple[List["SearchResult"], Optional[str]]:
+    """Search the primary; if it is slow, race a duplicate backend against it.
+
+    Returns (results, hedge_provider_id) where hedge_provider_id is set when the
+    backup's answer was used. A failed or empty answer from one side waits for
+    the other; if both fail the primary's error is raised.
+    """
+    primary = asyncio.ensure_future(provider.search(query, **kwargs))
+    backup: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay_seconds)
+        if done:
+            return primary.result(), None
+
+        hedge_id, hedge_provider = hedge
+        backup = asyncio.ensure_future(hedge_provider.search(query, **kwargs))
+        pending = {primary, backup}
+        fallback: Optional[Tuple[List["SearchResult"], Optional[str]]] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    continue
+                answer = (task.result(), hedge_id if task is backup else None)
+                if answer[0]:
+                    return answer
+                fallback = fallback or answer
+        if fallback is not None:
+            return fallback
+        raise primary.exception()
+    finally:
+        for task in (primary, backup):
+            if task is not None and not task.done():
+                task.cancel()
+
+
 async def run_provider_with_status(
     provider_id: str,
     provider: "SourcingProvider",
     query: str,
     *,
     timeout_seconds: float = 8.0,
+    adaptive_timeout: bool = False,
+    hedge: Optional[Tuple[str, "SourcingProvider"]] = None,
+    hedge_delay_seconds: Optional[float] = None,
+    latency_tracker: Optional[ProviderLatencyTracker] = None,
     **kwargs,
 ) -> Tuple[List["SearchResult"], ProviderStatusSnapshot]:
+    """Run one provider search and report its status.
+
+    ``timeout_seconds`` is the static ceiling. With ``adaptive_timeout`` the
+    deadline is derived from the provider's rolling latency percentile instead,
+    never exceeding the ceiling. ``hedge`` names a duplicate backend that is
+    raced against the primary once ``hedge_delay_seconds`` (default: the
+    primary's rolling p90) has passed without an answer.
+    """
+    tracker = latency_tracker or provider_latency
+    deadline = (
+        tracker.deadline_for(provider_id, timeout_seconds) if adaptive_timeout else timeout_seconds
+    )
+    hedged_by: Optional[str] = None
     started = time.monotonic()
     try:
-        results = await asyncio.wait_for(
-            provider.search(query, **kwargs), timeout=timeout_seconds
-        )
-        elapsed_ms = int((time.monotonic() - started) * 1000)
+        if hedge is not None:
+            delay = hedge_delay_seconds
+            if delay is None:
+                delay = tracker.percentile(provider_id, 0.9) or deadline / 2
+            results, hedged_by = await asyncio.wait_for(
+                _search_hedged(provider, query, hedge, min(delay, deadline), **kwargs),
+                timeout=deadline,
+            )
+        else:
+            results = await asyncio.wait_for(
+                provider.search(query, **kwargs), timeout=deadline
+            )
+        elapsed = time.monotonic() - started
+        if hedged_by is None:
+            tracker.record(provider_id, elapsed)
         status = ProviderStatusSnapshot(
             provider_id=provider_id,
             status="ok",
             result_count=len(results),
-            latency_ms=elapsed_ms,
+            latency_ms=int(elapsed * 1000),
+            message=f"Hedged via {hedged_by}" if hedged_by else None,
         )
         return results, status
     except asyncio.TimeoutError:
-        elapsed_ms = int((time.monotonic() - started) * 1000)
+        elapsed = time.monotonic() - started
+        # Censored sample: the provider took at least this long.
+        tracker.record(provider_id, elapsed)
         status = ProviderStatusSnapshot(
             provider_id=provider_id,
             status="timeout",
             result_count=0,
-            latency_ms=elapsed_ms,
+            latency_ms=int(elapsed * 1000),
             message="Search timed out",
         )
         return [], status
@@ -53,5 +152,6 @@ async def run_provider_with_status(
             result_count=0,
             latency_ms=elapsed_ms,
             message=f"Search failed: {error_msg[:100]}",
+            retry_after_seconds=retry_after_seconds(e),
         )
         return [], status
@@ -0,0 +1,93 @@
+"""Rolling per-provider latency tracking and adaptive deadlines."""
+
+from __future__ import annotations
+
+import math
+import os
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+class ProviderLatencyTracker:
+    """Keeps a rolling window of observed latencies per provider.
+
+    The adaptive deadline is ``percentile * multiplier``, clamped between
+    ``floor_seconds`` and the caller's static ceiling. Until a provider has
+    ``min_samples`` observations the static ceiling is used unchanged.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        percentile: float = 0.95,
+        multiplier: float = 1.5,
+        floor_seconds: float = 1.0,
+    ):
+        self.window = max(1, window)
+        self.min_samples = max(1, min_samples)
+        self.percentile_q = min(max(percentile, 0.0), 1.0)
+        self.multiplier = multiplier
+        self.floor_seconds = floor_seconds
+        self._samples: Dict[str, Deque[float]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ProviderLatencyTracker":
+        return cls(
+            window=int(_env_float("SOURCING_LATENCY_WINDOW", 200)),
+            min_samples=int(_env_float("SOURCING_ADAPTIVE_TIMEOUT_MIN_SAMPLES", 20)),
+            percentile=_env_float("SOURCING_ADAPTIVE_TIMEOUT_PERCENTILE", 0.95),
+            multiplier=_env_float("SOURCING_ADAPTIVE_TIMEOUT_MULTIPLIER", 1.5),
+            floor_seconds=_env_float("SOURCING_ADAPTIVE_TIMEOUT_FLOOR_SECONDS", 1.0),
+        )
+
+    def record(self, provider_id: str, seconds: float) -> None:
+        samples = self._samples.get(provider_id)
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self._samples[provider_id] = samples
+        samples.append(max(0.0, seconds))
+
+    def sample_count(self, provider_id: str) -> int:
+        return len(self._samples.get(provider_id, ()))
+
+    def percentile(self, provider_id: str, q: float) -> Optional[float]:
+        samples = self._samples.get(provider_id)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def deadline_for(self, provider_id: str, ceiling_seconds: float) -> float:
+        if self.sample_count(provider_id) < self.min_samples:
+            return ceiling_seconds
+        observed = self.percentile(provider_id, self.percentile_q) or ceiling_seconds
+        floor = min(self.floor_seconds, ceiling_seconds)
+        return min(max(observed * self.multiplier, floor), ceiling_seconds)
+
+    def reset(self) -> None:
+        self._samples.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            provider_id: {
+                "samples": len(samples),
+                "p50_ms": round((self.percentile(provider_id, 0.5) or 0.0) * 1000, 1),
+                "p95_ms": round((self.percentile(provider_id, 0.95) or 0.0) * 1000, 1),
+            }
+            for provider_id, samples in self._samples.items()
+        }
+
+
+# Process-wide tracker shared by all provider executions.
+provider_latency = ProviderLatencyTracker.from_env()
+
+__all__ = ["ProviderLatencyTracker", "provider_latency"]
@@ -157,6 +157,7 @@ class ProviderStatusSnapshot(BaseModel):
     result_count: int = 0
     latency_ms: Optional[int] = None
     message: Optional[str] = None
+    retry_after_seconds: Optional[float] = None
 
 
 class NormalizedResult(BaseModel):
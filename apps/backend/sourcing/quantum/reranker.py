@@ -16,6 +16,8 @@ from typing import Any, Dict, List
 
 import numpy as np
 
+from utils.cpu_offload import run_cpu_bound
+
 logger = logging.getLogger(__name__)
 
 QUANTUM_RERANKING_ENABLED = os.getenv("QUANTUM_RERANKING_ENABLED", "true").lower() in ("1", "true", "yes")
@@ -107,6 +109,70 @@ def _simulate_quantum_kernel(query_params: np.ndarray, candidate_params: np.ndar
     return float(np.clip(signed_sum / magnitude_sum, -1.0, 1.0))
 
 
+def _reduce_embeddings(embeddings: np.ndarray, n_modes: int) -> np.ndarray:
+    """Row-wise ``_reduce_embedding`` for an ``(m, d)`` matrix; returns ``(m, n_modes)``."""
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    m, d = embeddings.shape
+    if d == 0:
+        return np.zeros((m, n_modes), dtype=np.float64)
+    embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12)
+
+    # Same chunk boundaries as np.array_split; empty chunks pool to 0.
+    sizes = np.full(n_modes, d // n_modes, dtype=np.int64)
+    sizes[: d % n_modes] += 1
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    pooled = np.zeros((m, n_modes), dtype=np.float64)
+    for mode in np.flatnonzero(sizes):
+        pooled[:, mode] = embeddings[:, starts[mode]:ends[mode]].mean(axis=1)
+
+    mean_val = pooled.mean(axis=1, keepdims=True)
+    std_val = pooled.std(axis=1, keepdims=True)
+    flat = std_val < 1e-8
+    normalized = np.where(
+        flat,
+        np.clip(pooled - mean_val, -1.0, 1.0),
+        np.clip((pooled - mean_val) / np.where(flat, 1.0, std_val), -3.0, 3.0),
+    )
+    return normalized / 3.0 * np.pi
+
+
+def _simulate_quantum_kernel_batch(
+    query_params: np.ndarray, candidate_params: np.ndarray
+) -> np.ndarray:
+    """``_simulate_quantum_kernel`` for one query against an ``(m, n)`` candidate matrix.
+
+    The circuit steps are applied to all candidates at once; only the ring of
+    beamsplitters, which is sequential across modes, loops (over ``n`` modes).
+    """
+    q = np.asarray(query_params, dtype=np.float64)
+    c = np.asarray(candidate_params, dtype=np.float64)
+    n = q.shape[0]
+
+    amplitudes = np.sinh(0.1) ** 2 + np.abs(q) * 0.5 * np.cos(q * 0.3)
+    output = amplitudes * np.cos(c) + np.abs(c) * 0.3 * np.cos(c * 0.2)
+
+    for i in range(n):
+        j = (i + 1) % n
+        theta = c[:, i] * 0.1
+        ct, st = np.cos(theta), np.sin(theta)
+        a_i, a_j = output[:, i].copy(), output[:, j].copy()
+        output[:, i] = ct * a_i + st * a_j
+        output[:, j] = -st * a_i + ct * a_j
+
+    if n >= 4:
+        ct, st = np.cos(np.pi / 8), np.sin(np.pi / 8)
+        for i in range(0, n - 2, 2):
+            a_i, a_j = output[:, i].copy(), output[:, i + 2].copy()
+            output[:, i] = ct * a_i + st * a_j
+            output[:, i + 2] = -st * a_i + ct * a_j
+
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64)
+    signed_sum = output @ weights
+    magnitude_sum = np.abs(output) @ weights + 1e-12
+    return np.clip(signed_sum / magnitude_sum, -1.0, 1.0)
+
+
 class QuantumReranker:
     """
     Quantum re-ranker using simulated photonic interference.
@@ -179,59 +245,87 @@ class QuantumReranker:
         base_score = self.blend_factor * quantum_signal + (1.0 - self.blend_factor) * classical_signal
         return float(np.clip(0.9 * base_score + 0.05 * base_score * coherence + 0.05 * novelty, 0.0, 1.0))
 
-    async def rerank_results(
+    def score_candidates(
+        self,
+        query_embedding: np.ndarray,
+        candidate_embeddings: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Score an ``(m, d)`` candidate matrix against the query in one vectorized pass.
+
+        Returns arrays of length ``m`` for the quantum, classical, novelty,
+        coherence and blended scores (the same values the per-pair methods give).
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+        try:
+            q_params = _reduce_embeddings(query[np.newaxis, :], self.n_modes)[0]
+            c_params = _reduce_embeddings(candidates, self.n_modes)
+            quantum = _simulate_quantum_kernel_batch(q_params, c_params)
+        except Exception as e:
+            logger.error(f"Quantum similarity failed: {e}")
+            quantum = np.zeros(candidates.shape[0], dtype=np.float64)
+
+        q_unit = _l2_normalize(query)
+        c_unit = candidates / (np.linalg.norm(candidates, axis=1, keepdims=True) + 1e-12)
+        classical = np.clip(c_unit @ q_unit, -1.0, 1.0).astype(np.float64)
+
+        quantum_signal = np.clip((quantum + 1.0) / 2.0, 0.0, 1.0)
+        classical_signal = np.clip((classical + 1.0) / 2.0, 0.0, 1.0)
+        novelty = np.maximum(0.0, quantum_signal - classical_signal)
+        coherence = np.maximum(0.0, 1.0 - np.abs(quantum_signal - classical_signal))
+        base_score = (
+            self.blend_factor * quantum_signal + (1.0 - self.blend_factor) * classical_signal
+        )
+        blended = np.clip(
+            0.9 * base_score + 0.05 * base_score * coherence + 0.05 * novelty, 0.0, 1.0
+        )
+        return {
+            "quantum_score": quantum,
+            "classical_score": classical,
+            "novelty_score": novelty,
+            "coherence_score": coherence,
+            "blended_score": blended,
+        }
+
+    def rerank_sync(
         self,
         query_embedding: List[float],
         search_results: List[Dict[str, Any]],
         top_k: int = 50,
     ) -> List[Dict[str, Any]]:
-        """
-        Rerank search results using quantum similarity.
-
-        Args:
-            query_embedding: Query embedding (1536-dim).
-            search_results: Results with optional 'embedding' key.
-            top_k: Max results to return.
-
-        Returns:
-            Reranked results with quantum scores.
-        """
+        """Blocking body of ``rerank_results``; safe to run on a worker thread."""
         if not self._enabled or not search_results:
             return search_results[:top_k]
 
-        query_emb = np.array(query_embedding, dtype=np.float32)
-        enhanced: List[Dict[str, Any]] = []
+        query_emb = np.asarray(query_embedding, dtype=np.float32).ravel()
+        enhanced: List[Dict[str, Any]] = list(search_results)
 
-        for result in search_results:
+        # Group candidates by embedding width so each group scores as one matrix.
+        by_width: Dict[int, List[int]] = {}
+        for idx, result in enumerate(search_results):
             candidate_embedding = result.get("embedding")
             if candidate_embedding is None:
                 # No embedding — keep result with neutral quantum scores
-                enhanced.append(result)
-                continue
-
-            candidate_emb = np.asarray(candidate_embedding, dtype=np.float32).ravel()
-            if candidate_emb.size == 0:
-                enhanced.append(result)
                 continue
-
-            q_score = self.quantum_similarity(query_emb, candidate_emb)
-            c_score = self.classical_similarity(query_emb, candidate_emb)
-            novelty = self._novelty_score(q_score, c_score)
-            coherence = self._coherence_score(q_score, c_score)
-            blended = self._blended_score(q_score, c_score, novelty, coherence)
-
-            enhanced_result = dict(result)
-            enhanced_result.update(
-                {
-                    "quantum_score": round(q_score, 4),
-                    "classical_score": round(c_score, 4),
-                    "novelty_score": round(novelty, 4),
-                    "coherence_score": round(coherence, 4),
-                    "blended_score": round(blended, 4),
-                    "quantum_reranked": True,
-                }
+            width = np.asarray(candidate_embedding).size
+            if width:
+                by_width.setdefault(width, []).append(idx)
+
+        for indices in by_width.values():
+            matrix = np.stack(
+                [
+                    np.asarray(search_results[i]["embedding"], dtype=np.float32).ravel()
+                    for i in indices
+                ]
             )
-            enhanced.append(enhanced_result)
+            scores = self.score_candidates(query_emb, matrix)
+            for row, idx in enumerate(indices):
+                enhanced_result = dict(search_results[idx])
+                enhanced_result.update(
+                    {name: round(float(values[row]), 4) for name, values in scores.items()}
+                )
+                enhanced_result["quantum_reranked"] = True
+                enhanced[idx] = enhanced_result
 
         # Sort: quantum-reranked by blended_score, non-reranked at the end
         reranked = [r for r in enhanced if r.get("quantum_reranked")]
@@ -241,3 +335,33 @@ class QuantumReranker:
         final = (reranked + non_reranked)[:top_k]
         logger.info(f"Quantum reranking: {len(reranked)} reranked, {len(non_reranked)} without embeddings")
         return final
+
+    async def rerank_results(
+        self,
+        query_embedding: List[float],
+        search_results: List[Dict[str, Any]],
+        top_k: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank search results using quantum similarity.
+
+        Scoring runs on the shared CPU pool (utils/cpu_offload.py) so large
+        batches do not block the event loop.
+
+        Args:
+            query_embedding: Query embedding (1536-dim).
+            search_results: Results with optional 'embedding' key.
+            top_k: Max results to return.
+
+        Returns:
+            Reranked results with quantum scores.
+        """
+        if not self._enabled or not search_results:
+            return search_results[:top_k]
+        return await run_cpu_bound(
+            self.rerank_sync,
+            query_embedding,
+            search_results,
+            top_k,
+            items=len(search_results),
+        )
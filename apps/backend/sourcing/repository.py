@@ -10,9 +10,13 @@ import time
 import base64
 
 from utils.security import redact_secrets_from_text
+from sourcing.cache import ProviderResultCache
+from sourcing.circuit_breaker import CircuitBreakerRegistry, provider_breakers
 from sourcing.executors import run_provider_with_status
 from sourcing.models import NormalizedResult, ProviderStatusSnapshot
 from sourcing.metrics import log_provider_result
+from sourcing.singleflight import SingleFlight, build_flight_key, provider_flights
+from sourcing.speculative import SpeculativeSearches, speculative_searches
 
 
 def extract_merchant_domain(url: str) -> str:
@@ -139,7 +143,42 @@ from sourcing.providers_marketplace import (  # noqa: F401
 )
 
 
+def classify_provider_status(status: ProviderStatusSnapshot) -> ProviderStatusSnapshot:
+    """Map raw provider failures onto quota / rate-limit statuses with safe messages."""
+    if status.status != "ok":
+        error_str = redact_secrets(status.message or "")
+        if "402" in error_str or "Payment Required" in error_str:
+            status.status = "exhausted"
+            status.message = "API quota exhausted"
+        elif "429" in error_str or "Too Many Requests" in error_str:
+            status.status = "rate_limited"
+            status.message = "Rate limit exceeded"
+        elif status.status == "error":
+            status.message = "Search failed"
+    return status
+
+
 class SourcingRepository:
+    # Per-provider result cache; None disables caching (e.g. repos built via __new__).
+    result_cache: Optional[ProviderResultCache] = None
+    # Coalesces identical concurrent upstream calls; None disables coalescing.
+    single_flight: Optional[SingleFlight] = None
+    # Skips providers that are failing, out of quota or rate limited; None disables.
+    circuit_breakers: Optional[CircuitBreakerRegistry] = None
+    # Fetches started by the chat route before its decision; claimed by search_streaming.
+    speculative: Optional[SpeculativeSearches] = None
+    # Derive per-provider deadlines from rolling latency instead of the static timeout.
+    adaptive_timeouts: bool = False
+    # Race a duplicate backend against a slow primary (see _HEDGE_GROUPS).
+    hedging_enabled: bool = False
+    # Once this many seconds have passed and enough results are in, stop waiting
+    # on the remaining providers. 0 disables the budget.
+    request_budget_seconds: float = 0.0
+    request_enough_results: int = 20
+
+    # Providers that front the same upstream index and can stand in for each other.
+    _HEDGE_GROUPS = (("serpapi", "searchapi", "scaleserp"),)
+
     def __init__(self):
         self.providers: Dict[str, SourcingProvider] = {}
         
@@ -222,6 +261,32 @@ class SourcingRepository:
             if len(self.providers) == 0:
                 self.providers["mock"] = MockShoppingProvider()
 
+        self.result_cache = ProviderResultCache.from_env(list(self.providers.keys()))
+        single_flight_setting = (
+            (os.getenv("SOURCING_SINGLE_FLIGHT_ENABLED", "true") or "").strip().lower()
+        )
+        if single_flight_setting not in ("0", "false", "no", "off"):
+            self.single_flight = provider_flights
+        breaker_setting = (
+            (os.getenv("SOURCING_CIRCUIT_BREAKER_ENABLED", "true") or "").strip().lower()
+        )
+        if breaker_setting not in ("0", "false", "no", "off"):
+            self.circuit_breakers = provider_breakers
+        self.speculative = speculative_searches
+        # Off by default: providers get the fixed SOURCING_PROVIDER_TIMEOUT_SECONDS deadline.
+        adaptive_setting = (os.getenv("SOURCING_ADAPTIVE_TIMEOUTS", "false") or "").strip().lower()
+        self.adaptive_timeouts = adaptive_setting in ("1", "true", "yes", "on")
+        hedging_setting = (os.getenv("SOURCING_HEDGING_ENABLED", "false") or "").strip().lower()
+        self.hedging_enabled = hedging_setting in ("1", "true", "yes", "on")
+        try:
+            self.request_budget_seconds = float(os.getenv("SOURCING_REQUEST_BUDGET_SECONDS", "0"))
+        except Exception:
+            self.request_budget_seconds = 0.0
+        try:
+            self.request_enough_results = int(os.getenv("SOURCING_REQUEST_ENOUGH_RESULTS", "20"))
+        except Exception:
+            self.request_enough_results = 20
+
     _PROVIDER_ALIASES: Dict[str, str] = {
         "rainforest": "amazon",
         "google": "serpapi",
@@ -236,6 +301,164 @@ class SourcingRepository:
             resolved.add(canonical)
         return resolved
 
+    def _hedge_for(
+        self, name: str, selected: Dict[str, SourcingProvider]
+    ) -> Optional[tuple[str, SourcingProvider]]:
+        """Pick a configured duplicate backend for ``name`` that is not already running."""
+        if not self.hedging_enabled:
+            return None
+        for group in self._HEDGE_GROUPS:
+            if name not in group:
+                continue
+            for candidate in group:
+                if candidate != name and candidate in self.providers and candidate not in selected:
+                    return candidate, self.providers[candidate]
+        return None
+
+    async def _iter_within_budget(
+        self,
+        tasks: Dict["asyncio.Task", str],
+        started: float,
+        result_count: int = 0,
+    ):
+        """Yield (name, results, status) for provider tasks as they finish.
+
+        When the request budget has elapsed and at least ``request_enough_results``
+        results are in, the remaining tasks are cancelled and reported as timeouts.
+        Upstream calls shared via single-flight keep running and still fill the cache.
+        """
+        budget = self.request_budget_seconds
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = budget - (time.monotonic() - started) if budget > 0 else None
+                enough = result_count >= self.request_enough_results
+                if remaining is not None and remaining <= 0 and enough:
+                    break
+                wait_timeout = remaining if remaining is not None and remaining > 0 else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        _, results, status = task.result()
+                    except Exception as e:
+                        results = []
+                        status = ProviderStatusSnapshot(
+                            provider_id=name,
+                            status="error",
+                            result_count=0,
+                            message=str(e)[:100],
+                        )
+                    result_count += len(results)
+                    yield name, results, status
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+            for task in pending:
+                task.cancel()
+                name = tasks[task]
+                print(f"[SourcingRepository] Abandoning provider {name} after request budget")
+                yield name, [], ProviderStatusSnapshot(
+                    provider_id=name,
+                    status="timeout",
+                    result_count=0,
+                    latency_ms=elapsed_ms,
+                    message="Abandoned after request budget",
+                )
+            pending = set()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _claim_speculative(
+        self, providers: Dict[str, SourcingProvider], query: str, params: Dict[str, Any]
+    ) -> Dict[str, asyncio.Task]:
+        """Take over speculative fetches that match this search, by provider name."""
+        speculative, cache = self.speculative, self.result_cache
+        if speculative is None or cache is None:
+            return {}
+        claimed: Dict[str, asyncio.Task] = {}
+        for name in providers:
+            if cache.is_cacheable(name):
+                task = speculative.claim(cache.key_for(name, query, params))
+                if task is not None:
+                    claimed[name] = task
+        return claimed
+
+    async def _cached_provider_result(
+        self,
+        name: str,
+        provider: SourcingProvider,
+        query: str,
+        timeout_seconds: float,
+        params: Dict[str, Any],
+    ) -> Optional[tuple[List[SearchResult], ProviderStatusSnapshot]]:
+        """Return a cached (results, status) pair, or None on a miss.
+
+        Stale entries are still returned, and refreshed in the background.
+        """
+        cache = self.result_cache
+        if cache is None or not cache.is_cacheable(name):
+            return None
+        key = cache.key_for(name, query, params)
+        entry = await cache.lookup(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh():
+            cache.revalidate(
+                key, lambda: self._run_provider(name, provider, query, timeout_seconds, params)
+            )
+        return entry.copy_results(), entry.status_snapshot()
+
+    async def _run_provider(
+        self,
+        name: str,
+        provider: SourcingProvider,
+        query: str,
+        timeout_seconds: float,
+        params: Dict[str, Any],
+        hedge: Optional[tuple[str, SourcingProvider]] = None,
+    ) -> tuple[List[SearchResult], ProviderStatusSnapshot]:
+        """Call a provider and store successful responses in the result cache.
+
+        Identical concurrent calls share one upstream request; every caller gets
+        its own copies since results and statuses are mutated downstream. When
+        the provider's circuit breaker is open the call is skipped outright.
+        """
+        breakers = self.circuit_breakers
+
+        async def call_upstream() -> tuple[List[SearchResult], ProviderStatusSnapshot]:
+            if breakers is not None and not breakers.allow(name):
+                return [], breakers.get(name).skipped_status()
+            recorded = False
+            try:
+                results, status = await run_provider_with_status(
+                    name,
+                    provider,
+                    query,
+                    timeout_seconds=timeout_seconds,
+                    adaptive_timeout=self.adaptive_timeouts,
+                    hedge=hedge,
+                    **params,
+                )
+                classify_provider_status(status)
+                if breakers is not None:
+                    breakers.record(name, status)
+                    recorded = True
+            finally:
+                if breakers is not None and not recorded:
+                    breakers.get(name).release()
+            cache = self.result_cache
+            if cache is not None and cache.is_cacheable(name):
+                await cache.store(cache.key_for(name, query, params), query, results, status)
+            return results, status
+
+        flight = self.single_flight
+        if flight is None:
+            return await call_upstream()
+        results, status = await flight.do(build_flight_key(name, query, params), call_upstream)
+        return [r.model_copy(deep=True) for r in results], status.model_copy()
+
     async def search_all(self, query: str, **kwargs) -> List[SearchResult]:
         """Search all providers and return results only (backwards compatible)."""
         result = await self.search_all_with_status(query, **kwargs)
@@ -278,35 +501,31 @@ class SourcingRepository:
             if name == "vendor_directory" and vendor_query:
                 effective_query = vendor_query
                 extra_kwargs["context_query"] = query
-            results, status = await run_provider_with_status(
-                name,
-                provider,
-                effective_query,
-                timeout_seconds=PROVIDER_TIMEOUT_SECONDS,
-                **extra_kwargs,
+            cached = await self._cached_provider_result(
+                name, provider, effective_query, PROVIDER_TIMEOUT_SECONDS, extra_kwargs
             )
-            if status.status != "ok":
-                error_str = redact_secrets(status.message or "")
-                if "402" in error_str or "Payment Required" in error_str:
-                    status.status = "exhausted"
-                    status.message = "API quota exhausted"
-                elif "429" in error_str or "Too Many Requests" in error_str:
-                    status.status = "rate_limited"
-                    status.message = "Rate limit exceeded"
-                elif status.status == "error":
-                    status.message = "Search failed"
+            if cached is not None:
+                results, status = cached
+            else:
+                results, status = await self._run_provider(
+                    name, provider, effective_query, PROVIDER_TIMEOUT_SECONDS, extra_kwargs,
+                    hedge=self._hedge_for(name, selected_providers),
+                )
             print(f"[SourcingRepository] Provider {name} returned {len(results)} results")
             return (name, results, status)
 
-        tasks = [
-            search_with_timeout(name, provider)
+        tasks = {
+            asyncio.create_task(search_with_timeout(name, provider)): name
             for name, provider in selected_providers.items()
-        ]
-        
-        task_results = await asyncio.gather(*tasks)
-        
+        }
+
+        finished: Dict[str, tuple[List[SearchResult], ProviderStatusSnapshot]] = {}
+        async for name, results, status in self._iter_within_budget(tasks, time.monotonic()):
+            finished[name] = (results, status)
+
         results_lists = []
-        for name, results, status in task_results:
+        for name in selected_providers:
+            results, status = finished[name]
             results_lists.append(results)
             provider_statuses.append(status)
             normalized_results.extend(normalize_results_for_provider(name, results))
@@ -394,9 +613,10 @@ class SourcingRepository:
             selected_providers = {k: v for k, v in self.providers.items() if k in allow}
 
         PROVIDER_TIMEOUT_SECONDS = float(os.getenv("SOURCING_PROVIDER_TIMEOUT_SECONDS", "30.0"))
+        started = time.monotonic()
 
         async def search_with_timeout(
-            name: str, provider: SourcingProvider
+            name: str, provider: SourcingProvider, speculation: Optional[asyncio.Task] = None
         ) -> tuple[str, List[SearchResult], ProviderStatusSnapshot]:
             print(f"[SourcingRepository] [STREAM] Starting provider: {name}")
             effective_query = query
@@ -404,72 +624,92 @@ class SourcingRepository:
             if name == "vendor_directory" and vendor_query:
                 effective_query = vendor_query
                 extra_kwargs["context_query"] = query
-            results, status = await run_provider_with_status(
-                name,
-                provider,
-                effective_query,
-                timeout_seconds=PROVIDER_TIMEOUT_SECONDS,
-                **extra_kwargs,
-            )
-            if status.status != "ok":
-                error_str = redact_secrets(status.message or "")
-                if "402" in error_str or "Payment Required" in error_str:
-                    status.status = "exhausted"
-                    status.message = "API quota exhausted"
-                elif "429" in error_str or "Too Many Requests" in error_str:
-                    status.status = "rate_limited"
-                    status.message = "Rate limit exceeded"
-                elif status.status == "error":
-                    status.message = "Search failed"
+            outcome = None
+            if speculation is not None:
+                try:
+                    outcome = await asyncio.shield(speculation)
+                except Exception as e:
+                    print(
+                        f"[SourcingRepository] [STREAM] Speculative fetch for {name} failed, "
+                        f"calling again: {e}"
+                    )
+            if outcome is None:
+                outcome = await self._run_provider(
+                    name, provider, effective_query, PROVIDER_TIMEOUT_SECONDS, extra_kwargs,
+                    hedge=self._hedge_for(name, selected_providers),
+                )
+            results, status = outcome
             print(f"[SourcingRepository] [STREAM] Provider {name} returned {len(results)} results")
             log_provider_result(name, status.status, len(results), status.latency_ms or 0)
             return (name, results, status)
 
-        tasks = {
-            asyncio.create_task(search_with_timeout(name, provider)): name
+        # Reuse fetches the chat route started speculatively, serve cached
+        # providers immediately; only the rest go upstream.
+        claimed = self._claim_speculative(selected_providers, query, kwargs)
+        unclaimed = [
+            (name, provider)
             for name, provider in selected_providers.items()
+            if name not in claimed
+        ]
+        cached_lookups = await asyncio.gather(*[
+            self._cached_provider_result(
+                name, provider, query, PROVIDER_TIMEOUT_SECONDS, dict(kwargs)
+            )
+            for name, provider in unclaimed
+        ])
+        cached_batches = []
+        live_providers: Dict[str, SourcingProvider] = {}
+        for (name, provider), cached in zip(unclaimed, cached_lookups):
+            if cached is not None:
+                cached_batches.append((name, cached[0], cached[1]))
+            else:
+                live_providers[name] = provider
+        in_flight: Dict[str, asyncio.Task] = {}
+        for name, speculation in claimed.items():
+            if not speculation.done():
+                in_flight[name] = speculation
+            elif not speculation.cancelled() and speculation.exception() is None:
+                results, status = speculation.result()
+                cached_batches.append((name, results, status))
+                continue
+            live_providers[name] = selected_providers[name]
+
+        tasks = {
+            asyncio.create_task(search_with_timeout(name, provider, in_flight.get(name))): name
+            for name, provider in live_providers.items()
         }
         
-        total_providers = len(tasks)
+        total_providers = len(selected_providers)
         completed_count = 0
         seen_urls = set()
 
-        for coro in asyncio.as_completed(tasks.keys()):
-            try:
-                name, results, status = await coro
-                completed_count += 1
-                providers_remaining = total_providers - completed_count
-                
-                unique_results = []
-                for r in results:
-                    url = normalize_url(getattr(r, 'url', ''))
-                    if url[:4] != 'http' and not url.startswith('mailto:'):
-                        continue
-                    url_key = url.lower().rstrip('/')
-                    if url_key not in seen_urls:
-                        seen_urls.add(url_key)
-                        if not getattr(r, "merchant_domain", ""):
-                            r.merchant_domain = extract_merchant_domain(r.url)
-                        r.match_score = compute_match_score(r, query)
-                        unique_results.append(r)
-                
-                unique_results.sort(key=lambda r: r.match_score, reverse=True)
-                
-                yield (name, unique_results, status, providers_remaining)
-                
-            except Exception as e:
-                completed_count += 1
-                providers_remaining = total_providers - completed_count
-                failed_name = "unknown"
-                for task, task_name in tasks.items():
-                    if task.done() and task.exception():
-                        failed_name = task_name
-                        break
-                status = ProviderStatusSnapshot(
-                    provider_id=failed_name,
-                    status="error",
-                    result_count=0,
-                    message=str(e)[:100]
-                )
-                yield (failed_name, [], status, providers_remaining)
+        def unique_batch(results: List[SearchResult]) -> List[SearchResult]:
+            unique_results = []
+            for r in results:
+                url = normalize_url(getattr(r, 'url', ''))
+                if url[:4] != 'http' and not url.startswith('mailto:'):
+                    continue
+                url_key = url.lower().rstrip('/')
+                if url_key not in seen_urls:
+                    seen_urls.add(url_key)
+                    if not getattr(r, "merchant_domain", ""):
+                        r.merchant_domain = extract_merchant_domain(r.url)
+                    r.match_score = compute_match_score(r, query)
+                    unique_results.append(r)
+            
+            unique_results.sort(key=lambda r: r.match_score, reverse=True)
+            return unique_results
+
+        for name, results, status in cached_batches:
+            completed_count += 1
+            print(
+                f"[SourcingRepository] [STREAM] Provider {name} served "
+                f"{len(results)} cached results"
+            )
+            log_provider_result(name, status.status, len(results), 0)
+            yield (name, unique_batch(results), status, total_providers - completed_count)
 
+        cached_count = sum(len(results) for _, results, _ in cached_batches)
+        async for name, results, status in self._iter_within_budget(tasks, started, cached_count):
+            completed_count += 1
+            yield (name, unique_batch(results), status, total_providers - completed_count)
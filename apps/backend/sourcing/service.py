@@ -21,6 +21,7 @@ from sourcing.models import NormalizedResult, ProviderStatusSnapshot, SearchInte
 from sourcing.repository import SourcingRepository
 from sourcing.metrics import get_metrics_collector, log_search_start
 from sourcing.scorer import score_results
+from utils.cpu_offload import run_cpu_bound
 from sourcing.parsers import _parse_numeric, _parse_price_value
 from sourcing.vendor_provider import build_query_embedding
 
@@ -309,7 +310,8 @@ class SourcingService:
 
         # 2. Score & Rank Results
         desire_tier = row.desire_tier if row else None
-        normalized_results = score_results(
+        normalized_results = await run_cpu_bound(
+            score_results,
             normalized_results,
             intent=search_intent,
             min_price=min_price,
@@ -317,6 +319,7 @@ class SourcingService:
             desire_tier=desire_tier,
             is_service=row.is_service if row else None,
             service_category=row.service_category if row else None,
+            items=len(normalized_results),
         )
 
         # 2b. Quantum re-ranking (for results with embeddings)
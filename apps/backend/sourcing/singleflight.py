@@ -0,0 +1,66 @@
+"""In-process single-flight coalescing for provider searches.
+
+When many identical searches arrive at once (a viral share link, a group thread
+opening the same project), only the first caller for a given
+(provider, query, params) key goes upstream; concurrent callers with the same
+key wait for that request and receive its result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def build_flight_key(provider_id: str, query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps(
+        {"provider": provider_id, "query": query, "params": params or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
+
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "inflight": self.inflight_count()}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.stats["coalesced"] += 1
+            logger.debug(f"[SingleFlight] Coalesced call onto in-flight key {key[:12]}")
+        else:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+
+            def _forget(done: asyncio.Task, k: str = key) -> None:
+                if self._inflight.get(k) is done:
+                    self._inflight.pop(k, None)
+
+            task.add_done_callback(_forget)
+        # Shield so one waiter disconnecting does not cancel the shared call.
+        return await asyncio.shield(task)
+
+
+# Process-wide, so identical searches coalesce across every SourcingRepository.
+provider_flights = SingleFlight()
+
+__all__ = ["SingleFlight", "build_flight_key", "provider_flights"]
@@ -0,0 +1,166 @@
+"""Speculative provider searches for chat turns.
+
+A chat turn spends seconds in the LLM decision before the row exists and its
+search starts, and provider latency then stacks on top. With
+``SOURCING_SPECULATIVE_SEARCH_ENABLED=true`` the chat route starts cacheable
+provider fetches for the likely query (the active row's stored search intent,
+else the heuristic query from the user message) as soon as the message arrives.
+
+Fetches are keyed like the result cache (provider, normalized query, zip, price
+bounds). ``SourcingRepository.search_streaming`` claims a matching fetch, in
+flight or finished, instead of calling the provider again. Fetches that nobody
+claims are dropped when the turn ends (or after a TTL) and counted as wasted.
+Claims are per process; finished fetches are also written to the result cache,
+which the Postgres tier shares across workers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from sourcing.repository import SourcingRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class SpeculativeSearchConfig:
+    enabled: bool = False
+    ttl_seconds: float = 30.0
+    max_pending: int = 256
+
+    @classmethod
+    def from_env(cls) -> "SpeculativeSearchConfig":
+        enabled = (os.getenv("SOURCING_SPECULATIVE_SEARCH_ENABLED", "false") or "").strip().lower()
+        return cls(
+            enabled=enabled in ("1", "true", "yes", "on"),
+            ttl_seconds=_env_float("SOURCING_SPECULATIVE_TTL_SECONDS", 30.0),
+            max_pending=int(_env_float("SOURCING_SPECULATIVE_MAX_PENDING", 256)),
+        )
+
+
+@dataclass
+class _Speculation:
+    task: asyncio.Task
+    started_at: float
+
+
+def _consume_result(task: asyncio.Task) -> None:
+    # Unclaimed fetches may fail; retrieve the exception so it is not logged as unhandled.
+    if not task.cancelled():
+        task.exception()
+
+
+class SpeculativeSearches:
+    """In-flight speculative provider fetches, keyed by result-cache key."""
+
+    def __init__(self, config: Optional[SpeculativeSearchConfig] = None):
+        self.config = config or SpeculativeSearchConfig()
+        self._pending: Dict[str, _Speculation] = {}
+        self.stats: Dict[str, int] = {
+            "turns": 0,
+            "started": 0,
+            "already_cached": 0,
+            "reused": 0,
+            "wasted": 0,
+            "skipped": 0,
+        }
+
+    async def start(
+        self,
+        repo: "SourcingRepository",
+        query: str,
+        *,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> List[str]:
+        """Start a fetch per cacheable provider not already cached; return the keys started."""
+        cache = repo.result_cache
+        if not self.config.enabled or cache is None or not (query or "").strip():
+            return []
+        self._expire()
+        self.stats["turns"] += 1
+        params: Dict[str, Any] = {"min_price": min_price, "max_price": max_price}
+        timeout_seconds = _env_float("SOURCING_PROVIDER_TIMEOUT_SECONDS", 30.0)
+        keys: List[str] = []
+        for name, provider in repo.providers.items():
+            if not cache.is_cacheable(name):
+                continue
+            key = cache.key_for(name, query, params)
+            if key in self._pending:
+                continue  # another turn's fetch; it owns the key
+            if len(self._pending) >= self.config.max_pending:
+                self.stats["skipped"] += 1
+                continue
+            if await cache.lookup(key) is not None:
+                self.stats["already_cached"] += 1
+                continue
+            task = asyncio.create_task(
+                repo._run_provider(name, provider, query, timeout_seconds, dict(params))
+            )
+            task.add_done_callback(_consume_result)
+            self._pending[key] = _Speculation(task, time.monotonic())
+            self.stats["started"] += 1
+            keys.append(key)
+        if keys:
+            logger.info(f"[Speculative] Started {len(keys)} provider fetches for {query!r}")
+        return keys
+
+    def claim(self, key: str) -> Optional[asyncio.Task]:
+        """Hand a pending fetch to the real search; None if there is none for ``key``."""
+        speculation = self._pending.pop(key, None)
+        if speculation is None:
+            return None
+        self.stats["reused"] += 1
+        return speculation.task
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Drop fetches that were not claimed (the decision did not search this query)."""
+        for key in keys:
+            speculation = self._pending.pop(key, None)
+            if speculation is not None:
+                self._waste(speculation)
+
+    def _waste(self, speculation: _Speculation) -> None:
+        self.stats["wasted"] += 1
+        if not speculation.task.done():
+            speculation.task.cancel()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.config.ttl_seconds
+        for key, speculation in list(self._pending.items()):
+            if speculation.started_at < cutoff:
+                self._pending.pop(key, None)
+                self._waste(speculation)
+
+    def snapshot(self) -> Dict[str, Any]:
+        started = self.stats["started"]
+        return {
+            "enabled": self.config.enabled,
+            **self.stats,
+            "pending": len(self._pending),
+            "hit_rate": round(self.stats["reused"] / started, 3) if started else None,
+        }
+
+
+# Process-wide: the chat route starts fetches and the search stream endpoint claims them.
+speculative_searches = SpeculativeSearches(SpeculativeSearchConfig.from_env())
+
+__all__ = [
+    "SpeculativeSearchConfig",
+    "SpeculativeSearches",
+    "speculative_searches",
+]
@@ -1,349 +1,661 @@
 """
-Startup migrations — lightweight, idempotent schema migrations run on every boot.
+Startup migrations — versioned schema steps recorded in a ledger table.
 
 Extracted from main.py to keep it under 450 lines.
-These run inside startup_event() wrapped in asyncio.timeout.
+``run_startup_migrations`` runs inside startup_event() wrapped in asyncio.timeout.
+Every step is hashed; applied hashes are stored in ``schema_migration_ledger`` so
+a boot against an up-to-date database costs one SELECT. Pending steps are applied
+by a single replica at a time under a Postgres advisory lock.
+
+Index builds are not part of the boot path: ``build_startup_indexes`` runs them
+with ``CREATE INDEX CONCURRENTLY`` in the background after startup, so new indexes
+never hold a write lock on hot tables.
 """
 import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
 
 from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 
+from utils.match_terms import ROW_TERMS_SQL
 
-async def run_startup_migrations(engine) -> None:
-    """Run all idempotent ALTER TABLE / CREATE TABLE migrations."""
-    async with engine.begin() as conn:
-        # Row columns
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS chat_history TEXT;"))
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS selected_providers TEXT;"))
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_channel VARCHAR;"))
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_message_id VARCHAR;"))
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_user_id INTEGER;"))
-
-        await conn.execute(text("ALTER TABLE vendor ALTER COLUMN default_commission_rate SET DEFAULT 0.0;"))
-        await conn.execute(text("UPDATE vendor SET default_commission_rate = 0.0 WHERE default_commission_rate IS DISTINCT FROM 0.0;"))
-
-        # User columns
-        await conn.execute(text('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS name TEXT;'))
-        await conn.execute(text('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS company TEXT;'))
-
-        # DealHandoff Phase 1+3 columns
-        for col, dtype in [
-            ("bid_id", "INTEGER"),
-            ("vendor_id", "INTEGER"),
-            ("vendor_email", "VARCHAR"),
-            ("vendor_name", "VARCHAR"),
-            ("acceptance_token", "VARCHAR"),
-            ("buyer_accepted_at", "TIMESTAMP"),
-            ("buyer_accepted_ip", "VARCHAR"),
-            ("vendor_accepted_at", "TIMESTAMP"),
-            ("vendor_accepted_ip", "VARCHAR"),
-        ]:
-            await conn.execute(text(
-                f"ALTER TABLE deal_handoff ADD COLUMN IF NOT EXISTS {col} {dtype};"
-            ))
+LEDGER_TABLE = "schema_migration_ledger"
 
-        # Bid provenance
-        await conn.execute(text("ALTER TABLE bid ADD COLUMN IF NOT EXISTS provenance TEXT;"))
+# pg_advisory_lock keys (arbitrary, but must stay stable across releases).
+MIGRATION_LOCK_KEY = 7_240_113_001
+INDEX_BUILD_LOCK_KEY = 7_240_113_002
 
-        # Vendor SEO columns
-        await conn.execute(text("ALTER TABLE vendor ADD COLUMN IF NOT EXISTS slug VARCHAR;"))
-        await conn.execute(text("ALTER TABLE vendor ADD COLUMN IF NOT EXISTS seo_content JSONB;"))
-        await conn.execute(text("ALTER TABLE vendor ADD COLUMN IF NOT EXISTS schema_markup JSONB;"))
-        await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS vendor_slug_idx ON vendor (slug);"))
+# Fail fast instead of queueing behind long transactions on hot tables; the next
+# boot retries whatever did not get recorded in the ledger.
+MIGRATION_LOCK_TIMEOUT = "5s"
 
-        # Vendor GEO column
-        await conn.execute(text("ALTER TABLE vendor ADD COLUMN IF NOT EXISTS store_geo_location TEXT;"))
 
-        # Drop dead service_areas column
-        result = await conn.execute(text(
-            "SELECT column_name FROM information_schema.columns "
-            "WHERE table_name = 'vendor' AND column_name = 'service_areas'"
-        ))
-        if result.first() is not None:
-            await conn.execute(text(
-                "UPDATE vendor "
-                "SET store_geo_location = COALESCE(store_geo_location, CAST(service_areas AS TEXT)) "
-                "WHERE store_geo_location IS NULL"
-            ))
-            await conn.execute(text("ALTER TABLE vendor DROP COLUMN service_areas;"))
+@dataclass(frozen=True)
+class MigrationStep:
+    """A named group of idempotent statements, applied once per checksum."""
 
-        # SDUI schema columns (Phase 0.2)
-        await conn.execute(text("ALTER TABLE project ADD COLUMN IF NOT EXISTS ui_schema JSONB;"))
-        await conn.execute(text("ALTER TABLE project ADD COLUMN IF NOT EXISTS ui_schema_version INTEGER DEFAULT 0;"))
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS ui_schema JSONB;"))
-        await conn.execute(text("ALTER TABLE row ADD COLUMN IF NOT EXISTS ui_schema_version INTEGER DEFAULT 0;"))
-        await conn.execute(text("ALTER TABLE bid ADD COLUMN IF NOT EXISTS bid_ui_schema JSONB;"))
-        await conn.execute(text("ALTER TABLE bid ADD COLUMN IF NOT EXISTS ui_schema_version INTEGER DEFAULT 0;"))
+    name: str
+    statements: tuple[str, ...] = ()
+    run: Optional[Callable[..., Awaitable[None]]] = None
 
-        # Project shopping mode (Ready to Shop / Edit List)
-        await conn.execute(text("ALTER TABLE project ADD COLUMN IF NOT EXISTS shopping_mode BOOLEAN DEFAULT FALSE;"))
+    @property
+    def checksum(self) -> str:
+        parts = [self.name, *self.statements]
+        if self.run is not None:
+            parts.append(self.run.__qualname__)
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
 
-        # pg_trgm for fuzzy text search
-        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
-        await conn.execute(text(
-            "CREATE INDEX IF NOT EXISTS vendor_name_trgm_idx ON vendor USING gin (name gin_trgm_ops);"
-        ))
 
-        # Vector similarity index on vendor embeddings.
-        # IVFFlat chosen over HNSW because Railway Postgres containers have low
-        # shared memory limits (~64MB) which cause HNSW builds to fail with
-        # DiskFullError on the shared memory segment.
-        # IVFFlat is much lighter on memory and perfectly adequate for <10k vectors.
-        # lists ≈ sqrt(3700) ≈ 61
-        await conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS vendor_embedding_ivfflat_idx
-            ON vendor USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 60);
-        """))
-        # Drop old HNSW index if it somehow exists from a previous attempt
-        await conn.execute(text(
-            "DROP INDEX IF EXISTS vendor_embedding_hnsw_idx;"
-        ))
+@dataclass(frozen=True)
+class IndexStep:
+    """An index built out of band with CREATE INDEX CONCURRENTLY (or dropped, if retired)."""
+
+    name: str
+    definition: str = ""
+    unique: bool = False
+    drop: bool = False
+
+    @property
+    def sql(self) -> str:
+        if self.drop:
+            return f"DROP INDEX CONCURRENTLY IF EXISTS {self.name};"
+        unique = "UNIQUE " if self.unique else ""
+        return f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {self.name} {self.definition};"
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
 
-        # Deal Pipeline tables
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS deal (
-                id SERIAL PRIMARY KEY,
-                row_id INTEGER NOT NULL REFERENCES row(id),
-                bid_id INTEGER REFERENCES bid(id),
-                vendor_id INTEGER REFERENCES vendor(id),
-                buyer_user_id INTEGER NOT NULL REFERENCES "user"(id),
-                status VARCHAR NOT NULL DEFAULT 'negotiating',
-                proxy_email_alias VARCHAR UNIQUE NOT NULL,
-                vendor_quoted_price FLOAT,
-                platform_fee_pct FLOAT NOT NULL DEFAULT 0.0,
-                platform_fee_amount FLOAT,
-                buyer_total FLOAT,
-                currency VARCHAR NOT NULL DEFAULT 'USD',
-                stripe_payment_intent_id VARCHAR,
-                stripe_transfer_id VARCHAR,
-                stripe_connect_account_id VARCHAR,
-                agreed_terms_summary TEXT,
-                fulfillment_notes TEXT,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                updated_at TIMESTAMP,
-                terms_agreed_at TIMESTAMP,
-                funded_at TIMESTAMP,
-                completed_at TIMESTAMP,
-                canceled_at TIMESTAMP
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS deal_row_id_idx ON deal (row_id);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS deal_status_idx ON deal (status);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS deal_proxy_alias_idx ON deal (proxy_email_alias);"))
-        await conn.execute(text("ALTER TABLE deal ALTER COLUMN platform_fee_pct SET DEFAULT 0.0;"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS deal_message (
-                id SERIAL PRIMARY KEY,
-                deal_id INTEGER NOT NULL REFERENCES deal(id),
-                sender_type VARCHAR NOT NULL,
-                sender_email VARCHAR,
-                subject VARCHAR,
-                content_text TEXT NOT NULL,
-                content_html TEXT,
-                attachments JSONB,
-                resend_message_id VARCHAR,
-                ai_classification VARCHAR,
-                ai_confidence FLOAT,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS deal_message_deal_id_idx ON deal_message (deal_id);"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS vendor_bookmark (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES "user"(id),
-                vendor_id INTEGER NOT NULL REFERENCES vendor(id),
-                source_row_id INTEGER REFERENCES row(id),
-                created_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_bookmark_user_id_idx ON vendor_bookmark (user_id);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_bookmark_vendor_id_idx ON vendor_bookmark (vendor_id);"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS item_bookmark (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES "user"(id),
-                canonical_url VARCHAR NOT NULL,
-                source_row_id INTEGER REFERENCES row(id),
-                created_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS item_bookmark_user_id_idx ON item_bookmark (user_id);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS item_bookmark_canonical_url_idx ON item_bookmark (canonical_url);"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS vendor_coverage_gap (
-                id SERIAL PRIMARY KEY,
-                row_id INTEGER REFERENCES row(id),
-                user_id INTEGER REFERENCES "user"(id),
-                row_title VARCHAR NOT NULL,
-                canonical_need VARCHAR NOT NULL,
-                search_query VARCHAR,
-                vendor_query VARCHAR,
-                geo_hint VARCHAR,
-                desire_tier VARCHAR,
-                service_type VARCHAR,
-                summary TEXT NOT NULL,
-                rationale TEXT,
-                suggested_queries JSONB,
-                assessment JSONB,
-                supporting_context JSONB,
-                confidence FLOAT NOT NULL DEFAULT 0.0,
-                times_seen INTEGER NOT NULL DEFAULT 1,
-                status VARCHAR NOT NULL DEFAULT 'new',
-                emailed_count INTEGER NOT NULL DEFAULT 0,
-                email_sent_at TIMESTAMP,
-                first_seen_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                last_seen_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_coverage_gap_status_idx ON vendor_coverage_gap (status);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_coverage_gap_need_idx ON vendor_coverage_gap (canonical_need);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_coverage_gap_last_seen_idx ON vendor_coverage_gap (last_seen_at);"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS location_geocode_cache (
-                id SERIAL PRIMARY KEY,
-                cache_key VARCHAR NOT NULL UNIQUE,
-                query_text VARCHAR NOT NULL,
-                normalized_query VARCHAR NOT NULL,
-                country_hint VARCHAR,
-                normalized_label VARCHAR,
-                lat FLOAT,
-                lon FLOAT,
-                precision VARCHAR,
-                status VARCHAR NOT NULL DEFAULT 'unresolved',
-                provider VARCHAR,
-                hit_count INTEGER NOT NULL DEFAULT 0,
-                expires_at TIMESTAMP NOT NULL,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                updated_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS location_geocode_cache_key_idx ON location_geocode_cache (cache_key);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS location_geocode_cache_status_idx ON location_geocode_cache (status);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS location_geocode_cache_expires_idx ON location_geocode_cache (expires_at);"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS discovered_vendor_candidate (
-                id SERIAL PRIMARY KEY,
-                row_id INTEGER NOT NULL REFERENCES row(id),
-                user_id INTEGER REFERENCES "user"(id),
-                vendor_id INTEGER REFERENCES vendor(id),
-                discovery_session_id VARCHAR NOT NULL,
-                adapter_id VARCHAR NOT NULL,
-                discovery_mode VARCHAR NOT NULL,
-                source_type VARCHAR NOT NULL,
-                source_query TEXT NOT NULL,
-                vendor_name VARCHAR NOT NULL,
-                website_url TEXT,
-                canonical_domain VARCHAR,
-                source_url TEXT,
-                snippet TEXT,
-                image_url TEXT,
-                email VARCHAR,
-                phone VARCHAR,
-                location_hint VARCHAR,
-                official_site BOOLEAN NOT NULL DEFAULT FALSE,
-                first_party_contact BOOLEAN NOT NULL DEFAULT FALSE,
-                confidence FLOAT NOT NULL DEFAULT 0.0,
-                completeness_score FLOAT NOT NULL DEFAULT 0.0,
-                trust_score FLOAT NOT NULL DEFAULT 0.0,
-                status VARCHAR NOT NULL DEFAULT 'discovered',
-                raw_payload JSONB,
-                extraction_payload JSONB,
-                provenance JSONB,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                updated_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS discovered_vendor_candidate_row_idx ON discovered_vendor_candidate (row_id);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS discovered_vendor_candidate_session_idx ON discovered_vendor_candidate (discovery_session_id);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS discovered_vendor_candidate_domain_idx ON discovered_vendor_candidate (canonical_domain);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS discovered_vendor_candidate_status_idx ON discovered_vendor_candidate (status);"))
-
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS vendor_enrichment_queue_item (
-                id SERIAL PRIMARY KEY,
-                candidate_id INTEGER NOT NULL REFERENCES discovered_vendor_candidate(id),
-                row_id INTEGER NOT NULL REFERENCES row(id),
-                vendor_id INTEGER REFERENCES vendor(id),
-                discovery_session_id VARCHAR NOT NULL,
-                canonical_domain VARCHAR,
-                discovery_mode VARCHAR NOT NULL,
-                source_provider VARCHAR NOT NULL,
-                confidence FLOAT NOT NULL DEFAULT 0.0,
-                completeness_score FLOAT NOT NULL DEFAULT 0.0,
-                trust_score FLOAT NOT NULL DEFAULT 0.0,
-                status VARCHAR NOT NULL DEFAULT 'queued',
-                retry_count INTEGER NOT NULL DEFAULT 0,
-                next_attempt_at TIMESTAMP,
-                payload JSONB,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                updated_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-        """))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_enrichment_queue_item_candidate_idx ON vendor_enrichment_queue_item (candidate_id);"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS vendor_enrichment_queue_item_status_idx ON vendor_enrichment_queue_item (status);"))
-
-        # Vendor geo columns
-        await conn.execute(text("ALTER TABLE vendor ADD COLUMN IF NOT EXISTS latitude FLOAT;"))
-        await conn.execute(text("ALTER TABLE vendor ADD COLUMN IF NOT EXISTS longitude FLOAT;"))
-
-        # Seed test vendor (idempotent)
-        await conn.execute(text("""
-            INSERT INTO vendor (name, email, domain, website, category, description, specialties, status, is_verified, tier_affinity, created_at)
-            SELECT 'Peak Aviation Solutions', 'lance@xcor-cto.com', 'flypeak.com', 'https://flypeak.com',
-                   'Private Aviation', 'Private jet charter and aviation solutions provider',
-                   'jet charter, private aviation, on-demand flights, aircraft management',
-                   'unverified', false, 'ultra_high_end', NOW()
-            WHERE NOT EXISTS (SELECT 1 FROM vendor WHERE domain = 'flypeak.com')
-        """))
-
-        # Pop family sharing tables
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS project_member (
-                id SERIAL PRIMARY KEY,
-                project_id INTEGER NOT NULL REFERENCES project(id),
-                user_id INTEGER NOT NULL REFERENCES "user"(id),
-                role VARCHAR NOT NULL DEFAULT 'member',
-                channel VARCHAR NOT NULL DEFAULT 'email',
-                invited_by INTEGER REFERENCES "user"(id),
-                joined_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                UNIQUE (project_id, user_id)
-            );
-        """))
-        await conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS project_invite (
-                id VARCHAR PRIMARY KEY,
-                project_id INTEGER NOT NULL REFERENCES project(id),
-                invited_by INTEGER NOT NULL REFERENCES "user"(id),
-                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                expires_at TIMESTAMP
-            );
-        """))
+
+def _step(name: str, *statements: str, run=None) -> MigrationStep:
+    return MigrationStep(name=name, statements=tuple(statements), run=run)
+
+
+async def _drop_vendor_service_areas(conn) -> None:
+    """Drop dead service_areas column after copying it into store_geo_location."""
+    result = await conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = 'vendor' AND column_name = 'service_areas'"
+    ))
+    if result.first() is not None:
         await conn.execute(text(
-            "CREATE INDEX IF NOT EXISTS project_invite_project_id_idx ON project_invite (project_id);"
+            "UPDATE vendor "
+            "SET store_geo_location = COALESCE(store_geo_location, CAST(service_areas AS TEXT)) "
+            "WHERE store_geo_location IS NULL"
         ))
+        await conn.execute(text("ALTER TABLE vendor DROP COLUMN service_areas;"))
+
+
+MIGRATION_STEPS: tuple[MigrationStep, ...] = (
+    # Row columns
+    _step(
+        "row_chat_and_origin_columns",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS chat_history TEXT;",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS selected_providers TEXT;",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_channel VARCHAR;",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_message_id VARCHAR;",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_user_id INTEGER;",
+    ),
+    _step(
+        "vendor_zero_commission",
+        "ALTER TABLE vendor ALTER COLUMN default_commission_rate SET DEFAULT 0.0;",
+        "UPDATE vendor SET default_commission_rate = 0.0 WHERE default_commission_rate IS DISTINCT FROM 0.0;",
+    ),
+    # User columns
+    _step(
+        "user_profile_columns",
+        'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS name TEXT;',
+        'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS company TEXT;',
+    ),
+    # DealHandoff Phase 1+3 columns
+    _step(
+        "deal_handoff_acceptance_columns",
+        *(
+            f"ALTER TABLE deal_handoff ADD COLUMN IF NOT EXISTS {col} {dtype};"
+            for col, dtype in [
+                ("bid_id", "INTEGER"),
+                ("vendor_id", "INTEGER"),
+                ("vendor_email", "VARCHAR"),
+                ("vendor_name", "VARCHAR"),
+                ("acceptance_token", "VARCHAR"),
+                ("buyer_accepted_at", "TIMESTAMP"),
+                ("buyer_accepted_ip", "VARCHAR"),
+                ("vendor_accepted_at", "TIMESTAMP"),
+                ("vendor_accepted_ip", "VARCHAR"),
+            ]
+        ),
+    ),
+    # Bid provenance
+    _step("bid_provenance", "ALTER TABLE bid ADD COLUMN IF NOT EXISTS provenance TEXT;"),
+    # Vendor SEO + GEO columns
+    _step(
+        "vendor_seo_columns",
+        "ALTER TABLE vendor ADD COLUMN IF NOT EXISTS slug VARCHAR;",
+        "ALTER TABLE vendor ADD COLUMN IF NOT EXISTS seo_content JSONB;",
+        "ALTER TABLE vendor ADD COLUMN IF NOT EXISTS schema_markup JSONB;",
+    ),
+    _step("vendor_store_geo_location", "ALTER TABLE vendor ADD COLUMN IF NOT EXISTS store_geo_location TEXT;"),
+    _step("vendor_drop_service_areas", run=_drop_vendor_service_areas),
+    # SDUI schema columns (Phase 0.2)
+    _step(
+        "sdui_schema_columns",
+        "ALTER TABLE project ADD COLUMN IF NOT EXISTS ui_schema JSONB;",
+        "ALTER TABLE project ADD COLUMN IF NOT EXISTS ui_schema_version INTEGER DEFAULT 0;",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS ui_schema JSONB;",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS ui_schema_version INTEGER DEFAULT 0;",
+        "ALTER TABLE bid ADD COLUMN IF NOT EXISTS bid_ui_schema JSONB;",
+        "ALTER TABLE bid ADD COLUMN IF NOT EXISTS ui_schema_version INTEGER DEFAULT 0;",
+    ),
+    # Bookmark sync matches on the stored normalized URL (older rows are backfilled on first sync).
+    _step("bid_normalized_url", "ALTER TABLE bid ADD COLUMN IF NOT EXISTS normalized_url TEXT;"),
+    # Project shopping mode (Ready to Shop / Edit List)
+    _step("project_shopping_mode", "ALTER TABLE project ADD COLUMN IF NOT EXISTS shopping_mode BOOLEAN DEFAULT FALSE;"),
+    # pg_trgm for fuzzy text search (the GIN index itself is built concurrently)
+    _step("pg_trgm_extension", "CREATE EXTENSION IF NOT EXISTS pg_trgm;"),
+    # Deal Pipeline tables
+    _step(
+        "deal_tables",
+        """
+        CREATE TABLE IF NOT EXISTS deal (
+            id SERIAL PRIMARY KEY,
+            row_id INTEGER NOT NULL REFERENCES row(id),
+            bid_id INTEGER REFERENCES bid(id),
+            vendor_id INTEGER REFERENCES vendor(id),
+            buyer_user_id INTEGER NOT NULL REFERENCES "user"(id),
+            status VARCHAR NOT NULL DEFAULT 'negotiating',
+            proxy_email_alias VARCHAR UNIQUE NOT NULL,
+            vendor_quoted_price FLOAT,
+            platform_fee_pct FLOAT NOT NULL DEFAULT 0.0,
+            platform_fee_amount FLOAT,
+            buyer_total FLOAT,
+            currency VARCHAR NOT NULL DEFAULT 'USD',
+            stripe_payment_intent_id VARCHAR,
+            stripe_transfer_id VARCHAR,
+            stripe_connect_account_id VARCHAR,
+            agreed_terms_summary TEXT,
+            fulfillment_notes TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP,
+            terms_agreed_at TIMESTAMP,
+            funded_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            canceled_at TIMESTAMP
+        );
+        """,
+        "ALTER TABLE deal ALTER COLUMN platform_fee_pct SET DEFAULT 0.0;",
+        """
+        CREATE TABLE IF NOT EXISTS deal_message (
+            id SERIAL PRIMARY KEY,
+            deal_id INTEGER NOT NULL REFERENCES deal(id),
+            sender_type VARCHAR NOT NULL,
+            sender_email VARCHAR,
+            subject VARCHAR,
+            content_text TEXT NOT NULL,
+            content_html TEXT,
+            attachments JSONB,
+            resend_message_id VARCHAR,
+            ai_classification VARCHAR,
+            ai_confidence FLOAT,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    _step(
+        "bookmark_tables",
+        """
+        CREATE TABLE IF NOT EXISTS vendor_bookmark (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES "user"(id),
+            vendor_id INTEGER NOT NULL REFERENCES vendor(id),
+            source_row_id INTEGER REFERENCES row(id),
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS item_bookmark (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES "user"(id),
+            canonical_url VARCHAR NOT NULL,
+            source_row_id INTEGER REFERENCES row(id),
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    _step(
+        "vendor_coverage_gap_table",
+        """
+        CREATE TABLE IF NOT EXISTS vendor_coverage_gap (
+            id SERIAL PRIMARY KEY,
+            row_id INTEGER REFERENCES row(id),
+            user_id INTEGER REFERENCES "user"(id),
+            row_title VARCHAR NOT NULL,
+            canonical_need VARCHAR NOT NULL,
+            search_query VARCHAR,
+            vendor_query VARCHAR,
+            geo_hint VARCHAR,
+            desire_tier VARCHAR,
+            service_type VARCHAR,
+            summary TEXT NOT NULL,
+            rationale TEXT,
+            suggested_queries JSONB,
+            assessment JSONB,
+            supporting_context JSONB,
+            confidence FLOAT NOT NULL DEFAULT 0.0,
+            times_seen INTEGER NOT NULL DEFAULT 1,
+            status VARCHAR NOT NULL DEFAULT 'new',
+            emailed_count INTEGER NOT NULL DEFAULT 0,
+            email_sent_at TIMESTAMP,
+            first_seen_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            last_seen_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    _step(
+        "location_geocode_cache_table",
+        """
+        CREATE TABLE IF NOT EXISTS location_geocode_cache (
+            id SERIAL PRIMARY KEY,
+            cache_key VARCHAR NOT NULL UNIQUE,
+            query_text VARCHAR NOT NULL,
+            normalized_query VARCHAR NOT NULL,
+            country_hint VARCHAR,
+            normalized_label VARCHAR,
+            lat FLOAT,
+            lon FLOAT,
+            precision VARCHAR,
+            status VARCHAR NOT NULL DEFAULT 'unresolved',
+            provider VARCHAR,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    _step(
+        "provider_result_cache_table",
+        """
+        CREATE TABLE IF NOT EXISTS provider_result_cache (
+            id SERIAL PRIMARY KEY,
+            cache_key VARCHAR NOT NULL UNIQUE,
+            provider_id VARCHAR NOT NULL,
+            normalized_query VARCHAR NOT NULL,
+            results JSONB,
+            result_count INTEGER NOT NULL DEFAULT 0,
+            status_message VARCHAR,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            fresh_until TIMESTAMP NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    _step(
+        "llm_response_cache_table",
+        """
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            id SERIAL PRIMARY KEY,
+            cache_key VARCHAR NOT NULL UNIQUE,
+            response TEXT NOT NULL,
+            model VARCHAR NOT NULL DEFAULT '',
+            latency_ms INTEGER NOT NULL DEFAULT 0,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    _step(
+        "vendor_discovery_tables",
+        """
+        CREATE TABLE IF NOT EXISTS discovered_vendor_candidate (
+            id SERIAL PRIMARY KEY,
+            row_id INTEGER NOT NULL REFERENCES row(id),
+            user_id INTEGER REFERENCES "user"(id),
+            vendor_id INTEGER REFERENCES vendor(id),
+            discovery_session_id VARCHAR NOT NULL,
+            adapter_id VARCHAR NOT NULL,
+            discovery_mode VARCHAR NOT NULL,
+            source_type VARCHAR NOT NULL,
+            source_query TEXT NOT NULL,
+            vendor_name VARCHAR NOT NULL,
+            website_url TEXT,
+            canonical_domain VARCHAR,
+            source_url TEXT,
+            snippet TEXT,
+            image_url TEXT,
+            email VARCHAR,
+            phone VARCHAR,
+            location_hint VARCHAR,
+            official_site BOOLEAN NOT NULL DEFAULT FALSE,
+            first_party_contact BOOLEAN NOT NULL DEFAULT FALSE,
+            confidence FLOAT NOT NULL DEFAULT 0.0,
+            completeness_score FLOAT NOT NULL DEFAULT 0.0,
+            trust_score FLOAT NOT NULL DEFAULT 0.0,
+            status VARCHAR NOT NULL DEFAULT 'discovered',
+            raw_payload JSONB,
+            extraction_payload JSONB,
+            provenance JSONB,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS vendor_enrichment_queue_item (
+            id SERIAL PRIMARY KEY,
+            candidate_id INTEGER NOT NULL REFERENCES discovered_vendor_candidate(id),
+            row_id INTEGER NOT NULL REFERENCES row(id),
+            vendor_id INTEGER REFERENCES vendor(id),
+            discovery_session_id VARCHAR NOT NULL,
+            canonical_domain VARCHAR,
+            discovery_mode VARCHAR NOT NULL,
+            source_provider VARCHAR NOT NULL,
+            confidence FLOAT NOT NULL DEFAULT 0.0,
+            completeness_score FLOAT NOT NULL DEFAULT 0.0,
+            trust_score FLOAT NOT NULL DEFAULT 0.0,
+            status VARCHAR NOT NULL DEFAULT 'queued',
+            retry_count INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP,
+            payload JSONB,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """,
+    ),
+    # Durable background jobs (services/jobs.py)
+    _step(
+        "background_job_table",
+        """
+        CREATE TABLE IF NOT EXISTS background_job (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            queue VARCHAR NOT NULL DEFAULT 'default',
+            payload JSONB,
+            status VARCHAR NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 5,
+            run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            locked_until TIMESTAMP,
+            last_error TEXT,
+            dedupe_key VARCHAR UNIQUE,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            finished_at TIMESTAMP
+        );
+        """,
+    ),
+    # Daily metric rollups for admin dashboards (services/metrics_rollup.py)
+    _step(
+        "metrics_daily_rollup_table",
+        """
+        CREATE TABLE IF NOT EXISTS metrics_daily_rollup (
+            id SERIAL PRIMARY KEY,
+            day DATE NOT NULL,
+            metric VARCHAR NOT NULL,
+            dimension VARCHAR NOT NULL DEFAULT '',
+            value FLOAT NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            CONSTRAINT metrics_daily_rollup_key UNIQUE (day, metric, dimension)
+        );
+        """,
+    ),
+    # Vendor geo columns
+    _step(
+        "vendor_lat_lon",
+        "ALTER TABLE vendor ADD COLUMN IF NOT EXISTS latitude FLOAT;",
+        "ALTER TABLE vendor ADD COLUMN IF NOT EXISTS longitude FLOAT;",
+    ),
+    # Seed test vendor
+    _step(
+        "seed_peak_aviation_vendor",
+        """
+        INSERT INTO vendor (name, email, domain, website, category, description, specialties, status, is_verified, tier_affinity, created_at)
+        SELECT 'Peak Aviation Solutions', 'lance@xcor-cto.com', 'flypeak.com', 'https://flypeak.com',
+               'Private Aviation', 'Private jet charter and aviation solutions provider',
+               'jet charter, private aviation, on-demand flights, aircraft management',
+               'unverified', false, 'ultra_high_end', NOW()
+        WHERE NOT EXISTS (SELECT 1 FROM vendor WHERE domain = 'flypeak.com')
+        """,
+    ),
+    # Pop family sharing tables
+    _step(
+        "project_sharing_tables",
+        """
+        CREATE TABLE IF NOT EXISTS project_member (
+            id SERIAL PRIMARY KEY,
+            project_id INTEGER NOT NULL REFERENCES project(id),
+            user_id INTEGER NOT NULL REFERENCES "user"(id),
+            role VARCHAR NOT NULL DEFAULT 'member',
+            channel VARCHAR NOT NULL DEFAULT 'email',
+            invited_by INTEGER REFERENCES "user"(id),
+            joined_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            UNIQUE (project_id, user_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS project_invite (
+            id VARCHAR PRIMARY KEY,
+            project_id INTEGER NOT NULL REFERENCES project(id),
+            invited_by INTEGER NOT NULL REFERENCES "user"(id),
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            expires_at TIMESTAMP
+        );
+        """,
+    ),
+    # User zip_code
+    _step(
+        "user_zip_code",
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'user' AND column_name = 'zip_code'
+            ) THEN
+                ALTER TABLE "user" ADD COLUMN zip_code VARCHAR;
+            END IF;
+        END $$;
+        """,
+    ),
+    # Seller inbox: indexed category terms on row (set on write by models.rows) and
+    # the optional precomputed merchant -> row match table.
+    _step(
+        "row_match_terms",
+        "ALTER TABLE row ADD COLUMN IF NOT EXISTS match_terms TEXT[];",
+        f"UPDATE row SET match_terms = {ROW_TERMS_SQL} WHERE match_terms IS NULL;",
+    ),
+    _step(
+        "seller_row_match_table",
+        """
+        CREATE TABLE IF NOT EXISTS seller_row_match (
+            merchant_id INTEGER NOT NULL REFERENCES vendor(id) ON DELETE CASCADE,
+            row_id INTEGER NOT NULL REFERENCES row(id) ON DELETE CASCADE,
+            row_created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (merchant_id, row_id)
+        );
+        """,
+    ),
+    # Shared rate limit counters (RATE_LIMIT_BACKEND=postgres). UNLOGGED: losing
+    # them in a crash only resets the current window.
+    _step(
+        "rate_limit_counter_table",
+        """
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_counter (
+            key TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL,
+            expires_at TIMESTAMPTZ NOT NULL
+        );
+        """,
+    ),
+    # Bug report triage kept across job retries (routes/bugs.create_github_issue_task).
+    _step(
+        "bug_report_triage_state",
+        "ALTER TABLE bug_report ADD COLUMN IF NOT EXISTS classification_reasoning TEXT;",
+        "ALTER TABLE bug_report ADD COLUMN IF NOT EXISTS triage_email_sent_at TIMESTAMP;",
+    ),
+)
+
+
+INDEX_STEPS: tuple[IndexStep, ...] = (
+    IndexStep("vendor_slug_idx", "ON vendor (slug)", unique=True),
+    IndexStep("bid_row_normalized_url_idx", "ON bid (row_id, normalized_url)"),
+    IndexStep("vendor_name_trgm_idx", "ON vendor USING gin (name gin_trgm_ops)"),
+    # Vector similarity index on vendor embeddings.
+    # IVFFlat chosen over HNSW because Railway Postgres containers have low
+    # shared memory limits (~64MB) which cause HNSW builds to fail with
+    # DiskFullError on the shared memory segment.
+    # IVFFlat is much lighter on memory and perfectly adequate for <10k vectors.
+    # lists ≈ sqrt(3700) ≈ 61
+    IndexStep(
+        "vendor_embedding_ivfflat_idx",
+        "ON vendor USING ivfflat (embedding vector_cosine_ops) WITH (lists = 60)",
+    ),
+    # Drop old HNSW index if it somehow exists from a previous attempt
+    IndexStep("vendor_embedding_hnsw_idx", drop=True),
+    IndexStep("deal_row_id_idx", "ON deal (row_id)"),
+    IndexStep("deal_status_idx", "ON deal (status)"),
+    # Inbound relays resolve deals by alias through the unique index created with the
+    # table (deal_proxy_email_alias_key, or ix_deal_proxy_email_alias via create_all);
+    # a second plain index on the column only costs writes.
+    IndexStep("deal_proxy_alias_idx", drop=True),
+    IndexStep("deal_message_deal_id_idx", "ON deal_message (deal_id)"),
+    IndexStep("vendor_bookmark_user_id_idx", "ON vendor_bookmark (user_id)"),
+    IndexStep("vendor_bookmark_vendor_id_idx", "ON vendor_bookmark (vendor_id)"),
+    IndexStep("item_bookmark_user_id_idx", "ON item_bookmark (user_id)"),
+    IndexStep("item_bookmark_canonical_url_idx", "ON item_bookmark (canonical_url)"),
+    IndexStep("vendor_coverage_gap_status_idx", "ON vendor_coverage_gap (status)"),
+    IndexStep("vendor_coverage_gap_need_idx", "ON vendor_coverage_gap (canonical_need)"),
+    IndexStep("vendor_coverage_gap_last_seen_idx", "ON vendor_coverage_gap (last_seen_at)"),
+    IndexStep("location_geocode_cache_key_idx", "ON location_geocode_cache (cache_key)"),
+    IndexStep("location_geocode_cache_status_idx", "ON location_geocode_cache (status)"),
+    IndexStep("location_geocode_cache_expires_idx", "ON location_geocode_cache (expires_at)"),
+    IndexStep("provider_result_cache_provider_idx", "ON provider_result_cache (provider_id)"),
+    IndexStep("provider_result_cache_expires_idx", "ON provider_result_cache (expires_at)"),
+    IndexStep("llm_response_cache_expires_idx", "ON llm_response_cache (expires_at)"),
+    IndexStep("discovered_vendor_candidate_row_idx", "ON discovered_vendor_candidate (row_id)"),
+    IndexStep("discovered_vendor_candidate_session_idx", "ON discovered_vendor_candidate (discovery_session_id)"),
+    IndexStep("discovered_vendor_candidate_domain_idx", "ON discovered_vendor_candidate (canonical_domain)"),
+    IndexStep("discovered_vendor_candidate_status_idx", "ON discovered_vendor_candidate (status)"),
+    IndexStep("vendor_enrichment_queue_item_candidate_idx", "ON vendor_enrichment_queue_item (candidate_id)"),
+    IndexStep("vendor_enrichment_queue_item_status_idx", "ON vendor_enrichment_queue_item (status)"),
+    IndexStep("vendor_enrichment_queue_item_claim_idx", "ON vendor_enrichment_queue_item (status, next_attempt_at)"),
+    IndexStep("background_job_name_idx", "ON background_job (name)"),
+    IndexStep("background_job_status_idx", "ON background_job (status)"),
+    IndexStep("background_job_claim_idx", "ON background_job (queue, status, run_at)"),
+    IndexStep("metrics_daily_rollup_day_idx", "ON metrics_daily_rollup (day)"),
+    IndexStep("metrics_daily_rollup_metric_day_idx", "ON metrics_daily_rollup (metric, day)"),
+    IndexStep("project_invite_project_id_idx", "ON project_invite (project_id)"),
+    IndexStep("row_match_terms_gin_idx", "ON row USING gin (match_terms)"),
+    IndexStep(
+        "row_open_created_idx",
+        "ON row (created_at DESC, id DESC) "
+        "WHERE status IN ('sourcing', 'inviting', 'bids_arriving', 'open', 'active')",
+    ),
+    IndexStep("seller_row_match_inbox_idx", "ON seller_row_match (merchant_id, row_created_at DESC, row_id DESC)"),
+    IndexStep("seller_row_match_row_id_idx", "ON seller_row_match (row_id)"),
+)
+
+
+_CREATE_LEDGER_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+        checksum VARCHAR(64) PRIMARY KEY,
+        step VARCHAR NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+"""
+_SELECT_LEDGER_SQL = f"SELECT checksum FROM {LEDGER_TABLE}"
+_RECORD_STEP_SQL = (
+    f"INSERT INTO {LEDGER_TABLE} (checksum, step) VALUES (:checksum, :step) "
+    "ON CONFLICT (checksum) DO NOTHING"
+)
+
+
+async def _applied_checksums(conn) -> set[str]:
+    result = await conn.execute(text(_SELECT_LEDGER_SQL))
+    return {row[0] for row in result}
+
 
-        # User zip_code
-        await conn.execute(text("""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns
-                    WHERE table_name = 'user' AND column_name = 'zip_code'
-                ) THEN
-                    ALTER TABLE "user" ADD COLUMN zip_code VARCHAR;
-                END IF;
-            END $$;
-        """))
+async def _load_ledger(engine) -> Optional[set[str]]:
+    """Return recorded checksums, or None when the ledger table does not exist yet."""
+    try:
+        async with engine.connect() as conn:
+            return await _applied_checksums(conn)
+    except ProgrammingError:
+        return None
 
-        print("Migration check: all startup migrations applied successfully")
+
+async def run_startup_migrations(engine, steps: tuple[MigrationStep, ...] = MIGRATION_STEPS) -> None:
+    """Apply schema steps whose checksum is not yet in the ledger."""
+    applied = await _load_ledger(engine)
+    if applied is not None and all(step.checksum in applied for step in steps):
+        print("Migration check: schema up to date")
+        return
+
+    async with engine.begin() as conn:
+        await conn.execute(text(_CREATE_LEDGER_SQL))
+        # Transaction-scoped: released on commit/rollback. Replicas booting together
+        # queue here and then find the ledger already filled in.
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.execute(text(f"SET LOCAL lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+        applied = await _applied_checksums(conn)
+        pending = [step for step in steps if step.checksum not in applied]
+        for step in pending:
+            for statement in step.statements:
+                await conn.execute(text(statement))
+            if step.run is not None:
+                await step.run(conn)
+            await conn.execute(text(_RECORD_STEP_SQL), {"checksum": step.checksum, "step": step.name})
+
+    print(f"Migration check: applied {len(pending)} pending startup migration step(s)")
+
+
+async def build_startup_indexes(engine, steps: tuple[IndexStep, ...] = INDEX_STEPS) -> None:
+    """Build pending indexes with CREATE INDEX CONCURRENTLY, outside the boot path.
+
+    Runs on an autocommit connection (CONCURRENTLY cannot run in a transaction)
+    and only on the replica that wins a session advisory lock; the others return
+    immediately and pick up anything left over on their next boot.
+    """
+    applied = await _load_ledger(engine)
+    if applied is None:
+        print("Index build skipped: migration ledger does not exist yet")
+        return
+    pending = [step for step in steps if step.checksum not in applied]
+    if not pending:
+        return
+
+    async with engine.execution_options(isolation_level="AUTOCOMMIT").connect() as conn:
+        locked = (
+            await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": INDEX_BUILD_LOCK_KEY})
+        ).scalar()
+        if not locked:
+            return
+        built = 0
+        try:
+            for step in pending:
+                if not step.drop:
+                    # A cancelled CONCURRENTLY build leaves an INVALID index behind that
+                    # IF NOT EXISTS would otherwise treat as done.
+                    invalid = (await conn.execute(text(
+                        "SELECT NOT i.indisvalid FROM pg_index i "
+                        "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+                    ), {"name": step.name})).scalar()
+                    if invalid:
+                        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {step.name};"))
+                try:
+                    await conn.execute(text(step.sql))
+                except Exception as e:
+                    print(f"Index build failed for {step.name}: {type(e).__name__}: {e}")
+                    continue
+                await conn.execute(text(_RECORD_STEP_SQL), {"checksum": step.checksum, "step": step.name})
+                built += 1
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INDEX_BUILD_LOCK_KEY})
+    print(f"Index build: {built}/{len(pending)} pending index step(s) applied")
 
 
 async def run_data_integrity_check(engine) -> None:
@@ -380,3 +692,16 @@ async def run_data_integrity_check(engine) -> None:
             print("   Run: python scripts/seed_vendors.py to restore vendor records.")
         else:
             print(f"✓  Data check: {vendor_count} vendors, {user_count} users in DB")
+
+
+async def run_post_boot_maintenance(engine) -> None:
+    """Background companion to run_startup_migrations: concurrent index builds, then the data check."""
+    try:
+        await build_startup_indexes(engine)
+    except Exception as e:
+        print(f"Index build skipped ({type(e).__name__}): {e}")
+    try:
+        async with asyncio.timeout(10):
+            await run_data_integrity_check(engine)
+    except (TimeoutError, Exception) as e:
+        print(f"⚠️  Data integrity check skipped ({type(e).__name__}): {e}")
@@ -1,21 +1,67 @@
+import asyncio
 import os
 import shutil
 import secrets
 import json
 from abc import ABC, abstractmethod
+from contextlib import AsyncExitStack
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Protocol
+from typing import Any, AsyncIterator, List, Optional, Protocol
+
+import aiofiles
+
+# Read size when streaming an UploadFile into storage.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# S3 parts must be >= 5 MiB (except the last); objects below one part use a single PUT.
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+
+def _multipart_part_size() -> int:
+    """BUCKET_MULTIPART_PART_SIZE, raised to the S3 minimum so small parts cannot fail uploads."""
+    configured = int(os.getenv("BUCKET_MULTIPART_PART_SIZE", str(8 * 1024 * 1024)))
+    return max(MIN_MULTIPART_PART_SIZE, configured)
+
+
+MULTIPART_PART_SIZE = _multipart_part_size()
+
+
+async def iter_upload_chunks(
+    upload: Any, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield an UploadFile's content in chunks instead of reading it whole."""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _unique_name(filename: str) -> str:
+    safe_name = os.path.basename(filename).replace(" ", "_")
+    timestamp = int(datetime.utcnow().timestamp())
+    return f"{timestamp}_{secrets.token_hex(4)}_{safe_name}"
+
 
 class IStorageProvider(ABC):
     @abstractmethod
     async def save_file(self, file_content: bytes, filename: str, subfolder: str = "bugs") -> str:
         pass
 
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], filename: str, subfolder: str = "bugs"
+    ) -> str:
+        """Store a chunked upload. Providers override this to avoid buffering the whole file."""
+        content = b"".join([chunk async for chunk in chunks])
+        return await self.save_file(content, filename, subfolder)
+
     @abstractmethod
     async def delete_file(self, file_path: str):
         pass
 
+    async def close(self) -> None:
+        """Release long-lived clients (called on shutdown)."""
+
 class DiskStorageProvider(IStorageProvider):
     def __init__(self, storage_path: str):
         self.storage_root = Path(storage_path)
@@ -24,18 +70,29 @@ class DiskStorageProvider(IStorageProvider):
         (self.storage_root / "bugs").mkdir(parents=True, exist_ok=True)
 
     async def save_file(self, file_content: bytes, filename: str, subfolder: str = "bugs") -> str:
-        safe_name = os.path.basename(filename).replace(" ", "_")
-        timestamp = int(datetime.utcnow().timestamp())
-        unique_name = f"{timestamp}_{secrets.token_hex(4)}_{safe_name}"
-        
+        async def _single() -> AsyncIterator[bytes]:
+            yield file_content
+
+        return await self.save_stream(_single(), filename, subfolder)
+
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], filename: str, subfolder: str = "bugs"
+    ) -> str:
+        unique_name = _unique_name(filename)
+
         target_dir = self.storage_root / subfolder
         target_dir.mkdir(parents=True, exist_ok=True)
-        
+
         file_path = target_dir / unique_name
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-            
+
+        try:
+            async with aiofiles.open(file_path, "wb") as buffer:
+                async for chunk in chunks:
+                    await buffer.write(chunk)
+        except BaseException:
+            file_path.unlink(missing_ok=True)
+            raise
+
         return f"/uploads/{subfolder}/{unique_name}"
 
     async def delete_file(self, file_path: str):
@@ -66,50 +123,115 @@ class BucketStorageProvider(IStorageProvider):
 
         self.session = aioboto3.Session()
         self._config = Config
+        self._max_connections = int(os.getenv("BUCKET_MAX_CONNECTIONS", "20"))
+        self._client: Any = None
+        self._client_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
+
+    async def _s3(self) -> Any:
+        """Shared S3 client; its connection pool is reused across uploads and deletes."""
+        if self._client is not None:
+            return self._client
+        async with self._client_lock:
+            if self._client is None:
+                stack = AsyncExitStack()
+                self._client = await stack.enter_async_context(
+                    self.session.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        region_name=self.region_name,
+                        config=self._config(
+                            signature_version="s3v4",
+                            max_pool_connections=self._max_connections,
+                        ),
+                    )
+                )
+                self._client_stack = stack
+        return self._client
+
+    async def close(self) -> None:
+        if self._client_stack is not None:
+            stack, self._client_stack, self._client = self._client_stack, None, None
+            await stack.aclose()
+
+    def _public_url(self, object_key: str) -> str:
+        # For Railway buckets, the URL structure is usually endpoint/bucket/key
+        # or a custom domain. We'll use the endpoint/bucket/key pattern or check if endpoint has the bucket.
+        if self.endpoint_url.endswith("/"):
+            return f"{self.endpoint_url}{self.bucket_name}/{object_key}"
+        return f"{self.endpoint_url}/{self.bucket_name}/{object_key}"
 
     async def save_file(self, file_content: bytes, filename: str, subfolder: str = "bugs") -> str:
-        safe_name = os.path.basename(filename).replace(" ", "_")
-        timestamp = int(datetime.utcnow().timestamp())
-        unique_name = f"{timestamp}_{secrets.token_hex(4)}_{safe_name}"
-        object_key = f"{subfolder}/{unique_name}"
-
-        async with self.session.client(
-            "s3",
-            endpoint_url=self.endpoint_url,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            region_name=self.region_name,
-            config=self._config(signature_version="s3v4")
-        ) as s3:
-            await s3.put_object(
+        object_key = f"{subfolder}/{_unique_name(filename)}"
+        s3 = await self._s3()
+        await s3.put_object(Bucket=self.bucket_name, Key=object_key, Body=file_content)
+        return self._public_url(object_key)
+
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], filename: str, subfolder: str = "bugs"
+    ) -> str:
+        """Single PUT for objects under one part, S3 multipart upload above that."""
+        object_key = f"{subfolder}/{_unique_name(filename)}"
+        s3 = await self._s3()
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        parts: List[dict] = []
+
+        async def _flush_part(data: bytes) -> None:
+            part_number = len(parts) + 1
+            response = await s3.upload_part(
                 Bucket=self.bucket_name,
                 Key=object_key,
-                Body=file_content
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data,
             )
-            
-            # Construct the public URL
-            # For Railway buckets, the URL structure is usually endpoint/bucket/key 
-            # or a custom domain. We'll use the endpoint/bucket/key pattern or check if endpoint has the bucket.
-            if self.endpoint_url.endswith("/"):
-                url = f"{self.endpoint_url}{self.bucket_name}/{object_key}"
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                while len(buffer) >= MULTIPART_PART_SIZE:
+                    if upload_id is None:
+                        created = await s3.create_multipart_upload(
+                            Bucket=self.bucket_name, Key=object_key
+                        )
+                        upload_id = created["UploadId"]
+                    part, buffer = bytes(buffer[:MULTIPART_PART_SIZE]), buffer[MULTIPART_PART_SIZE:]
+                    await _flush_part(part)
+
+            if upload_id is None:
+                await s3.put_object(Bucket=self.bucket_name, Key=object_key, Body=bytes(buffer))
             else:
-                url = f"{self.endpoint_url}/{self.bucket_name}/{object_key}"
-            
-            return url
+                if buffer:
+                    await _flush_part(bytes(buffer))
+                await s3.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await s3.abort_multipart_upload(
+                        Bucket=self.bucket_name, Key=object_key, UploadId=upload_id
+                    )
+                except Exception as abort_error:
+                    print(f"[STORAGE] Failed to abort multipart upload {object_key}: {abort_error}")
+            raise
+
+        return self._public_url(object_key)
 
     async def delete_file(self, file_path: str):
         # For bucket, file_path is the full URL or we need to extract the key
         # If it's the full URL, we extract the key (everything after bucket_name/)
         if self.bucket_name in file_path:
             key = file_path.split(f"{self.bucket_name}/")[-1]
-            async with self.session.client(
-                "s3",
-                endpoint_url=self.endpoint_url,
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-                region_name=self.region_name
-            ) as s3:
-                await s3.delete_object(Bucket=self.bucket_name, Key=key)
+            s3 = await self._s3()
+            await s3.delete_object(Bucket=self.bucket_name, Key=key)
 
 def get_storage_provider() -> IStorageProvider:
     provider_type = os.getenv("STORAGE_PROVIDER", "disk").lower()
@@ -22,6 +22,16 @@ set_csrf_secret(None)  # type: ignore[arg-type]
 
 @pytest_asyncio.fixture(name="session", scope="function")
 async def session_fixture():
+    # Every test gets a fresh schema, so cached sessions and the guest user id are stale.
+    from services.session_cache import session_cache
+    if session_cache is not None:
+        session_cache.clear()
+    from services.share_access import share_access_counter, share_resource_cache
+    share_access_counter.clear()
+    share_resource_cache.clear()
+    from services.rate_limiter import rate_limiter
+    rate_limiter.clear()
+
     # Use a SEPARATE test database to avoid nuking dev data.
     # Derive test DB URL from the main engine URL by appending "_test".
     from urllib.parse import urlparse, urlunparse
@@ -0,0 +1,197 @@
+"""Tests for adaptive provider deadlines, hedging and the request budget."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from sourcing.executors import ProviderLatencyTracker, run_provider_with_status
+from sourcing.repository import SearchResult, SourcingProvider, SourcingRepository
+
+
+class DelayedProvider(SourcingProvider):
+    def __init__(self, name: str, delay: float, count: int = 1):
+        self.name = name
+        self.calls = 0
+        self._delay = delay
+        self._count = count
+
+    async def search(self, query: str, **kwargs) -> List[SearchResult]:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return [
+            SearchResult(
+                title=f"{self.name} {query} {i}",
+                price=10.0 + i,
+                merchant=self.name,
+                url=f"https://{self.name}.example.com/item-{i}",
+                source=self.name,
+            )
+            for i in range(self._count)
+        ]
+
+
+def _make_repo(providers, **attrs) -> SourcingRepository:
+    repo = SourcingRepository.__new__(SourcingRepository)
+    repo.providers = providers
+    for key, value in attrs.items():
+        setattr(repo, key, value)
+    return repo
+
+
+def test_deadline_uses_ceiling_until_enough_samples():
+    tracker = ProviderLatencyTracker(min_samples=5, multiplier=2.0, floor_seconds=0.5)
+    for _ in range(4):
+        tracker.record("ebay", 0.4)
+    assert tracker.deadline_for("ebay", 8.0) == 8.0
+
+    tracker.record("ebay", 0.4)
+    assert tracker.deadline_for("ebay", 8.0) == pytest.approx(0.8)
+
+
+def test_deadline_is_clamped_between_floor_and_ceiling():
+    tracker = ProviderLatencyTracker(min_samples=1, multiplier=1.5, floor_seconds=1.0)
+    tracker.record("fast", 0.1)
+    tracker.record("slow", 20.0)
+
+    assert tracker.deadline_for("fast", 8.0) == 1.0
+    assert tracker.deadline_for("slow", 8.0) == 8.0
+
+
+def test_percentile_uses_nearest_rank():
+    tracker = ProviderLatencyTracker(window=10)
+    for seconds in range(1, 21):
+        tracker.record("amazon", float(seconds))
+
+    assert tracker.sample_count("amazon") == 10
+    assert tracker.percentile("amazon", 0.5) == 15.0
+    assert tracker.percentile("amazon", 0.95) == 20.0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_deadline_cuts_off_slow_outlier():
+    tracker = ProviderLatencyTracker(min_samples=3, multiplier=2.0, floor_seconds=0.01)
+    for _ in range(3):
+        tracker.record("ebay", 0.02)
+
+    results, status = await run_provider_with_status(
+        "ebay",
+        DelayedProvider("ebay", delay=0.5),
+        "desk",
+        timeout_seconds=5.0,
+        adaptive_timeout=True,
+        latency_tracker=tracker,
+    )
+
+    assert results == []
+    assert status.status == "timeout"
+    assert status.latency_ms < 500
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_primary_is_slow():
+    primary = DelayedProvider("serpapi", delay=0.5)
+    backup = DelayedProvider("searchapi", delay=0.01)
+
+    results, status = await run_provider_with_status(
+        "serpapi",
+        primary,
+        "desk",
+        timeout_seconds=2.0,
+        hedge=("searchapi", backup),
+        hedge_delay_seconds=0.02,
+        latency_tracker=ProviderLatencyTracker(),
+    )
+
+    assert status.status == "ok"
+    assert status.message == "Hedged via searchapi"
+    assert results[0].source == "searchapi"
+    assert backup.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_started_when_primary_is_fast():
+    primary = DelayedProvider("serpapi", delay=0.0)
+    backup = DelayedProvider("searchapi", delay=0.0)
+
+    results, status = await run_provider_with_status(
+        "serpapi",
+        primary,
+        "desk",
+        hedge=("searchapi", backup),
+        hedge_delay_seconds=0.2,
+        latency_tracker=ProviderLatencyTracker(),
+    )
+
+    assert status.message is None
+    assert results[0].source == "serpapi"
+    assert backup.calls == 0
+
+
+def test_hedge_only_uses_providers_outside_the_search():
+    serpapi = DelayedProvider("serpapi", 0)
+    searchapi = DelayedProvider("searchapi", 0)
+    scaleserp = DelayedProvider("scaleserp", 0)
+    repo = _make_repo(
+        {"serpapi": serpapi, "searchapi": searchapi, "scaleserp": scaleserp},
+        hedging_enabled=True,
+    )
+
+    hedge = repo._hedge_for("serpapi", {"serpapi": serpapi, "searchapi": searchapi})
+    assert hedge == ("scaleserp", scaleserp)
+    assert repo._hedge_for("serpapi", repo.providers) is None
+    assert repo._hedge_for("amazon", {"serpapi": serpapi}) is None
+
+    repo.hedging_enabled = False
+    assert repo._hedge_for("serpapi", {"serpapi": serpapi}) is None
+
+
+@pytest.mark.asyncio
+async def test_budget_abandons_slow_provider_once_enough_results():
+    fast = DelayedProvider("amazon", delay=0.0, count=3)
+    slow = DelayedProvider("kroger", delay=2.0)
+    repo = _make_repo(
+        {"amazon": fast, "kroger": slow},
+        request_budget_seconds=0.05,
+        request_enough_results=3,
+    )
+
+    response = await repo.search_all_with_status("desk")
+
+    statuses = {s.provider_id: s for s in response.provider_statuses}
+    assert [s.provider_id for s in response.provider_statuses] == ["amazon", "kroger"]
+    assert statuses["amazon"].status == "ok"
+    assert statuses["kroger"].status == "timeout"
+    assert statuses["kroger"].message == "Abandoned after request budget"
+    assert len(response.results) == 3
+
+
+@pytest.mark.asyncio
+async def test_budget_waits_when_results_are_insufficient():
+    fast = DelayedProvider("amazon", delay=0.0, count=1)
+    slow = DelayedProvider("kroger", delay=0.1)
+    repo = _make_repo(
+        {"amazon": fast, "kroger": slow},
+        request_budget_seconds=0.01,
+        request_enough_results=5,
+    )
+
+    batches = [batch async for batch in repo.search_streaming("desk")]
+
+    assert [name for name, *_ in batches] == ["amazon", "kroger"]
+    assert batches[-1][2].status == "ok"
+    assert batches[-1][3] == 0
+
+
+def test_fixed_timeouts_unless_enabled_by_env(monkeypatch):
+    monkeypatch.delenv("SOURCING_ADAPTIVE_TIMEOUTS", raising=False)
+    monkeypatch.delenv("SOURCING_REQUEST_BUDGET_SECONDS", raising=False)
+    repo = SourcingRepository()
+    assert repo.adaptive_timeouts is False
+    assert repo.request_budget_seconds == 0.0
+
+    monkeypatch.setenv("SOURCING_ADAPTIVE_TIMEOUTS", "true")
+    monkeypatch.setenv("SOURCING_REQUEST_BUDGET_SECONDS", "4")
+    repo = SourcingRepository()
+    assert repo.adaptive_timeouts is True
+    assert repo.request_budget_seconds == 4.0
@@ -0,0 +1,127 @@
+"""Tests for the pure ASGI middleware stack (security headers, CSRF, observability)."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import security.csrf as csrf
+from security.csrf import CSRF_COOKIE_NAME, CSRF_HEADER_NAME, CSRFProtectionMiddleware
+from security.headers import SecurityHeadersMiddleware
+
+
+def _app(release: asyncio.Event = None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/nonce")
+    async def nonce(request: Request):
+        return {"nonce": request.state.csp_nonce}
+
+    @app.post("/api/items")
+    async def create_item():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield "data: first\n\n"
+            if release is not None:
+                await release.wait()
+            yield "data: second\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(CSRFProtectionMiddleware)
+    return app
+
+
+@pytest.fixture
+def csrf_secret(monkeypatch):
+    monkeypatch.setattr(csrf, "CSRF_SECRET_KEY", "test-secret")
+
+
+def test_safe_request_gets_headers_cookie_and_nonce_in_state(csrf_secret):
+    client = TestClient(_app())
+    response = client.get("/nonce")
+
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.json()["nonce"] == response.headers["X-CSP-Nonce"]
+    assert f"nonce-{response.headers['X-CSP-Nonce']}" in response.headers["Content-Security-Policy"]
+    set_cookie = response.headers["set-cookie"]
+    assert set_cookie.startswith(f"{CSRF_COOKIE_NAME}=") and "SameSite=strict" in set_cookie
+    assert "HttpOnly" not in set_cookie
+
+
+def test_unsafe_request_requires_matching_token(csrf_secret):
+    client = TestClient(_app())
+
+    rejected = client.post("/api/items")
+    assert rejected.status_code == 403
+    assert rejected.json() == {"detail": "CSRF token missing from cookie"}
+
+    token, timestamp, signature = csrf.create_signed_csrf_token()
+    client.cookies.set(CSRF_COOKIE_NAME, csrf.encode_csrf_cookie(token, timestamp, signature))
+    mismatch = client.post("/api/items", headers={CSRF_HEADER_NAME: "wrong"})
+    assert mismatch.json()["detail"] == "CSRF token mismatch"
+    assert client.post("/api/items", headers={CSRF_HEADER_NAME: token}).json() == {"ok": True}
+    assert client.post("/api/items", headers={"Authorization": "Bearer t"}).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_sse_chunks_pass_through_before_the_stream_ends(csrf_secret):
+    release = asyncio.Event()
+    app = _app(release)
+    messages = []
+    first_chunk = asyncio.Event()
+
+    async def receive():
+        await asyncio.Event().wait()  # client never disconnects
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_chunk.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/stream", "raw_path": b"/stream", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(first_chunk.wait(), timeout=1)
+
+    start = messages[0]
+    header_names = {name.decode().lower() for name, _ in start["headers"]}
+    assert {"x-csp-nonce", "set-cookie", "content-security-policy"} <= header_names
+    # delivered while the handler is still waiting
+    assert messages[-1]["body"] == b"data: first\n\n"
+
+    release.set()
+    await asyncio.wait_for(task, timeout=1)
+    assert b"".join(m.get("body", b"") for m in messages[1:]) == b"data: first\n\ndata: second\n\n"
+
+
+def test_observability_middleware_records_status_and_correlation_id():
+    pytest.importorskip("pythonjsonlogger")
+    pytest.importorskip("prometheus_client")
+    from observability.metrics import http_requests_total
+    from observability.middleware import ObservabilityMiddleware
+
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int, request: Request):
+        return {"correlation_id": request.state.correlation_id}
+
+    app.add_middleware(ObservabilityMiddleware)
+    client = TestClient(app)
+    labels = {"method": "GET", "endpoint": "/items/{id}", "status": "200"}
+    before = http_requests_total.labels(**labels)._value.get()
+
+    response = client.get("/items/7", headers={"X-Request-ID": "req-1"})
+
+    assert response.headers["X-Request-ID"] == "req-1" == response.json()["correlation_id"]
+    assert http_requests_total.labels(**labels)._value.get() == before + 1
@@ -0,0 +1,329 @@
+"""Tests for the durable job queue worker (services/jobs.py), without a DB."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from models import BackgroundJob, BugReport
+from services import jobs as jobs_mod
+from services.jobs import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    ClaimedJob,
+    JobWorker,
+    JobWorkerConfig,
+    enqueue,
+    job,
+)
+
+
+class FakeSession:
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, key, **kwargs):
+        return self.rows.get(key)
+
+    def add(self, obj):
+        pass
+
+    async def commit(self):
+        self.committed = True
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt)
+        self.params = params
+
+        class _Result:
+            def first(self):
+                return (42,)
+
+            def all(self):
+                return []
+
+        return _Result()
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setattr(jobs_mod, "_handlers", {})
+    monkeypatch.setattr(jobs_mod, "_periodic", {})
+    return jobs_mod._handlers
+
+
+def _worker(session=None, **config) -> JobWorker:
+    session = session or FakeSession()
+    return JobWorker(session_factory=lambda: session, config=JobWorkerConfig(**config))
+
+
+def test_config_parses_queue_concurrency(monkeypatch):
+    monkeypatch.setenv("JOB_QUEUES", "default:3, email:2,maintenance")
+    assert JobWorkerConfig.from_env().queues == {"default": 3, "email": 2, "maintenance": 1}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_with_dedupe_key_is_insert_on_conflict_do_nothing(handlers, monkeypatch):
+    monkeypatch.setenv("JOB_QUEUES", "default:4,email:2")
+    job("demo.task", queue="email", max_attempts=7)(AsyncMock())
+    session = FakeSession()
+
+    job_id = await enqueue(session, "demo.task", {"x": 1}, dedupe_key="demo:1")
+
+    assert job_id == 42
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (dedupe_key) DO NOTHING" in sql
+    params = session.statements[0].compile(dialect=postgresql.dialect()).params
+    assert params["queue"] == "email" and params["max_attempts"] == 7
+    assert session.committed is False  # committed with the caller's transaction
+
+
+@pytest.mark.asyncio
+async def test_enqueue_rejects_queues_no_worker_claims(handlers, monkeypatch):
+    monkeypatch.setenv("JOB_QUEUES", "default:4")
+    job("demo.mail", queue="email")(AsyncMock())
+    session = FakeSession()
+
+    with pytest.raises(ValueError, match="not in JOB_QUEUES"):
+        await enqueue(session, "demo.mail", {})
+    assert session.statements == []
+
+
+@pytest.mark.asyncio
+async def test_execute_passes_payload_and_reports_errors(handlers):
+    seen = []
+
+    @job("demo.ok")
+    async def ok(payload):
+        seen.append(payload)
+
+    @job("demo.boom")
+    async def boom(payload):
+        raise RuntimeError("upstream 503")
+
+    worker = _worker()
+    worker._finish = AsyncMock()
+
+    await worker.execute(ClaimedJob(1, "demo.ok", {"a": 1}, 1, 5))
+    await worker.execute(ClaimedJob(2, "demo.boom", {}, 1, 5))
+    await worker.execute(ClaimedJob(3, "demo.unknown", {}, 1, 5))
+
+    assert seen == [{"a": 1}]
+    calls = worker._finish.await_args_list
+    assert calls[0].kwargs == {}
+    assert "upstream 503" in calls[1].kwargs["error"]
+    assert "no handler registered" in calls[2].kwargs["error"]
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_requeued_with_backoff_then_marked_failed():
+    row = BackgroundJob(id=5, name="demo", status="running", attempts=1, max_attempts=2)
+    session = FakeSession({5: row})
+    worker = _worker(session, base_backoff_seconds=60)
+
+    await worker._finish(ClaimedJob(5, "demo", {}, 1, 2), error="boom")
+    assert row.status == STATUS_QUEUED
+    assert row.run_at > row.updated_at
+    assert row.last_error == "boom"
+
+    row.status, row.attempts = "running", 2  # claimed again
+    await worker._finish(ClaimedJob(5, "demo", {}, 2, 2), error="boom again")
+    assert row.status == STATUS_FAILED
+    assert row.finished_at is not None
+    assert worker.stats["retried"] == 1 and worker.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_successful_job_is_marked_done():
+    row = BackgroundJob(id=6, name="demo", status="running", attempts=1, last_error="old")
+    worker = _worker(FakeSession({6: row}))
+
+    await worker._finish(ClaimedJob(6, "demo", {}, 1, 5))
+
+    assert row.status == STATUS_DONE
+    assert row.last_error is None and row.locked_until is None
+
+
+@pytest.mark.asyncio
+async def test_stale_worker_does_not_overwrite_the_new_claims_result():
+    # Attempt 1 outlived its lease and attempt 2 is now running elsewhere.
+    row = BackgroundJob(id=7, name="demo", status="running", attempts=2, max_attempts=5)
+    worker = _worker(FakeSession({7: row}))
+
+    await worker._finish(ClaimedJob(7, "demo", {}, 1, 5), error="late failure")
+    await worker._finish(ClaimedJob(7, "demo", {}, 1, 5))
+
+    assert row.status == "running" and row.last_error is None
+    assert worker.stats["lost_lease"] == 2
+    assert worker.stats["succeeded"] == worker.stats["retried"] == 0
+
+
+@pytest.mark.asyncio
+async def test_claim_leases_each_job_past_its_handler_timeout(handlers):
+    job("demo.quick", queue="maintenance", timeout_seconds=30)(AsyncMock())
+    job("demo.long", queue="maintenance", timeout_seconds=1800)(AsyncMock())
+    job("demo.other", timeout_seconds=3600)(AsyncMock())
+    session = FakeSession()
+    worker = _worker(session, queues={"maintenance": 1}, lease_seconds=600)
+
+    await worker.claim("maintenance", 1)
+
+    assert "CAST(:leases AS jsonb) ->> name" in str(session.statements[0])
+    leases = json.loads(session.params["leases"])
+    assert leases == {"demo.quick": 600, "demo.long": 1800 + jobs_mod.LEASE_MARGIN_SECONDS}
+    assert session.params["lease_seconds"] == 600
+
+
+@pytest.mark.asyncio
+async def test_poll_only_claims_free_slots_per_queue(handlers):
+    release = asyncio.Event()
+
+    @job("demo.slow")
+    async def slow(payload):
+        await release.wait()
+
+    worker = _worker(queues={"default": 2}, schedule_interval_seconds=3600)
+    worker.schedule_periodic = AsyncMock(return_value=0)
+    worker._finish = AsyncMock()
+    worker.claim = AsyncMock(side_effect=[
+        [ClaimedJob(1, "demo.slow", {}, 1, 5), ClaimedJob(2, "demo.slow", {}, 1, 5)],
+        [],
+    ])
+
+    assert await worker.poll_once() == 2
+    assert await worker.poll_once() == 0
+    worker.claim.assert_awaited_once_with("default", 2)  # second poll had no free slot
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert worker.snapshot()["running"] == {"default": 0}
+    assert worker._finish.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_periodic_jobs_are_deduplicated_per_interval_slot(handlers):
+    job("demo.hourly")(AsyncMock())
+    job("demo.nightly", queue="maintenance")(AsyncMock())
+    jobs_mod.periodic("demo.hourly", interval_seconds=3600)
+    jobs_mod.periodic("demo.nightly", interval_seconds=86400)
+    session = FakeSession()
+    worker = _worker(session)
+
+    assert await worker.schedule_periodic() == 1  # this worker only serves "default"
+
+    assert len(session.statements) == 1
+    params = session.statements[0].compile(dialect=postgresql.dialect()).params
+    assert params["dedupe_key"].startswith("periodic:demo.hourly:")
+    assert session.committed
+
+
+def test_default_handlers_are_registered():
+    import services.job_handlers  # noqa: F401
+
+    for name in ("bugs.create_github_issue", "security.cleanup", "retention.cleanup", "jobs.prune"):
+        assert jobs_mod.get_handler(name) is not None
+    assert "security.cleanup" in jobs_mod._periodic
+
+
+@pytest.mark.asyncio
+async def test_github_issue_job_is_retried_when_the_client_fails(monkeypatch):
+    import routes.bugs as bugs_routes
+    import services.job_handlers  # noqa: F401
+
+    bug = BugReport(id=11, notes="Checkout button does nothing", severity="high", status="captured")
+    row = BackgroundJob(
+        id=12, name="bugs.create_github_issue", status="running", attempts=1, max_attempts=3
+    )
+    session = FakeSession({11: bug, 12: row})
+
+    async def get_session():
+        yield session
+
+    monkeypatch.setattr(bugs_routes, "get_session", get_session)
+    monkeypatch.setattr(
+        bugs_routes, "classify_report", AsyncMock(return_value={"type": "bug", "confidence": 0.9})
+    )
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setenv("GITHUB_REPO", "acme/app")
+    monkeypatch.setattr(bugs_routes.github_client, "create_issue", AsyncMock(return_value=None))
+
+    worker = _worker(session, base_backoff_seconds=60)
+    await worker.execute(ClaimedJob(12, "bugs.create_github_issue", {"bug_id": 11}, 1, 3))
+
+    assert bug.status == "github_failed" and bug.github_issue_url is None
+    assert row.status == STATUS_QUEUED and row.run_at > row.updated_at
+    assert "GitHub issue creation failed" in row.last_error
+    assert worker.stats["retried"] == 1
+
+
+@pytest.fixture
+def feature_request(monkeypatch):
+    import routes.bugs as bugs_routes
+
+    bug = BugReport(id=21, notes="Please add dark mode", severity="low", status="captured")
+
+    async def get_session():
+        yield FakeSession({21: bug})
+
+    classify = AsyncMock(
+        return_value={"type": "feature_request", "confidence": 0.9, "reasoning": "asks for UI"}
+    )
+    email = AsyncMock()
+    monkeypatch.setattr(bugs_routes, "get_session", get_session)
+    monkeypatch.setattr(bugs_routes, "classify_report", classify)
+    monkeypatch.setattr(bugs_routes, "send_triage_notification_email", email)
+    return bugs_routes, bug, classify, email
+
+
+@pytest.mark.asyncio
+async def test_github_issue_retries_do_not_reclassify_or_resend_the_triage_email(
+    feature_request, monkeypatch
+):
+    bugs_routes, bug, classify, email = feature_request
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setenv("GITHUB_REPO", "acme/app")
+    create_issue = AsyncMock(side_effect=[None, None, {"html_url": "https://github.test/1"}])
+    monkeypatch.setattr(bugs_routes.github_client, "create_issue", create_issue)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await bugs_routes.create_github_issue_task(21)
+    await bugs_routes.create_github_issue_task(21)
+
+    assert create_issue.await_count == 3
+    classify.assert_awaited_once()
+    email.assert_awaited_once()
+    assert email.await_args.kwargs["reasoning"] == "asks for UI"
+    assert bug.triage_email_sent_at is not None
+    assert bug.status == "sent" and bug.github_issue_url == "https://github.test/1"
+    assert "asks for UI" in create_issue.await_args_list[-1].kwargs["body"]
+
+
+@pytest.mark.asyncio
+async def test_github_issue_job_finishes_when_github_is_not_configured(
+    feature_request, monkeypatch
+):
+    bugs_routes, bug, classify, email = feature_request
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.delenv("GH_TOKEN", raising=False)
+    monkeypatch.delenv("GITHUB_REPO", raising=False)
+    monkeypatch.delenv("GITHUB_REPOSITORY", raising=False)
+    create_issue = AsyncMock()
+    monkeypatch.setattr(bugs_routes.github_client, "create_issue", create_issue)
+
+    await bugs_routes.create_github_issue_task(21)  # does not raise, so the job is done
+
+    assert bug.status == "github_unconfigured"
+    create_issue.assert_not_awaited()
+    email.assert_awaited_once()
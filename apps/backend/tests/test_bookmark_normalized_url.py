@@ -0,0 +1,88 @@
+"""Tests for set-based bookmark like propagation via bid.normalized_url (no DB)."""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from models import Bid
+from models.bids import _set_bid_normalized_url
+from routes import bookmarks
+from utils.urls import normalize_bookmark_url
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    def __init__(self, legacy_rows=None):
+        self.legacy_rows = legacy_rows or []
+        self.executed = []
+
+    async def exec(self, stmt):
+        return _Result(self.legacy_rows)
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+        return _Result([])
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_normalize_strips_tracking_and_www():
+    assert (
+        normalize_bookmark_url("http://WWW.Example.com/item/42/?utm_source=x&tag=aff-20&color=red#reviews")
+        == "https://example.com/item/42?color=red"
+    )
+    assert normalize_bookmark_url("  ") is None
+
+
+def test_bid_normalized_url_is_set_on_flush():
+    bid = Bid(row_id=1, item_title="Lamp", item_url="https://www.shop.com/lamp/?gclid=abc")
+    _set_bid_normalized_url(None, None, bid)
+    assert bid.normalized_url == "https://shop.com/lamp"
+
+    bid.canonical_url = "https://shop.com/p/lamp-2"
+    _set_bid_normalized_url(None, None, bid)
+    assert bid.normalized_url == "https://shop.com/p/lamp-2"
+
+
+@pytest.mark.asyncio
+async def test_item_sync_is_a_single_update_on_normalized_url():
+    session = FakeSession()
+
+    await bookmarks._sync_item_bookmark_like_state(session, 7, "https://shop.com/lamp", False)
+
+    assert len(session.executed) == 1
+    sql = _sql(session.executed[0][0])
+    assert sql.startswith("UPDATE bid SET is_liked=")
+    assert "liked_at=" in sql
+    assert "bid.normalized_url = " in sql
+    assert "row.user_id = " in sql
+
+
+@pytest.mark.asyncio
+async def test_item_sync_backfills_legacy_bids_first():
+    session = FakeSession(legacy_rows=[(11, None, "https://www.shop.com/lamp/"), (12, "   ", None)])
+
+    await bookmarks._sync_item_bookmark_like_state(session, 7, "https://shop.com/lamp", True)
+
+    backfill_stmt, backfill_rows = session.executed[0]
+    assert backfill_rows == [{"id": 11, "normalized_url": "https://shop.com/lamp"}]
+    like_sql = _sql(session.executed[1][0])
+    assert "liked_at" not in like_sql  # bookmarking keeps the existing liked_at
+
+
+@pytest.mark.asyncio
+async def test_vendor_sync_is_a_single_update():
+    session = FakeSession()
+
+    await bookmarks._sync_vendor_bookmark_like_state(session, 7, 3, True)
+
+    assert len(session.executed) == 1
+    assert "bid.vendor_id = " in _sql(session.executed[0][0])
@@ -0,0 +1,170 @@
+"""Tests for buffered clickout ingestion (services/clickout_buffer.py)."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from services.clickout_buffer import ClickoutBuffer
+
+
+class RecordingWriter:
+    def __init__(self, fail_times: int = 0, reject=()):
+        self.batches = []
+        self.fail_times = fail_times
+        self.reject = set(reject)
+
+    async def __call__(self, batch):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("connection refused")
+        if any(item.event["n"] in self.reject for item in batch):
+            raise RuntimeError("foreign key violation")
+        self.batches.append([item.event["n"] for item in batch])
+
+    def written(self):
+        return [n for batch in self.batches for n in batch]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting_for_the_interval():
+    writer = RecordingWriter()
+    buffer = ClickoutBuffer(batch_size=3, flush_interval_ms=10_000, writer=writer)
+
+    for n in range(3):
+        buffer.submit({"n": n})
+    await asyncio.sleep(0.01)
+
+    assert writer.batches == [[0, 1, 2]]
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_on_the_interval():
+    writer = RecordingWriter()
+    buffer = ClickoutBuffer(batch_size=100, flush_interval_ms=20, writer=writer)
+
+    buffer.submit({"n": 1})
+    buffer.submit({"n": 2})
+    assert writer.batches == []
+    await asyncio.sleep(0.06)
+
+    assert writer.batches == [[1, 2]]
+    assert buffer.stats["written"] == 2
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_full_ring_drops_oldest_and_counts_it():
+    writer = RecordingWriter()
+    buffer = ClickoutBuffer(max_events=3, batch_size=100, flush_interval_ms=10_000, writer=writer)
+
+    for n in range(5):
+        buffer.submit({"n": n})
+
+    assert buffer.depth() == 3
+    assert buffer.stats["dropped"] == 2
+    assert buffer.stats["high_water"] == 3
+    await buffer.close()
+    assert writer.batches == [[2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_in_order():
+    writer = RecordingWriter(fail_times=1)
+    buffer = ClickoutBuffer(batch_size=2, flush_interval_ms=10, writer=writer)
+
+    buffer.submit({"n": 1})
+    buffer.submit({"n": 2})
+    await asyncio.sleep(0.05)
+
+    assert writer.written() == [1, 2]
+    assert buffer.stats["flush_errors"] == 1
+    assert buffer.stats["dropped"] == 0
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_bad_row_is_dropped_alone_and_the_rest_of_its_batch_is_written():
+    writer = RecordingWriter(reject={2})
+    buffer = ClickoutBuffer(batch_size=4, flush_interval_ms=10_000, max_attempts=3, writer=writer)
+    for n in range(1, 5):
+        buffer.submit({"n": n})
+
+    await buffer.close()
+
+    assert writer.written() == [1, 3, 4]
+    assert buffer.stats["written"] == 3
+    assert buffer.stats["dropped"] == 1
+    assert buffer.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_adjacent_bad_rows_do_not_cost_the_rows_behind_them_at_shutdown():
+    writer = RecordingWriter(reject={1, 2})
+    buffer = ClickoutBuffer(batch_size=4, flush_interval_ms=10_000, max_attempts=3, writer=writer)
+    for n in range(1, 5):
+        buffer.submit({"n": n})
+
+    assert await buffer.flush() is False
+    assert [item.attempts for item in buffer._queue] == [1, 1, 0, 0]
+    assert writer.batches == []
+
+    await buffer.close()
+
+    assert writer.written() == [3, 4]
+    assert buffer.stats["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_outage_stops_the_row_by_row_retry_after_two_failures():
+    writer = RecordingWriter(fail_times=3)
+    buffer = ClickoutBuffer(batch_size=4, flush_interval_ms=10_000, writer=writer)
+    for n in range(1, 5):
+        buffer.submit({"n": n})
+
+    assert await buffer.flush() is False
+
+    assert writer.fail_times == 0  # one batch write and two single-row writes, not four
+    assert [(item.event["n"], item.attempts) for item in buffer._queue] == [
+        (1, 1), (2, 1), (3, 0), (4, 0),
+    ]
+    await buffer.close()
+    assert writer.written() == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_everything_pending():
+    writer = RecordingWriter()
+    buffer = ClickoutBuffer(batch_size=2, flush_interval_ms=10_000, writer=writer)
+    buffer.submit({"n": 1})
+
+    await buffer.close()
+
+    assert writer.batches == [[1]]
+    assert buffer.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_redirect_enqueues_clickout_without_a_db_write():
+    from main import app
+    from services import clickout_buffer as buffer_mod
+
+    captured = []
+    def submit(event, audit=None):
+        captured.append((event, audit))
+
+    with patch.object(buffer_mod.clickout_buffer, "submit", submit):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get(
+                "/api/out?url=https://www.example.com/item&row_id=4&bid_id=9&idx=2&source=test",
+                follow_redirects=False,
+            )
+
+    assert resp.status_code == 302
+    event, audit = captured[0]
+    assert event["row_id"] == 4 and event["bid_id"] == 9 and event["offer_index"] == 2
+    assert event["merchant_domain"] == "example.com"
+    assert audit["action"] == "clickout.redirect"
@@ -0,0 +1,93 @@
+"""Tests for CPU offload of search stages, the vectorized reranker and the loop lag monitor."""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.loop_lag import EventLoopLagMonitor
+from sourcing.quantum.reranker import (
+    QuantumReranker,
+    _reduce_embedding,
+    _reduce_embeddings,
+    _simulate_quantum_kernel,
+    _simulate_quantum_kernel_batch,
+)
+from utils.cpu_offload import run_cpu_bound
+
+
+@pytest.mark.parametrize("dims", [5, 8, 37, 64])
+def test_vectorized_kernel_matches_per_candidate_kernel(dims):
+    rng = np.random.default_rng(dims)
+    query = rng.normal(size=dims)
+    candidates = rng.normal(size=(12, dims))
+    candidates[3] = 1.0  # flat pooled vector takes the low-variance branch
+
+    q_params = _reduce_embedding(query, 8)
+    c_params = _reduce_embeddings(candidates, 8)
+    expected = [_simulate_quantum_kernel(q_params, _reduce_embedding(c, 8)) for c in candidates]
+
+    assert np.allclose(c_params, [_reduce_embedding(c, 8) for c in candidates])
+    assert np.allclose(_simulate_quantum_kernel_batch(q_params, c_params), expected)
+
+
+@pytest.mark.asyncio
+async def test_rerank_matches_per_pair_scores_and_runs_on_the_pool(monkeypatch):
+    monkeypatch.setenv("SEARCH_CPU_OFFLOAD_MIN_ITEMS", "0")
+    reranker = QuantumReranker()
+    reranker._enabled = True
+    rng = np.random.default_rng(1)
+    query = rng.normal(size=32).tolist()
+    results = [{"_idx": i, "embedding": rng.normal(size=32).tolist()} for i in range(6)]
+    results.append({"_idx": 6, "embedding": None})
+
+    threads = []
+    original = reranker.rerank_sync
+
+    def spy(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(reranker, "rerank_sync", spy)
+    reranked = await reranker.rerank_results(query, results, top_k=10)
+
+    assert threads and threads[0].startswith("search-cpu")
+    assert reranked[-1]["_idx"] == 6 and not reranked[-1].get("quantum_reranked")
+    blended = [r["blended_score"] for r in reranked[:-1]]
+    assert blended == sorted(blended, reverse=True)
+    for r in reranked[:-1]:
+        q = np.array(query, dtype=np.float32)
+        c = np.array(results[r["_idx"]]["embedding"], dtype=np.float32)
+        quantum = round(reranker.quantum_similarity(q, c), 4)
+        classical = round(reranker.classical_similarity(q, c), 4)
+        assert r["quantum_score"] == pytest.approx(quantum, abs=1e-4)
+        assert r["classical_score"] == pytest.approx(classical, abs=1e-4)
+
+
+@pytest.mark.asyncio
+async def test_small_batches_run_inline(monkeypatch):
+    monkeypatch.setenv("SEARCH_CPU_OFFLOAD_MIN_ITEMS", "20")
+    name = await run_cpu_bound(lambda: threading.current_thread().name, items=3)
+    assert name == threading.current_thread().name
+    name = await run_cpu_bound(lambda: threading.current_thread().name, items=50)
+    assert name.startswith("search-cpu")
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_reports_a_blocked_loop():
+    monitor = EventLoopLagMonitor(interval=0.01, warn_threshold=0.03)
+    stop = asyncio.Event()
+    task = asyncio.create_task(monitor.run(stop))
+
+    await asyncio.sleep(0.03)
+    time.sleep(0.08)  # block the loop
+    await asyncio.sleep(0.03)
+    stop.set()
+    await asyncio.wait_for(task, timeout=1)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["slow_samples"] >= 1
+    assert snapshot["max_ms"] >= 50
+    assert snapshot["samples"] >= 3
@@ -0,0 +1,207 @@
+"""Tests for per-statement DB timing (services/db_timing.py) against a SQLite stand-in."""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+import services.db_timing as db_timing
+from services.db_timing import (
+    RequestDBTimingMiddleware,
+    instrument_engine,
+    statement_fingerprint,
+    statement_timings,
+    track_request_db_time,
+)
+
+
+class RecordingHistogram:
+    def __init__(self):
+        self.observations = []
+
+    def labels(self, **labels):
+        histogram = self
+
+        class _Child:
+            def observe(self, value):
+                histogram.observations.append((labels, value))
+
+        return _Child()
+
+
+@pytest.fixture
+def stand_in_db(monkeypatch):
+    statement_histogram, query_histogram = RecordingHistogram(), RecordingHistogram()
+    monkeypatch.setattr(db_timing, "db_statement_duration_seconds", statement_histogram)
+    monkeypatch.setattr(db_timing, "db_query_duration_seconds", query_histogram)
+    monkeypatch.setattr(statement_timings, "slow_threshold_seconds", None)
+    statement_timings.clear()
+
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)"))
+    statement_timings.clear()
+    statement_histogram.observations.clear()
+    query_histogram.observations.clear()
+    yield engine, statement_histogram, query_histogram
+    statement_timings.clear()
+    engine.dispose()
+
+
+def test_fingerprint_drops_arguments_and_collapses_lists():
+    a = statement_fingerprint(
+        "SELECT * FROM row WHERE id = $1::INTEGER AND status IN ($2::VARCHAR, $3::VARCHAR)"
+    )
+    b = statement_fingerprint(
+        "SELECT *\n  FROM row WHERE id = 7 AND status IN ('open', 'sourcing', 'closed')"
+    )
+    assert a == b == "SELECT * FROM row WHERE id = ? AND status IN (?, ...)"
+
+    rows = statement_fingerprint(
+        "INSERT INTO bid (a, b) VALUES (%(a_0)s, 'x'), (%(a_1)s, 'y') -- batch"
+    )
+    assert rows == "INSERT INTO bid (a, b) VALUES (?, ...), ..."
+    assert statement_fingerprint("SELECT :name::text, t1.id FROM t1") == "SELECT ?, t1.id FROM t1"
+
+
+def test_statements_are_timed_per_fingerprint(stand_in_db):
+    engine, statement_histogram, query_histogram = stand_in_db
+    with engine.begin() as conn:
+        for i in range(3):
+            conn.execute(
+                text("INSERT INTO item (id, name) VALUES (:id, :name)"), {"id": i, "name": f"n{i}"}
+            )
+        conn.execute(text("SELECT name FROM item WHERE id = 2"))
+
+    top = statement_timings.top()
+    by_statement = sorted(top, key=lambda e: e["statement"])
+    assert [(entry["statement"], entry["calls"]) for entry in by_statement] == [
+        ("INSERT INTO item (id, name) VALUES (?, ...)", 3),
+        ("SELECT name FROM item WHERE id = ?", 1),
+    ]
+    labels = {
+        labels["operation"]: labels["fingerprint"]
+        for labels, _ in statement_histogram.observations
+    }
+    assert set(labels) == {"insert", "select"}
+    assert labels["insert"] in {entry["fingerprint"] for entry in top}
+    assert [labels["query_type"] for labels, _ in query_histogram.observations].count("insert") == 3
+    assert statement_timings.snapshot()["statements"] == 4
+
+
+def test_fingerprints_beyond_the_limit_share_one_label(stand_in_db, monkeypatch):
+    engine, statement_histogram, _ = stand_in_db
+    monkeypatch.setattr(statement_timings, "max_fingerprints", 2)
+    with engine.begin() as conn:
+        for column in ("id", "name", "id, name"):
+            conn.execute(text(f"SELECT {column} FROM item"))
+
+    assert statement_timings.snapshot()["fingerprints"] == 2
+    assert statement_histogram.observations[-1][0]["fingerprint"] == db_timing.OTHER_FINGERPRINT
+
+
+def test_slow_statements_are_logged_with_the_correlation_id(stand_in_db, monkeypatch, caplog):
+    engine, _, _ = stand_in_db
+    monkeypatch.setattr(statement_timings, "slow_threshold_seconds", 0.05)
+    monkeypatch.setattr(db_timing, "get_correlation_id", lambda: "req-slow-1")
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _slow_down(conn, cursor, statement, parameters, context, executemany):
+        if "slow_marker" in statement:
+            context._db_timing_started -= 0.2  # as if the statement took 200ms longer
+
+    with caplog.at_level(logging.WARNING, logger="services.db_timing"), engine.begin() as conn:
+        conn.execute(text("SELECT 1 AS fast"))
+        conn.execute(text("SELECT name AS slow_marker FROM item WHERE name = 'secret@example.com'"))
+
+    slow = [r for r in caplog.records if "Slow query" in r.getMessage()]
+    assert len(slow) == 1
+    assert "correlation_id=req-slow-1" in slow[0].getMessage()
+    assert "secret@example.com" not in slow[0].getMessage()
+    assert slow[0].duration_seconds >= 0.2
+    assert statement_timings.stats["slow"] == 1
+
+
+def test_request_stats_count_only_statements_in_the_request(stand_in_db):
+    engine, _, _ = stand_in_db
+    with engine.begin() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_request_db_time() as stats:
+            conn.execute(text("SELECT 2"))
+            conn.execute(text("SELECT 3"))
+        conn.execute(text("SELECT 4"))
+
+    assert stats.queries == 2
+    assert stats.seconds > 0
+
+
+def test_nested_request_tracking_shares_the_outer_stats(stand_in_db):
+    engine, _, _ = stand_in_db
+    with engine.begin() as conn, track_request_db_time() as outer:
+        conn.execute(text("SELECT 1"))
+        with track_request_db_time() as inner:
+            conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+
+    assert inner is outer
+    assert outer.queries == 3
+
+
+def test_each_request_prints_its_db_time(stand_in_db, capsys):
+    engine, _, _ = stand_in_db
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"ok": True}
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    app.add_middleware(RequestDBTimingMiddleware, enabled=True)
+    client = TestClient(app)
+    assert client.get("/items/7").status_code == 200
+    assert client.get("/ping").status_code == 200
+
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith("[DB]")]
+    assert len(lines) == 1  # requests without statements print nothing
+    assert lines[0].startswith("[DB] GET /items/{item_id} 200 ")
+    assert "db_queries=2 db_ms=" in lines[0]
+
+
+def test_main_app_mounts_request_db_timing():
+    from main import app
+
+    assert RequestDBTimingMiddleware in [m.cls for m in app.user_middleware]
+
+
+def test_access_log_reports_request_db_time(stand_in_db, caplog):
+    pytest.importorskip("pythonjsonlogger")
+    pytest.importorskip("prometheus_client")
+    from observability.middleware import ObservabilityMiddleware
+
+    engine, _, _ = stand_in_db
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"ok": True}
+
+    app.add_middleware(ObservabilityMiddleware)
+    with caplog.at_level(logging.INFO, logger="observability.middleware"):
+        TestClient(app).get("/items")
+
+    completed = [r for r in caplog.records if r.getMessage() == "Request completed"]
+    assert completed[-1].db_queries == 2
+    assert completed[-1].db_seconds >= 0
@@ -0,0 +1,147 @@
+"""Tests for the deal email relay: one contact lookup per relay and a non-blocking send."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import services.deal_pipeline as deal_pipeline
+import services.email as email_service
+from models.deals import Deal
+from services.deal_pipeline import identify_sender, relay_email, resolve_deal_contacts
+
+
+class CountingSession:
+    """Answers the deal + contacts query and counts every DB round trip."""
+
+    def __init__(
+        self, deal, buyer=("buyer@example.com", "Bea"), vendor=("sales@acme.test", "Acme", "Al")
+    ):
+        self.row = (deal, *buyer, *vendor)
+        self.round_trips = 0
+
+    async def execute(self, statement, params=None):
+        self.round_trips += 1
+        columns = len(statement.selected_columns)
+        return SimpleNamespace(first=lambda: self.row[-columns:])
+
+    async def get(self, *args, **kwargs):
+        self.round_trips += 1
+        raise AssertionError("relay should not load entities one by one")
+
+
+def make_deal(**kwargs):
+    defaults = dict(
+        id=3,
+        row_id=1,
+        buyer_user_id=10,
+        vendor_id=20,
+        proxy_email_alias="acme-3",
+        status="negotiating",
+    )
+    defaults.update(kwargs)
+    return Deal(**defaults)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    sent = []
+
+    async def fake_send(params):
+        sent.append(params)
+        return {"id": f"re_{len(sent)}"}
+
+    monkeypatch.setattr(deal_pipeline, "RESEND_API_KEY", "re_test")
+    monkeypatch.setattr(deal_pipeline, "DEV_EMAIL_OVERRIDE", "")
+    monkeypatch.setattr(deal_pipeline, "send_resend_email", fake_send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_inbound_relay_costs_one_lookup(sent):
+    session = CountingSession(make_deal())
+
+    contacts = await resolve_deal_contacts(session, "acme-3")
+    sender = await identify_sender(contacts.deal, "Sales@Acme.test", session, contacts=contacts)
+    result = await relay_email(
+        contacts.deal, sender, "Quote: $500", None, "Re: quote", session, contacts=contacts
+    )
+
+    assert session.round_trips == 1
+    assert sender == "vendor"
+    assert result.success and result.message_id == "re_1"
+    assert sent[0]["to"] == ["buyer@example.com"]
+    assert sent[0]["from"] == f"Acme (via BuyAnything) <acme-3@{deal_pipeline.MESSAGES_DOMAIN}>"
+
+
+@pytest.mark.asyncio
+async def test_relay_without_preloaded_contacts_uses_one_query(sent):
+    session = CountingSession(make_deal())
+
+    result = await relay_email(make_deal(), "buyer", "Can you do $450?", None, "Re: quote", session)
+
+    assert session.round_trips == 1
+    assert result.success
+    assert sent[0]["to"] == ["sales@acme.test"]
+    assert sent[0]["from"].startswith("Bea (via BuyAnything)")
+
+
+@pytest.mark.asyncio
+async def test_unknown_sender_is_not_relayed(sent):
+    session = CountingSession(make_deal())
+    contacts = await resolve_deal_contacts(session, "acme-3")
+
+    sender = await identify_sender(contacts.deal, "someone@else.test", session, contacts=contacts)
+    assert sender is None
+    assert session.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_slow_send(monkeypatch):
+    requests = []
+
+    def slow_sdk_send(params):
+        requests.append(params)
+        time.sleep(0.2)  # the SDK blocks its thread for the whole HTTPS round trip
+        return {"id": "re_slow"}
+
+    monkeypatch.setattr(email_service.resend.Emails, "send", slow_sdk_send)
+    monkeypatch.setattr(deal_pipeline, "RESEND_API_KEY", "re_test")
+    monkeypatch.setattr(deal_pipeline, "DEV_EMAIL_OVERRIDE", "")
+    monkeypatch.setattr(deal_pipeline, "send_resend_email", email_service.send_resend_email)
+
+    ticks = 0
+    sending = True
+
+    async def ticker():
+        nonlocal ticks
+        while sending:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    session = CountingSession(make_deal())
+    result = await relay_email(make_deal(), "vendor", "Quote: $500", None, "Re: quote", session)
+    sending = False
+    await ticker_task
+
+    assert result.success and result.message_id == "re_slow"
+    assert requests[0]["to"] == ["buyer@example.com"]
+    assert ticks >= 10  # the loop kept running while the send was in flight
+
+
+def test_alias_lookup_is_backed_by_exactly_one_unique_index():
+    from startup_migrations import INDEX_STEPS, MIGRATION_STEPS
+
+    # Both schema paths create the unique index: create_all from the model...
+    assert Deal.__table__.c.proxy_email_alias.unique
+    # ...and the startup table DDL through the column's UNIQUE constraint.
+    ddl = next(
+        s for s in MIGRATION_STEPS
+        if any("CREATE TABLE IF NOT EXISTS deal (" in q for q in s.statements)
+    )
+    assert "proxy_email_alias VARCHAR UNIQUE NOT NULL" in " ".join(ddl.statements)
+    # No startup index step builds another index on the column.
+    assert not [s for s in INDEX_STEPS if "proxy_email_alias" in s.definition]
+    assert next(s for s in INDEX_STEPS if s.name == "deal_proxy_alias_idx").drop
@@ -0,0 +1,84 @@
+"""Tests for the fast JSON encoder used for SSE frames and pre-encoded responses."""
+
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import numpy as np
+import pytest
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+import utils.json_utils as json_utils
+from models import Row
+from routes.chat_helpers import sse_event
+from utils.json_utils import FastJSONResponse, json_dumps_bytes, sse_data
+
+PAYLOAD = {
+    "title": "Trail shoe “Pro” – size 10 \U0001f45f",
+    "price": 79.99,
+    "count": 3,
+    "ok": True,
+    "missing": None,
+    "nested": {"scores": [0.1, 0.25], "tags": ["a", "b"]},
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_utils, "orjson", None)
+    elif json_utils.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_output_matches_starlette_json_response(encoder):
+    assert json_dumps_bytes(PAYLOAD) == JSONResponse(PAYLOAD).body
+    assert json.loads(json_dumps_bytes(PAYLOAD)) == json.loads(json.dumps(PAYLOAD))
+
+
+def test_special_types_encode_like_jsonable_encoder(encoder):
+    value = {
+        "when": datetime(2024, 5, 1, 12, 30, 15, 250, tzinfo=timezone.utc),
+        "naive": datetime(2024, 5, 1, 12, 30),
+        "day": date(2024, 5, 1),
+        "price": Decimal("19.90"),
+        "whole": Decimal("20"),
+        "id": UUID("12345678-1234-5678-1234-567812345678"),
+        "score": np.float64(0.5),
+        "row": Row(id=7, title="Lamp", status="sourcing", user_id=1),
+        7: "int key",
+    }
+    assert json.loads(json_dumps_bytes(value)) == json.loads(json.dumps(jsonable_encoder(value)))
+
+
+def test_unsupported_values_fall_back_to_stdlib():
+    assert json.loads(json_dumps_bytes({"big": 2**70})) == {"big": 2**70}
+    with pytest.raises(TypeError):
+        json_dumps_bytes({"obj": object()})
+
+
+def test_nan_and_infinity_encode_as_null(encoder):
+    value = {"score": float("nan"), "bounds": (float("-inf"), 1.5), "price": Decimal("NaN")}
+    assert json_dumps_bytes(value) == b'{"score":null,"bounds":[null,1.5],"price":null}'
+    # Also when the stdlib path is taken for values orjson rejects.
+    assert json_dumps_bytes({"big": 2**70, "score": float("inf")}) == (
+        b'{"big":1180591620717411303424,"score":null}'
+    )
+
+
+def test_sse_frames_parse_to_the_same_payload():
+    named = sse_event("search_results", PAYLOAD)
+    assert named.startswith("event: search_results\ndata: ") and named.endswith("\n\n")
+    assert json.loads(named.split("data: ", 1)[1]) == PAYLOAD
+    assert sse_event("done", None) == "event: done\ndata: null\n\n"
+    assert sse_data({"a": "line\nbreak"}) == 'data: {"a":"line\\nbreak"}\n\n'
+
+
+def test_fast_response_renders_headers_and_body():
+    response = FastJSONResponse(PAYLOAD, status_code=201)
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == PAYLOAD
@@ -0,0 +1,111 @@
+"""Tests for the LLM prompt cache and request coalescing (services/llm_cache.py)."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from services import llm_core
+from services.llm_cache import (
+    CachedLLMResponse,
+    LLMCacheConfig,
+    LLMResponseCache,
+    MemoryLLMCache,
+    build_llm_cache_key,
+)
+
+
+def _entry(response: str = "ok", ttl: float = 60.0) -> CachedLLMResponse:
+    return CachedLLMResponse(
+        response=response, model="m", latency_seconds=2.0, expires_at=time.time() + ttl
+    )
+
+
+def test_cache_key_covers_models_prompt_and_images():
+    base = build_llm_cache_key("prompt", ["a", "b"])
+    assert base == build_llm_cache_key("prompt", ["a", "b"], [])
+    assert base != build_llm_cache_key("prompt ", ["a", "b"])
+    assert base != build_llm_cache_key("prompt", ["a", "c"])
+    assert base != build_llm_cache_key("prompt", ["a", "b"], ["https://img/1.png"])
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_bounded_lru_and_drops_expired():
+    tier = MemoryLLMCache(max_entries=2)
+    await tier.set("a", _entry())
+    await tier.set("b", _entry())
+    await tier.get("a")
+    await tier.set("c", _entry())
+    assert await tier.get("b") is None
+    assert await tier.get("a") is not None
+
+    await tier.set("old", _entry(ttl=-1))
+    assert await tier.get("old") is None
+
+
+@pytest.mark.asyncio
+async def test_hit_skips_upstream_and_records_saved_latency():
+    cache = LLMResponseCache()
+    call = AsyncMock(return_value='{"provider_query": "lamp"}')
+
+    first = await cache.get_or_call("k", call, model="m")
+    second = await cache.get_or_call("k", call, model="m")
+
+    assert first == second == '{"provider_query": "lamp"}'
+    assert call.await_count == 1
+    assert cache.stats["misses"] == 1 and cache.stats["hits"] == 1
+    assert cache.snapshot()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_prompts_share_one_call():
+    cache = LLMResponseCache()
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    results = await asyncio.gather(*[cache.get_or_call("k", slow) for _ in range(5)])
+
+    assert results == ["answer"] * 5
+    assert calls == 1
+    assert cache.snapshot()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_errors_and_empty_responses_are_not_cached():
+    cache = LLMResponseCache()
+
+    with pytest.raises(TimeoutError):
+        await cache.get_or_call("k", AsyncMock(side_effect=TimeoutError()))
+    assert await cache.get_or_call("k", AsyncMock(return_value="  ")) == "  "
+    assert await cache.get_or_call("k", AsyncMock(return_value="real")) == "real"
+    assert cache.stats["stores"] == 1 and cache.stats["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_hit_is_promoted_to_memory():
+    shared = MemoryLLMCache()
+    await shared.set("k", _entry("from-shared"))
+    memory = MemoryLLMCache()
+    cache = LLMResponseCache(LLMCacheConfig(), tiers=[memory, shared])
+
+    assert await cache.get_or_call("k", AsyncMock()) == "from-shared"
+    assert (await memory.get("k")).response == "from-shared"
+
+
+@pytest.mark.asyncio
+async def test_call_gemini_only_caches_when_asked(monkeypatch):
+    import services.llm_cache as llm_cache_mod
+
+    monkeypatch.setattr(llm_cache_mod, "llm_response_cache", LLMResponseCache())
+    upstream = AsyncMock(return_value="hello")
+    with patch.object(llm_core, "_call_llm", upstream):
+        await llm_core.call_gemini("same prompt", cache=True)
+        await llm_core.call_gemini("same prompt", cache=True)
+        await llm_core.call_gemini("same prompt")
+    assert upstream.await_count == 2
@@ -0,0 +1,138 @@
+"""Tests for streamed LLM decisions: incremental JSON parsing, provider fallback, early dispatch."""
+
+import asyncio
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+
+import services.llm as llm
+import services.llm_core as llm_core
+from services.llm import ChatContext, UnifiedDecisionStream, stream_unified_decision
+from utils.json_stream import StreamingJSONObjectParser
+
+DECISION = {
+    "message": 'Looking for "trail" shoes — size 10?\nOn it \U0001f45f',
+    "intent": {
+        "what": "trail running shoes",
+        "category": "product",
+        "search_query": "trail running shoes {10}",
+    },
+    "action": {"type": "create_row"},
+    "ui_hint": {"layout": "ROW_MEDIA_LEFT", "blocks": ["ProductImage", "PriceBlock"]},
+}
+
+
+def _ctx() -> ChatContext:
+    return ChatContext(user_message="trail shoes", conversation_history=[])
+
+
+def _fake_stream(chunks, gate: asyncio.Event = None, after: int = -1):
+    async def stream(prompt, timeout=30.0, image_urls=None):
+        for index, chunk in enumerate(chunks):
+            if index == after and gate is not None:
+                await gate.wait()
+            yield chunk
+
+    return stream
+
+
+def test_parser_streams_message_and_completes_fields_for_any_chunking():
+    doc = "```json\n" + json.dumps(DECISION) + "\n```"
+    rng = random.Random(7)
+    for _ in range(50):
+        parser = StreamingJSONObjectParser(stream_fields=["message"])
+        deltas, fields = [], []
+        pos = 0
+        while pos < len(doc):
+            size = rng.randint(1, 6)
+            for event in parser.feed(doc[pos:pos + size]):
+                (deltas if event.kind == "delta" else fields).append(event)
+            pos += size
+        assert "".join(e.value for e in deltas) == DECISION["message"]
+        assert [e.key for e in fields] == ["message", "intent", "action", "ui_hint"]
+        assert parser.fields == DECISION and parser.done
+
+
+def test_parser_reports_message_before_the_object_closes():
+    parser = StreamingJSONObjectParser(stream_fields=["message"])
+    events = parser.feed('{"message": "Hel')
+    assert [(e.kind, e.value) for e in events] == [("delta", "Hel")]
+    events = parser.feed('lo", "action": {"type": "search"}, "n": 2')
+    assert [(e.kind, e.key) for e in events] == [
+        ("delta", "message"), ("field", "message"), ("field", "action")
+    ]
+    assert parser.feed("}")[0].value == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_to_gemini_only_before_first_chunk(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "or-key")
+    monkeypatch.setenv("GEMINI_API_KEY", "g-key")
+    monkeypatch.setattr(llm_core, "_openrouter_backoff_until", 0.0)
+
+    async def broken(prompt, timeout=30.0, image_urls=None):
+        raise ConnectionError("refused")
+        yield  # pragma: no cover
+
+    async def cut_off(prompt, timeout=30.0, image_urls=None):
+        yield "partial"
+        raise ConnectionError("reset")
+
+    with patch.object(llm_core, "_stream_openrouter", broken), \
+         patch.object(llm_core, "_stream_gemini_direct", _fake_stream(["a", "b"])):
+        assert [c async for c in llm_core.stream_gemini("p")] == ["a", "b"]
+
+    received = []
+    with patch.object(llm_core, "_stream_openrouter", cut_off), \
+         patch.object(llm_core, "_stream_gemini_direct", _fake_stream(["unused"])):
+        with pytest.raises(ConnectionError):
+            async for chunk in llm_core.stream_gemini("p"):
+                received.append(chunk)
+    assert received == ["partial"]
+
+
+@pytest.mark.asyncio
+async def test_decision_is_ready_before_trailing_fields_arrive():
+    text = json.dumps(DECISION)
+    split = text.index('"ui_hint"')
+    chunks = [text[i:min(i + 9, split)] for i in range(0, split, 9)] + [text[split:]]
+    gate = asyncio.Event()
+
+    with patch.object(llm, "stream_gemini", _fake_stream(chunks, gate, after=len(chunks) - 1)):
+        stream = UnifiedDecisionStream(_ctx())
+        deltas = [d async for d in stream.message_deltas()]
+
+        assert "".join(deltas) == DECISION["message"]
+        assert stream.decision.action == {"type": "create_row"}
+        assert stream.decision.ui_hint is None  # still streaming
+
+        gate.set()
+        final = await stream.final()
+        assert final.ui_hint == DECISION["ui_hint"]
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_late_stream_failure_keeps_the_dispatched_decision():
+    text = json.dumps(DECISION)
+    head = text[: text.index('"ui_hint"')]
+
+    with patch.object(llm, "stream_gemini", _fake_stream([head, "<<garbage"])):
+        stream = UnifiedDecisionStream(_ctx())
+        [d async for d in stream.message_deltas()]
+        final = await stream.final()
+
+    assert final.message == DECISION["message"]
+    assert final.intent.what == "trail running shoes"
+
+
+@pytest.mark.asyncio
+async def test_unparseable_stream_falls_back_to_basic_row():
+    with patch.object(llm, "stream_gemini", _fake_stream(["I cannot help with that."])):
+        events = [e async for e in stream_unified_decision(_ctx())]
+
+    assert [e.kind for e in events] == ["final"]
+    assert events[0].decision.action == {"type": "create_row"}
+    assert events[0].decision.intent.search_query == "trail shoes"
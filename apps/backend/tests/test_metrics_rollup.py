@@ -0,0 +1,167 @@
+"""Tests for daily metric rollups and the dashboards that read them (no DB)."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from routes import admin as admin_routes
+from routes import admin_metrics as metrics_routes
+from services.metrics_rollup import (
+    ROLLUP_SOURCES,
+    RollupTotals,
+    _refresh_sql,
+    gather_reads,
+    refresh_rollups,
+)
+
+
+class FakeSession:
+    bind = None
+
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, stmt, params=None):
+        self.statements.append((str(stmt), params))
+
+    async def commit(self):
+        self.committed = True
+
+
+def test_rollup_totals_sum_dimensions():
+    totals = RollupTotals([
+        ("clickouts", "amazon", 10),
+        ("clickouts", "", 5),
+        ("gmv", "affiliate", 120.5),
+        ("gmv", "stripe_connect", 79.5),
+    ])
+    assert totals.count("clickouts") == 15
+    assert totals.by_dimension("clickouts") == {"amazon": 10.0, "": 5.0}
+    assert totals.total("gmv") == 200.0
+    assert totals.count("purchases") == 0
+
+
+def test_refresh_sql_covers_every_metric_in_one_statement():
+    sql = str(_refresh_sql(ROLLUP_SOURCES))
+    assert sql.startswith("INSERT INTO metrics_daily_rollup")
+    assert sql.count("UNION ALL") == len(ROLLUP_SOURCES) - 1
+    for metric in ROLLUP_SOURCES:
+        assert f"'{metric}' AS metric" in sql
+
+
+@pytest.mark.asyncio
+async def test_refresh_replaces_trailing_days_in_one_transaction():
+    session = FakeSession()
+
+    since = await refresh_rollups(session)
+
+    assert since == datetime.utcnow().date() - timedelta(days=1)
+    (delete_sql, delete_params), (insert_sql, insert_params) = session.statements
+    assert delete_sql.startswith("DELETE FROM metrics_daily_rollup")
+    assert delete_params == {"since": since}
+    assert insert_sql.startswith("INSERT INTO metrics_daily_rollup")
+    assert insert_params["since"] == datetime.combine(since, datetime.min.time())
+    assert session.committed
+
+
+@pytest.mark.asyncio
+async def test_gather_reads_without_bind_runs_on_the_given_session():
+    session = FakeSession()
+    result = await gather_reads(session, a=AsyncMock(return_value=1), b=AsyncMock(return_value=2))
+    assert result == {"a": 1, "b": 2}
+
+
+@pytest.mark.asyncio
+async def test_admin_metrics_reads_event_counts_from_rollups():
+    current = RollupTotals([
+        ("bids_created", "", 200),
+        ("clickouts", "amazon", 30),
+        ("clickouts", "", 10),
+        ("clickouts_suspicious", "", 4),
+        ("clickouts_affiliate", "", 30),
+        ("platform_revenue", "affiliate", 50.0),
+        ("gmv", "affiliate", 1000.0),
+        ("rows_created", "", 12),
+        ("purchases", "affiliate", 3),
+        ("shares_created", "", 6),
+        ("referral_signups", "", 2),
+    ])
+    previous = RollupTotals([("gmv", "affiliate", 500.0)])
+    live = {
+        "current": current,
+        "previous": previous,
+        "avg_time_to_first_result_seconds": 12.34,
+        "active_users": 5,
+    }
+    with patch.object(metrics_routes, "gather_reads", AsyncMock(return_value=live)):
+        body = await metrics_routes.admin_metrics(days=30, admin=None, session=FakeSession())
+
+    assert body["m2_offer_ctr"] == 0.2
+    assert body["m3_clickout_success_rate"] == 0.9
+    assert body["m4_affiliate_coverage"] == 0.75
+    assert body["m4_handler_breakdown"] == {"amazon": 30, None: 10}
+    assert body["m5_revenue_per_active_user"] == 10.0
+    assert body["m9_gmv_growth_rate"] == 1.0
+    assert body["funnel"] == {
+        "active_users": 5,
+        "rows_created": 12,
+        "bids_shown": 200,
+        "clickouts": 40,
+        "purchases": 3,
+        "suspicious_clickouts": 4,
+    }
+
+
+@pytest.mark.asyncio
+async def test_admin_stats_combines_rollups_and_live_counts():
+    all_time = RollupTotals(
+        [("users_created", "", 100), ("clickouts", "x", 9), ("gmv", "affiliate", 42.0)]
+    )
+    week = RollupTotals([("users_created", "", 7), ("clickouts", "x", 2)])
+    live = {
+        "all_time": all_time,
+        "week": week,
+        "total_users": 98,
+        "total_rows": 30,
+        "total_bids": 250,
+        "active_rows": 11,
+        "total_merchants": 3,
+        "total_outreach": 20,
+        "outreach_quoted": 4,
+        "total_bugs": 6,
+        "open_bugs": 1,
+    }
+    with patch.object(admin_routes, "gather_reads", AsyncMock(return_value=live)) as gather:
+        body = await admin_routes.admin_stats(admin=None, session=FakeSession())
+
+    assert gather.await_count == 1
+    # Current-state totals are live counts, not cumulative rollups (users can be deleted).
+    assert body["users"] == {"total": 98, "last_7_days": 7}
+    assert body["rows"]["total"] == 30 and body["bids"]["total"] == 250
+    assert body["clickouts"]["total"] == 9 and body["clickouts"]["last_7_days"] == 2
+    assert body["purchases"]["gmv"] == 42.0
+    assert body["rows"]["active"] == 11
+    assert body["bugs"] == {"total": 6, "open": 1}
+
+
+@pytest.mark.asyncio
+async def test_growth_totals_are_live_counts():
+    live = {
+        "share_stats": (4, 10, 50),
+        "user_counts": (120, 5),
+        "referral_rows": [],
+        "sellers_who_buy": 2,
+        "total_merchants": 8,
+        "referred_buyers": 1,
+    }
+    with patch.object(admin_routes, "gather_reads", AsyncMock(return_value=live)) as gather:
+        body = await admin_routes.growth_metrics(admin=None, session=FakeSession())
+
+    assert "all_time" not in gather.await_args.kwargs
+    components = body["k_factor"]["components"]
+    assert (components["total_shares"], components["total_referral_signups"]) == (10, 5)
+    assert components["total_clicks"] == 50
+    assert body["total_users"] == 120
+    assert body["collaborator_funnel"]["signup_to_buyer_rate"] == 0.2
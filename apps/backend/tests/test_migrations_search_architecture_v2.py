@@ -1,11 +1,10 @@
 import pytest
-import inspect
 from sqlalchemy import text
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from models import Row, Bid, Seller, RequestSpec
 from database import engine
-from startup_migrations import run_startup_migrations
+from startup_migrations import MIGRATION_STEPS
 
 @pytest.mark.asyncio
 async def test_search_architecture_v2_columns_exist(session: AsyncSession):
@@ -96,7 +95,7 @@ async def test_persist_search_architecture_v2_fields(session: AsyncSession):
 
 
 def test_startup_migrations_cover_row_origin_columns():
-    source = inspect.getsource(run_startup_migrations)
+    source = "\n".join(stmt for step in MIGRATION_STEPS for stmt in step.statements)
     assert 'ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_channel VARCHAR;' in source
     assert 'ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_message_id VARCHAR;' in source
     assert 'ALTER TABLE row ADD COLUMN IF NOT EXISTS origin_user_id INTEGER;' in source
@@ -0,0 +1,190 @@
+"""Tests for per-provider circuit breakers (sourcing/circuit_breaker.py)."""
+
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from sourcing.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreakerConfig,
+    CircuitBreakerRegistry,
+)
+from sourcing.executors.base import retry_after_seconds
+from sourcing.models import ProviderStatusSnapshot
+from sourcing.repository import SearchResult, SourcingProvider, SourcingRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedProvider(SourcingProvider):
+    def __init__(self, name: str, error: Exception = None):
+        self.name = name
+        self.calls = 0
+        self.error = error
+
+    async def search(self, query: str, **kwargs) -> List[SearchResult]:
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return [
+            SearchResult(
+                title=f"{self.name} {query}",
+                price=25.0,
+                merchant=self.name,
+                url=f"https://{self.name}.example.com/item",
+                source=self.name,
+            )
+        ]
+
+
+def _http_error(code: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.example.com/search")
+    response = httpx.Response(code, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"Client error '{code}'", request=request, response=response)
+
+
+def _status(provider_id: str, status: str, retry_after=None) -> ProviderStatusSnapshot:
+    return ProviderStatusSnapshot(
+        provider_id=provider_id, status=status, retry_after_seconds=retry_after
+    )
+
+
+def _make_repo(providers, registry: CircuitBreakerRegistry) -> SourcingRepository:
+    repo = SourcingRepository.__new__(SourcingRepository)
+    repo.providers = providers
+    repo.circuit_breakers = registry
+    return repo
+
+
+def test_error_rate_opens_breaker_then_half_open_probe_closes_it():
+    clock = FakeClock()
+    registry = CircuitBreakerRegistry(
+        CircuitBreakerConfig(window=4, min_calls=4, error_rate_threshold=0.5, cooldown_seconds=30),
+        clock=clock,
+    )
+    breaker = registry.get("ebay")
+
+    for status in ("ok", "error", "ok"):
+        breaker.record(_status("ebay", status))
+    assert breaker.current_state() == CLOSED
+
+    breaker.record(_status("ebay", "timeout"))
+    assert breaker.current_state() == OPEN
+    assert not registry.allow("ebay")
+
+    clock.now += 31
+    assert breaker.current_state() == HALF_OPEN
+    assert registry.allow("ebay")
+    assert not registry.allow("ebay")  # only one probe at a time
+
+    breaker.record(_status("ebay", "ok"))
+    assert breaker.current_state() == CLOSED
+    assert registry.allow("ebay")
+
+
+def test_failed_probe_reopens_breaker():
+    clock = FakeClock()
+    config = CircuitBreakerConfig(min_calls=1, cooldown_seconds=10)
+    registry = CircuitBreakerRegistry(config, clock=clock)
+    breaker = registry.get("amazon")
+    breaker.record(_status("amazon", "error"))
+
+    clock.now += 11
+    assert registry.allow("amazon")
+    breaker.record(_status("amazon", "error"))
+
+    assert breaker.current_state() == OPEN
+    assert breaker.trips == 2
+
+
+def test_quota_and_rate_limit_open_immediately_and_honour_retry_after():
+    clock = FakeClock()
+    registry = CircuitBreakerRegistry(
+        CircuitBreakerConfig(quota_cooldown_seconds=900, rate_limit_cooldown_seconds=60),
+        clock=clock,
+    )
+
+    registry.record("serpapi", _status("serpapi", "exhausted"))
+    registry.record("searchapi", _status("searchapi", "rate_limited", retry_after=5))
+
+    assert registry.get("serpapi").retry_in_seconds() == 900
+    assert registry.get("searchapi").retry_in_seconds() == 5
+    clock.now += 6
+    assert registry.get("searchapi").current_state() == HALF_OPEN
+
+    snapshot = registry.snapshot()
+    assert snapshot["serpapi"]["state"] == OPEN
+    assert snapshot["serpapi"]["reason"] == "exhausted"
+
+
+def test_retry_after_header_is_parsed():
+    assert retry_after_seconds(_http_error(429, {"Retry-After": "12"})) == 12.0
+    past_date = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    assert retry_after_seconds(_http_error(429, past_date)) == 0.0
+    assert retry_after_seconds(_http_error(429)) is None
+    assert retry_after_seconds(RuntimeError("boom")) is None
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_skips_provider_without_calling_it():
+    serpapi = ScriptedProvider("serpapi", error=_http_error(402))
+    amazon = ScriptedProvider("amazon")
+    repo = _make_repo({"serpapi": serpapi, "amazon": amazon}, CircuitBreakerRegistry())
+
+    first = await repo.search_all_with_status("desk")
+    second = await repo.search_all_with_status("desk")
+
+    assert serpapi.calls == 1
+    assert amazon.calls == 2
+    assert first.provider_statuses[0].status == "exhausted"
+    skipped = second.provider_statuses[0]
+    assert skipped.status == "exhausted"
+    assert skipped.message.startswith("Skipped: circuit open")
+    assert len(second.results) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_retry_after_reaches_breaker():
+    searchapi = ScriptedProvider("searchapi", error=_http_error(429, {"Retry-After": "7"}))
+    registry = CircuitBreakerRegistry()
+    repo = _make_repo({"searchapi": searchapi}, registry)
+
+    batches = [batch async for batch in repo.search_streaming("desk")]
+
+    assert batches[0][2].status == "rate_limited"
+    assert 0 < registry.get("searchapi").retry_in_seconds() <= 7
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_releases_half_open_slot():
+    clock = FakeClock()
+    config = CircuitBreakerConfig(min_calls=1, cooldown_seconds=1)
+    registry = CircuitBreakerRegistry(config, clock=clock)
+    registry.record("kroger", _status("kroger", "error"))
+    clock.now += 2
+
+    class HangingProvider(ScriptedProvider):
+        async def search(self, query: str, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(10)
+
+    repo = _make_repo({"kroger": HangingProvider("kroger")}, registry)
+    task = asyncio.create_task(repo.search_all_with_status("milk"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.01)
+
+    assert registry.get("kroger").current_state() == HALF_OPEN
+    assert registry.allow("kroger")
@@ -0,0 +1,266 @@
+"""Tests for the per-provider search result cache (sourcing/cache.py)."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+
+from models import ProviderResultCacheEntry
+from sourcing.cache import (
+    CACHED_STATUS_MESSAGE,
+    MemoryResultCache,
+    PostgresResultCache,
+    ProviderResultCache,
+    ResultCacheConfig,
+    build_result_cache_key,
+    result_cache_snapshot,
+)
+from sourcing.models import ProviderStatusSnapshot
+from sourcing.repository import SearchResult, SourcingProvider, SourcingRepository
+
+
+class CountingProvider(SourcingProvider):
+    def __init__(self, name: str, results: List[SearchResult] = None, error: Exception = None):
+        self.name = name
+        self.calls = 0
+        self._results = results if results is not None else [_make_result(name)]
+        self._error = error
+
+    async def search(self, query: str, **kwargs) -> List[SearchResult]:
+        self.calls += 1
+        if self._error:
+            raise self._error
+        return [r.model_copy() for r in self._results]
+
+
+def _make_result(source: str) -> SearchResult:
+    return SearchResult(
+        title=f"{source} standing desk",
+        price=199.0,
+        merchant=source,
+        url=f"https://{source}.example.com/desk",
+        merchant_domain=f"{source}.example.com",
+        source=source,
+    )
+
+
+def _make_repo(providers, config: ResultCacheConfig = None) -> SourcingRepository:
+    repo = SourcingRepository.__new__(SourcingRepository)
+    repo.providers = providers
+    repo.result_cache = ProviderResultCache(config or ResultCacheConfig())
+    return repo
+
+
+def test_cache_key_normalizes_query_and_bounds():
+    def key(provider="amazon", query="standing desk", zip_code="94107", **bounds):
+        bounds = {"min_price": 50, "max_price": 200, **bounds}
+        return build_result_cache_key(provider, query, zip_code=zip_code, **bounds)
+
+    a = key(query="  Standing   DESK ")
+    assert a == key(min_price=50.0, max_price="200")
+    assert a != key(provider="ebay")
+    assert a != key(zip_code="10001")
+    assert a != key(max_price=300)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryResultCache(max_entries=2)
+    cache = ProviderResultCache(ResultCacheConfig(max_entries=2), tiers=[tier])
+
+    def ok(pid):
+        return ProviderStatusSnapshot(provider_id=pid, status="ok", result_count=1)
+
+    async def _run():
+        await cache.store("a", "q", [_make_result("a")], ok("a"))
+        await cache.store("b", "q", [_make_result("b")], ok("b"))
+        assert await cache.lookup("a") is not None  # touch "a"
+        await cache.store("c", "q", [_make_result("c")], ok("c"))
+        assert await cache.lookup("b") is None
+        assert await cache.lookup("a") is not None
+
+    asyncio.run(_run())
+    assert len(tier) == 2
+
+
+@pytest.mark.asyncio
+async def test_second_search_is_served_from_cache():
+    amazon = CountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    first = await repo.search_all_with_status("Standing Desk", max_price=300)
+    second = await repo.search_all_with_status("standing desk", max_price=300)
+
+    assert amazon.calls == 1
+    assert [r.url for r in second.results] == [r.url for r in first.results]
+    assert second.provider_statuses[0].status == "ok"
+    assert second.provider_statuses[0].message == CACHED_STATUS_MESSAGE
+    assert repo.result_cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_different_price_bounds_miss_the_cache():
+    amazon = CountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    await repo.search_all_with_status("standing desk", max_price=300)
+    await repo.search_all_with_status("standing desk", max_price=500)
+
+    assert amazon.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    failing = CountingProvider("serpapi", error=RuntimeError("429 Too Many Requests"))
+    repo = _make_repo({"serpapi": failing})
+
+    first = await repo.search_all_with_status("standing desk")
+    await repo.search_all_with_status("standing desk")
+
+    assert first.provider_statuses[0].status == "rate_limited"
+    assert failing.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_responses_use_negative_ttl():
+    empty = CountingProvider("ebay", results=[])
+    repo = _make_repo({"ebay": empty}, ResultCacheConfig(ttl_seconds=300, negative_ttl_seconds=0))
+
+    await repo.search_all_with_status("standing desk")
+    await repo.search_all_with_status("standing desk")
+    assert empty.calls == 2
+
+    repo = _make_repo({"ebay": empty}, ResultCacheConfig(ttl_seconds=300, negative_ttl_seconds=60))
+    await repo.search_all_with_status("standing desk")
+    await repo.search_all_with_status("standing desk")
+    assert empty.calls == 3
+    assert repo.result_cache.stats["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_and_revalidated():
+    amazon = CountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon}, ResultCacheConfig(ttl_seconds=0, stale_seconds=60))
+
+    await repo.search_all_with_status("standing desk")
+    stale = await repo.search_all_with_status("standing desk")
+
+    assert stale.provider_statuses[0].message == CACHED_STATUS_MESSAGE
+    assert len(stale.results) == 1
+    await asyncio.sleep(0)  # let the background refresh run
+    await asyncio.sleep(0)
+    assert amazon.calls == 2
+    assert repo.result_cache.stats["stale_hits"] == 1
+    assert repo.result_cache.stats["revalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_vendor_directory_is_never_cached():
+    vendors = CountingProvider("vendor_directory")
+    repo = _make_repo({"vendor_directory": vendors})
+
+    await repo.search_all_with_status("yacht charter")
+    await repo.search_all_with_status("yacht charter")
+
+    assert vendors.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_streaming_yields_cached_providers_before_live_ones():
+    amazon = CountingProvider("amazon")
+    ebay = CountingProvider("ebay")
+    repo = _make_repo({"amazon": amazon, "ebay": ebay})
+
+    await repo.search_all_with_status("standing desk", providers=["amazon"])
+
+    batches = []
+    async for name, results, status, remaining in repo.search_streaming("standing desk"):
+        batches.append((name, status.message, remaining, len(results)))
+
+    assert batches[0] == ("amazon", CACHED_STATUS_MESSAGE, 1, 1)
+    assert batches[1][0] == "ebay"
+    assert batches[1][2] == 0
+    assert amazon.calls == 1
+    assert ebay.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_copies():
+    amazon = CountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    first = await repo.search_all_with_status("standing desk")
+    first.results[0].title = "mutated"
+    second = await repo.search_all_with_status("standing desk")
+
+    assert second.results[0].title == "amazon standing desk"
+
+
+def test_cache_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("SOURCING_CACHE_ENABLED", "false")
+    assert ProviderResultCache.from_env(["amazon"]) is None
+
+    monkeypatch.setenv("SOURCING_CACHE_ENABLED", "true")
+    monkeypatch.setenv("SOURCING_CACHE_TTL_AMAZON", "900")
+    cache = ProviderResultCache.from_env(["amazon", "ebay"])
+    assert cache is not None
+    assert cache.config.ttl_for("amazon") == 900
+    assert cache.config.ttl_for("ebay") == cache.config.ttl_seconds
+
+
+def test_repo_without_init_has_no_cache():
+    repo = SourcingRepository.__new__(SourcingRepository)
+    assert repo.result_cache is None
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_hits_do_not_write():
+    now = datetime.utcnow()
+    row = ProviderResultCacheEntry(
+        cache_key="k",
+        provider_id="amazon",
+        normalized_query="standing desk",
+        results=[_make_result("amazon").model_dump(mode="json")],
+        fresh_until=now + timedelta(minutes=5),
+        expires_at=now + timedelta(minutes=15),
+    )
+
+    class ReadOnlySession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def exec(self, stmt):
+            class _Result:
+                def first(self):
+                    return row
+
+            return _Result()
+
+        def add(self, obj):
+            raise AssertionError("cache lookups must not write")
+
+        async def commit(self):
+            raise AssertionError("cache lookups must not commit")
+
+    entry = await PostgresResultCache(session_factory=ReadOnlySession).get("k")
+
+    assert entry is not None and entry.is_fresh()
+    assert entry.results[0].title == "amazon standing desk"
+
+
+def test_snapshot_sums_stats_over_repository_caches(monkeypatch):
+    monkeypatch.setenv("SOURCING_CACHE_ENABLED", "true")
+    first = ProviderResultCache.from_env(["amazon"])
+    second = ProviderResultCache.from_env(["amazon"])
+    baseline = result_cache_snapshot()
+    first.stats["hits"] += 3
+    second.stats["misses"] += 1
+
+    snapshot = result_cache_snapshot()
+    assert snapshot["caches"] >= 2
+    assert snapshot["hits"] - baseline["hits"] == 3
+    assert snapshot["misses"] - baseline["misses"] == 1
+    assert snapshot["tiers"] == ["MemoryResultCache"]
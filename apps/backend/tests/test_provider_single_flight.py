@@ -0,0 +1,142 @@
+"""Tests for single-flight coalescing of identical concurrent provider searches."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from sourcing.repository import SearchResult, SourcingProvider, SourcingRepository
+from sourcing.singleflight import SingleFlight, build_flight_key, provider_flights
+
+
+class SlowCountingProvider(SourcingProvider):
+    def __init__(self, name: str, delay: float = 0.05):
+        self.name = name
+        self.calls = 0
+        self._delay = delay
+
+    async def search(self, query: str, **kwargs) -> List[SearchResult]:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return [
+            SearchResult(
+                title=f"{self.name} {query}",
+                price=42.0,
+                merchant=self.name,
+                url=f"https://{self.name}.example.com/{query.replace(' ', '-')}",
+                source=self.name,
+            )
+        ]
+
+
+def _make_repo(providers) -> SourcingRepository:
+    repo = SourcingRepository.__new__(SourcingRepository)
+    repo.providers = providers
+    repo.single_flight = SingleFlight()
+    return repo
+
+
+def test_flight_key_is_stable_across_param_order():
+    a = build_flight_key("amazon", "desk", {"min_price": 10, "zip_code": "94107"})
+    b = build_flight_key("amazon", "desk", {"zip_code": "94107", "min_price": 10})
+    assert a == b
+    assert a != build_flight_key("ebay", "desk", {"zip_code": "94107", "min_price": 10})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_upstream_call():
+    amazon = SlowCountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    responses = await asyncio.gather(
+        *[repo.search_all_with_status("standing desk", max_price=300) for _ in range(5)]
+    )
+
+    assert amazon.calls == 1
+    assert all(len(r.results) == 1 for r in responses)
+    assert repo.single_flight.stats == {"leaders": 1, "coalesced": 4}
+    assert repo.single_flight.inflight_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_different_params_are_not_coalesced():
+    amazon = SlowCountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    await asyncio.gather(
+        repo.search_all_with_status("standing desk", max_price=300),
+        repo.search_all_with_status("standing desk", max_price=500),
+    )
+
+    assert amazon.calls == 2
+    assert repo.single_flight.stats["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_receive_independent_copies():
+    amazon = SlowCountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    first, second = await asyncio.gather(
+        repo.search_all_with_status("standing desk"),
+        repo.search_all_with_status("standing desk"),
+    )
+
+    assert first.results[0] is not second.results[0]
+    first.results[0].title = "mutated"
+    assert second.results[0].title == "amazon standing desk"
+
+
+@pytest.mark.asyncio
+async def test_streaming_and_batch_searches_coalesce():
+    amazon = SlowCountingProvider("amazon")
+    repo = _make_repo({"amazon": amazon})
+
+    async def _drain_stream():
+        return [batch async for batch in repo.search_streaming("standing desk")]
+
+    batch_response, streamed = await asyncio.gather(
+        repo.search_all_with_status("standing desk"),
+        _drain_stream(),
+    )
+
+    assert amazon.calls == 1
+    assert len(batch_response.results) == 1
+    assert streamed[0][0] == "amazon"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("k", upstream))
+    follower = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_repositories_share_one_flight_group_and_report_it(monkeypatch):
+    monkeypatch.setenv("SOURCING_SINGLE_FLIGHT_ENABLED", "true")
+    assert SourcingRepository().single_flight is provider_flights
+    assert SourcingRepository().single_flight is provider_flights
+
+    flight = SingleFlight()
+    release = asyncio.Event()
+    waiters = [asyncio.create_task(flight.do("k", release.wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert flight.snapshot() == {"leaders": 1, "coalesced": 2, "inflight": 1}
+
+    release.set()
+    await asyncio.gather(*waiters)
+    assert flight.snapshot()["inflight"] == 0
@@ -0,0 +1,138 @@
+"""Tests for the shared sliding-window rate limiter (services/rate_limiter.py)."""
+
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+import routes.rate_limit as rate_limit_routes
+from routes.rate_limit import rate_limit
+from services.rate_limiter import (
+    InProcessBackend,
+    LocalCounterStore,
+    RateLimiter,
+    SharedStoreBackend,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 6000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _allowed(limiter: RateLimiter, key: str, attempts: int, limit: int) -> int:
+    return sum([await limiter.allow(key, limit) for _ in range(attempts)])
+
+
+@pytest.mark.asyncio
+async def test_previous_window_is_weighted_by_remaining_time():
+    clock = FakeClock()
+    limiter = RateLimiter(window_seconds=60, clock=clock)
+
+    assert await _allowed(limiter, "ip", 12, limit=10) == 10
+    # Halfway through the next window, half of the previous window's hits still count.
+    clock.now += 90
+    assert await _allowed(limiter, "ip", 10, limit=10) == 5
+    # Two windows later the key carries nothing.
+    clock.now += 120
+    assert await _allowed(limiter, "ip", 10, limit=10) == 10
+    assert limiter.stats["denied"] == 2 + 5
+
+
+@pytest.mark.asyncio
+async def test_denied_requests_are_not_counted():
+    clock = FakeClock()
+    limiter = RateLimiter(window_seconds=60, clock=clock)
+    assert await _allowed(limiter, "ip", 50, limit=3) == 3
+
+    clock.now += 60  # next window, previous weight 1.0 -> still full
+    assert await _allowed(limiter, "ip", 1, limit=3) == 0
+    clock.now += 30  # halfway: 3 * 0.5 + current < 3 allows two more
+    assert await _allowed(limiter, "ip", 3, limit=3) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_is_bounded_by_max_keys_and_idle_keys_are_dropped():
+    clock = FakeClock()
+    backend = InProcessBackend(max_keys=1000)
+    limiter = RateLimiter(backend=backend, window_seconds=60, clock=clock)
+
+    for i in range(20_000):
+        await limiter.allow(f"ip-{i}", 5)
+    assert len(backend) == 1000
+    assert backend.stats["evicted_lru"] == 19_000
+
+    clock.now += 120  # every key is now idle
+    await limiter.allow("fresh", 5)
+    assert len(backend) == 1
+    assert backend.stats["evicted_idle"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_check_cost_does_not_grow_with_hits_in_window():
+    limiter = RateLimiter(window_seconds=60, clock=FakeClock())
+    started = time.perf_counter()
+    for _ in range(50_000):
+        await limiter.allow("hot", 1_000_000)
+    elapsed = time.perf_counter() - started
+
+    # A per-key timestamp list would filter up to 50k entries per check here.
+    assert elapsed < 2.0
+    assert limiter.stats["allowed"] == 50_000
+    assert limiter.snapshot()["keys"] == 1
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_store_share_one_budget():
+    clock = FakeClock()
+    store = LocalCounterStore(clock=clock)
+    workers = [
+        RateLimiter(backend=SharedStoreBackend(store), window_seconds=60, clock=clock)
+        for _ in range(3)
+    ]
+
+    allowed = 0
+    for _ in range(10):
+        for worker in workers:
+            allowed += await worker.allow("search:1", 10)
+    assert allowed == 10
+
+    clock.now += 120
+    assert await workers[0].allow("search:1", 10)
+
+    # Separate in-process limiters allow the limit once per worker.
+    local = [RateLimiter(window_seconds=60, clock=clock) for _ in range(3)]
+    assert sum([await _allowed(worker, "search:1", 10, limit=10) for worker in local]) == 30
+
+
+@pytest.mark.asyncio
+async def test_store_failures_fail_open():
+    class BrokenStore(LocalCounterStore):
+        async def incr(self, key, ttl_seconds, read_key):
+            raise ConnectionError("store down")
+
+    limiter = RateLimiter(backend=SharedStoreBackend(BrokenStore()), window_seconds=60)
+    assert await limiter.allow("ip", 1)
+    assert limiter.snapshot()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dependency_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(rate_limit_routes.RATE_LIMIT_MAX, "public_search", 2)
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(rate_limit("public_search"))])
+    async def limited():
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        statuses = [(await client.get("/limited")).status_code for _ in range(3)]
+        denied = await client.get("/limited")
+
+    assert statuses == [200, 200, 429]
+    assert denied.json()["detail"] == "Rate limit exceeded"
+    assert 1 <= int(denied.headers["retry-after"]) <= 60
@@ -0,0 +1,139 @@
+"""Tests for fingerprinted SDUI block hydration and write-skipping on unchanged schemas."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import services.sdui_builder as sdui_builder
+from routes.chat_helpers import _build_and_persist_ui_schema
+from services.sdui_builder import apply_ui_schema, block_cache, build_ui_schema
+
+HINT = {
+    "layout": "ROW_MEDIA_LEFT",
+    "blocks": ["ProductImage", "PriceBlock", "BadgeList", "ActionRow"],
+}
+
+
+def make_row(**kwargs):
+    defaults = dict(
+        id=1, title="Trail shoes", status="sourcing", choice_answers=None, choice_factors=None,
+        chat_history=None, is_service=False, service_category=None, active_deal=None,
+        ui_schema=None, ui_schema_version=0,
+    )
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def make_bid(i, **kwargs):
+    defaults = dict(
+        id=i, item_title=f"Shoe {i}", price=50.0 + i, currency="USD", image_url=f"https://img/{i}.jpg",
+        item_url=f"https://shop/{i}", source="rainforest", provenance=None, is_swap=False,
+        closing_status=None, description="long text no block reads",
+    )
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+class FakeSession:
+    def __init__(self, bids):
+        self.bids = bids
+        self.commits = 0
+        self.added = []
+
+    async def exec(self, statement):
+        return SimpleNamespace(all=lambda: list(self.bids))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    block_cache.clear()
+    yield
+    block_cache.clear()
+
+
+@pytest.fixture
+def hydrator_calls(monkeypatch):
+    calls = []
+    for block_type, hydrator in list(sdui_builder.BLOCK_HYDRATORS.items()):
+        def spy(*args, _type=block_type, _fn=hydrator, **kwargs):
+            calls.append(_type)
+            return _fn(*args, **kwargs)
+        monkeypatch.setitem(sdui_builder.BLOCK_HYDRATORS, block_type, spy)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_identical_inputs_produce_zero_writes(hydrator_calls):
+    row = make_row()
+    session = FakeSession([make_bid(i) for i in range(3)])
+
+    first = await _build_and_persist_ui_schema(session, row, HINT)
+    assert (session.commits, row.ui_schema_version) == (1, 1)
+    hydrated = len(hydrator_calls)
+
+    second = await _build_and_persist_ui_schema(session, row, HINT)
+    assert second == first
+    assert (session.commits, row.ui_schema_version) == (1, 1)
+    assert len(hydrator_calls) == hydrated  # every block came from the cache
+
+
+@pytest.mark.asyncio
+async def test_fields_no_hydrator_reads_do_not_trigger_a_write(hydrator_calls):
+    row = make_row()
+    bids = [make_bid(i) for i in range(3)]
+    session = FakeSession(bids)
+    await _build_and_persist_ui_schema(session, row, HINT)
+    hydrator_calls.clear()
+
+    bids[0].description = "edited"
+    await _build_and_persist_ui_schema(session, row, HINT)
+
+    assert hydrator_calls == []
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_only_changed_blocks_are_rehydrated(hydrator_calls):
+    row = make_row()
+    bids = [make_bid(i) for i in range(3)]
+    session = FakeSession(bids)
+    await _build_and_persist_ui_schema(session, row, HINT)
+    hydrator_calls.clear()
+
+    bids[0].price = 9.99
+    schema = await _build_and_persist_ui_schema(session, row, HINT)
+
+    assert hydrator_calls == ["PriceBlock"]
+    assert next(b for b in schema["blocks"] if b["type"] == "PriceBlock")["amount"] == 9.99
+    assert (session.commits, row.ui_schema_version) == (2, 2)
+
+
+def test_action_row_tracks_total_bid_count(hydrator_calls):
+    row = make_row()
+    bids = [make_bid(i) for i in range(3)]
+    build_ui_schema(HINT, row, bids)
+    hydrator_calls.clear()
+
+    schema = build_ui_schema(HINT, row, bids + [make_bid(i) for i in range(3, 40)])
+
+    assert "ActionRow" in hydrator_calls
+    actions = next(b for b in schema["blocks"] if b["type"] == "ActionRow")["actions"]
+    assert any(a["intent"] == "view_all_bids" and a["count"] == 40 for a in actions)
+
+
+def test_apply_ui_schema_ignores_key_order_from_json_round_trip():
+    schema = build_ui_schema(HINT, make_row(), [make_bid(1)])
+    stored = json.loads(json.dumps(schema, sort_keys=True))
+    row = make_row(ui_schema=stored, ui_schema_version=4)
+
+    assert apply_ui_schema(row, schema) is False
+    assert row.ui_schema_version == 4
+    assert apply_ui_schema(row, {**schema, "layout": "ROW_COMPACT"}) is True
+    assert row.ui_schema_version == 5
@@ -0,0 +1,129 @@
+"""Tests for indexed seller inbox matching (services/seller_inbox.py)."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import services.seller_inbox as seller_inbox
+from models import Row, Vendor
+from models.rows import _set_row_match_terms
+from services.seller_inbox import decode_cursor, encode_cursor, inbox_query
+from utils.match_terms import match_terms, row_match_terms
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect())).lower()
+
+
+def test_terms_normalize_case_separators_and_stopwords():
+    expected = ["aviation", "private"]
+    assert match_terms("Private Aviation") == match_terms("private_aviation") == expected
+    assert match_terms("Food & Beverage") == ["beverage", "food"]
+    assert match_terms(None, "") == []
+
+
+def test_row_terms_cover_title_category_and_intent_fields():
+    intent = {
+        "product_category": "running_shoes",
+        "keywords": ["trail"],
+        "raw_input": "ignored words",
+        "max_price": 120,
+    }
+    assert row_match_terms("Size 10", "footwear", intent) == [
+        "10", "footwear", "running", "shoes", "size", "trail"
+    ]
+    # search_intent may be persisted as a JSON string
+    assert row_match_terms("", None, '{"category": "catering"}') == ["catering"]
+
+
+def test_row_writes_store_match_terms():
+    row = Row(
+        title="Wedding catering",
+        service_category="catering",
+        search_intent={"what": "Buffet for 80"},
+    )
+    _set_row_match_terms(None, None, row)
+    assert row.match_terms == ["80", "buffet", "catering", "wedding"]
+
+
+def test_inbox_filters_on_indexed_terms_not_ilike(monkeypatch):
+    monkeypatch.delenv("SELLER_INBOX_MATCH_TABLE", raising=False)
+    sql = _sql(inbox_query(Vendor(id=1, name="m", category="Private Aviation"), per_page=20))
+
+    assert "row.match_terms @>" in sql
+    assert "ilike" not in sql and "cast(" not in sql
+    assert "order by row.created_at desc, row.id desc" in sql
+    assert "offset" not in sql
+
+
+def test_inbox_without_category_keeps_service_rows_only(monkeypatch):
+    monkeypatch.delenv("SELLER_INBOX_MATCH_TABLE", raising=False)
+    sql = _sql(inbox_query(Vendor(id=1, name="m", category=None), per_page=20))
+    assert "row.is_service = true" in sql
+    assert "match_terms @>" not in sql
+
+
+def test_keyset_cursor_replaces_offset(monkeypatch):
+    monkeypatch.delenv("SELLER_INBOX_MATCH_TABLE", raising=False)
+    created_at = datetime(2026, 5, 1, 12, 30, 15, 123456)
+    cursor = decode_cursor(encode_cursor(created_at, 42))
+    assert cursor == (created_at, 42)
+
+    merchant = Vendor(id=1, name="m", category="catering")
+    sql = _sql(inbox_query(merchant, per_page=20, before=cursor, offset=40))
+    assert "(row.created_at, row.id) < (" in sql
+    assert "offset" not in sql
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_match_table_path_reads_the_merchant_range(monkeypatch):
+    monkeypatch.setenv("SELLER_INBOX_MATCH_TABLE", "true")
+    sql = _sql(inbox_query(Vendor(id=7, name="m", category="catering"), per_page=20))
+    assert "join seller_row_match" in sql
+    assert "seller_row_match.merchant_id =" in sql
+    assert "order by seller_row_match.row_created_at desc, seller_row_match.row_id desc" in sql
+    assert "match_terms @>" not in sql
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+
+def test_row_state_changes_resync_its_matches():
+    conn = RecordingConnection()
+    row = Row(
+        id=5,
+        title="Catering",
+        status="sourcing",
+        created_at=datetime(2026, 1, 1),
+        match_terms=["catering"],
+    )
+    seller_inbox._sync_row_matches(None, conn, row)
+
+    delete_sql, _ = conn.statements[0]
+    insert_sql, params = conn.statements[1]
+    assert delete_sql.startswith("DELETE FROM seller_row_match")
+    assert "INSERT INTO seller_row_match" in insert_sql
+    assert params["terms"] == ["catering"] and params["row_id"] == 5
+
+    conn.statements.clear()
+    row.status = "closed"
+    seller_inbox._sync_row_matches(None, conn, row)
+    assert len(conn.statements) == 1  # closed rows only lose their matches
+
+
+def test_listeners_install_idempotently():
+    try:
+        seller_inbox.install_match_table_listeners()
+        seller_inbox.install_match_table_listeners()
+        assert seller_inbox.sa.event.contains(Row, "after_update", seller_inbox._sync_row_matches)
+    finally:
+        seller_inbox.remove_match_table_listeners()
+    assert not seller_inbox.sa.event.contains(Row, "after_update", seller_inbox._sync_row_matches)
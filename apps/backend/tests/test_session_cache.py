@@ -0,0 +1,188 @@
+"""Tests for the validated-session cache behind get_current_session."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import dependencies
+import routes.auth_profile as auth_profile
+from dependencies import get_current_session, resolve_user_id_and_guest_flag
+from models import AuthSession, User, generate_session_token, hash_token
+from services.session_cache import REVOCATION_CHANNEL, AuthSessionCache
+
+
+class FakeDB:
+    """Stands in for the auth_session / user tables and counts queries."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.users = {}
+        self.queries = 0
+        self.notifications = []
+        self._pending = []
+
+    def add_session(self, **kwargs):
+        token = generate_session_token()
+        row = AuthSession(
+            id=len(self.sessions) + 1, user_id=7, session_token_hash=hash_token(token), **kwargs
+        )
+        self.sessions[row.session_token_hash] = row
+        return token
+
+    async def exec(self, statement):
+        self.queries += 1
+        entity = statement.column_descriptions[0]["entity"]
+        now = datetime.utcnow()
+        if entity is AuthSession:
+            row = self.sessions.get(statement.compile().params["session_token_hash_1"])
+            live = (
+                row is not None
+                and row.revoked_at is None
+                and (row.expires_at is None or row.expires_at > now)
+            )
+            matches = [row] if live else []
+        else:
+            matches = [u for u in self.users.values() if u.email == dependencies.GUEST_EMAIL]
+        return SimpleNamespace(first=lambda: matches[0] if matches else None)
+
+    async def execute(self, clause, params=None):
+        if "pg_notify" in str(clause):
+            self.notifications.append(params)
+
+    def add(self, obj):
+        self._pending.append(obj)
+
+    async def commit(self):
+        for obj in self._pending:
+            if isinstance(obj, AuthSession):
+                self.sessions[obj.session_token_hash] = obj
+            elif isinstance(obj, User):
+                obj.id = obj.id or 100 + len(self.users)
+                self.users[obj.id] = obj
+        self._pending.clear()
+
+    async def refresh(self, obj):
+        pass
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AuthSessionCache(ttl_seconds=60, broadcast=True)
+    monkeypatch.setattr(dependencies, "session_cache", cache)
+    monkeypatch.setattr(auth_profile, "session_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_the_session_query(cache):
+    db = FakeDB()
+    token = db.add_session()
+
+    first = await get_current_session(f"Bearer {token}", db)
+    second = await get_current_session(f"Bearer {token}", db)
+
+    assert db.queries == 1
+    assert first.user_id == second.user_id == 7
+    assert second is not first  # each hit is its own detached instance
+    assert cache.snapshot()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_the_cached_session(cache):
+    db = FakeDB()
+    token = db.add_session()
+    assert await get_current_session(f"Bearer {token}", db) is not None
+
+    result = await auth_profile.auth_logout(authorization=f"Bearer {token}", session=db)
+    assert result == {"status": "ok"}
+
+    assert db.sessions[hash_token(token)].revoked_at is not None
+    assert db.notifications == [{"channel": REVOCATION_CHANNEL, "token_hash": hash_token(token)}]
+    assert await get_current_session(f"Bearer {token}", db) is None
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.listeners = {}
+        self.listening = asyncio.Event()
+
+    def add_termination_listener(self, callback):
+        pass
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+        self.listening.set()
+
+    async def remove_listener(self, channel, callback):
+        self.listeners.pop(channel, None)
+
+
+class _FakeListenEngine:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @asynccontextmanager
+    async def connect(self):
+        async def get_raw_connection():
+            return SimpleNamespace(driver_connection=self.driver)
+        yield SimpleNamespace(get_raw_connection=get_raw_connection)
+
+
+@pytest.mark.asyncio
+async def test_revocation_on_another_worker_evicts_the_entry(cache):
+    db = FakeDB()
+    token = db.add_session()
+    other_worker = AuthSessionCache(broadcast=True)
+    other_worker.put(db.sessions[hash_token(token)])
+    driver = _FakeDriver()
+    stop = asyncio.Event()
+    listener = asyncio.create_task(
+        other_worker.listen_for_revocations(stop, engine=_FakeListenEngine(driver))
+    )
+    await asyncio.wait_for(driver.listening.wait(), timeout=1)
+
+    await get_current_session(f"Bearer {token}", db)
+    await auth_profile.auth_logout(authorization=f"Bearer {token}", session=db)
+    for notification in db.notifications:  # what Postgres delivers after commit
+        channel = notification["channel"]
+        driver.listeners[channel](None, 1, channel, notification["token_hash"])
+
+    assert other_worker.get(hash_token(token)) is None
+    stop.set()
+    await asyncio.wait_for(listener, timeout=1)
+    assert driver.listeners == {}
+
+
+@pytest.mark.asyncio
+async def test_entries_never_outlive_the_session_expiry(cache):
+    db = FakeDB()
+    token = db.add_session(expires_at=datetime.utcnow() + timedelta(milliseconds=50))
+    assert await get_current_session(f"Bearer {token}", db) is not None
+    assert cache.get(hash_token(token)) is not None
+
+    await asyncio.sleep(0.06)
+
+    assert await get_current_session(f"Bearer {token}", db) is None
+    assert db.queries == 2
+    assert len(cache) == 0
+
+
+def test_revoked_sessions_are_not_cached():
+    cache = AuthSessionCache()
+    cache.put(AuthSession(id=1, user_id=1, session_token_hash="h", revoked_at=datetime.utcnow()))
+    assert cache.get("h") is None
+
+
+@pytest.mark.asyncio
+async def test_guest_user_is_resolved_once_per_process(cache):
+    db = FakeDB()
+
+    first = await resolve_user_id_and_guest_flag(None, db)
+    second = await resolve_user_id_and_guest_flag(None, db)
+
+    assert first == second
+    assert first[1] is True
+    assert db.queries == 1
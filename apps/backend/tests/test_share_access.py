@@ -0,0 +1,118 @@
+"""Tests for write-behind share link access counting (services/share_access.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import routes.shares as shares
+from services.share_access import ShareAccessCounter, ShareResourceCache
+
+
+class RecordingWriter:
+    def __init__(self, delay=0.0, failures=0):
+        self.calls = []
+        self.delay = delay
+        self.failures = failures
+
+    async def __call__(self, counts):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("db down")
+        self.calls.append(dict(counts))
+
+    def totals(self):
+        totals = {}
+        for call in self.calls:
+            for link_id, n in call.items():
+                totals[link_id] = totals.get(link_id, 0) + n
+        return totals
+
+
+class FakeSession:
+    """Serves one share link and one row, and fails loudly on any write."""
+
+    def __init__(self, share_link, row):
+        self.share_link = share_link
+        self.row = row
+        self.reads = 0
+
+    async def exec(self, statement):
+        self.reads += 1
+        entity = statement.column_descriptions[0]["entity"]
+        match = self.share_link if entity is shares.ShareLink else self.row
+        return SimpleNamespace(first=lambda: match)
+
+    def add(self, obj):
+        raise AssertionError("public share path must not write")
+
+    async def commit(self):
+        raise AssertionError("public share path must not commit")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_hits_are_all_counted_across_flushes():
+    writer = RecordingWriter(delay=0.001)
+    counter = ShareAccessCounter(flush_interval_ms=1, writer=writer)
+
+    async def hit(i):
+        await asyncio.sleep((i % 10) * 0.002)  # spread the hits across many flushes
+        counter.record(i % 3)
+
+    await asyncio.gather(*(hit(i) for i in range(900)))
+    await counter.close()
+
+    assert writer.totals() == {0: 300, 1: 300, 2: 300}
+    assert len(writer.calls) > 1  # batched over several flushes, not one write per hit
+    assert counter.snapshot()["pending_hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_hits():
+    writer = RecordingWriter()
+    counter = ShareAccessCounter(flush_interval_ms=60_000, writer=writer)
+    for _ in range(5):
+        counter.record(42)
+
+    assert writer.calls == []
+    await counter.close()
+
+    assert writer.calls == [{42: 5}]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counts_for_the_next_one():
+    writer = RecordingWriter(failures=1)
+    counter = ShareAccessCounter(flush_interval_ms=60_000, writer=writer)
+    counter.record(1)
+
+    assert await counter.flush() is False
+    counter.record(1)
+    assert await counter.flush() is True
+
+    assert writer.calls == [{1: 2}]
+    await counter.close()
+
+
+@pytest.mark.asyncio
+async def test_resolve_share_link_reads_only_and_reuses_the_payload(monkeypatch):
+    counter = ShareAccessCounter(flush_interval_ms=60_000, writer=RecordingWriter())
+    monkeypatch.setattr(shares, "share_access_counter", counter)
+    monkeypatch.setattr(shares, "share_resource_cache", ShareResourceCache(ttl_seconds=60))
+    link = SimpleNamespace(
+        id=9, token="t", resource_type="row", resource_id=3, created_by=1, access_count=10
+    )
+    row = SimpleNamespace(
+        id=3, title="Desk", status="sourcing", budget_max=None, currency="USD",
+        created_at=shares.datetime(2026, 1, 1), updated_at=shares.datetime(2026, 1, 2),
+    )
+    session = FakeSession(link, row)
+
+    responses = await asyncio.gather(*(shares.resolve_share_link("t", session) for _ in range(4)))
+
+    assert sorted(r.access_count for r in responses) == [11, 12, 13, 14]
+    assert responses[0].resource_data["title"] == "Desk"
+    assert session.reads == 4 + 1  # one link lookup per hit, one row load in total
+    assert counter.pending(9) == 4
+    await counter.close()
@@ -137,7 +137,21 @@ async def test_resolve_share_link_increments_access_count(
     # Access multiple times
     await client.get(f"/api/shares/{share.token}")
     await client.get(f"/api/shares/{share.token}")
-    await client.get(f"/api/shares/{share.token}")
+    response = await client.get(f"/api/shares/{share.token}")
+    assert response.json()["access_count"] == 3  # includes hits not yet flushed
+
+    # Hits are written behind the request; flush them through the test engine.
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
+
+    import services.share_access as share_access
+    share_access._session_factory = sessionmaker(
+        session.bind, class_=SQLModelAsyncSession, expire_on_commit=False
+    )
+    try:
+        assert await share_access.share_access_counter.flush() is True
+    finally:
+        share_access._session_factory = None
 
     await session.refresh(share)
     assert share.access_count >= 3
@@ -0,0 +1,132 @@
+"""Tests for speculative provider fetches started before the chat decision."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from sourcing.cache import ProviderResultCache
+from sourcing.repository import SearchResult, SourcingProvider, SourcingRepository
+from sourcing.speculative import SpeculativeSearchConfig, SpeculativeSearches
+
+
+class CountingProvider(SourcingProvider):
+    def __init__(self, name: str, delay: float = 0.02):
+        self.name = name
+        self.calls = 0
+        self._delay = delay
+
+    async def search(self, query: str, **kwargs) -> List[SearchResult]:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        return [
+            SearchResult(
+                title=f"{self.name} {query}",
+                price=20.0,
+                merchant=self.name,
+                url=f"https://{self.name}.example.com/{query.replace(' ', '-')}",
+                source=self.name,
+            )
+        ]
+
+
+def _make_repo(providers) -> SourcingRepository:
+    repo = SourcingRepository.__new__(SourcingRepository)
+    repo.providers = providers
+    repo.result_cache = ProviderResultCache()
+    repo.speculative = SpeculativeSearches(SpeculativeSearchConfig(enabled=True))
+    return repo
+
+
+async def _drain(repo, query, **kwargs):
+    return [batch async for batch in repo.search_streaming(query, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_speculation_is_reused_by_the_real_search():
+    amazon = CountingProvider("amazon", delay=0.05)
+    repo = _make_repo({"amazon": amazon})
+
+    keys = await repo.speculative.start(repo, "Trail Shoes")
+    batches = await _drain(repo, "trail shoes")  # same cache key after normalization
+
+    assert len(keys) == 1
+    assert amazon.calls == 1
+    assert [len(b[1]) for b in batches] == [1]
+    assert repo.speculative.snapshot()["reused"] == 1
+    assert repo.speculative.snapshot()["hit_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_finished_speculation_is_served_without_another_call():
+    ebay = CountingProvider("ebay", delay=0)
+    repo = _make_repo({"ebay": ebay})
+
+    await repo.speculative.start(repo, "desk lamp", max_price=50)
+    await asyncio.sleep(0.01)
+    batches = await _drain(repo, "desk lamp", max_price=50)
+
+    assert ebay.calls == 1
+    assert batches[0][0] == "ebay"
+
+
+@pytest.mark.asyncio
+async def test_unclaimed_speculation_is_discarded_as_wasted():
+    amazon = CountingProvider("amazon", delay=0.05)
+    repo = _make_repo({"amazon": amazon})
+
+    keys = await repo.speculative.start(repo, "desk lamp")
+    await _drain(repo, "floor lamp")
+    repo.speculative.discard(keys)
+
+    snapshot = repo.speculative.snapshot()
+    assert snapshot["wasted"] == 1 and snapshot["reused"] == 0 and snapshot["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_and_already_cached_providers_are_not_speculated():
+    amazon = CountingProvider("amazon", delay=0)
+    vendors = CountingProvider("vendor_directory", delay=0)
+    repo = _make_repo({"amazon": amazon, "vendor_directory": vendors})
+    await _drain(repo, "desk lamp")  # populates the cache for amazon
+
+    assert await repo.speculative.start(repo, "desk lamp") == []
+    assert repo.speculative.stats["already_cached"] == 1
+    assert vendors.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_speculation_starts_nothing():
+    repo = _make_repo({"amazon": CountingProvider("amazon")})
+    repo.speculative = SpeculativeSearches(SpeculativeSearchConfig(enabled=False))
+
+    assert await repo.speculative.start(repo, "desk lamp") == []
+    assert repo.speculative.stats["started"] == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_helper_prefers_the_active_rows_search_intent(monkeypatch):
+    from models.rows import Row
+    from routes import chat_helpers, rows_search
+
+    started = []
+
+    class Recorder:
+        config = SpeculativeSearchConfig(enabled=True)
+
+        async def start(self, repo, query, *, min_price=None, max_price=None):
+            started.append((query, min_price, max_price))
+            return ["k"]
+
+    monkeypatch.setattr(chat_helpers, "speculative_searches", Recorder())
+    monkeypatch.setattr(rows_search, "get_sourcing_repo", lambda: object())
+
+    row = Row(
+        title="Lamp",
+        search_intent='{"product_category": "lamp", "raw_input": "brass desk lamp"}',
+        choice_answers='{"max_price": "$80"}',
+    )
+    start = chat_helpers._start_speculative_search
+    assert await start("make it cheaper", row) == ["k"]
+    assert await start("running shoes $90 (size 10)", None) == ["k"]
+    assert started == [("brass desk lamp", None, 80.0), ("running shoes size 10", None, None)]
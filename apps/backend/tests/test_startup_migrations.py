@@ -0,0 +1,154 @@
+"""Tests for the ledger-backed startup migrations and the concurrent index pass."""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.exc import ProgrammingError
+
+from startup_migrations import (
+    INDEX_STEPS,
+    MIGRATION_STEPS,
+    build_startup_indexes,
+    run_startup_migrations,
+)
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+
+class FakeEngine:
+    """Records every statement and keeps the ledger in memory."""
+
+    def __init__(self, ledger=None, lock_available=True):
+        self.ledger = ledger  # None means the ledger table does not exist
+        self.lock_available = lock_available
+        self.statements = []  # (connection mode, sql)
+
+    def execution_options(self, isolation_level=None):
+        assert isolation_level == "AUTOCOMMIT"
+        return _AutocommitView(self)
+
+    @asynccontextmanager
+    async def connect(self):
+        yield _Conn(self, "connect")
+
+    @asynccontextmanager
+    async def begin(self):
+        yield _Conn(self, "transaction")
+
+
+class _AutocommitView:
+    def __init__(self, engine):
+        self._engine = engine
+
+    @asynccontextmanager
+    async def connect(self):
+        yield _Conn(self._engine, "autocommit")
+
+
+class _Conn:
+    def __init__(self, engine, mode):
+        self.engine = engine
+        self.mode = mode
+
+    async def execute(self, clause, params=None):
+        sql = str(clause).strip()
+        self.engine.statements.append((self.mode, sql))
+        if sql.startswith("CREATE TABLE IF NOT EXISTS schema_migration_ledger"):
+            if self.engine.ledger is None:
+                self.engine.ledger = {}
+        elif sql.startswith("SELECT checksum FROM schema_migration_ledger"):
+            if self.engine.ledger is None:
+                raise ProgrammingError(sql, {}, Exception("relation does not exist"))
+            return _Result((checksum,) for checksum in self.engine.ledger)
+        elif sql.startswith("INSERT INTO schema_migration_ledger"):
+            self.engine.ledger[params["checksum"]] = params["step"]
+        elif "pg_try_advisory_lock" in sql:
+            return _Result([(self.engine.lock_available,)])
+        return _Result()
+
+
+def _all_applied():
+    return {step.checksum: step.name for step in (*MIGRATION_STEPS, *INDEX_STEPS)}
+
+
+@pytest.mark.asyncio
+async def test_second_boot_issues_only_the_ledger_lookup():
+    engine = FakeEngine()
+    await run_startup_migrations(engine)
+    first_boot = len(engine.statements)
+
+    engine.statements.clear()
+    await run_startup_migrations(engine)
+
+    assert first_boot > len(MIGRATION_STEPS)
+    assert engine.statements == [("connect", "SELECT checksum FROM schema_migration_ledger")]
+
+
+@pytest.mark.asyncio
+async def test_first_boot_applies_steps_under_advisory_lock_and_records_them():
+    engine = FakeEngine()
+    await run_startup_migrations(engine)
+
+    sqls = [sql for mode, sql in engine.statements if mode == "transaction"]
+    lock_at = next(i for i, sql in enumerate(sqls) if "pg_advisory_xact_lock" in sql)
+    first_alter = next(i for i, sql in enumerate(sqls) if sql.startswith("ALTER TABLE"))
+    assert sqls[0].startswith("CREATE TABLE IF NOT EXISTS schema_migration_ledger")
+    assert lock_at < first_alter
+    assert set(engine.ledger) == {step.checksum for step in MIGRATION_STEPS}
+    # No index build blocks the boot path.
+    assert not any("CREATE INDEX" in sql or "CREATE UNIQUE INDEX" in sql for sql in sqls)
+
+
+@pytest.mark.asyncio
+async def test_only_changed_steps_rerun():
+    ledger = _all_applied()
+    changed = MIGRATION_STEPS[0]
+    del ledger[changed.checksum]
+    engine = FakeEngine(ledger)
+
+    await run_startup_migrations(engine)
+
+    executed = [sql for mode, sql in engine.statements if sql.startswith("ALTER TABLE")]
+    assert executed == list(changed.statements)
+
+
+@pytest.mark.asyncio
+async def test_index_pass_builds_concurrently_on_autocommit_connection():
+    ledger = {step.checksum: step.name for step in MIGRATION_STEPS}
+    engine = FakeEngine(ledger)
+
+    await build_startup_indexes(engine)
+
+    builds = [(mode, sql) for mode, sql in engine.statements if "INDEX CONCURRENTLY" in sql]
+    assert {mode for mode, _ in builds} == {"autocommit"}
+    assert any("vendor_embedding_ivfflat_idx" in sql for _, sql in builds)
+    assert any("vendor_name_trgm_idx" in sql for _, sql in builds)
+    assert "pg_advisory_unlock" in engine.statements[-1][1]
+    assert set(engine.ledger) == set(_all_applied())
+
+    engine.statements.clear()
+    await build_startup_indexes(engine)
+    assert engine.statements == [("connect", "SELECT checksum FROM schema_migration_ledger")]
+
+
+@pytest.mark.asyncio
+async def test_index_pass_defers_to_the_replica_holding_the_lock():
+    applied = {step.checksum: step.name for step in MIGRATION_STEPS}
+    engine = FakeEngine(applied, lock_available=False)
+
+    await build_startup_indexes(engine)
+
+    assert not any("INDEX CONCURRENTLY" in sql for _, sql in engine.statements)
+    assert not any("pg_advisory_unlock" in sql for _, sql in engine.statements)
@@ -0,0 +1,173 @@
+"""Tests for chunked attachment uploads into disk and bucket storage."""
+
+import asyncio
+import io
+
+import pytest
+
+import storage
+from storage import BucketStorageProvider, DiskStorageProvider, iter_upload_chunks
+
+
+class FakeUpload:
+    def __init__(self, data: bytes, filename: str = "shot.png"):
+        self._buf = io.BytesIO(data)
+        self.filename = filename
+        self.reads = []
+        self.closed = False
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self._buf.read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeS3:
+    def __init__(self, fail_on_part: int = 0):
+        self.calls = []
+        self.fail_on_part = fail_on_part
+
+    async def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs["Key"], len(kwargs["Body"])))
+
+    async def create_multipart_upload(self, **kwargs):
+        self.calls.append(("create_multipart_upload", kwargs["Key"]))
+        return {"UploadId": "up-1"}
+
+    async def upload_part(self, **kwargs):
+        if kwargs["PartNumber"] == self.fail_on_part:
+            raise ConnectionError("reset by peer")
+        self.calls.append(("upload_part", kwargs["PartNumber"], len(kwargs["Body"])))
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    async def complete_multipart_upload(self, **kwargs):
+        self.calls.append(("complete_multipart_upload", kwargs["MultipartUpload"]["Parts"]))
+
+    async def abort_multipart_upload(self, **kwargs):
+        self.calls.append(("abort_multipart_upload", kwargs["UploadId"]))
+
+
+def _bucket(s3: FakeS3) -> BucketStorageProvider:
+    provider = BucketStorageProvider.__new__(BucketStorageProvider)
+    provider.endpoint_url = "https://bucket.example.com"
+    provider.bucket_name = "uploads"
+    provider._client = s3
+    provider._client_stack = None
+    provider._client_lock = asyncio.Lock()
+    return provider
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_iter_upload_chunks_reads_in_bounded_pieces():
+    upload = FakeUpload(b"x" * 2500)
+    chunks = [chunk async for chunk in iter_upload_chunks(upload, chunk_size=1000)]
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    assert max(upload.reads) == 1000
+
+
+@pytest.mark.asyncio
+async def test_disk_save_stream_writes_all_chunks(tmp_path):
+    provider = DiskStorageProvider(str(tmp_path))
+
+    url = await provider.save_stream(_chunks(b"abc", b"def"), "my file.txt", "bugs")
+
+    assert url.startswith("/uploads/bugs/") and url.endswith("_my_file.txt")
+    assert (tmp_path / url.removeprefix("/uploads/")).read_bytes() == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_disk_save_stream_removes_partial_file_on_error(tmp_path):
+    provider = DiskStorageProvider(str(tmp_path))
+
+    async def broken():
+        yield b"partial"
+        raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        await provider.save_stream(broken(), "a.txt", "bugs")
+    assert list((tmp_path / "bugs").iterdir()) == []
+
+
+def test_part_size_is_raised_to_the_s3_minimum(monkeypatch):
+    monkeypatch.setenv("BUCKET_MULTIPART_PART_SIZE", str(1024 * 1024))
+    assert storage._multipart_part_size() == storage.MIN_MULTIPART_PART_SIZE == 5 * 1024 * 1024
+
+    monkeypatch.setenv("BUCKET_MULTIPART_PART_SIZE", str(16 * 1024 * 1024))
+    assert storage._multipart_part_size() == 16 * 1024 * 1024
+
+
+@pytest.mark.asyncio
+async def test_bucket_small_object_uses_single_put(monkeypatch):
+    monkeypatch.setattr(storage, "MULTIPART_PART_SIZE", 10)
+    s3 = FakeS3()
+
+    url = await _bucket(s3).save_stream(_chunks(b"abc", b"de"), "a.png", "bugs")
+
+    assert [c[0] for c in s3.calls] == ["put_object"]
+    assert s3.calls[0][2] == 5
+    assert url.startswith("https://bucket.example.com/uploads/bugs/")
+
+
+@pytest.mark.asyncio
+async def test_bucket_large_object_uses_multipart(monkeypatch):
+    monkeypatch.setattr(storage, "MULTIPART_PART_SIZE", 10)
+    s3 = FakeS3()
+
+    await _bucket(s3).save_stream(_chunks(b"a" * 7, b"b" * 7, b"c" * 9), "big.bin", "bugs")
+
+    assert s3.calls[0][0] == "create_multipart_upload"
+    assert [c[1:] for c in s3.calls if c[0] == "upload_part"] == [(1, 10), (2, 10), (3, 3)]
+    assert s3.calls[-1] == (
+        "complete_multipart_upload",
+        [{"ETag": f"etag-{n}", "PartNumber": n} for n in (1, 2, 3)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_bucket_failed_part_aborts_multipart(monkeypatch):
+    monkeypatch.setattr(storage, "MULTIPART_PART_SIZE", 10)
+    s3 = FakeS3(fail_on_part=2)
+
+    with pytest.raises(ConnectionError):
+        await _bucket(s3).save_stream(_chunks(b"a" * 25), "big.bin", "bugs")
+
+    assert s3.calls[-1] == ("abort_multipart_upload", "up-1")
+
+
+@pytest.mark.asyncio
+async def test_bug_attachments_upload_concurrently(monkeypatch):
+    from routes import bugs
+
+    active = 0
+    peak = 0
+
+    class SlowStorage:
+        async def save_stream(self, chunks, filename, subfolder="bugs"):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            data = b"".join([c async for c in chunks])
+            await asyncio.sleep(0.02)
+            active -= 1
+            if filename == "bad.png":
+                raise OSError("disk full")
+            return f"/uploads/{subfolder}/{filename}:{len(data)}"
+
+    monkeypatch.setattr(bugs, "get_storage", lambda: SlowStorage())
+    uploads = [
+        FakeUpload(b"1" * 3, "a.png"), FakeUpload(b"2", "bad.png"), FakeUpload(b"3" * 2, "c.png")
+    ]
+
+    results = await asyncio.gather(*[bugs._save_attachment(u) for u in uploads])
+
+    assert peak == 3
+    assert results == ["/uploads/bugs/a.png:3", None, "/uploads/bugs/c.png:2"]
+    assert all(u.closed for u in uploads)
@@ -0,0 +1,146 @@
+"""Stripe SDK calls must not block the event loop (services/stripe_calls.py)."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import Request
+
+from routes.checkout import BatchCheckoutRequest, batch_checkout
+from services.stripe_calls import call_stripe
+
+STRIPE_LATENCY = 0.2
+
+
+def _slow_create(**params):
+    time.sleep(STRIPE_LATENCY)  # the real SDK blocks on HTTPS
+    checkout_session = MagicMock()
+    checkout_session.id = f"cs_{params['metadata']['bid_id']}"
+    checkout_session.url = f"https://checkout.stripe.com/pay/{checkout_session.id}"
+    return checkout_session
+
+
+def _bid(bid_id: int) -> MagicMock:
+    bid = MagicMock()
+    bid.id = bid_id
+    bid.row_id = 1
+    bid.price = 10.0 * bid_id
+    bid.currency = "USD"
+    bid.item_title = f"Item {bid_id}"
+    bid.image_url = None
+    bid.vendor_id = None
+    return bid
+
+
+def _mock_db():
+    row = MagicMock()
+    row.id = 1
+    row_result = MagicMock()
+    row_result.first.return_value = row
+    session = AsyncMock()
+    session.exec = AsyncMock(return_value=row_result)
+    session.get = AsyncMock(side_effect=lambda model, bid_id: _bid(bid_id))
+    return session
+
+
+def _request() -> Request:
+    return Request({"type": "http", "headers": [], "query_string": b""})
+
+
+class LoopProbe:
+    """Stripe stand-in that only returns after the event loop has run during the call.
+
+    If the call blocked the loop, the ticker could not run and the call would
+    fail after ``timeout`` seconds. Unlike a bound on loop gaps, this does not
+    depend on how long unrelated pauses (such as a GC pass) take.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self._ticked = threading.Event()
+        self._stop = asyncio.Event()
+        self.blocked_calls = 0
+
+    async def tick(self) -> None:
+        while not self._stop.is_set():
+            self._ticked.set()
+            await asyncio.sleep(0.005)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def create(self, **params):
+        self._ticked.clear()
+        if not self._ticked.wait(self.timeout):
+            self.blocked_calls += 1
+        return _slow_create(**params)
+
+
+@pytest.mark.asyncio
+async def test_call_stripe_does_not_block_event_loop():
+    probe = LoopProbe()
+    ticker = asyncio.create_task(probe.tick())
+
+    result = await call_stripe(probe.create, metadata={"bid_id": "7"})
+    probe.stop()
+    await ticker
+
+    assert result.id == "cs_7"
+    assert probe.blocked_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_checkout_creates_sessions_concurrently_without_blocking():
+    probe = LoopProbe()
+    stripe = MagicMock()
+    stripe.checkout.Session.create.side_effect = probe.create
+    auth = MagicMock()
+    auth.user_id = 1
+
+    ticker = asyncio.create_task(probe.tick())
+    with patch("routes.checkout._get_stripe", return_value=stripe), \
+            patch("routes.checkout.get_current_session", AsyncMock(return_value=auth)), \
+            patch("routes.checkout.audit_log", AsyncMock()):
+        started = time.monotonic()
+        response = await batch_checkout(
+            _request(),
+            BatchCheckoutRequest(bid_ids=[1, 2, 3, 4], row_id=1),
+            authorization="Bearer token",
+            session=_mock_db(),
+        )
+        elapsed = time.monotonic() - started
+    probe.stop()
+    await ticker
+
+    assert [s["session_id"] for s in response.sessions] == ["cs_1", "cs_2", "cs_3", "cs_4"]
+    assert response.total_amount == 100.0
+    assert probe.blocked_calls == 0
+    # Four sequential calls would take 4 * STRIPE_LATENCY.
+    assert elapsed < STRIPE_LATENCY * 3
+
+
+@pytest.mark.asyncio
+async def test_batch_checkout_skips_failed_sessions():
+    def create(**params):
+        if params["metadata"]["bid_id"] == "2":
+            raise RuntimeError("card_declined")
+        return _slow_create(**params)
+
+    stripe = MagicMock()
+    stripe.checkout.Session.create.side_effect = create
+    auth = MagicMock()
+    auth.user_id = 1
+
+    with patch("routes.checkout._get_stripe", return_value=stripe), \
+            patch("routes.checkout.get_current_session", AsyncMock(return_value=auth)), \
+            patch("routes.checkout.audit_log", AsyncMock()):
+        response = await batch_checkout(
+            _request(),
+            BatchCheckoutRequest(bid_ids=[1, 2, 3], row_id=1),
+            authorization="Bearer token",
+            session=_mock_db(),
+        )
+
+    assert [s["bid_id"] for s in response.sessions] == [1, 3]
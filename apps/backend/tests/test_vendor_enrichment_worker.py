@@ -0,0 +1,162 @@
+"""Tests for the vendor enrichment queue worker (no DB)."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from models import VendorEnrichmentQueueItem
+from services import vendor_enrichment_worker as worker_mod
+from services.vendor_enrichment_worker import (
+    STATUS_DEAD_LETTER,
+    STATUS_RETRY,
+    EnrichmentError,
+    EnrichmentWorkerConfig,
+    VendorEnrichmentWorker,
+    apply_failure,
+    backoff_seconds,
+    enrich_candidate,
+)
+
+
+def _item(retry_count: int = 0) -> VendorEnrichmentQueueItem:
+    return VendorEnrichmentQueueItem(
+        id=1,
+        candidate_id=10,
+        row_id=5,
+        discovery_session_id="s1",
+        discovery_mode="organic",
+        source_provider="google_organic",
+        retry_count=retry_count,
+        payload={"website_url": "https://acme.example.com"},
+    )
+
+
+def _candidate(name: str = "Acme Charters") -> dict:
+    return {
+        "candidate_id": 10,
+        "vendor_name": name,
+        "website_url": "https://acme.example.com",
+        "canonical_domain": "acme.example.com",
+        "email": None,
+        "phone": None,
+        "image_url": None,
+    }
+
+
+def _worker(**kwargs) -> VendorEnrichmentWorker:
+    return VendorEnrichmentWorker(session_factory=lambda: None, **kwargs)
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    config = EnrichmentWorkerConfig(base_backoff_seconds=10, max_backoff_seconds=50)
+    assert [backoff_seconds(n, config, jitter=0) for n in (1, 2, 3, 4)] == [10, 20, 40, 50]
+
+
+def test_failure_schedules_retry_then_dead_letters():
+    config = EnrichmentWorkerConfig(max_attempts=3, base_backoff_seconds=60)
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    item = _item()
+
+    apply_failure(item, "crawl failed", config, now=now)
+    assert item.status == STATUS_RETRY
+    assert item.retry_count == 1
+    assert item.next_attempt_at > now
+    assert item.payload["last_error"] == "crawl failed"
+    assert item.payload["website_url"] == "https://acme.example.com"
+
+    apply_failure(item, "crawl failed", config, now=now)
+    apply_failure(item, "still failing", config, now=now)
+    assert item.status == STATUS_DEAD_LETTER
+    assert item.next_attempt_at is None
+    assert item.payload["last_error"] == "still failing"
+
+
+@pytest.mark.asyncio
+async def test_enrich_all_runs_concurrently_with_a_bound():
+    active = 0
+    peak = 0
+
+    async def enrich(candidate):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        if candidate["vendor_name"] == "broken":
+            raise EnrichmentError("insufficient site text")
+        return {"profile_text": candidate["vendor_name"]}
+
+    worker = _worker(config=EnrichmentWorkerConfig(concurrency=3), enrich=enrich)
+    candidates = {i: _candidate("broken" if i == 4 else f"v{i}") for i in range(1, 9)}
+
+    outcomes = await worker.enrich_all(candidates)
+
+    assert peak == 3
+    assert isinstance(outcomes[4], EnrichmentError)
+    assert outcomes[1] == {"profile_text": "v1"}
+
+
+@pytest.mark.asyncio
+async def test_run_once_embeds_in_one_batch_and_routes_failures():
+    embed_calls = []
+
+    async def enrich(candidate):
+        if candidate["vendor_name"] == "broken":
+            raise EnrichmentError("crawl failed")
+        return {"profile_text": f"profile {candidate['vendor_name']}"}
+
+    async def embed(texts):
+        embed_calls.append(list(texts))
+        return [[float(i)] for i, _ in enumerate(texts)]
+
+    worker = _worker(config=EnrichmentWorkerConfig(), enrich=enrich, embed=embed)
+    worker.claim_batch = AsyncMock(return_value=[1, 2, 3])
+    worker._load_candidates = AsyncMock(
+        return_value={1: _candidate("a"), 2: _candidate("broken"), 3: _candidate("c")}
+    )
+    worker._complete = AsyncMock()
+    worker._fail = AsyncMock()
+
+    assert await worker.run_once() == 3
+
+    assert embed_calls == [["profile a", "profile c"]]
+    completed = {call.args[0]: call.args[3] for call in worker._complete.await_args_list}
+    assert completed == {1: [0.0], 3: [1.0]}
+    worker._fail.assert_awaited_once()
+    assert worker._fail.await_args.args[0] == 2
+    assert "crawl failed" in worker._fail.await_args.args[1]
+    assert worker.stats["claimed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_run_once_returns_zero_when_queue_is_empty():
+    worker = _worker(config=EnrichmentWorkerConfig())
+    worker.claim_batch = AsyncMock(return_value=[])
+    assert await worker.run_once() == 0
+    assert worker.stats["batches"] == 0
+
+
+@pytest.mark.asyncio
+async def test_enrich_candidate_merges_llm_fields_and_contact_hints():
+    site_text = "Acme Charters " + "luxury yacht charters in Miami. " * 10 + "Call (305) 555-0100"
+    llm_fields = {
+        "description": "Yacht charters.", "specialties": ["yachts", "events"], "email": None
+    }
+    with patch.object(worker_mod, "fetch_site_text", AsyncMock(return_value=site_text)), \
+            patch.object(worker_mod, "extract_vendor_profile", AsyncMock(return_value=llm_fields)):
+        fields = await enrich_candidate(_candidate())
+
+    assert fields["description"] == "Yacht charters."
+    assert fields["specialties"] == "yachts, events"
+    assert "555-0100" in fields["phone"]
+    assert fields["profile_text"].startswith("Acme Charters")
+    assert "Website: acme.example.com" in fields["profile_text"]
+
+
+@pytest.mark.asyncio
+async def test_enrich_candidate_rejects_thin_sites():
+    with patch.object(worker_mod, "fetch_site_text", AsyncMock(return_value="Coming soon")):
+        with pytest.raises(EnrichmentError):
+            await enrich_candidate(_candidate())
@@ -0,0 +1,53 @@
+"""Run CPU-heavy search stages (scoring, reranking) on a shared thread pool.
+
+Pool size: ``SEARCH_CPU_WORKERS``. Calls with fewer than
+``SEARCH_CPU_OFFLOAD_MIN_ITEMS`` items run inline.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _max_workers() -> int:
+    return max(1, _env_int("SEARCH_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix="search-cpu")
+    return _executor
+
+
+async def run_cpu_bound(
+    fn: Callable[..., T], *args: Any, items: Optional[int] = None, **kwargs: Any
+) -> T:
+    """Await ``fn(*args, **kwargs)`` on the CPU pool; inline below the item threshold."""
+    if items is not None and items < _env_int("SEARCH_CPU_OFFLOAD_MIN_ITEMS", 20):
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_cpu_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -0,0 +1,145 @@
+"""
+Incremental parsing of a JSON object that arrives in arbitrary text chunks.
+
+Used to act on a streamed LLM response before it is complete: top-level fields
+are reported as soon as their value closes, and selected string fields are
+reported character by character while they are still being written.
+Text before the first ``{`` (markdown fences, prose) is ignored.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+# Models sometimes put raw newlines inside strings; accept them.
+_decoder = json.JSONDecoder(strict=False)
+
+
+@dataclass
+class JSONStreamEvent:
+    kind: str  # "delta" (partial text of a streamed string field) or "field" (complete value)
+    key: str
+    value: Any
+
+
+def _decode_partial_string(raw: str) -> str:
+    """Decode the longest prefix of a JSON string body that is safe to show."""
+    # Back off over an incomplete trailing escape (at most "\uXXXX" + a dangling "\").
+    for cut in range(len(raw), max(-1, len(raw) - 7), -1):
+        try:
+            text = _decoder.decode('"' + raw[:cut] + '"')
+        except ValueError:
+            continue
+        # Hold back a high surrogate until its pair arrives.
+        if text and "\ud800" <= text[-1] <= "\udbff":
+            text = text[:-1]
+        return text
+    return ""
+
+
+class StreamingJSONObjectParser:
+    """Parse one top-level JSON object fed in chunks; see ``feed``."""
+
+    def __init__(self, stream_fields: Iterable[str] = ()):
+        self.stream_fields = set(stream_fields)
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key | colon | value | comma (at depth 1)
+        self._token_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._streamed = 0
+
+    def feed(self, chunk: str) -> List[JSONStreamEvent]:
+        """Consume ``chunk`` and return the events it completed, in order."""
+        events: List[JSONStreamEvent] = []
+        if self.done or not chunk:
+            return events
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_string(i, events)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect == "key":
+                        self._token_start = i
+                    elif self._expect == "value":
+                        self._value_start = i
+                        self._streamed = 0
+            elif self._depth > 1:
+                if ch in "{[":
+                    self._depth += 1
+                elif ch in "}]":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._complete(_decoder.decode(text[self._value_start : i + 1]), events)
+            elif ch == ":":
+                self._expect = "value"
+            elif ch in "{[":
+                self._depth += 1
+                self._value_start = i
+            elif ch in ",}":
+                if self._value_start is not None:  # a bare number / true / false / null
+                    self._complete(_decoder.decode(text[self._value_start : i].strip()), events)
+                self._expect = "key"
+                if ch == "}":
+                    self.done = True
+            elif not ch.isspace() and self._expect == "value" and self._value_start is None:
+                self._value_start = i
+
+        self._emit_partial(events)
+        return events
+
+    def _close_string(self, end: int, events: List[JSONStreamEvent]) -> None:
+        if self._expect == "key":
+            self._key = _decoder.decode(self._text[self._token_start : end + 1])
+            self._expect = "colon"
+            return
+        value = _decoder.decode(self._text[self._value_start : end + 1])
+        if self._key in self.stream_fields and len(value) > self._streamed:
+            events.append(JSONStreamEvent("delta", self._key, value[self._streamed :]))
+        self._complete(value, events)
+
+    def _complete(self, value: Any, events: List[JSONStreamEvent]) -> None:
+        self.fields[self._key] = value
+        events.append(JSONStreamEvent("field", self._key, value))
+        self._expect = "comma"
+        self._value_start = None
+
+    def _emit_partial(self, events: List[JSONStreamEvent]) -> None:
+        """Report newly arrived text of a streamed string field that is still open."""
+        if not (self._in_string and self._depth == 1 and self._expect == "value"):
+            return
+        if self._key not in self.stream_fields or self._value_start is None:
+            return
+        partial = _decode_partial_string(self._text[self._value_start + 1 : self._pos])
+        if len(partial) > self._streamed:
+            events.append(JSONStreamEvent("delta", self._key, partial[self._streamed :]))
+            self._streamed = len(partial)
@@ -7,13 +7,123 @@ throughout the application, reducing code duplication and improving reliability.
 
 import json
 import logging
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
 from typing import Any, Optional, TypeVar, Callable
+from uuid import UUID
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:  # declared in pyproject.toml; the stdlib encoder below produces the same JSON
+    import orjson
+except ImportError:  # pragma: no cover - stale environments without orjson
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
+# =============================================================================
+# Fast encoding (SSE frames, pre-encoded responses)
+# =============================================================================
+
+def _encode_default(obj: Any) -> Any:
+    """Convert types neither encoder handles natively, the way FastAPI's jsonable_encoder does."""
+    if isinstance(obj, BaseModel):  # includes SQLModel tables
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        exponent = obj.as_tuple().exponent
+        return int(obj) if isinstance(exponent, int) and exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, float):  # float subclasses such as numpy.float64
+        return float(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of ``obj`` with NaN and infinities replaced by None, as orjson encodes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    return _finite(_encode_default(obj))
+
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """
+    Encode ``obj`` as compact UTF-8 JSON.
+
+    Uses orjson when installed and falls back to the stdlib encoder (for values
+    orjson rejects, such as integers beyond 64 bits). Both produce the same
+    format as Starlette's JSONResponse: no whitespace, non-ASCII kept as UTF-8.
+    Datetimes, Decimals and pydantic/SQLModel objects are encoded like FastAPI
+    encodes them. NaN and infinities become ``null`` on both paths.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_encode_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    try:
+        return _stdlib_dumps(obj)
+    except ValueError:  # out of range floats
+        return _stdlib_dumps(_finite(obj))
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(
+        obj,
+        default=_encode_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def json_dumps_fast(obj: Any) -> str:
+    """``json_dumps_bytes`` as a str, for text protocols such as SSE."""
+    return json_dumps_bytes(obj).decode("utf-8")
+
+
+def sse_data(payload: Any) -> str:
+    """Format an unnamed SSE frame carrying ``payload`` as JSON."""
+    return f"data: {json_dumps_fast(payload)}\n\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with ``json_dumps_bytes``.
+
+    Return it directly from handlers that build large plain-dict payloads:
+    FastAPI then skips its recursive ``jsonable_encoder`` pass, which costs far
+    more than the encoding itself. Routes with a ``response_model`` should keep
+    the default class, since FastAPI serializes those with pydantic-core.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps_bytes(content)
+
+
 def safe_json_loads(
     s: Optional[str],
     default: Optional[T] = None,
@@ -0,0 +1,86 @@
+"""Category term normalization shared by row persistence and the seller inbox."""
+
+import json
+import re
+from typing import Any, Iterable, List, Optional
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({"a", "an", "and", "for", "in", "of", "or", "the", "to", "with"})
+
+# search_intent keys that describe what the buyer wants (not prices, locations or features).
+INTENT_TERM_KEYS = (
+    "category",
+    "service_type",
+    "product_category",
+    "category_path",
+    "product_name",
+    "keywords",
+    "what",
+)
+
+# Mirrors ``match_terms`` in SQL so backfills and merchant lookups agree with the
+# Python write path. ``{expr}`` is any text expression.
+SQL_TERMS_TEMPLATE = (
+    "ARRAY(SELECT DISTINCT t FROM regexp_split_to_table(lower({expr}), '[^a-z0-9]+') AS t "
+    "WHERE t <> '' AND t <> ALL(ARRAY["
+    + ", ".join(f"'{w}'" for w in sorted(STOPWORDS))
+    + "]) ORDER BY t)"
+)
+
+
+def match_terms(*values: Optional[str]) -> List[str]:
+    """Sorted, de-duplicated lowercase alphanumeric tokens of ``values``, minus stopwords.
+
+    ``"Private Aviation"`` and ``"private_aviation"`` both normalize to
+    ``["aviation", "private"]``, so a merchant matches a row when its terms are a
+    subset of the row's (``row.match_terms @> merchant_terms`` in SQL).
+    """
+    terms = set()
+    for value in values:
+        if value:
+            terms.update(t for t in _TOKEN_RE.findall(value.lower()) if t not in STOPWORDS)
+    return sorted(terms)
+
+
+def _intent_strings(search_intent: Any) -> Iterable[str]:
+    if isinstance(search_intent, str):
+        try:
+            search_intent = json.loads(search_intent)
+        except (TypeError, ValueError):
+            return [search_intent]
+    if not isinstance(search_intent, dict):
+        return []
+    strings: List[str] = []
+    for key in INTENT_TERM_KEYS:
+        value = search_intent.get(key)
+        if isinstance(value, str):
+            strings.append(value)
+        elif isinstance(value, list):
+            strings.extend(v for v in value if isinstance(v, str))
+    return strings
+
+
+def row_match_terms(
+    title: Optional[str], service_category: Optional[str], search_intent: Any = None
+) -> List[str]:
+    """Terms stored on ``row.match_terms``: title, service category and intent category fields."""
+    return match_terms(title, service_category, *_intent_strings(search_intent))
+
+
+def _intent_value_sql(key: str) -> str:
+    value = f"to_jsonb(search_intent)->'{key}'"
+    return (
+        f"CASE jsonb_typeof({value}) "
+        f"WHEN 'string' THEN to_jsonb(search_intent)->>'{key}' "
+        "WHEN 'array' THEN "
+        f"(SELECT string_agg(e, ' ') FROM jsonb_array_elements_text({value}) AS e) END"
+    )
+
+
+# SQL equivalent of ``row_match_terms`` over the ``row`` table's columns (used to backfill).
+ROW_TERMS_SQL = SQL_TERMS_TEMPLATE.format(
+    expr="concat_ws(' ', title, service_category, "
+    + ", ".join(_intent_value_sql(key) for key in INTENT_TERM_KEYS)
+    + ")"
+)
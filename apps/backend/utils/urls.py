@@ -0,0 +1,38 @@
+"""URL normalization shared by bookmarks and bid persistence."""
+
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_TRACKING_PARAMS = {
+    "tag", "ref", "ref_", "fbclid", "gclid", "mc_cid", "mc_eid", "aff", "aff_id", "clickid"
+}
+
+
+def normalize_bookmark_url(url: Optional[str]) -> Optional[str]:
+    """Canonical form used to match item bookmarks against bids.
+
+    Forces https, drops ``www.``, trailing slashes, fragments and tracking/affiliate
+    query params. Stored on ``bid.normalized_url`` so matching can happen in SQL.
+    """
+    if not url:
+        return None
+    candidate = url.strip()
+    if not candidate:
+        return None
+    if not candidate.startswith(("http://", "https://")):
+        candidate = f"https://{candidate}"
+    try:
+        parsed = urlsplit(candidate)
+        host = parsed.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        filtered_query = [
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+        ]
+        normalized_path = parsed.path.rstrip("/") or parsed.path or "/"
+        query = urlencode(filtered_query, doseq=True)
+        return urlunsplit(("https", host, normalized_path, query, ""))
+    except Exception:
+        return candidate
@@ -272,7 +272,10 @@ export default function Chat() {
                 ? (data as SsePayload)
                 : {};
 
-            if (eventName === 'assistant_message') {
+            if (eventName === 'assistant_message_delta') {
+              // Streamed while the model is still writing; assistant_message carries the final text
+              assistantContent += typeof payload.text === 'string' ? payload.text : '';
+            } else if (eventName === 'assistant_message') {
               assistantContent = typeof payload.text === 'string' ? payload.text : '';
             } else if (eventName === 'action_started') {
               if (payload.type === 'search') {